@@ -1,5 +1,8 @@
 import os
-from inspect import signature
+from hashlib import blake2b
+from inspect import iscoroutinefunction, signature
+
+from MVP.refactored.backend.lru_cache import LRUCache
 
 
 def get_predefined_functions() -> dict:
@@ -17,6 +20,39 @@ def get_predefined_functions() -> dict:
 
 functions = get_predefined_functions()
 
+DEFAULT_MEMO_SIZE = 128
+
+
+class CompiledFunctionCache(LRUCache):
+    """
+    Process-wide cache of compiled box function code, keyed by a hash of the code.
+
+    Every distinct code is executed once and the resulting `invoke` function and `meta` are shared by all BoxFunctions
+    with that code, predefined or user defined. The cache is bounded by `max_size`, least recently used entries go
+    first. Edited code gets a new key by itself, `invalidate` drops the entry of code that was replaced or deleted.
+    """
+
+    @staticmethod
+    def key(code: str) -> str:
+        return blake2b(code.encode(), digest_size=16).hexdigest()
+
+    def get(self, code: str) -> tuple:
+        """Return the `invoke` function and `meta` of the code, executing the code only when it is not cached."""
+        return super().get(self.key(code), lambda: self.compile(code))
+
+    @staticmethod
+    def compile(code: str) -> tuple:
+        # one namespace, so names imported by the code are globals of `invoke`
+        namespace = {}
+        exec(code, namespace)
+        return namespace["invoke"], namespace["meta"]
+
+    def invalidate(self, code: str) -> None:
+        self.pop(self.key(code))
+
+
+compiled_functions = CompiledFunctionCache()
+
 
 class BoxFunction:
     def __init__(self, name, code=None):
@@ -27,14 +63,37 @@ class BoxFunction:
             self.code: str = code
         else:
             raise ValueError("Should be specified function code or name of predefined function")
-        local = {}
-        exec(self.code, {}, local)
-        self.function = local["invoke"]
-        self.meta = local["meta"]
+        self.function, self.meta = compiled_functions.get(self.code)
 
     def __call__(self, *args):
         return self.function(*args)
 
+    @property
+    def is_vectorizable(self) -> bool:
+        """Whether `invoke` also accepts whole NumPy arrays, computing every row at once."""
+        return bool(self.meta.get("vectorizable", False))
+
+    @property
+    def is_coroutine(self) -> bool:
+        """Whether `invoke` is an `async def` function, so calling it returns a coroutine to await."""
+        return iscoroutinefunction(self.function)
+
+    @property
+    def memo_size(self) -> int | None:
+        """
+        Number of results kept for a function that `meta` declares pure, `"cache_size"` in `meta` or 128.
+
+        None when the results are not memoized: the function is not pure, or is a coroutine, whose result can only
+        be awaited once.
+        """
+        if not self.meta.get("pure", False) or self.is_coroutine:
+            return None
+        return int(self.meta.get("cache_size", DEFAULT_MEMO_SIZE))
+
+    def __reduce__(self):
+        # The compiled function can not be pickled, it is compiled again from the code in the receiving process.
+        return BoxFunction, (self.name, self.code)
+
     def count_inputs(self):
         sig = signature(self.code)
         params = sig.parameters
@@ -0,0 +1,61 @@
+import hashlib
+import threading
+
+from MVP.refactored.backend.lru_cache import LRUCache
+
+
+class Memo(LRUCache):
+    """
+    LRU cache of the results of a pure function, keyed on its arguments.
+
+    Hashable arguments are keyed by type and value. Arrays (anything with `dtype` and `tobytes`, like NumPy arrays) are
+    keyed by dtype, shape and a hash of their content, up to `max_array_bytes` bytes; lists and tuples by their items.
+    A call with any other unhashable argument, or a larger array, is passed through and counted in `uncached`.
+    Cached results are shared between calls, so callers must not modify them.
+
+    The class only uses the standard library, the code generator emits its source, after that of LRUCache, into
+    modules with pure boxes.
+    """
+
+    def __init__(self, function, max_size=128, max_array_bytes=1 << 20):
+        super().__init__(max_size)
+        self.function = function
+        self.max_array_bytes = max_array_bytes
+        self.uncached = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, *args):
+        try:
+            key = self.key(args)
+        except TypeError:
+            with self.lock:
+                self.uncached += 1
+            return self.function(*args)
+        with self.lock:
+            found, result = self.lookup(key)
+        if found:
+            return result
+        result = self.function(*args)
+        with self.lock:
+            self.put(key, result)
+        return result
+
+    def __reduce__(self):
+        # The lock can not be pickled, a process pool worker starts with an empty memo.
+        return Memo, (self.function, self.max_size, self.max_array_bytes)
+
+    def key(self, value):
+        """Hashable key of the value, raises TypeError for values that can not be keyed."""
+        if isinstance(value, (tuple, list)):
+            return type(value).__name__, tuple(self.key(item) for item in value)
+        if hasattr(value, "dtype") and hasattr(value, "tobytes"):
+            if value.dtype.hasobject or value.nbytes > self.max_array_bytes:
+                raise TypeError("Array can not be keyed by its content")
+            digest = hashlib.blake2b(value.tobytes(), digest_size=16).digest()
+            return "array", value.dtype.str, value.shape, digest
+        hash(value)
+        return type(value), value
+
+    def clear(self):
+        super().clear()
+        self.uncached = 0
@@ -9,5 +9,6 @@ def invoke(*numbers: list) -> int:
 meta = {
     "name": "Add",
     "min_args": 2,
-    "max_args": math.inf
+    "max_args": math.inf,
+    "vectorizable": True,
 }
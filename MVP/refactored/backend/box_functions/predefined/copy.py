@@ -5,5 +5,6 @@ def invoke(x) -> list:
 meta = {
     "name": "Copy",
     "min_args": 1,
-    "max_args": 1
+    "max_args": 1,
+    "vectorizable": True,
 }
@@ -11,4 +11,5 @@ meta = {
     "name": "Subtract",
     "min_args": 2,
     "max_args": math.inf,
+    "vectorizable": True,
 }
@@ -1,117 +1,261 @@
-import re
+import ast
+import inspect
 from queue import Queue
 
 import autopep8
 
-from MVP.refactored.backend.box_functions.box_function import BoxFunction
+from MVP.refactored.backend.box_functions.box_function import BoxFunction, CompiledFunctionCache
+from MVP.refactored.backend.box_functions.memo import Memo
+from MVP.refactored.backend.code_generation.fragment_cache import FragmentCache
 from MVP.refactored.backend.code_generation.renamer import Renamer
+from MVP.refactored.backend.execution.batch import map_rows
+from MVP.refactored.backend.execution.profiler import BoxProfile, Profiler
 from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
 from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
 from MVP.refactored.backend.hypergraph.node import Node
+from MVP.refactored.backend.hypergraph.spider_resolver import SpiderResolver
+from MVP.refactored.backend.hypergraph.structural_hash import digest
+from MVP.refactored.backend.lru_cache import LRUCache
 from MVP.refactored.frontend.components.custom_canvas import CustomCanvas
 
 
 class CodeGenerator:
-    @classmethod
-    def generate_code(cls, canvas: CustomCanvas, canvasses: dict[str, CustomCanvas], main_diagram) -> str:
-        code_parts: dict[BoxFunction, list[int]] = cls.get_all_code_parts(canvas, canvasses, main_diagram)
-        file_content = cls.get_imports([f.code for f in code_parts.keys()]) + "\n\n"
-
-        box_functions: dict[BoxFunction, set[str]] = {}
+    POOLS = {"thread": "ThreadPoolExecutor", "process": "ProcessPoolExecutor"}
+    ASYNCIO = "asyncio"
+    MEMO_IMPORTS = ("import hashlib", "import threading", "from collections import OrderedDict")
+    PROFILER_IMPORTS = ("import inspect", "import json", "import os", "import sys", "import threading", "import time")
+    fragments = FragmentCache()
 
-        for box_function in code_parts.keys():
-            renamer = Renamer()
-            variables = set()
-            variables.update(renamer.find_globals(box_function.code))
-            variables.update(renamer.find_function_names(box_function.code))
-            box_functions[box_function] = variables
+    @classmethod
+    def generate_code(cls, canvas: CustomCanvas, canvasses: dict[str, CustomCanvas], main_diagram,
+                      parallel: str = None, max_workers: int = None, batch: bool = False,
+                      formatted: bool = False, profile: bool = False) -> str:
+        """
+        Generate a Python module that runs the diagram of the canvas in `main`.
+
+        With `parallel` set to "thread" or "process", `main` submits the boxes of every topological level to a
+        concurrent.futures pool with `max_workers` workers and waits for the level before starting the next one.
+        With "asyncio", `main` is `async def main` and the boxes of every level run under `asyncio.gather`, coroutine
+        box functions are awaited and plain box functions run in a worker thread through `asyncio.to_thread`.
+
+        With `batch`, `main` takes a NumPy array per input and returns arrays. Vectorizable box functions are called
+        with the whole arrays, the others are mapped over the rows in chunks by the emitted `map_rows` helper.
+
+        Every distinct sub-diagram, by structural hash, becomes one function `sub_diagram_<n>` that the functions of its
+        parents call, so the module grows with the number of distinct sub-diagrams, not with the number of instances.
+        Sub-diagram functions run their boxes one by one, only `main` uses the pool in the "thread" and "process" modes.
+
+        Box functions and `main` are built as `ast` trees and rendered with `ast.unparse`, so the code is well-formed
+        without a formatter. Every rendered fragment is kept in `fragments`, so generating again after an edit only
+        rebuilds what the edit changed. With `formatted`, the module is also passed through autopep8 once.
+
+        Pure box functions (see `BoxFunction.memo_size`) are wrapped in a `Memo`, whose source is emitted once with
+        that of the `LRUCache` it extends.
+
+        With `profile`, the module defines a `profiler` (see `Profiler`) and every box call, sub-diagram calls
+        included, goes through it. Boxes inside a sub-diagram are recorded under the ids of the boxes of one of its
+        canvasses, all instances of the sub-diagram add up there. Profiling cannot be combined with the "process" mode.
+        """
+        if parallel is not None and parallel not in cls.POOLS and parallel != cls.ASYNCIO:
+            raise ValueError(f"Unknown parallel mode {parallel}, expected one of {[*cls.POOLS, cls.ASYNCIO]}")
+        if profile and parallel == "process":
+            raise ValueError("Profiled code cannot run boxes in worker processes")
+        sub_diagrams, sub_diagram_functions = cls.get_sub_diagrams(canvas, canvasses)
+        code_parts: dict[BoxFunction, list[int]] = cls.get_all_code_parts([canvas, *sub_diagrams], canvasses,
+                                                                           main_diagram)
+        imports: set[str] = set()
+        if parallel == cls.ASYNCIO:
+            imports.add("import asyncio")
+        elif parallel is not None:
+            imports.add(f"from concurrent.futures import {cls.POOLS[parallel]}")
+        if batch:
+            imports.add("import numpy as np")
+        if profile:
+            imports.update(cls.PROFILER_IMPORTS)
+
+        function_list: list[str] = []
+        renamed_functions: dict[BoxFunction, str] = {}
+        for i, box_function in enumerate(code_parts.keys()):
+            function_imports, function_fragment, renamed_functions[box_function] = cls.fragments.get(
+                ("function", CompiledFunctionCache.key(box_function.code), i),
+                lambda: cls.create_function_fragment(box_function, i))
+            imports.update(function_imports)
+            function_list.append(function_fragment)
+
+        if any(box_function.memo_size is not None for box_function in code_parts):
+            imports.update(cls.MEMO_IMPORTS)
+            function_list[:0] = [inspect.getsource(LRUCache), inspect.getsource(Memo)]
+        parts = ["\n".join(sorted(imports))] if imports else []
+        parts += function_list
+        if batch:
+            parts.append(cls.create_batch_helpers())
+        if profile:
+            parts.append(cls.create_profiler_helpers([canvas, *sub_diagrams]))
+        sub_diagram_parallel = cls.ASYNCIO if parallel == cls.ASYNCIO else None
+        for sub_diagram in sub_diagrams:
+            name = sub_diagram_functions[sub_diagram.id]
+            key = ("sub_diagram", name, cls.describe_canvas(sub_diagram, renamed_functions, sub_diagram_functions),
+                   sub_diagram_parallel, batch, profile)
+            parts.append(cls.fragments.get(key, lambda: cls.construct_main_function(
+                sub_diagram, renamed_functions, sub_diagram_parallel, None, batch, name, sub_diagram_functions,
+                profile)))
+        main_key = ("main", cls.describe_canvas(canvas, renamed_functions, sub_diagram_functions), parallel,
+                    max_workers, batch, profile)
+        parts.append(cls.fragments.get(main_key, lambda: cls.construct_main_function(
+            canvas, renamed_functions, parallel, max_workers, batch, sub_diagram_functions=sub_diagram_functions,
+            profile=profile)))
+        file_content = "\n\n\n".join(part.strip("\n") for part in parts) + "\n"
+        if formatted:
+            file_content = autopep8.fix_code(file_content)
 
-        function_list, renamed_functions = cls.rename(box_functions)
-        function_list = cls.remove_meta(function_list)
-        function_list = cls.remove_imports(function_list)
+        with open("diagram.py", "w") as file:
+            file.write(file_content)
 
-        file_content += "\n".join(function_list)
+        return file_content
 
-        file_content += "\n" + cls.construct_main_function(canvas, renamed_functions)
+    @classmethod
+    def create_function_fragment(cls, box_function: BoxFunction, index: int) -> tuple[tuple[str, ...], str, str]:
+        """
+        Rename the code of the box function and split it into its imports and the rest of the code without `meta`.
+
+        A pure box function is called through its `Memo`, named after `invoke` with a `_memo` suffix. `invoke` keeps
+        its name, so the memo can still be pickled for a process pool.
+
+        :return: Imports, code and the name to call the box function by.
+        """
+        (code_part,), renamed_functions = cls.rename([box_function], start=index)
+        tree = ast.parse(code_part)
+        imports = tuple(ast.unparse(statement) for statement in tree.body
+                        if isinstance(statement, (ast.Import, ast.ImportFrom)))
+        tree.body = [statement for statement in tree.body
+                     if not isinstance(statement, (ast.Import, ast.ImportFrom)) and not cls.is_meta(statement)]
+        invoke = renamed_functions[box_function]
+        code = ast.unparse(tree)
+        if box_function.memo_size is not None:
+            code += f"\n\n\n{invoke}_memo = Memo({invoke}, {box_function.memo_size})"
+            invoke = f"{invoke}_memo"
+        return imports, code, invoke
 
-        with open("diagram.py", "w") as file:
-            file.write(autopep8.fix_code(file_content))
+    @classmethod
+    def is_meta(cls, statement: ast.stmt) -> bool:
+        return isinstance(statement, ast.Assign) and any(isinstance(target, ast.Name) and target.id == "meta"
+                                                         for target in statement.targets)
 
-        return autopep8.fix_code(file_content)
+    @classmethod
+    def describe_canvas(cls, canvas: CustomCanvas, renamed_functions: dict[BoxFunction, str],
+                        sub_diagram_functions: dict[int, str] = None) -> str:
+        """Hash of everything `construct_main_function` reads from the canvas: boxes, order, wiring and functions."""
+        sub_diagram_functions = sub_diagram_functions if sub_diagram_functions is not None else {}
+        names = {box_function.code: name for box_function, name in renamed_functions.items()}
+        label_content = canvas.main_diagram.label_content
+        resolver = SpiderResolver()
+        box_names = {}
+        for label in {box.label_text for box in canvas.boxes if box.id not in sub_diagram_functions}:
+            code = BoxFunction(label, code=label_content.get(label)).code
+            box_names[label] = (names.get(code), CompiledFunctionCache.key(code))
+        boxes = tuple((box.id, box.y, sub_diagram_functions.get(box.id) or box_names[box.label_text],
+                       tuple((c.side, c.index, resolver.wire_id(c)) for c in box.connections))
+                      for box in canvas.boxes)
+        interface = tuple((c.side, c.index, resolver.wire_id(c)) for c in canvas.inputs + canvas.outputs)
+        return digest(boxes, interface)
 
     @classmethod
-    def get_all_code_parts(cls, canvas: CustomCanvas, canvasses: dict[str, CustomCanvas], main_diagram) -> dict[
-                            BoxFunction, list[int]]:
+    def get_all_code_parts(cls, canvases: list[CustomCanvas], canvasses: dict[str, CustomCanvas], main_diagram
+                           ) -> dict[BoxFunction, list[int]]:
+        """Collect the box functions of the canvases, sub-diagram boxes are left to their own canvas."""
         code_parts: dict[BoxFunction, list[int]] = dict()
-        for box in canvas.boxes:
-            if str(box.id) in canvasses:
-                code_parts.update(cls.get_all_code_parts(canvasses.get(str(box.id)), canvasses, main_diagram))
-            else:
-                box_function = BoxFunction(box.label_text, code=main_diagram.label_content[box.label_text])
-                if box_function in code_parts:
-                    code_parts[box_function].append(box.id)
-                else:
-                    code_parts[box_function] = [box.id]
+        for canvas in canvases:
+            for box in canvas.boxes:
+                if str(box.id) in canvasses:
+                    continue
+                box_function = BoxFunction(box.label_text, code=main_diagram.label_content.get(box.label_text))
+                code_parts.setdefault(box_function, []).append(box.id)
         return code_parts
 
     @classmethod
-    def get_imports(cls, code_parts: list[str]) -> str:
-        regex = r"(^import .+)|(^from .+)"
-        imports = set()
-        for part in code_parts:
-            code_imports = re.finditer(regex, part, re.MULTILINE)
-            for code_import in code_imports:
-                imports.add(code_import.group())
-        return "\n".join(imports)
+    def get_sub_diagrams(cls, canvas: CustomCanvas, canvasses: dict[str, CustomCanvas]
+                         ) -> tuple[list[CustomCanvas], dict[int, str]]:
+        """
+        Find one canvas of every distinct sub-diagram below the canvas, by structural hash, children before parents.
+
+        :return: The distinct sub-diagram canvasses and the name of the generated function of every sub-diagram box
+                 (and of every distinct sub-diagram canvas), by id.
+        """
+        hypergraph_manager = canvas.main_diagram.hypergraph_manager
+        sub_diagrams: list[CustomCanvas] = []
+        names_by_hash: dict[str, str] = {}
+        functions: dict[int, str] = {}
+
+        def visit(parent: CustomCanvas) -> None:
+            for box in parent.boxes:
+                sub_canvas = canvasses.get(str(box.id))
+                if sub_canvas is None or sub_canvas is parent:
+                    continue
+                canvas_hash = hypergraph_manager.canvas_hash(sub_canvas)
+                if canvas_hash not in names_by_hash:
+                    visit(sub_canvas)
+                    names_by_hash[canvas_hash] = f"sub_diagram_{len(sub_diagrams)}"
+                    functions[sub_canvas.id] = names_by_hash[canvas_hash]
+                    sub_diagrams.append(sub_canvas)
+                functions[box.id] = names_by_hash[canvas_hash]
+
+        visit(canvas)
+        return sub_diagrams, functions
 
     @classmethod
-    def rename(cls, names: dict[BoxFunction, set[str]]) -> tuple[list[str], dict[BoxFunction, str]]:
+    def rename(cls, box_functions: list[BoxFunction], start: int = 0) -> tuple[list[str], dict[BoxFunction, str]]:
+        """Suffix the module-level names of the i-th box function with `_i`, so the functions can share a module."""
         renamed_code_parts: list[str] = list()
         renamed_functions: dict[BoxFunction, str] = dict()
-        for i, (box_function, names) in enumerate(names.items()):
-            renamer = Renamer()
-            code_part = box_function.code
-            for name in names:
-                if name == "meta":
-                    continue
-                new_name = f'{name}_{i}'
-                if name == "invoke":
-                    renamed_functions[box_function] = new_name
-                code_part = renamer.refactor_code(code_part, name, new_name)
-            renamed_code_parts.append(code_part)
+        for i, box_function in enumerate(box_functions, start):
+            code_part, mapping = Renamer.rename(box_function.code, f"_{i}")
+            renamed_functions[box_function] = mapping["invoke"]
+            renamed_code_parts.append(code_part + "\n")
         return renamed_code_parts, renamed_functions
 
     @classmethod
-    def remove_imports(cls, code_parts: list[str]) -> list[str]:
-        regex = r"(^import .+)|(^from .+)"
-        regex2 = r"^\n+"
-        code_parts_without_imports = []
-
-        for part in code_parts:
-            cleaned_part = re.sub(regex, "", part, flags=re.MULTILINE)
-            cleaned_part = re.sub(regex2, "", cleaned_part)
-            code_parts_without_imports.append(cleaned_part)
-        return code_parts_without_imports
-
-    @classmethod
-    def remove_meta(cls, code_parts: list[str]) -> list[str]:
-        regex = r"^meta\s=\s{[\s\S]+?}"
-        regex2 = r"^\n+"
-        code_parts_without_meta = []
-
-        for part in code_parts:
-            cleaned_part = re.sub(regex, "", part, flags=re.MULTILINE)
-            cleaned_part = re.sub(regex2, "", cleaned_part)
-            code_parts_without_meta.append(cleaned_part)
-        return code_parts_without_meta
+    def construct_main_function(cls, canvas: CustomCanvas, renamed_functions: dict[BoxFunction, str],
+                                parallel: str = None, max_workers: int = None, batch: bool = False,
+                                name: str = "main", sub_diagram_functions: dict[int, str] = None,
+                                profile: bool = False) -> str:
+        """
+        Generate the function that runs the diagram of the canvas.
+
+        The function takes one parameter per canvas input and returns the canvas outputs, both in canvas order.
+        Sub-diagram boxes call the function named for them in `sub_diagram_functions`. With `profile` every call
+        goes through the module-level `profiler`.
+
+        Raises ValueError when the canvas is not a valid diagram.
+        """
+        sub_diagram_functions = sub_diagram_functions if sub_diagram_functions is not None else {}
+        hypergraph = cls.get_hypergraph(canvas)
+        input_names = cls.get_input_names(canvas, hypergraph)
+        main_function = cls.create_definition_of_main_function(list(dict.fromkeys(input_names.values())),
+                                                               parallel == cls.ASYNCIO, name)
+        nodes_queue = cls.get_nodes_queue(canvas, hypergraph)
+
+        callees = (input_names, sub_diagram_functions, profile)
+        if parallel is None:
+            main_function_content, function_result_variables = cls.create_main_function_content(
+                                                canvas, nodes_queue, renamed_functions, hypergraph, batch, *callees)
+        elif parallel == cls.ASYNCIO:
+            main_function_content, function_result_variables = cls.create_async_main_function_content(
+                                                canvas, nodes_queue, renamed_functions, hypergraph, batch, *callees)
+        else:
+            main_function_content, function_result_variables = cls.create_parallel_main_function_content(
+                        canvas, nodes_queue, renamed_functions, hypergraph, parallel, max_workers, batch, *callees)
+        main_function_return = cls.create_main_function_return(function_result_variables, hypergraph, canvas,
+                                                               input_names)
+
+        main_function.body = main_function_content + [main_function_return]
+        return ast.unparse(main_function)
 
     @classmethod
-    def construct_main_function(cls, canvas: CustomCanvas, renamed_functions: dict[BoxFunction, str]) -> str:
-        main_function = ""
-        hypergraph: Hypergraph = HypergraphManager().get_graph_by_id(canvas.id)
+    def get_nodes_queue(cls, canvas: CustomCanvas, hypergraph: Hypergraph) -> Queue[Node]:
+        """Queue the nodes in the order they are called: level by level from the inputs, by box y within a level."""
+        box_y: dict[int, int] = {box.id: box.y for box in canvas.boxes}
         input_nodes: set[Node] = set(hypergraph.get_node_by_input(input_id) for input_id in hypergraph.inputs)
-        input_nodes = sorted(input_nodes, key=lambda input_node: canvas.get_box_by_id(input_node.id).y)
-        main_function += cls.create_definition_of_main_function(input_nodes)
+        input_nodes = sorted(input_nodes, key=lambda input_node: box_y[input_node.id])
         nodes_queue: Queue[Node] = Queue()
         node_input_count_check: dict[int, int] = dict()
 
@@ -126,78 +270,244 @@ class CodeGenerator:
         while len(input_nodes) > 0:
             input_nodes = cls.get_children_nodes(input_nodes,
                                                  node_input_count_check)
-            input_nodes = sorted(input_nodes, key=lambda input_node: canvas.get_box_by_id(input_node.id).y)
+            input_nodes = sorted(input_nodes, key=lambda input_node: box_y[input_node.id])
             for node in input_nodes:
                 nodes_queue.put(node)
-
-        main_function_content, function_result_variables = cls.create_main_function_content(
-                                                                    canvas, nodes_queue, renamed_functions, hypergraph)
-        main_function_return = cls.create_main_function_return(function_result_variables, hypergraph)
-
-        main_function += main_function_content
-        main_function += main_function_return
-        return main_function
+        return nodes_queue
 
     @classmethod
-    def create_definition_of_main_function(cls, input_nodes: set[Node]) -> str:
+    def get_hypergraph(cls, canvas: CustomCanvas) -> Hypergraph:
+        """
+        The registered hypergraph of the canvas, or else one built for it here.
+
+        A built hypergraph is not registered, so generating code leaves the hypergraph manager as it was.
+        """
+        hypergraph = canvas.main_diagram.hypergraph_manager.get_graph_by_id(canvas.id)
+        if hypergraph is None:
+            hypergraph = HypergraphManager.build_hypergraph(canvas)
+            report = hypergraph.validate()
+            if not report.is_valid:
+                raise ValueError(f"Cannot generate code for canvas {canvas.id}: {report}")
+        return hypergraph
 
-        definition = "def main("
-        variables_count = sum(map(lambda node: len(node.inputs), input_nodes))
-        has_args = False
+    @classmethod
+    def create_batch_helpers(cls) -> str:
+        return f"DEFAULT_CHUNK_SIZE = 65536\n\n\n{inspect.getsource(map_rows)}\n"
 
-        for i in range(variables_count):
-            definition += f"input_{i + 1} = None, "
-            has_args = True
-        definition = (definition[:-2] if has_args else definition) + "):\n\t"
+    @classmethod
+    def create_profiler_helpers(cls, canvases: list[CustomCanvas]) -> str:
+        """Source of the profiler classes and of `profiler`, with every box of the canvases registered."""
+        boxes = {}
+        for canvas in canvases:
+            for box in canvas.boxes:
+                boxes[box.id] = (box.label_text, sum(1 for connection in box.connections if connection.side != "left"))
+        return (f"{inspect.getsource(BoxProfile)}\n\n{inspect.getsource(Profiler)}\n\n"
+                f"profiler = Profiler({boxes!r})\n")
 
+    @classmethod
+    def create_definition_of_main_function(cls, parameters: list[str], asynchronous: bool = False, name: str = "main"
+                                           ) -> ast.FunctionDef | ast.AsyncFunctionDef:
+        # parsed from source, so the node has every field the running Python version expects
+        definition = ast.parse(f"{'async ' if asynchronous else ''}def {name}(): pass").body[0]
+        definition.args.args = [ast.arg(arg=parameter) for parameter in parameters]
+        definition.args.defaults = [ast.Constant(value=None) for _ in parameters]
         return definition
 
+    @classmethod
+    def get_input_names(cls, canvas: CustomCanvas, hypergraph: Hypergraph) -> dict[int, str]:
+        """
+        Name the parameter of every wire that no box drives, by resolved wire id (see SpiderResolver).
+
+        The i-th canvas input is `input_<i>` even when it has no wire, other undriven wires (from spiders) get the
+        following names. Raises ValueError when a canvas input is joined to a wire that is already driven.
+        """
+        names: dict[int | None, str] = {}
+        resolver = SpiderResolver()
+        for i, connection in enumerate(sorted(canvas.inputs, key=lambda c: c.index)):
+            wire = resolver.wire_id(connection)
+            if wire in names or (wire is not None and hypergraph.get_node_by_output(wire) is not None):
+                raise ValueError(f"Input {i + 1} of canvas {canvas.id} is joined to a wire that is already driven")
+            names[wire if wire is not None else (None, i)] = f"input_{i + 1}"
+        for box in canvas.boxes:
+            node = hypergraph.get_node(box.id)
+            for wire in node.inputs if node is not None else []:
+                if wire not in names and hypergraph.get_node_by_output(wire) is None:
+                    names[wire] = f"input_{len(names) + 1}"
+        return names
+
     @classmethod
     def create_main_function_content(cls, canvas: CustomCanvas, nodes_queue: Queue[Node],
-                                     renamed_functions: dict[BoxFunction, str], hypergraph: Hypergraph
-                                     ) -> list[str, dict[int, str]]:
+                                     renamed_functions: dict[BoxFunction, str], hypergraph: Hypergraph,
+                                     batch: bool = False, input_names: dict[int, str] = None,
+                                     sub_diagram_functions: dict[int, str] = None, profile: bool = False
+                                     ) -> tuple[list[ast.stmt], dict[int, str]]:
+        calls, function_result_variables = cls.create_function_calls(canvas, nodes_queue, renamed_functions,
+                                                                     hypergraph, batch, input_names,
+                                                                     sub_diagram_functions, profile)
+        content = [cls.create_assignment([variable_name], call) for variable_name, call in calls.values()]
+        return content, function_result_variables
+
+    @classmethod
+    def create_parallel_main_function_content(cls, canvas: CustomCanvas, nodes_queue: Queue[Node],
+                                              renamed_functions: dict[BoxFunction, str], hypergraph: Hypergraph,
+                                              parallel: str, max_workers: int = None, batch: bool = False,
+                                              input_names: dict[int, str] = None,
+                                              sub_diagram_functions: dict[int, str] = None, profile: bool = False
+                                              ) -> tuple[list[ast.stmt], dict[int, str]]:
+        levels = cls.get_levels(list(nodes_queue.queue), hypergraph)
+        calls, function_result_variables = cls.create_function_calls(canvas, nodes_queue, renamed_functions,
+                                                                     hypergraph, batch, input_names,
+                                                                     sub_diagram_functions, profile)
+        with_pool = ast.parse(f"with {cls.POOLS[parallel]}(max_workers={max_workers!r}) as pool: pass").body[0]
+        with_pool.body = []
+        for level in levels:
+            if len(level) == 1:
+                variable_name, call = calls[level[0].id]
+                with_pool.body.append(cls.create_assignment([variable_name], call))
+            else:
+                submits = ast.List(elts=[cls.create_submit(calls[node.id][1]) for node in level], ctx=ast.Load())
+                with_pool.body.append(cls.create_assignment(["futures"], submits))
+                with_pool.body.append(cls.create_assignment(
+                    [calls[node.id][0] for node in level],
+                    ast.parse("[future.result() for future in futures]", mode="eval").body))
+        return [with_pool], function_result_variables
+
+    @classmethod
+    def create_async_main_function_content(cls, canvas: CustomCanvas, nodes_queue: Queue[Node],
+                                           renamed_functions: dict[BoxFunction, str], hypergraph: Hypergraph,
+                                           batch: bool = False, input_names: dict[int, str] = None,
+                                           sub_diagram_functions: dict[int, str] = None, profile: bool = False
+                                           ) -> tuple[list[ast.stmt], dict[int, str]]:
+        sub_diagram_functions = sub_diagram_functions if sub_diagram_functions is not None else {}
+        nodes = list(nodes_queue.queue)
+        levels = cls.get_levels(nodes, hypergraph)
+        # sub-diagram functions are generated as `async def` too
+        is_coroutine = {node.id: node.id in sub_diagram_functions or canvas.get_box_function(node.id).is_coroutine
+                        for node in nodes}
+        calls, function_result_variables = cls.create_function_calls(canvas, nodes_queue, renamed_functions,
+                                                                     hypergraph, batch, input_names,
+                                                                     sub_diagram_functions, profile)
+        content = []
+        for level in levels:
+            if len(level) == 1:
+                variable_name, call = calls[level[0].id]
+                content.append(cls.create_assignment(
+                    [variable_name], ast.Await(value=call) if is_coroutine[level[0].id] else call))
+            else:
+                awaitables = [calls[node.id][1] if is_coroutine[node.id]
+                              else cls.create_submit(calls[node.id][1], "asyncio.to_thread")
+                              for node in level]
+                gather = ast.Call(func=ast.parse("asyncio.gather", mode="eval").body, args=awaitables, keywords=[])
+                content.append(cls.create_assignment([calls[node.id][0] for node in level], ast.Await(value=gather)))
+        return content, function_result_variables
+
+    @classmethod
+    def get_levels(cls, nodes: list[Node], hypergraph: Hypergraph) -> list[list[Node]]:
+        """Group nodes, given in a topological order, so that every node only depends on nodes of earlier levels."""
+        node_levels: dict[int, int] = dict()
+        levels: list[list[Node]] = []
+        for node in nodes:
+            parents = [hypergraph.get_node_by_output(node_input) for node_input in node.inputs]
+            level = max((node_levels[parent.id] + 1 for parent in parents if parent is not None), default=0)
+            node_levels[node.id] = level
+            if level == len(levels):
+                levels.append([])
+            levels[level].append(node)
+        return levels
 
+    @classmethod
+    def create_submit(cls, call: ast.Call, submit: str = "pool.submit") -> ast.Call:
+        """Turn `f(a, b)` into `submit(f, a, b)`."""
+        return ast.Call(func=ast.parse(submit, mode="eval").body, args=[call.func, *call.args], keywords=[])
+
+    @classmethod
+    def create_assignment(cls, variable_names: list[str], value: ast.expr) -> ast.Assign:
+        if len(variable_names) == 1:
+            target = ast.Name(id=variable_names[0], ctx=ast.Store())
+        else:
+            target = ast.Tuple(elts=[ast.Name(id=name, ctx=ast.Store()) for name in variable_names], ctx=ast.Store())
+        # `ast.unparse` reads the line number of assignments, no other location is needed
+        return ast.Assign(targets=[target], value=value, lineno=0)
+
+    @classmethod
+    def create_function_calls(cls, canvas: CustomCanvas, nodes_queue: Queue[Node],
+                              renamed_functions: dict[BoxFunction, str], hypergraph: Hypergraph, batch: bool = False,
+                              input_names: dict[int, str] = None, sub_diagram_functions: dict[int, str] = None,
+                              profile: bool = False) -> tuple[dict[int, tuple[str, ast.Call]], dict[int, str]]:
+        """
+        Create the call of every node in queue order, as node id to result variable name and call expression.
+
+        In batch mode calls of box functions that are not vectorizable go through `map_rows`, sub-diagram functions
+        take the arrays as they are. With `profile`, `f(a, b)` of box 3 becomes `profiler.call(3, f, a, b)`.
+        """
+        input_names = input_names if input_names is not None else cls.get_input_names(canvas, hypergraph)
+        sub_diagram_functions = sub_diagram_functions if sub_diagram_functions is not None else {}
+        calls: dict[int, tuple[str, ast.Call]] = dict()
         function_result_variables: dict[int, str] = dict()
-        input_index = 1
         result_index = 1
-        content = ""
-
-        function_output_index: dict[int, int] = dict()
-        for node in hypergraph.nodes:
-            if len(node.outputs) > 1:
-                function_output_index[node.id] = 0
 
         while not nodes_queue.empty():
             node = nodes_queue.get()
             variable_name = f"res_{result_index}"
-            current_box_function = canvas.get_box_function(node.id)
-            line = f"{variable_name} = {renamed_functions[current_box_function]}("
+            if node.id in sub_diagram_functions:
+                function = ast.Name(id=sub_diagram_functions[node.id], ctx=ast.Load())
+                call = ast.Call(func=function, args=[], keywords=[])
+            else:
+                current_box_function = canvas.get_box_function(node.id)
+                function = ast.Name(id=renamed_functions[current_box_function], ctx=ast.Load())
+                call = ast.Call(func=function, args=[], keywords=[])
+                if batch and not current_box_function.is_vectorizable:
+                    call.func = ast.Name(id="map_rows", ctx=ast.Load())
+                    call.args += [function, ast.Constant(value=len(node.outputs)), cls.create_row_count(input_names)]
             result_index += 1
             function_result_variables[node.id] = variable_name
 
             for input_wire in node.inputs:
-                input_node = hypergraph.get_node_by_output(input_wire)
-                if input_node is None:
-                    line += f"input_{input_index}, "
-                    input_index += 1
-                else:
-                    if input_node.id in function_output_index:
-                        line += f"{function_result_variables[input_node.id]}[{function_output_index[input_node.id]}], "
-                        function_output_index[input_node.id] += 1
-                    else:
-                        line += f"{function_result_variables[input_node.id]}, "
-            line = line[:-2] + ")\n\t"
-            content += line
+                call.args.append(cls.create_wire_value(input_wire, hypergraph, function_result_variables, input_names))
+            if profile:
+                call = ast.Call(func=ast.parse("profiler.call", mode="eval").body,
+                                args=[ast.Constant(value=node.id), call.func, *call.args], keywords=[])
+            calls[node.id] = (variable_name, call)
 
-        return content, function_result_variables
+        return calls, function_result_variables
+
+    @classmethod
+    def create_row_count(cls, input_names: dict[int, str]) -> ast.expr:
+        """Number of rows in batch mode, the length of the first input array, or one row without inputs."""
+        if not input_names:
+            return ast.Constant(value=1)
+        return ast.Call(func=ast.Name(id="len", ctx=ast.Load()),
+                        args=[ast.Name(id=next(iter(input_names.values())), ctx=ast.Load())], keywords=[])
+
+    @classmethod
+    def create_wire_value(cls, wire: int, hypergraph: Hypergraph, function_result_variables: dict[int, str],
+                          input_names: dict[int, str]) -> ast.expr:
+        """Expression for the value on the wire, the parameter or the (indexed) result of the box driving it."""
+        producers = hypergraph.wire_producers.get(wire, [])
+        if len(producers) > 1:
+            raise ValueError(f"Wire {wire} is driven by {len(producers)} box outputs, "
+                             f"of boxes {sorted({node.id for node in producers})}")
+        if not producers:
+            if wire not in input_names:
+                raise ValueError(f"Wire {wire} is not driven by any box or canvas input")
+            return ast.Name(id=input_names[wire], ctx=ast.Load())
+        node = producers[0]
+        result = ast.Name(id=function_result_variables[node.id], ctx=ast.Load())
+        if len(node.outputs) > 1:
+            result = ast.Subscript(value=result, slice=ast.Constant(value=node.outputs.index(wire)), ctx=ast.Load())
+        return result
 
     @classmethod
-    def create_main_function_return(cls, function_result_variables: dict[int, str], hypergraph: Hypergraph) -> str:
-        return_statement = "return "
-        output_nodes = set(hypergraph.get_node_by_output(output) for output in hypergraph.outputs)
-        for output_node in output_nodes:
-            return_statement += f'{function_result_variables.get(output_node.id)}, '
-        return return_statement[:-2]
+    def create_main_function_return(cls, function_result_variables: dict[int, str], hypergraph: Hypergraph,
+                                    canvas: CustomCanvas, input_names: dict[int, str]) -> ast.Return:
+        resolver = SpiderResolver()
+        values = [cls.create_wire_value(resolver.wire_id(connection), hypergraph, function_result_variables,
+                                        input_names)
+                  if connection.has_wire else ast.Constant(value=None)
+                  for connection in sorted(canvas.outputs, key=lambda c: c.index)]
+        if len(values) > 1:
+            return ast.Return(value=ast.Tuple(elts=values, ctx=ast.Load()))
+        return ast.Return(value=values[0] if values else None)
 
     @classmethod
     def get_children_nodes(cls, current_level_nodes: list[Node], node_input_count_check: dict[int, int]) -> set:
@@ -209,8 +519,8 @@ class CodeGenerator:
             for node_child in current_node_children:
                 connections_with_parent_node = 0
                 for parent_node_output in node.outputs:
-                    if parent_node_output in node_child.inputs:
-                        connections_with_parent_node += 1
+                    # through a spider one output can feed several inputs of the child
+                    connections_with_parent_node += node_child.inputs.count(parent_node_output)
                         
                 node_input_count_check[node_child.id] = node_input_count_check.get(node_child.id, 0) + connections_with_parent_node
 
@@ -0,0 +1,11 @@
+from MVP.refactored.backend.lru_cache import LRUCache
+
+
+class FragmentCache(LRUCache):
+    """
+    Cache of generated code fragments (formatted box functions, `main` functions of canvasses), keyed by a hash of
+    everything the fragment is generated from.
+
+    After an edit only the fragments whose inputs changed get new keys and are generated again. The cache is bounded by
+    `max_size`, least recently used fragments go first.
+    """
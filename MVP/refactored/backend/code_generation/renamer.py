@@ -1,99 +1,93 @@
 import ast
-
-import astor  # Requires pip install astor
+from functools import lru_cache
 
 
 class Renamer(ast.NodeTransformer):
-    def __init__(self, target_name: str = None, new_name: str = None):
-        self.target_name = target_name
-        self.new_name = new_name
-        self.current_function_globals = set()
-        self.current_function_params = set()
-        self.global_vars = set()
-        self.global_statements = set()
-        self.function_names = set()
+    """
+    Renames the module-level names of box function code (functions, global variables) in a single pass.
 
-    def visit_Assign(self, node):
-        if hasattr(node, "parent") and isinstance(node.parent, ast.Module):
-            for target in node.targets:
-                if isinstance(target, ast.Name):
-                    self.global_vars.add(target.id)
-        self.generic_visit(node)
+    Names bound locally in a function (parameters, assignments without a `global` statement) shadow the module-level
+    names and are left alone.
+    """
 
-        return node
+    def __init__(self, mapping: dict[str, str] = None):
+        self.mapping = mapping if mapping is not None else {}
+        self.scopes: list[set[str]] = []
 
-    def visit_FunctionDef(self, node):
-        self.function_names.add(node.name)
-        if node.name == self.target_name:
-            node.name = self.new_name
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def rename(code_str: str, suffix: str) -> tuple[str, dict[str, str]]:
+        """
+        Append the suffix to every module-level name of the code, except `meta`.
 
-        self.current_function_params = {arg.arg for arg in node.args.args}
+        The code is parsed and unparsed once. Results are cached per code and suffix.
 
-        for stmt in node.body:
-            if isinstance(stmt, ast.Global):
-                stmt.names = [
-                    self.new_name if name == self.target_name else name
-                    for name in stmt.names
-                ]
-                self.global_statements.update(stmt.names)
-                self.current_function_globals.update(stmt.names)
+        :param code_str: Source code of a box function.
+        :param suffix: Suffix appended to every renamed name.
+        :return: Renamed code and the mapping of old names to new names.
+        """
+        tree = ast.parse(code_str)
+        mapping = {name: f"{name}{suffix}" for name in Renamer.find_names(tree) if name != "meta"}
+        Renamer(mapping).visit(tree)
+        return ast.unparse(tree), mapping
+
+    @staticmethod
+    def find_names(tree: ast.Module) -> set[str]:
+        """Find the names of all functions, module-level variables and names declared `global`."""
+        names = set()
+        for statement in tree.body:
+            if isinstance(statement, ast.Assign):
+                names.update(target.id for target in statement.targets if isinstance(target, ast.Name))
+            elif isinstance(statement, (ast.AnnAssign, ast.AugAssign)) and isinstance(statement.target, ast.Name):
+                names.add(statement.target.id)
+        for node in ast.walk(tree):
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                names.add(node.name)
+            elif isinstance(node, ast.Global):
+                names.update(node.names)
+        return names
+
+    @staticmethod
+    def find_locals(function: ast.FunctionDef | ast.AsyncFunctionDef | ast.Lambda) -> set[str]:
+        arguments = function.args
+        names = {arg.arg for arg in arguments.posonlyargs + arguments.args + arguments.kwonlyargs}
+        names.update(arg.arg for arg in (arguments.vararg, arguments.kwarg) if arg is not None)
+        if isinstance(function, ast.Lambda):
+            return names
+
+        declared_global = set()
+        # the body of the function itself, nested functions have their own scope
+        nodes = list(function.body)
+        while nodes:
+            node = nodes.pop()
+            if isinstance(node, ast.Global):
+                declared_global.update(node.names)
+            elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+                names.add(node.id)
+            if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)):
+                nodes.extend(ast.iter_child_nodes(node))
+        return names - declared_global
 
+    def visit_FunctionDef(self, node):
+        node.name = self.mapping.get(node.name, node.name)
+        self.scopes.append(self.find_locals(node))
         self.generic_visit(node)
+        self.scopes.pop()
+        return node
 
-        self.current_function_globals.clear()
-        self.current_function_params.clear()
+    visit_AsyncFunctionDef = visit_FunctionDef
 
+    def visit_Lambda(self, node):
+        self.scopes.append(self.find_locals(node))
+        self.generic_visit(node)
+        self.scopes.pop()
         return node
 
-    def visit_Call(self, node):
-        if isinstance(node.func, ast.Name) and node.func.id == self.target_name:
-            node.func.id = self.new_name
-        self.generic_visit(node)
+    def visit_Global(self, node):
+        node.names = [self.mapping.get(name, name) for name in node.names]
         return node
 
     def visit_Name(self, node):
-        if (
-                node.id == self.target_name
-                and (
-                node.id in self.current_function_globals
-                or not self.current_function_params)
-        ):
-            node.id = self.new_name
-
+        if node.id in self.mapping and not any(node.id in scope for scope in self.scopes):
+            node.id = self.mapping[node.id]
         return node
-
-    def refactor_code(self, code_str: str, target_name: str, new_name: str):
-        if target_name:
-            self.target_name = target_name
-        if new_name:
-            self.new_name = new_name
-        tree = ast.parse(code_str)
-        self.visit(tree)
-        return astor.to_source(tree)
-
-    def find_globals(self, code_str):
-        tree = ast.parse(code_str)
-        self._attach_parents(tree)
-        self.visit(tree)
-
-        all_globals = self.global_vars.union(self.global_statements)
-        self.cleanup()
-        return all_globals
-
-    def find_function_names(self, code_str):
-        tree = ast.parse(code_str)
-        self.visit(tree)
-
-        functions = set(self.function_names)
-        self.cleanup()
-        return functions
-
-    def cleanup(self):
-        self.global_vars.clear()
-        self.global_statements.clear()
-        self.function_names.clear()
-
-    def _attach_parents(self, node, parent=None):
-        node.parent = parent
-        for child in ast.iter_child_nodes(node):
-            self._attach_parents(child, node)
@@ -1,28 +1,81 @@
 import json
 from MVP.refactored.backend.generator import Generator
+from MVP.refactored.backend.index_view import IndexView
 from MVP.refactored.backend.resource import Resource
 
 
 class Diagram:
+    """Backend model of a diagram; boxes, resources and spiders are kept in dictionaries by id."""
+
     def __init__(self):
         self.input = []
         self.output = []
-        self.boxes = []
-        self.resources = []
-        self.spiders = []
+        self.box_index: dict[int, Generator] = {}
+        self.resource_index: dict[int, Resource] = {}
+        self.spider_index: dict[int, Resource] = {}
+
+    @property
+    def boxes(self) -> IndexView:
+        return IndexView(self.box_index, values=True)
+
+    @boxes.setter
+    def boxes(self, boxes):
+        self.box_index = {box.id: box for box in boxes}
+
+    @property
+    def resources(self) -> IndexView:
+        return IndexView(self.resource_index, values=True)
+
+    @resources.setter
+    def resources(self, resources):
+        self.resource_index = {resource.id: resource for resource in resources}
+
+    @property
+    def spiders(self) -> IndexView:
+        return IndexView(self.spider_index, values=True)
+
+    @spiders.setter
+    def spiders(self, spiders):
+        self.spider_index = {spider.id: spider for spider in spiders}
 
     def add_resource(self, resource):
-        self.resources.append(resource)
+        self.resource_index[resource.id] = resource
+
+    def get_resource(self, resource_id):
+        return self.resource_index.get(resource_id)
 
     def add_box(self, boxes):
-        self.boxes.append(boxes)
+        self.box_index[boxes.id] = boxes
+
+    def get_box(self, box_id):
+        return self.box_index.get(box_id)
+
+    def change_box_id(self, box, box_id):
+        """Give the box a new id, it moves to the end of `boxes`."""
+        if self.box_index.get(box.id) is box:
+            del self.box_index[box.id]
+        box.id = box_id
+        self.box_index[box_id] = box
 
     def remove_box(self, boxes):
-        self.boxes.remove(boxes)
+        """Remove the box, raises ValueError if this box is not in the diagram."""
+        if self.box_index.get(boxes.id) is not boxes:
+            raise ValueError(f"Box {boxes.id} is not in the diagram")
+        del self.box_index[boxes.id]
 
     def remove_resource(self, resources):
-        if resources in self.resources:
-            self.resources.remove(resources)
+        if self.resource_index.get(resources.id) is resources:
+            del self.resource_index[resources.id]
+
+    def add_spider(self, spider):
+        self.spider_index[spider.id] = spider
+
+    def get_spider(self, spider_id):
+        return self.spider_index.get(spider_id)
+
+    def remove_spider(self, spider):
+        if self.spider_index.get(spider.id) is spider:
+            del self.spider_index[spider.id]
 
     def diagram_import(self, file_path):
         with open(file_path, 'r') as file:
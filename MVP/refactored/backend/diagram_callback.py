@@ -1,20 +1,197 @@
 import logging
+import queue
+import threading
+import time
+from contextlib import contextmanager
 
 from MVP.refactored.backend.diagram import Diagram
 from MVP.refactored.backend.generator import Generator
+from MVP.refactored.backend.metrics import CallbackMetrics
 from MVP.refactored.backend.resource import Resource
 
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
 class Receiver:
-    def __init__(self):
+    # box_callback actions that never create the box, every other action creates a box that does not exist yet
+    BOX_ACTIONS = {"add_inner_left", "add_inner_right", "remove_inner_left", "remove_inner_right", "box_add_left",
+                   "box_add_right", "box_remove_connection", "box_remove_connection_all", "box_delete", "compound",
+                   "atomic", "sub_box", "box_add_operator", "box_swap_id", "change_connection_id",
+                   "add_diagram_output", "add_diagram_input", "remove_diagram_input", "remove_diagram_output"}
+
+    def __init__(self, threaded=False, metrics: CallbackMetrics = None):
+        """
+        :param threaded: Apply the callbacks on a worker thread, `receiver_callback` then only queues them and `flush`
+            waits until the diagram is up to date.
+        :param metrics: Record the number and duration of the applied callbacks, None records nothing.
+        """
         self.listener = True
+        self.metrics = metrics
         self.diagram = Diagram()
+        self.transaction_depth = 0
+        self.queued_callbacks: list[tuple[str, dict]] = []
+        self.worker_queue = None
+        self.worker = None
+        if threaded:
+            self.worker_queue = queue.SimpleQueue()
+            self.worker = threading.Thread(target=self.work, name="receiver", daemon=True)
+            self.worker.start()
         logger.info("Receiver initialized.")
 
+    @property
+    def threaded(self):
+        return self.worker is not None
+
     def receiver_callback(self, action, **kwargs):
+        """
+        Apply a change made in the frontend to the backend diagram, or queue it while a transaction is open.
+
+        In threaded mode the change is handed to the worker thread and applied later, see `flush`.
+
+        :param action: Name of the change.
+        :param kwargs: Ids and connections the change is about.
+        :return: None
+        """
+        if self.transaction_depth:
+            self.queued_callbacks.append((action, kwargs))
+        elif self.threaded:
+            self.worker_queue.put((self.apply_callback, (action,), kwargs))
+        else:
+            self.apply_callback(action, **kwargs)
+
+    def work(self):
+        """Apply the queued callbacks in order until `close` is called, runs on the worker thread."""
+        while True:
+            item = self.worker_queue.get()
+            if item is None:
+                return
+            function, args, kwargs = item
+            try:
+                function(*args, **kwargs)
+            except Exception:
+                logger.exception("Receiver worker failed to apply %s %s", args, kwargs)
+
+    def flush(self, timeout=None):
+        """
+        Wait until every callback made so far has been applied to the diagram.
+
+        Anything reading `diagram` in threaded mode (notations, export) has to flush first. Does nothing when the
+        receiver is not threaded.
+
+        :param timeout: Seconds to wait at most, None waits until done.
+        :return: True if the diagram is up to date.
+        """
+        if not self.threaded:
+            return True
+        done = threading.Event()
+        self.worker_queue.put((done.set, (), {}))
+        return done.wait(timeout)
+
+    def close(self):
+        """Apply the queued callbacks and stop the worker thread."""
+        if self.threaded:
+            self.worker_queue.put(None)
+            self.worker.join()
+            self.worker = None
+
+    @contextmanager
+    def transaction(self):
+        """Queue callbacks and apply them coalesced when the outermost transaction ends, even on error."""
+        self.transaction_depth += 1
+        try:
+            yield self
+        finally:
+            self.transaction_depth -= 1
+            if self.transaction_depth == 0:
+                self.commit()
+
+    def commit(self):
+        callbacks, self.queued_callbacks = self.queued_callbacks, []
+        if self.threaded:
+            # coalescing looks up the diagram, so it happens on the worker thread with the rest
+            self.worker_queue.put((self.apply_transaction, (callbacks,), {}))
+        else:
+            self.apply_transaction(callbacks)
+
+    def apply_transaction(self, callbacks):
+        coalesced = self.coalesce(callbacks)
+        for action, kwargs in coalesced:
+            self.apply_callback(action, **kwargs)
+        if self.metrics is not None:
+            self.metrics.increment("transactions")
+            self.metrics.increment("coalesced_callbacks", len(callbacks) - len(coalesced))
+        logger.info("Transaction applied %s of %s callbacks", len(coalesced), len(callbacks))
+
+    def coalesce(self, callbacks):
+        """Drop the callbacks of objects that are created and deleted within them and not referred to otherwise."""
+        callbacks = list(callbacks)
+        while True:
+            roles: dict[tuple, list[str]] = {}
+            for action, kwargs in callbacks:
+                for key, role in self.callback_roles(action, kwargs):
+                    roles.setdefault(key, []).append(role)
+            dropped = {key for key, key_roles in roles.items()
+                       if key_roles[0] == "add" and key_roles[-1] == "delete" and "other" not in key_roles
+                       and not self.exists(key)}
+            if not dropped:
+                return callbacks
+            callbacks = [(action, kwargs) for action, kwargs in callbacks
+                         if not any(key in dropped for key, _ in self.callback_roles(action, kwargs))]
+
+    def callback_roles(self, action, kwargs):
+        """Objects a callback is about, as ((kind, id), role), the role is "add", "delete" or "other"."""
+        wire_id = kwargs.get('wire_id')
+        start_connection = kwargs.get('start_connection')
+        end_connection = kwargs.get('end_connection')
+        generator_id = kwargs.get('generator_id')
+        if action == 'wire_add':
+            if end_connection:
+                roles = [(("spider", kwargs.get('connection_id')), "other"), (("box", end_connection[1]), "other")]
+            else:
+                roles = [(("wire", wire_id), "add")]
+            roles.append((("box", start_connection[1]), "other"))
+        elif action == 'wire_delete':
+            if start_connection or end_connection:
+                roles = [(("spider", wire_id), "other")]
+            else:
+                roles = [(("wire", wire_id), "delete")]
+        elif action == 'create_spider':
+            roles = [(("spider", wire_id), "add"), (("box", generator_id), "other")]
+        elif action == 'create_spider_parent':
+            roles = [(("spider", wire_id), "other"), (("box", generator_id), "other")]
+        elif action == 'delete_spider':
+            roles = [(("spider", wire_id), "delete")]
+        elif action == 'box_delete':
+            roles = [(("box", generator_id), "delete")]
+        elif action in self.BOX_ACTIONS:
+            roles = [(("box", generator_id), "other")]
+            if action in ('sub_box', 'box_swap_id'):
+                roles.append((("box", kwargs.get('connection_id')), "other"))
+        else:
+            roles = [(("box", generator_id), "add")]
+        return [(key, role) for key, role in roles if key[1] is not None]
+
+    def exists(self, key):
+        kind, id_ = key
+        if kind == "wire":
+            return self.diagram.get_resource(id_) is not None
+        if kind == "spider":
+            return self.diagram.get_spider(id_) is not None
+        return self.diagram.get_box(id_) is not None
+
+    def apply_callback(self, action, **kwargs):
+        if self.metrics is None:
+            self.route_callback(action, kwargs)
+            return
+        start = time.perf_counter()
+        failed = True
+        try:
+            self.route_callback(action, kwargs)
+            failed = False
+        finally:
+            self.metrics.observe(action, time.perf_counter() - start, failed)
+
+    def route_callback(self, action, kwargs):
         wire_id = kwargs.get('wire_id')
         start_connection = kwargs.get('start_connection')
         end_connection = kwargs.get('end_connection')
@@ -24,9 +201,9 @@ class Receiver:
         connection_nr = kwargs.get('connection_nr')
         operator = kwargs.get('operator')
 
-        logger.info(f"receiver_callback invoked with action: {action}, kwargs: {kwargs}")
+        logger.info("receiver_callback invoked with action: %s, kwargs: %s", action, kwargs)
         if action in ['wire_add', 'wire_delete']:
-            logger.info(f"Routing to wire_callback with action: {action}")
+            logger.info("Routing to wire_callback with action: %s", action)
             self.wire_callback(wire_id, action, start_connection, connection_id, end_connection)
         elif action == 'create_spider':
             logger.info("Routing to create_spider")
@@ -41,12 +218,13 @@ class Receiver:
             self.box_callback(generator_id, action, connection_id, generator_side, connection_nr, operator)
 
     def delete_spider_be(self, wire_id):
-        logger.info(f"Routing to delete_spider")
+        logger.info("Routing to delete_spider")
         spider = self.spider_get_resource_by_connection_id(wire_id)
         if spider.parent:
             parent = self.generator_get_box_by_id(spider.parent)
             parent.spiders.remove(wire_id)
         self.wire_handle_delete_resource(spider)
+        self.diagram.remove_spider(spider)
 
     def spider_parent(self, id, generator_id=None):
         spider = self.spider_get_resource_by_connection_id(id)
@@ -55,7 +233,7 @@ class Receiver:
         parent.spiders.append(spider.id)
 
     def create_spider(self, id, connection_id, generator_id=None):
-        logger.info(f"Creating spider with id: {id}")
+        logger.info("Creating spider with id: %s", id)
         resource = Resource(id)
         resource.spider = True
         resource.spider_connection = connection_id
@@ -64,12 +242,12 @@ class Receiver:
             parent = self.generator_get_box_by_id(generator_id)
             parent.spiders.append(resource.id)
         # self.diagram.add_resource(resource)
-        self.diagram.spiders.append(resource)
-        logger.info(f"Spider created and added to diagram: {resource}")
+        self.diagram.add_spider(resource)
+        logger.info("Spider created and added to diagram: %s", resource)
 
     def wire_callback(self, wire_id, action=None, start_connection=None, connection_id=None, end_connection=None):
-        logger.info(
-            f"wire_callback invoked with wire_id: {wire_id}, action: {action}, start_connection: {start_connection}, connection_id: {connection_id}")
+        logger.info("wire_callback invoked with wire_id: %s, action: %s, start_connection: %s, connection_id: %s",
+                    wire_id, action, start_connection, connection_id)
         if action == 'wire_delete':
             if start_connection:
                 spider = self.spider_get_resource_by_connection_id(wire_id)
@@ -118,10 +296,10 @@ class Receiver:
                 else:
                     self.wire_create_new_resource(wire_id, connection_nr, connection_box_id, connection_side,
                                                   connection_id)
-        logger.info(f"Resources: {self.diagram.resources}")
-        logger.info(f"Spiders: {self.diagram.spiders}")
-        logger.info(f"Number of Resources: {len(self.diagram.resources)}")
-        logger.info(f"Overall input and output: {self.diagram.input} and {self.diagram.output}")
+        logger.info("Resources: %s", self.diagram.resource_index)
+        logger.info("Spiders: %s", self.diagram.spider_index)
+        logger.info("Number of Resources: %s", len(self.diagram.resource_index))
+        logger.info("Overall input and output: %s and %s", self.diagram.input, self.diagram.output)
 
     def spider_handle_delete_connection(self, spider, connection):
         if spider:
@@ -165,12 +343,12 @@ class Receiver:
                             self.diagram.input[connection_nr] = [connection_nr, box_id]
 
             self.diagram.remove_resource(resource)
-            logger.warning(f"Resource with id {resource.id} removed.")
+            logger.warning("Resource with id %s removed.", resource.id)
         else:
-            logger.warning(f"Resource with id not found.")
+            logger.warning("Resource with id not found.")
 
     def wire_main_input_output(self, connection_nr, connection_box_id, connection_side, id):
-        logger.info(f"Handling main input/output wiring with id: {id}")
+        logger.info("Handling main input/output wiring with id: %s", id)
         if connection_side == 'left':
             temp = [connection_nr, connection_box_id] + [id]
             self.diagram.output[connection_nr] = temp
@@ -179,7 +357,8 @@ class Receiver:
             self.diagram.input[connection_nr] = temp
 
     def wire_add_to_atomic_box(self, connection_nr, box, connection_side, id):
-        logger.info(f"Adding connection to atomic box: {box.id}, side: {connection_side}, id: {id}, nr {connection_nr}")
+        logger.info("Adding connection to atomic box: %s, side: %s, id: %s, nr %s",
+                    box.id, connection_side, id, connection_nr)
         if connection_side == 'left':
             connection = box.left[connection_nr]
             box.left[connection_nr] = connection + [id]
@@ -188,7 +367,7 @@ class Receiver:
             box.right[connection_nr] = connection + [id]
 
     def wire_add_to_compound_box(self, id, connection_nr, box, connection_id):
-        logger.info(f"Adding connection to compound box: {box.id}, connection_id: {connection_id}, id: {id}")
+        logger.info("Adding connection to compound box: %s, connection_id: %s, id: %s", box.id, connection_id, id)
         sides = ['left', 'right', 'left_inner', 'right_inner']
         for side in sides:
             side_list = getattr(box, side)
@@ -198,7 +377,7 @@ class Receiver:
 
     def wire_handle_resource_action(self, resource, id, connection_nr, connection_box_id, connection_side,
                                     connection_id):
-        logger.info(f"Handling resource action for resource: {resource}, id: {id}")
+        logger.info("Handling resource action for resource: %s, id: %s", resource, id)
         if connection_box_id is None:
             if connection_side != 'spider':
                 self.wire_main_input_output(connection_nr, connection_box_id, connection_side, id)
@@ -212,15 +391,15 @@ class Receiver:
         resource.add_connection([connection_nr, connection_box_id, connection_side] + [connection_id])
 
     def wire_create_new_resource(self, id, connection_nr, connection_box_id, connection_side, connection_id):
-        logger.info(f"Creating new resource with id: {id}")
+        logger.info("Creating new resource with id: %s", id)
         resource = Resource(id)
         self.wire_handle_resource_action(resource, id, connection_nr, connection_box_id, connection_side,
                                          connection_id)
         self.diagram.add_resource(resource)
-        logger.warning(f"Added connection to resource with id {id} connections {resource.connections}.")
-        logger.info(f"Resources: {self.diagram.resources}")
-        logger.info(f"Number of Resources: {len(self.diagram.resources)}")
-        logger.info(f"Overall input and output: {self.diagram.input} and {self.diagram.output}")
+        logger.warning("Added connection to resource with id %s connections %s.", id, resource.connections)
+        logger.info("Resources: %s", self.diagram.resource_index)
+        logger.info("Number of Resources: %s", len(self.diagram.resource_index))
+        logger.info("Overall input and output: %s and %s", self.diagram.input, self.diagram.output)
 
     def box_callback(self, id, action=None, connection_id=None, generator_side=None, connection_nr=None, operator=None):
         box = self.generator_get_box_by_id(id)
@@ -237,10 +416,10 @@ class Receiver:
                 self.generator_delete_box(box)
             elif action == 'compound':
                 box.add_type(1)
-                logger.info(f"created sub diagram: {box.type}")
+                logger.info("created sub diagram: %s", box.type)
             elif action == 'atomic':
                 box.add_type(0)
-                logger.info(f"created atomic component: {box.type}")
+                logger.info("created atomic component: %s", box.type)
             elif action == 'sub_box':
                 parent = self.generator_get_box_by_id(connection_id)
                 parent.subset.append(id)
@@ -248,7 +427,7 @@ class Receiver:
             elif action == "box_add_operator":
                 box.operand = operator
             elif action == 'box_swap_id':
-                box.id = connection_id
+                self.diagram.change_box_id(box, connection_id)
             elif action == "change_connection_id":
                 if generator_side == "left":
                     box.left[-1] = connection_id
@@ -267,9 +446,9 @@ class Receiver:
         else:
             self.generator_create_new_box(id)
 
-        logger.info(f"Resources: {self.diagram.resources}")
-        logger.info(f"Number of Resources: {len(self.diagram.resources)}")
-        logger.info(f"Number of Boxes: {len(self.diagram.boxes)}")
+        logger.info("Resources: %s", self.diagram.resource_index)
+        logger.info("Number of Resources: %s", len(self.diagram.resource_index))
+        logger.info("Number of Boxes: %s", len(self.diagram.box_index))
 
     def add_main_diagram_input(self):
         self.diagram.input.append([len(self.diagram.input), None])
@@ -315,14 +494,14 @@ class Receiver:
     def generator_add_box_connection(self, box, action, connection_nr, connection_id):
         if action == 'box_add_left':
             box.add_left([connection_nr, box.id, connection_id])
-            logger.info(
-                f"added box connecton left: id {box.id} connection nr {connection_nr} side left, connection id {connection_id}")
-            logger.info(f"Number of connection in box side: {len(box.left)}")
+            logger.info("added box connecton left: id %s connection nr %s side left, connection id %s",
+                        box.id, connection_nr, connection_id)
+            logger.info("Number of connection in box side: %s", len(box.left))
         elif action == 'box_add_right':
             box.add_right([connection_nr, box.id, connection_id])
-            logger.info(
-                f"added box connecton right: id {box.id} connection nr {connection_nr} side right, connection id {connection_id}")
-            logger.info(f"Number of connection in box side: {len(box.right)}")
+            logger.info("added box connecton right: id %s connection nr %s side right, connection id %s",
+                        box.id, connection_nr, connection_id)
+            logger.info("Number of connection in box side: %s", len(box.right))
 
     def generator_remove_box_connection(self, box, connection_id, connection_side):
         if box.type == 0:
@@ -382,7 +561,7 @@ class Receiver:
                             self.spider_get_resource_by_connection_id(box.right_inner[connection_id][3]),
                             box.right_inner[connection_id][2])
                 box.right_inner.pop()
-        logger.info(f"Removed associated resource: {connection_id}, side {connection_side}")
+        logger.info("Removed associated resource: %s, side %s", connection_id, connection_side)
 
     def generator_delete_box(self, box):
         if box.type == 1:
@@ -424,10 +603,10 @@ class Receiver:
         self.diagram.add_box(box)
 
     def wire_get_resource_by_id(self, id):
-        return next((r for r in self.diagram.resources if r.id == id), None)
+        return self.diagram.get_resource(id)
 
     def generator_get_box_by_id(self, id):
-        return next((b for b in self.diagram.boxes if b.id == id), None)
+        return self.diagram.get_box(id)
 
     def spider_get_resource_by_connection_id(self, id):
-        return next((b for b in self.diagram.spiders if b.id == id), None)
+        return self.diagram.get_spider(id)
@@ -0,0 +1,29 @@
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 65536
+
+
+def map_rows(function, output_count, row_count, *columns, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Apply a scalar box function to every one of the `row_count` rows of the columns and return its results as arrays.
+
+    Rows are handled one chunk at a time, so only one chunk of Python objects is alive at once. A function with several
+    outputs returns one array per output, a function without outputs is still called on every row and returns ().
+    """
+    columns = [np.asarray(column) for column in columns]
+    chunks = []
+    for start in range(0, row_count, chunk_size):
+        stop = min(start + chunk_size, row_count)
+        rows = zip(*(column[start:stop].tolist() for column in columns)) if columns else [()] * (stop - start)
+        results = [function(*row) for row in rows]
+        if output_count == 1:
+            chunks.append(np.asarray(results))
+        elif output_count > 1:
+            chunks.append([np.asarray(output) for output in zip(*results)])
+    if output_count == 0:
+        return ()
+    if output_count == 1:
+        return np.concatenate(chunks) if chunks else np.array([])
+    if not chunks:
+        return [np.array([]) for _ in range(output_count)]
+    return [np.concatenate([chunk[i] for chunk in chunks]) for i in range(output_count)]
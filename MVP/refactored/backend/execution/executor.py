@@ -0,0 +1,348 @@
+from __future__ import annotations
+
+from collections import Counter
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import tee
+from operator import itemgetter
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+import numpy as np
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction
+from MVP.refactored.backend.box_functions.memo import Memo
+from MVP.refactored.backend.execution.batch import DEFAULT_CHUNK_SIZE, map_rows
+from MVP.refactored.backend.execution.profiler import Profiler
+from MVP.refactored.backend.hypergraph.flattener import FlatTemplate, Flattener
+from MVP.refactored.backend.hypergraph.validation import HypergraphValidator
+
+if TYPE_CHECKING:
+    from MVP.refactored.frontend.components.custom_canvas import CustomCanvas
+
+
+class ExecutionPlan:
+    """
+    Flattened diagram in execution order.
+
+    Wires are the dense wire numbers of the flattened diagram, so values can be kept in a list indexed by wire.
+    Every step is `(label, input wires, output wires)`. Steps are grouped into levels, a step only depends on steps of
+    earlier levels, and `steps` lists the levels one after another. `nodes` holds the flat node id of every step.
+    """
+
+    __slots__ = ("levels", "steps", "nodes", "inputs", "outputs", "wire_count")
+
+    def __init__(self, levels, inputs, outputs, wire_count, nodes=None):
+        self.levels: list[list[tuple[str, tuple[int, ...], tuple[int, ...]]]] = levels
+        self.steps = [step for level in levels for step in level]
+        self.nodes: list[int] = nodes if nodes is not None else []
+        self.inputs: tuple[int, ...] = inputs
+        self.outputs: tuple[int, ...] = outputs
+        self.wire_count = wire_count
+
+    @classmethod
+    def from_template(cls, template: FlatTemplate) -> ExecutionPlan:
+        producers: dict[int, int] = {}
+        for node_id, outputs in enumerate(template.outputs):
+            for wire in outputs:
+                if wire in producers:
+                    raise ValueError(f"Wire {wire} is an output of more than one box")
+                producers[wire] = node_id
+
+        driven = set(producers).union(template.input_wires)
+        for node_id, inputs in enumerate(template.inputs):
+            if not driven.issuperset(inputs):
+                raise ValueError(f"Box {template.labels[node_id]} has an input that is not connected")
+        for i, wire in enumerate(template.output_wires):
+            if wire not in driven:
+                raise ValueError(f"Diagram output {i} is not connected")
+
+        order, _ = HypergraphValidator.topological_sort(FlatTemplateView(template))
+        if len(order) != len(template):
+            raise ValueError("Diagram contains a cycle")
+
+        wire_levels = dict.fromkeys(template.input_wires, 0)
+        levels = []
+        level_nodes = []
+        for node_id in order:
+            level = max((wire_levels[wire] for wire in template.inputs[node_id]), default=0)
+            for wire in template.outputs[node_id]:
+                wire_levels[wire] = level + 1
+            if level == len(levels):
+                levels.append([])
+                level_nodes.append([])
+            levels[level].append((template.labels[node_id], template.inputs[node_id], template.outputs[node_id]))
+            level_nodes[level].append(node_id)
+        return cls(levels, template.input_wires, template.output_wires, template.wire_count,
+                   [node_id for nodes in level_nodes for node_id in nodes])
+
+
+class FlatTemplateView:
+    """Minimal hypergraph interface over a flat template, enough for `HypergraphValidator.topological_sort`."""
+
+    def __init__(self, template: FlatTemplate):
+        self.nodes = [FlatNodeView(node_id, inputs, outputs)
+                      for node_id, (inputs, outputs) in enumerate(zip(template.inputs, template.outputs))]
+        self.wire_consumers: dict[int, list[FlatNodeView]] = {}
+        for node in self.nodes:
+            for wire in node.inputs:
+                self.wire_consumers.setdefault(wire, []).append(node)
+
+
+class FlatNodeView:
+    __slots__ = ("id", "inputs", "outputs")
+
+    def __init__(self, node_id, inputs, outputs):
+        self.id = node_id
+        self.inputs = inputs
+        self.outputs = outputs
+
+
+class DiagramExecutor:
+    """
+    Runs a diagram in-process, without generating source code.
+
+    The canvas is flattened (sub-diagrams inlined), ordered topologically and every box function is called directly,
+    passing values along the wires. The execution plan of every canvas is kept until its flattened template changes, so
+    running an unchanged diagram again only costs the box calls. Box functions are compiled once per distinct code.
+
+    With `parallel` set to "thread" or "process" the boxes of one level run concurrently on a pool of `max_workers`
+    workers, and all their results are gathered before the next level starts. Thread pools only help boxes that release
+    the GIL (NumPy, I/O); CPU-heavy pure Python boxes need the process pool, which pickles every box function and its
+    arguments. The pool is kept for the lifetime of the executor, use it as a context manager or call `close`.
+
+    Box functions that `meta` declares pure are memoized, their memos are kept in `memos` between runs. Boxes sent to
+    the process pool run without their memo, it would be pickled empty with every call.
+    """
+
+    PARALLEL_MODES = (None, "thread", "process")
+
+    def __init__(self, flattener: Flattener = None, parallel: str = None, max_workers: int = None):
+        if parallel not in self.PARALLEL_MODES:
+            raise ValueError(f"Unknown parallel mode {parallel}, expected one of {self.PARALLEL_MODES}")
+        self.flattener = flattener if flattener is not None else Flattener()
+        self.parallel = parallel
+        self.max_workers = max_workers
+        self.pool: Executor | None = None
+        self.plans: dict[int, tuple[int, ExecutionPlan]] = {}
+        self.functions: dict[str, BoxFunction] = {}
+        self.memos: dict[str, Memo] = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+
+    def get_pool(self) -> Executor:
+        if self.pool is None:
+            pool_class = ThreadPoolExecutor if self.parallel == "thread" else ProcessPoolExecutor
+            self.pool = pool_class(max_workers=self.max_workers)
+        return self.pool
+
+    def get_plan(self, canvas: CustomCanvas) -> ExecutionPlan:
+        template = self.flattener.flatten(canvas, canvas.main_diagram.canvasses).template
+        serial, plan = self.plans.get(canvas.id, (None, None))
+        if serial != template.serial:
+            plan = ExecutionPlan.from_template(template)
+            self.plans[canvas.id] = (template.serial, plan)
+        return plan
+
+    def get_function(self, label: str, label_content: dict[str, str]) -> BoxFunction:
+        code = label_content.get(label)
+        box_function = self.functions.get(code if code is not None else label)
+        if box_function is None:
+            box_function = BoxFunction(label, code=code)
+            self.functions[code if code is not None else label] = box_function
+        return box_function
+
+    def memoize(self, box_function: BoxFunction) -> BoxFunction | Memo:
+        """Wrap a pure box function in its memo, kept between runs, other box functions are returned as they are."""
+        if box_function.memo_size is None:
+            return box_function
+        memo = self.memos.get(box_function.code)
+        if memo is None:
+            memo = Memo(box_function, box_function.memo_size)
+            self.memos[box_function.code] = memo
+        return memo
+
+    def execute(self, canvas: CustomCanvas, *inputs, profiler: Profiler = None) -> tuple:
+        """
+        Run the diagram of the canvas.
+
+        With a profiler every call is recorded under the id of its box, boxes in sub-diagrams under the id of the box
+        inside the sub-diagram. The boxes are then called one at a time, so their timings do not overlap.
+
+        :param canvas: Canvas to run, its sub-diagrams are run as part of it.
+        :param inputs: One value for every diagram input, in diagram order.
+        :param profiler: (Optional) Profiler to record the box calls in.
+        :return: Tuple with the value of every diagram output, in diagram order.
+        """
+        plan = self.get_plan(canvas)
+        if len(inputs) != len(plan.inputs):
+            raise ValueError(f"Diagram takes {len(plan.inputs)} inputs, {len(inputs)} given")
+
+        label_content = canvas.main_diagram.label_content
+        functions = {label: self.memoize(self.get_function(label, label_content))
+                     for label in {step[0] for step in plan.steps}}
+        values: list[Any] = [None] * plan.wire_count
+        for wire, value in zip(plan.inputs, inputs):
+            values[wire] = value
+
+        if profiler is not None:
+            flat = self.flattener.flatten(canvas, canvas.main_diagram.canvasses)
+            for (label, input_wires, output_wires), node_id in zip(plan.steps, plan.nodes):
+                box_id = flat.get_box(node_id).id
+                if box_id not in profiler.profiles:
+                    profiler.add_box(box_id, label, len(output_wires))
+                result = profiler.call(box_id, functions[label], *[values[wire] for wire in input_wires])
+                self.store_result(label, result, output_wires, values)
+        elif self.parallel is None:
+            for label, input_wires, output_wires in plan.steps:
+                result = functions[label](*[values[wire] for wire in input_wires])
+                self.store_result(label, result, output_wires, values)
+        else:
+            for level in plan.levels:
+                self.execute_level(level, functions, values)
+
+        return tuple(values[wire] for wire in plan.outputs)
+
+    def execute_batch(self, canvas: CustomCanvas, *inputs, chunk_size: int = DEFAULT_CHUNK_SIZE) -> tuple:
+        """
+        Run the diagram of the canvas once over whole arrays of inputs.
+
+        Boxes whose `meta` marks them vectorizable are called once with the arrays, every other box is mapped over the
+        rows one chunk of `chunk_size` rows at a time.
+
+        :param canvas: Canvas to run, its sub-diagrams are run as part of it.
+        :param inputs: One array (or sequence) for every diagram input, in diagram order, all of the same length. A
+        diagram without inputs is run over one row.
+        :param chunk_size: (Optional) Number of rows a scalar box is mapped over at once.
+        :return: Tuple with an array for every diagram output, in diagram order.
+        """
+        plan = self.get_plan(canvas)
+        if len(inputs) != len(plan.inputs):
+            raise ValueError(f"Diagram takes {len(plan.inputs)} inputs, {len(inputs)} given")
+        columns = [np.asarray(column) for column in inputs]
+        if len({len(column) for column in columns}) > 1:
+            raise ValueError("All diagram inputs must have the same length")
+        row_count = len(columns[0]) if columns else 1
+
+        label_content = canvas.main_diagram.label_content
+        functions = {label: self.get_function(label, label_content) for label in {step[0] for step in plan.steps}}
+        values: list[Any] = [None] * plan.wire_count
+        for wire, column in zip(plan.inputs, columns):
+            values[wire] = column
+
+        for label, input_wires, output_wires in plan.steps:
+            box_function = functions[label]
+            arguments = [values[wire] for wire in input_wires]
+            if box_function.is_vectorizable:
+                result = self.memoize(box_function)(*arguments)
+            else:
+                result = map_rows(self.memoize(box_function), len(output_wires), row_count, *arguments,
+                                  chunk_size=chunk_size)
+            self.store_result(label, result, output_wires, values)
+
+        return tuple(np.asarray(values[wire]) for wire in plan.outputs)
+
+    def stream(self, canvas: CustomCanvas, *inputs: Iterable) -> Iterator[tuple]:
+        """
+        Run the diagram of the canvas over streams of inputs, yielding the outputs of every item as soon as it is done.
+
+        Every box is a lazy stage over the streams of its input wires and every wire is an iterator, split with `tee`
+        when several boxes or diagram outputs read it. Pulling the next outputs pulls one item through every stage,
+        boxes whose results nobody reads included, so an item is only taken from the inputs when its outputs are asked
+        for and every wire buffers at most about one item. The stream ends with the shortest input.
+
+        :param canvas: Canvas to run, its sub-diagrams are run as part of it.
+        :param inputs: One iterable for every diagram input, in diagram order.
+        :return: Iterator over tuples with the value of every diagram output, in diagram order.
+        """
+        plan = self.get_plan(canvas)
+        if len(inputs) != len(plan.inputs):
+            raise ValueError(f"Diagram takes {len(plan.inputs)} inputs, {len(inputs)} given")
+
+        label_content = canvas.main_diagram.label_content
+        functions = {label: self.memoize(self.get_function(label, label_content))
+                     for label in {step[0] for step in plan.steps}}
+        readers = Counter(wire for _, input_wires, _ in plan.steps for wire in input_wires)
+        readers.update(plan.outputs)
+        # results nobody reads are still pulled, a clock of rows keeps the length for diagrams without outputs
+        drains: list[Iterator] = []
+        streams: dict[int, list[Iterator]] = {}
+
+        def provide(wire: int, stream: Iterator) -> None:
+            if readers[wire] == 0:
+                drains.append(stream)
+            else:
+                streams[wire] = list(tee(stream, readers[wire]))
+
+        clock_count = 1 + sum(1 for _, input_wires, _ in plan.steps if not input_wires)
+        rows = tee(zip(*inputs), len(plan.inputs) + clock_count)
+        for i, wire in enumerate(plan.inputs):
+            provide(wire, map(itemgetter(i), rows[i]))
+        clocks = list(rows[len(plan.inputs):])
+        drains.append(clocks.pop())
+
+        for label, input_wires, output_wires in plan.steps:
+            function = functions[label]
+            if input_wires:
+                results = map(function, *[streams[wire].pop() for wire in input_wires])
+            else:
+                results = (function() for _ in clocks.pop())
+            if len(output_wires) == 1:
+                provide(output_wires[0], results)
+            elif not output_wires:
+                drains.append(results)
+            else:
+                splits = tee(self.split_results(label, results, len(output_wires)), len(output_wires))
+                for i, (wire, split) in enumerate(zip(output_wires, splits)):
+                    provide(wire, map(itemgetter(i), split))
+
+        outputs = [streams[wire].pop() for wire in plan.outputs]
+        for values in zip(*outputs, *drains):
+            yield values[:len(outputs)]
+
+    def execute_level(self, level: list[tuple[str, tuple[int, ...], tuple[int, ...]]],
+                      functions: dict[str, BoxFunction], values: list) -> None:
+        if len(level) == 1:
+            label, input_wires, output_wires = level[0]
+            self.store_result(label, functions[label](*[values[wire] for wire in input_wires]), output_wires, values)
+            return
+        pool = self.get_pool()
+        if self.parallel == "process":
+            functions = {label: function.function if isinstance(function, Memo) else function
+                         for label, function in functions.items()}
+        futures = [pool.submit(functions[label], *[values[wire] for wire in input_wires])
+                   for label, input_wires, _ in level]
+        for (label, _, output_wires), future in zip(level, futures):
+            self.store_result(label, future.result(), output_wires, values)
+
+    @classmethod
+    def split_results(cls, label: str, results: Iterator, output_count: int) -> Iterator[tuple]:
+        """Check that every result of a box with several outputs has one value per output."""
+        positions = tuple(range(output_count))
+        row: list[Any] = [None] * output_count
+        for result in results:
+            cls.store_result(label, result, positions, row)
+            yield tuple(row)
+
+    @staticmethod
+    def store_result(label: str, result: Any, output_wires: tuple[int, ...], values: list) -> None:
+        if len(output_wires) == 1:
+            values[output_wires[0]] = result
+            return
+        if len(output_wires) == 0:
+            return
+        try:
+            results = list(result)
+        except TypeError:
+            raise ValueError(f"Box {label} has {len(output_wires)} outputs but returned a single value")
+        if len(results) != len(output_wires):
+            raise ValueError(f"Box {label} has {len(output_wires)} outputs but returned {len(results)} values")
+        for wire, value in zip(output_wires, results):
+            values[wire] = value
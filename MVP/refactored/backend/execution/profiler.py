@@ -0,0 +1,124 @@
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+
+
+class BoxProfile:
+    """Running totals of the calls of one box."""
+
+    __slots__ = ("box_id", "label", "calls", "wall_time", "cpu_time", "input_bytes", "output_bytes")
+
+    def __init__(self, box_id: int, label: str, output_count: int):
+        self.box_id = box_id
+        self.label = label
+        self.calls = 0
+        self.wall_time = 0.0
+        self.cpu_time = 0.0
+        self.input_bytes = 0
+        self.output_bytes = [0] * output_count
+
+    def to_dict(self) -> dict:
+        return {"box_id": self.box_id, "label": self.label, "calls": self.calls, "wall_time": self.wall_time,
+                "cpu_time": self.cpu_time, "input_bytes": self.input_bytes, "output_bytes": self.output_bytes}
+
+
+class Profiler:
+    """
+    Records, for every box id, the number of calls, the cumulative wall and CPU time and the sizes of the values passed
+    along its wires.
+
+    Boxes are registered with their label and number of outputs, then every call goes through `call`. The bytes of
+    every output port are summed separately, so each outgoing wire has its own total. CPU time is the time of the
+    calling thread, a coroutine box is timed from its first to its last step and its CPU time includes whatever ran on
+    the event loop meanwhile. Up to `max_events` calls are also kept as Chrome trace events.
+
+    The class only uses the standard library, the code generator emits its source into profiled modules.
+    """
+
+    def __init__(self, boxes: dict = None, max_events: int = 100000):
+        self.profiles = {}
+        self.events = []
+        self.max_events = max_events
+        self.start = time.perf_counter()
+        self.pid = os.getpid()
+        self.lock = threading.Lock()
+        for box_id, (label, output_count) in (boxes or {}).items():
+            self.add_box(box_id, label, output_count)
+
+    def add_box(self, box_id, label, output_count):
+        self.profiles[box_id] = BoxProfile(box_id, label, output_count)
+
+    def call(self, box_id, function, *args):
+        """Call the function of the box with the arguments and record the call, awaitable results are awaited."""
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        result = function(*args)
+        if inspect.isawaitable(result):
+            return self.finish(box_id, result, args, wall_start, cpu_start)
+        self.record(box_id, args, result, wall_start, cpu_start)
+        return result
+
+    async def finish(self, box_id, awaitable, args, wall_start, cpu_start):
+        result = await awaitable
+        self.record(box_id, args, result, wall_start, cpu_start)
+        return result
+
+    def record(self, box_id, args, result, wall_start, cpu_start):
+        wall_time = time.perf_counter() - wall_start
+        cpu_time = time.thread_time() - cpu_start
+        profile = self.profiles[box_id]
+        input_bytes = sum(self.size_of(arg) for arg in args if not callable(arg))
+        if len(profile.output_bytes) == 1:
+            output_bytes = [self.size_of(result)]
+        elif profile.output_bytes:
+            output_bytes = [self.size_of(value) for value in result]
+        else:
+            output_bytes = []
+        with self.lock:
+            profile.calls += 1
+            profile.wall_time += wall_time
+            profile.cpu_time += cpu_time
+            profile.input_bytes += input_bytes
+            profile.output_bytes = [total + size for total, size in zip(profile.output_bytes, output_bytes)]
+            if len(self.events) < self.max_events:
+                self.events.append({"name": profile.label, "cat": "box", "ph": "X",
+                                    "ts": (wall_start - self.start) * 1e6, "dur": wall_time * 1e6,
+                                    "pid": self.pid, "tid": threading.get_ident(), "args": {"box_id": box_id}})
+
+    @staticmethod
+    def size_of(value):
+        """Size of the value in bytes, the buffer of an array or the container and its items."""
+        if hasattr(value, "nbytes"):
+            return value.nbytes
+        size = sys.getsizeof(value)
+        if isinstance(value, (list, tuple, set, frozenset)):
+            size += sum(sys.getsizeof(item) for item in value)
+        return size
+
+    def hot_boxes(self, count=10):
+        """Profiles of the `count` boxes with the most wall time, slowest first."""
+        return sorted(self.profiles.values(), key=lambda profile: profile.wall_time, reverse=True)[:count]
+
+    def report(self):
+        return {"boxes": [profile.to_dict() for profile in self.profiles.values()]}
+
+    def chrome_trace(self):
+        return {"traceEvents": list(self.events), "displayTimeUnit": "ms"}
+
+    def save_report(self, path):
+        with open(path, "w") as file:
+            json.dump(self.report(), file, indent=2)
+
+    def save_chrome_trace(self, path):
+        """Save the calls as a trace that chrome://tracing and Perfetto can open."""
+        with open(path, "w") as file:
+            json.dump(self.chrome_trace(), file)
+
+    @staticmethod
+    def load_report(path):
+        """Load a report saved by `save_report` as box id to the dictionary of its totals."""
+        with open(path) as file:
+            return {box["box_id"]: box for box in json.load(file)["boxes"]}
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from itertools import chain
+
+import numpy as np
+from scipy import sparse
+
+from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
+from MVP.refactored.backend.hypergraph.node import Node
+
+ID_DTYPE = np.int64
+
+
+class CompactHypergraph:
+    """
+    Read-only, array-backed copy of a `Hypergraph`.
+
+    Wire ids are interned: `wire_ids` holds every wire id of the hypergraph once, sorted, and the incidence arrays refer
+    to wires by their position in it. The inputs and outputs of node `i` are
+    `input_wires[input_indptr[i]:input_indptr[i + 1]]` and `output_wires[output_indptr[i]:output_indptr[i + 1]]`
+    (CSR layout), in the same order as on the original `Node`.
+
+    Nodes are exposed as `CompactNode` views that are created on access and only hold the graph and the node position.
+    """
+
+    __slots__ = ("id", "node_ids", "wire_ids", "input_indptr", "input_wires", "output_indptr", "output_wires",
+                 "boundary_inputs", "boundary_outputs", "_node_order", "_sorted_node_ids", "_adjacency",
+                 "_parent_adjacency")
+
+    def __init__(self, hypergraph_id, node_ids, wire_ids, input_indptr, input_wires, output_indptr, output_wires,
+                 boundary_inputs, boundary_outputs):
+        self.id = hypergraph_id
+        self.node_ids = node_ids
+        self.wire_ids = wire_ids
+        self.input_indptr = input_indptr
+        self.input_wires = input_wires
+        self.output_indptr = output_indptr
+        self.output_wires = output_wires
+        self.boundary_inputs = boundary_inputs
+        self.boundary_outputs = boundary_outputs
+        self._node_order = None
+        self._sorted_node_ids = None
+        self._adjacency = None
+        self._parent_adjacency = None
+
+    @classmethod
+    def from_hypergraph(cls, hypergraph: Hypergraph) -> CompactHypergraph:
+        nodes = hypergraph.nodes
+        node_ids = np.fromiter((node.id for node in nodes), dtype=ID_DTYPE, count=len(nodes))
+        input_counts = np.fromiter((len(node.inputs) for node in nodes), dtype=np.int64, count=len(nodes))
+        output_counts = np.fromiter((len(node.outputs) for node in nodes), dtype=np.int64, count=len(nodes))
+        raw_inputs = np.fromiter(chain.from_iterable(node.inputs for node in nodes), dtype=ID_DTYPE,
+                                 count=int(input_counts.sum()))
+        raw_outputs = np.fromiter(chain.from_iterable(node.outputs for node in nodes), dtype=ID_DTYPE,
+                                  count=int(output_counts.sum()))
+        raw_boundary_inputs = np.fromiter(hypergraph.inputs, dtype=ID_DTYPE, count=len(hypergraph.inputs))
+        raw_boundary_outputs = np.fromiter(hypergraph.outputs, dtype=ID_DTYPE, count=len(hypergraph.outputs))
+
+        parts = [raw_inputs, raw_outputs, raw_boundary_inputs, raw_boundary_outputs]
+        wire_ids, interned = np.unique(np.concatenate(parts), return_inverse=True)
+        index_dtype = np.int32 if len(wire_ids) < np.iinfo(np.int32).max else np.int64
+        interned = interned.astype(index_dtype)
+        ends = np.cumsum([len(part) for part in parts])
+        input_wires, output_wires, boundary_inputs, boundary_outputs = np.split(interned, ends[:-1])
+
+        return cls(hypergraph.id, node_ids, wire_ids,
+                   cls.to_indptr(input_counts), input_wires,
+                   cls.to_indptr(output_counts), output_wires,
+                   boundary_inputs, boundary_outputs)
+
+    @staticmethod
+    def to_indptr(counts: np.ndarray) -> np.ndarray:
+        indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return indptr
+
+    def to_hypergraph(self) -> Hypergraph:
+        hypergraph = Hypergraph(self.id, nodes=[node.to_node() for node in self.nodes])
+        hypergraph.inputs = self.inputs
+        hypergraph.outputs = self.outputs
+        return hypergraph
+
+    @property
+    def nodes(self) -> list[CompactNode]:
+        return [CompactNode(self, index) for index in range(len(self.node_ids))]
+
+    @property
+    def inputs(self) -> list[int]:
+        return self.wire_ids[self.boundary_inputs].tolist()
+
+    @property
+    def outputs(self) -> list[int]:
+        return self.wire_ids[self.boundary_outputs].tolist()
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays of the representation."""
+        return sum(getattr(self, name).nbytes for name in ("node_ids", "wire_ids", "input_indptr", "input_wires",
+                                                           "output_indptr", "output_wires", "boundary_inputs",
+                                                           "boundary_outputs"))
+
+    def get_node(self, node_id: int) -> CompactNode | None:
+        if self._node_order is None:
+            self._node_order = np.argsort(self.node_ids, kind="stable")
+            self._sorted_node_ids = self.node_ids[self._node_order]
+        sorted_ids = self._sorted_node_ids
+        position = np.searchsorted(sorted_ids, node_id)
+        if position < len(sorted_ids) and sorted_ids[position] == node_id:
+            return CompactNode(self, int(self._node_order[position]))
+        return None
+
+    def wire_index(self, wire_id: int) -> int | None:
+        position = np.searchsorted(self.wire_ids, wire_id)
+        if position < len(self.wire_ids) and self.wire_ids[position] == wire_id:
+            return int(position)
+        return None
+
+    def input_incidence(self) -> sparse.csr_matrix:
+        """Node x wire matrix with a 1 where the wire is an input of the node."""
+        return self.incidence(self.input_indptr, self.input_wires)
+
+    def output_incidence(self) -> sparse.csr_matrix:
+        """Node x wire matrix with a 1 where the wire is an output of the node."""
+        return self.incidence(self.output_indptr, self.output_wires)
+
+    def incidence(self, indptr: np.ndarray, wires: np.ndarray) -> sparse.csr_matrix:
+        data = np.ones(len(wires), dtype=np.int8)
+        return sparse.csr_matrix((data, wires, indptr), shape=(len(self.node_ids), len(self.wire_ids)))
+
+    def incidence_matrix(self) -> sparse.csr_matrix:
+        """Oriented node x wire incidence matrix, +1 for produced wires and -1 for consumed wires."""
+        return self.output_incidence() - self.input_incidence()
+
+    def adjacency_matrix(self) -> sparse.csr_matrix:
+        """Node x node matrix where entry (i, j) counts the wires node i produces and node j consumes."""
+        if self._adjacency is None:
+            outputs = self.output_incidence().astype(np.int32)
+            inputs = self.input_incidence().astype(np.int32)
+            self._adjacency = (outputs @ inputs.T).tocsr()
+        return self._adjacency
+
+    def parent_adjacency_matrix(self) -> sparse.csr_matrix:
+        """Transpose of `adjacency_matrix` in CSR form, row i holds the parents of node i."""
+        if self._parent_adjacency is None:
+            self._parent_adjacency = self.adjacency_matrix().T.tocsr()
+        return self._parent_adjacency
+
+    def __len__(self) -> int:
+        return len(self.node_ids)
+
+
+class CompactNode:
+    """Lightweight view of one node of a `CompactHypergraph`."""
+
+    __slots__ = ("graph", "index")
+
+    def __init__(self, graph: CompactHypergraph, index: int):
+        self.graph = graph
+        self.index = index
+
+    @property
+    def id(self) -> int:
+        return int(self.graph.node_ids[self.index])
+
+    @property
+    def input_wires(self) -> np.ndarray:
+        graph = self.graph
+        return graph.input_wires[graph.input_indptr[self.index]:graph.input_indptr[self.index + 1]]
+
+    @property
+    def output_wires(self) -> np.ndarray:
+        graph = self.graph
+        return graph.output_wires[graph.output_indptr[self.index]:graph.output_indptr[self.index + 1]]
+
+    @property
+    def inputs(self) -> list[int]:
+        return self.graph.wire_ids[self.input_wires].tolist()
+
+    @property
+    def outputs(self) -> list[int]:
+        return self.graph.wire_ids[self.output_wires].tolist()
+
+    def get_children(self) -> list[CompactNode]:
+        adjacency = self.graph.adjacency_matrix()
+        row = adjacency.indices[adjacency.indptr[self.index]:adjacency.indptr[self.index + 1]]
+        return [CompactNode(self.graph, int(index)) for index in np.sort(row)]
+
+    def get_parents(self) -> list[CompactNode]:
+        parents = self.graph.parent_adjacency_matrix()
+        column = parents.indices[parents.indptr[self.index]:parents.indptr[self.index + 1]]
+        return [CompactNode(self.graph, int(index)) for index in np.sort(column)]
+
+    def is_valid(self) -> bool:
+        return len(self.input_wires) > 0 and len(self.output_wires) > 0
+
+    def has_input(self, input_id) -> bool:
+        return input_id in self.inputs
+
+    def has_output(self, output_id) -> bool:
+        return output_id in self.outputs
+
+    def to_node(self) -> Node:
+        return Node(self.id, self.inputs, self.outputs)
+
+    def to_dict(self) -> dict:
+        return {
+            "id": self.id,
+            "inputs": self.inputs,
+            "outputs": self.outputs,
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactNode):
+            return False
+        return other.graph is self.graph and other.index == self.index
+
+    def __hash__(self):
+        return hash((id(self.graph), self.index))
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+from itertools import count
+from typing import TYPE_CHECKING
+
+from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
+from MVP.refactored.backend.hypergraph.node import Node
+from MVP.refactored.backend.hypergraph.spider_resolver import SpiderResolver
+from MVP.refactored.backend.lru_cache import LRUCache
+
+if TYPE_CHECKING:
+    from MVP.refactored.frontend.canvas_objects.box import Box
+    from MVP.refactored.frontend.components.custom_canvas import CustomCanvas
+
+
+class FlatTemplate:
+    """
+    Fully inlined content of one canvas, independent of the ids used on the canvas.
+
+    Wires are numbered 0..wire_count - 1. Node `i` is the leaf box reached from the canvas by following the box positions
+    in `paths[i]` through the sub-diagrams. `input_wires` and `output_wires` are the wires of the canvas inputs and
+    outputs, in canvas order.
+    """
+
+    __slots__ = ("serial", "labels", "paths", "inputs", "outputs", "input_wires", "output_wires", "wire_count")
+
+    def __init__(self, serial, labels, paths, inputs, outputs, input_wires, output_wires, wire_count):
+        self.serial = serial
+        self.labels: list[str] = labels
+        self.paths: list[tuple[int, ...]] = paths
+        self.inputs: list[tuple[int, ...]] = inputs
+        self.outputs: list[tuple[int, ...]] = outputs
+        self.input_wires: tuple[int, ...] = input_wires
+        self.output_wires: tuple[int, ...] = output_wires
+        self.wire_count = wire_count
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+
+class FlatDiagram:
+    """Single dataflow graph of a canvas with all of its sub-diagrams inlined."""
+
+    def __init__(self, canvas: CustomCanvas, canvasses: dict[str, CustomCanvas], template: FlatTemplate):
+        self.canvas = canvas
+        self.canvasses = canvasses
+        self.template = template
+
+    @property
+    def labels(self) -> list[str]:
+        return self.template.labels
+
+    @property
+    def inputs(self) -> list[int]:
+        return list(self.template.input_wires)
+
+    @property
+    def outputs(self) -> list[int]:
+        return list(self.template.output_wires)
+
+    def to_hypergraph(self, hypergraph_id=None) -> Hypergraph:
+        """Hypergraph of the leaf boxes, node ids are positions in `labels`, wire ids are the template wire numbers."""
+        template = self.template
+        nodes = [Node(i, list(inputs), list(outputs))
+                 for i, (inputs, outputs) in enumerate(zip(template.inputs, template.outputs))]
+        return Hypergraph(self.canvas.id if hypergraph_id is None else hypergraph_id, nodes=nodes)
+
+    def get_box(self, node_id: int) -> Box:
+        """Resolve a flattened node to the box it was created from."""
+        canvas = self.canvas
+        box = None
+        for position in self.template.paths[node_id]:
+            if box is not None:
+                canvas = self.canvasses[str(box.id)]
+            box = canvas.boxes[position]
+        return box
+
+    def __len__(self) -> int:
+        return len(self.template)
+
+
+class Flattener:
+    """
+    Inlines compound boxes into one hypergraph of leaf boxes.
+
+    Every canvas is described by a key built from its box labels, its wiring (wires renumbered in order of appearance)
+    and the serials of the templates of its sub-diagrams. Canvasses with equal keys have identical content, so each
+    distinct sub-diagram is expanded once and every other occurrence reuses the cached template by remapping its wire
+    numbers. The cache is kept between calls and bounded by `max_templates`, least recently used entries go first.
+
+    Only boxes are nodes. Spiders are resolved into wire joins: every wire meeting in a group of spiders becomes the
+    same wire, so one box output can feed several boxes and canvas outputs.
+    """
+
+    def __init__(self, max_templates: int = 1024):
+        self.templates = LRUCache(max_templates)
+        self.serials = count()
+
+    @property
+    def hits(self) -> int:
+        return self.templates.hits
+
+    @property
+    def misses(self) -> int:
+        return self.templates.misses
+
+    def flatten(self, canvas: CustomCanvas, canvasses: dict[str, CustomCanvas]) -> FlatDiagram:
+        return FlatDiagram(canvas, canvasses, self.get_template(canvas, canvasses, {}))
+
+    def clear(self) -> None:
+        self.templates.clear()
+
+    def get_template(self, canvas: CustomCanvas, canvasses: dict[str, CustomCanvas],
+                     templates_by_canvas: dict[int, FlatTemplate]) -> FlatTemplate:
+        if canvas.id in templates_by_canvas:
+            return templates_by_canvas[canvas.id]
+
+        children: dict[int, FlatTemplate] = {}
+        for box in canvas.boxes:
+            sub_canvas = canvasses.get(str(box.id))
+            if sub_canvas is not None and sub_canvas is not canvas:
+                children[box.id] = self.get_template(sub_canvas, canvasses, templates_by_canvas)
+
+        key, description = self.describe(canvas, children)
+        template = self.templates.get(key, lambda: self.expand(description, children))
+        templates_by_canvas[canvas.id] = template
+        return template
+
+    @staticmethod
+    def describe(canvas: CustomCanvas, children: dict[int, FlatTemplate]) -> tuple[tuple, tuple]:
+        """
+        Build the cache key of a canvas together with the wiring needed to expand it.
+
+        Unconnected ports are None, connected ports the number of their wire in order of first appearance.
+        """
+        wire_numbers: dict[int, int] = {}
+        resolver = SpiderResolver()
+
+        def number(connection):
+            if not connection.has_wire:
+                return None
+            return wire_numbers.setdefault(resolver.wire_id(connection), len(wire_numbers))
+
+        inputs = tuple(number(connection) for connection in canvas.inputs)
+        boxes = []
+        entries = []
+        for box in canvas.boxes:
+            connections = sorted(box.connections, key=lambda c: c.index)
+            left = tuple(number(c) for c in connections if c.side == "left")
+            right = tuple(number(c) for c in connections if c.side != "left")
+            child = children.get(box.id)
+            boxes.append((box, left, right))
+            entries.append((child.serial if child is not None else box.label_text, left, right))
+        outputs = tuple(number(connection) for connection in canvas.outputs)
+        return (inputs, tuple(entries), outputs), (inputs, boxes, outputs, len(wire_numbers))
+
+    def expand(self, description: tuple, children: dict[int, FlatTemplate]) -> FlatTemplate:
+        inputs, boxes, outputs, wire_count = description
+        parents = list(range(wire_count))
+
+        def fresh():
+            parents.append(len(parents))
+            return len(parents) - 1
+
+        def find(wire):
+            while parents[wire] != wire:
+                parents[wire] = parents[parents[wire]]
+                wire = parents[wire]
+            return wire
+
+        def connected(wires):
+            return [wire if wire is not None else fresh() for wire in wires]
+
+        labels, paths, node_inputs, node_outputs = [], [], [], []
+        for position, (box, left, right) in enumerate(boxes):
+            child = children.get(box.id)
+            if child is None:
+                labels.append(box.label_text)
+                paths.append((position,))
+                node_inputs.append(tuple(wire for wire in left if wire is not None))
+                node_outputs.append(tuple(wire for wire in right if wire is not None))
+                continue
+
+            # Bind the sub-diagram interface to the ports of the compound box, a wire passing straight through the
+            # sub-diagram joins the two outer wires.
+            mapping: list[int | None] = [None] * child.wire_count
+            for inner, outer in zip(child.input_wires + child.output_wires, connected(left) + connected(right)):
+                if mapping[inner] is None:
+                    mapping[inner] = outer
+                else:
+                    parents[find(outer)] = find(mapping[inner])
+            for inner in range(child.wire_count):
+                if mapping[inner] is None:
+                    mapping[inner] = fresh()
+
+            labels.extend(child.labels)
+            paths.extend((position,) + path for path in child.paths)
+            node_inputs.extend(tuple(mapping[wire] for wire in wires) for wires in child.inputs)
+            node_outputs.extend(tuple(mapping[wire] for wire in wires) for wires in child.outputs)
+
+        # Renumber the wires densely, in order of first appearance.
+        numbers: dict[int, int] = {}
+
+        def renumber(wires):
+            return tuple(numbers.setdefault(find(wire), len(numbers)) for wire in wires)
+
+        input_wires = renumber(connected(inputs))
+        node_inputs = [renumber(wires) for wires in node_inputs]
+        node_outputs = [renumber(wires) for wires in node_outputs]
+        output_wires = renumber(connected(outputs))
+        return FlatTemplate(next(self.serials), labels, paths, node_inputs, node_outputs, input_wires, output_wires,
+                            len(numbers))
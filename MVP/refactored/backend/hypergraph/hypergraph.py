@@ -1,4 +1,6 @@
 from MVP.refactored.backend.hypergraph.node import Node
+from MVP.refactored.backend.index_view import IndexView
+from MVP.refactored.backend.hypergraph.validation import HypergraphValidator, ValidationReport
 import networkx as nx
 import matplotlib.pyplot as plt
 
@@ -6,157 +8,208 @@ import matplotlib.pyplot as plt
 class Hypergraph(Node):
 
     def __init__(self, hypergraph_id=None, inputs=None, outputs=None, nodes=None):
+        self.boundary_inputs: dict[int, None] = {}
+        self.boundary_outputs: dict[int, None] = {}
+        self.wire_producers: dict[int, list[Node]] = {}
+        self.wire_consumers: dict[int, list[Node]] = {}
+        self.nodes_by_id: dict[int, Node] = {}
+        self.track_io = True
+        self.observer = None  # IncrementalValidator of a live hypergraph, told about every change of the wire index
         super().__init__(hypergraph_id, inputs, outputs)
-        if nodes is None:
-            nodes = []
-        self.nodes = nodes
-        self.set_hypergraph_io()
+        self.add_nodes(nodes or [])
+
+    @property
+    def nodes(self) -> IndexView:
+        return IndexView(self.nodes_by_id, values=True)
+
+    @property
+    def inputs(self) -> IndexView:
+        return IndexView(self.boundary_inputs)
+
+    @inputs.setter
+    def inputs(self, inputs: list[int]) -> None:
+        self.boundary_inputs = dict.fromkeys(inputs)
+        if self.observer is not None:
+            self.observer.boundary_changed()
+
+    @property
+    def outputs(self) -> IndexView:
+        return IndexView(self.boundary_outputs)
+
+    @outputs.setter
+    def outputs(self, outputs: list[int]) -> None:
+        self.boundary_outputs = dict.fromkeys(outputs)
+        if self.observer is not None:
+            self.observer.boundary_changed()
+
+    def add_input(self, input_id: int) -> None:
+        if input_id in self.boundary_inputs or input_id in self.boundary_outputs:
+            raise ValueError("Input already exists")
+        self.boundary_inputs[input_id] = None
+        if self.hypergraph is not None:
+            self.hypergraph.index_consumer(input_id, self)
+
+    def remove_input(self, input_id: int) -> None:
+        if input_id not in self.boundary_inputs:
+            raise ValueError("Input does not exist")
+        del self.boundary_inputs[input_id]
+        if self.hypergraph is not None:
+            self.hypergraph.unindex_consumer(input_id, self)
+
+    def add_output(self, output_id: int) -> None:
+        if output_id in self.boundary_inputs or output_id in self.boundary_outputs:
+            raise ValueError("Output already exists")
+        self.boundary_outputs[output_id] = None
+        if self.hypergraph is not None:
+            self.hypergraph.index_producer(output_id, self)
+
+    def remove_output(self, output_id: int) -> None:
+        if output_id not in self.boundary_outputs:
+            raise ValueError("Output does not exist")
+        del self.boundary_outputs[output_id]
+        if self.hypergraph is not None:
+            self.hypergraph.unindex_producer(output_id, self)
 
     def add_node(self, node: Node) -> None:
-        if node in self.nodes:
+        if node.id in self.nodes_by_id:
             raise ValueError("Node already exists")
-        self.nodes.append(node)
-        self.set_hypergraph_io()
+        self.index_node(node)
+
+    def add_nodes(self, nodes: [Node]) -> None:
+        """Add many nodes, computing the hypergraph inputs and outputs once at the end."""
+        self.track_io = False
+        try:
+            for node in nodes:
+                self.add_node(node)
+        finally:
+            self.track_io = True
+            self.set_hypergraph_io()
+
+    def index_node(self, node: Node) -> None:
+        node.hypergraph = self
+        self.nodes_by_id[node.id] = node
+        for input_id in node.inputs:
+            self.index_consumer(input_id, node)
+        for output_id in node.outputs:
+            self.index_producer(output_id, node)
+        if self.observer is not None:
+            self.observer.node_added(node)
+
+    def unindex_node(self, node: Node) -> None:
+        for input_id in node.inputs:
+            self.unindex_consumer(input_id, node)
+        for output_id in node.outputs:
+            self.unindex_producer(output_id, node)
+        del self.nodes_by_id[node.id]
+        node.hypergraph = None
+        if self.observer is not None:
+            self.observer.node_removed(node)
+
+    def index_consumer(self, wire_id: int, node: Node) -> None:
+        self.wire_consumers.setdefault(wire_id, []).append(node)
+        if self.track_io:
+            self.boundary_outputs.pop(wire_id, None)
+            if wire_id not in self.wire_producers:
+                self.boundary_inputs[wire_id] = None
+        if self.observer is not None:
+            self.observer.wire_changed(wire_id, node)
+
+    def unindex_consumer(self, wire_id: int, node: Node) -> None:
+        self._unindex(self.wire_consumers, wire_id, node)
+        if self.track_io and wire_id not in self.wire_consumers:
+            self.boundary_inputs.pop(wire_id, None)
+            if wire_id in self.wire_producers:
+                self.boundary_outputs[wire_id] = None
+        if self.observer is not None:
+            self.observer.wire_changed(wire_id, node)
+
+    def index_producer(self, wire_id: int, node: Node) -> None:
+        self.wire_producers.setdefault(wire_id, []).append(node)
+        if self.track_io:
+            self.boundary_inputs.pop(wire_id, None)
+            if wire_id not in self.wire_consumers:
+                self.boundary_outputs[wire_id] = None
+        if self.observer is not None:
+            self.observer.wire_changed(wire_id, node)
+
+    def unindex_producer(self, wire_id: int, node: Node) -> None:
+        self._unindex(self.wire_producers, wire_id, node)
+        if self.track_io and wire_id not in self.wire_producers:
+            self.boundary_outputs.pop(wire_id, None)
+            if wire_id in self.wire_consumers:
+                self.boundary_inputs[wire_id] = None
+        if self.observer is not None:
+            self.observer.wire_changed(wire_id, node)
+
+    @staticmethod
+    def _unindex(index: dict[int, list[Node]], wire_id: int, node: Node) -> None:
+        nodes = index.get(wire_id)
+        if nodes is None:
+            return
+        nodes.remove(node)
+        if not nodes:
+            del index[wire_id]
 
     def get_node_by_input(self, input_id: int) -> Node | None:
-        for node in self.nodes:
-            if input_id in node.inputs:
-                return node
-        return None
+        consumers = self.wire_consumers.get(input_id)
+        return consumers[0] if consumers else None
 
     def get_node_by_output(self, output_id: int) -> Node | None:
-        for node in self.nodes:
-            if output_id in node.outputs:
-                return node
-        return None
+        producers = self.wire_producers.get(output_id)
+        return producers[0] if producers else None
+
+    def get_nodes_by_input(self, input_id: int) -> list[Node]:
+        return list(self.wire_consumers.get(input_id, []))
 
     def get_node_children_by_id(self, node_id: int) -> list[Node]:
         return self.get_node_children_by_node(self.get_node(node_id))
 
     def get_node_children_by_node(self, required_node: Node) -> list[Node]:
-        children = []
-        for node in self.nodes:
-            if any(n in node.inputs for n in required_node.outputs):
-                children.append(node)
-        return children
+        children = {}
+        for output_id in required_node.outputs:
+            for node in self.wire_consumers.get(output_id, []):
+                children[node.id] = node
+        return list(children.values())
 
     def get_node_parents_by_id(self, node_id: int) -> list[Node]:
         return self.get_node_parents_by_node(self.get_node(node_id))
 
     def get_node_parents_by_node(self, required_node: Node) -> list[Node]:
-        parents = []
-        for node in self.nodes:
-            if any(n in node.outputs for n in required_node.inputs):
-                parents.append(node)
-        return parents
-
-    def add_nodes(self, nodes: [Node]) -> None:
-        for node in nodes:
-            self.add_node(node)
+        parents = {}
+        for input_id in required_node.inputs:
+            for node in self.wire_producers.get(input_id, []):
+                parents[node.id] = node
+        return list(parents.values())
 
     def get_node(self, node_id: int) -> Node | None:
-        for node in self.nodes:
-            if node.id == node_id:
-                return node
-        return None
+        return self.nodes_by_id.get(node_id)
 
     def remove_node(self, node: Node) -> None:
-        self.nodes.remove(node)
+        if self.nodes_by_id.get(node.id) is not node:
+            raise ValueError("Node does not exist")
+        self.unindex_node(node)
 
     def set_hypergraph_io(self) -> None:
-        all_inputs = set()
-        all_outputs = set()
+        self.boundary_inputs = {wire_id: None for wire_id in self.wire_consumers if wire_id not in self.wire_producers}
+        self.boundary_outputs = {wire_id: None for wire_id in self.wire_producers if wire_id not in self.wire_consumers}
 
-        for node in self.nodes:
-            all_inputs.update(node.inputs)
-            all_outputs.update(node.outputs)
-
-        self.inputs = list(all_inputs - all_outputs)
-        self.outputs = list(all_outputs - all_inputs)
+    def validate(self) -> ValidationReport:
+        return HypergraphValidator.validate(self)
 
     def is_valid(self) -> bool:
-        if not self.inputs or not self.outputs or not self.nodes:
-            return False
-
-        node_inputs = set()
-        node_outputs = set()
-
-        for node in self.nodes:
-            if not node.is_valid():
-                return False
-
-            node_inputs.update(node.inputs)
-            node_outputs.update(node.outputs)
-
-        invalid_inputs = node_inputs - set(self.inputs) - node_outputs
-        if invalid_inputs:
-            return False
-
-        invalid_outputs = node_outputs - set(self.outputs) - node_inputs
-        if invalid_outputs:
-            return False
-
-        if not self.is_connected():
-            return False
-
-        has_no_cycles = self.has_no_cycles()
-        if not has_no_cycles:
-            return False
-
-        return True
+        return self.validate().is_valid
 
     def is_connected(self) -> bool:
-        visited = set()
-        self.explore_connected(self.nodes[0], visited)
-
-        return len(visited) == len(self.nodes)
-
-    def explore_connected(self, node, visited):
-        """Helper function to perform DFS for connectivity check."""
-        if node in visited:
-            return
-        visited.add(node)
-
-        for node_output in node.outputs:
-            for other_node in self.nodes:
-                if node_output in other_node.inputs and other_node not in visited:
-                    self.explore_connected(other_node, visited)
-
-        for node_input in node.inputs:
-            for other_node in self.nodes:
-                if node_input in other_node.outputs and other_node not in visited:
-                    self.explore_connected(other_node, visited)
+        return len(HypergraphValidator.find_components(self)) <= 1
 
     def has_no_cycles(self) -> bool:
-        explored_nodes = set()
-        current_path = set()
-
-        for current_node in self.nodes:
-            if current_node not in explored_nodes:
-                if not self.depth_first_search(current_node, explored_nodes, current_path):
-                    return False
-        return True
-
-    def depth_first_search(self, node, visited, current_path) -> bool:
-        if node in current_path:
-            return False
-        if node in visited:
-            return True
-
-        visited.add(node)
-        current_path.add(node)
-
-        for output in node.outputs:
-            for other_node in self.nodes:
-                if output in other_node.inputs:
-                    if not self.depth_first_search(other_node, visited, current_path):
-                        return False
-
-        current_path.remove(node)
-        return True
+        _, cycle_members = HypergraphValidator.topological_sort(self)
+        return not cycle_members
 
     def to_dict(self) -> dict:
         hypergraph_dict = super().to_dict()
+        hypergraph_dict["inputs"] = list(self.inputs)
+        hypergraph_dict["outputs"] = list(self.outputs)
         hypergraph_dict["nodes"] = [node.to_dict() for node in self.nodes]
         return hypergraph_dict
 
@@ -165,23 +218,20 @@ class Hypergraph(Node):
         for node in self.nodes:
             g.add_node(node.id, label="N_" + str(node.id)[-6:])
             for output in node.outputs:
-                for other_node in self.nodes:
-                    if output in other_node.inputs:
-                        g.add_edge(node.id, other_node.id, label=str(output)[-6:])
+                for other_node in self.wire_consumers.get(output, []):
+                    g.add_edge(node.id, other_node.id, label=str(output)[-6:])
 
         start_node_id = "input"
         g.add_node(start_node_id)
         for input_wire in self.inputs:
-            for node in self.nodes:
-                if input_wire in node.inputs:
-                    g.add_edge(start_node_id, node.id, label=str(input_wire)[-6:])
+            for node in self.wire_consumers.get(input_wire, []):
+                g.add_edge(start_node_id, node.id, label=str(input_wire)[-6:])
 
         end_node_id = "output"
         g.add_node(end_node_id)
         for output_wire in self.outputs:
-            for node in self.nodes:
-                if output_wire in node.outputs:
-                    g.add_edge(node.id, end_node_id, label=str(output_wire)[-6:])
+            for node in self.wire_producers.get(output_wire, []):
+                g.add_edge(node.id, end_node_id, label=str(output_wire)[-6:])
 
         fig, ax = plt.subplots(figsize=(10, 5))
         pos = nx.spring_layout(g)
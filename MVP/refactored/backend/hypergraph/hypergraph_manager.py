@@ -2,49 +2,248 @@ from __future__ import annotations
 from typing import TYPE_CHECKING
 from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
 from MVP.refactored.backend.hypergraph.node import Node
+from MVP.refactored.backend.hypergraph.spider_resolver import SpiderResolver
+from MVP.refactored.backend.hypergraph.structural_hash import StructuralHashes
+from MVP.refactored.backend.hypergraph.validation import IncrementalValidator
 
 if TYPE_CHECKING:
+    from MVP.refactored.frontend.canvas_objects.box import Box
+    from MVP.refactored.frontend.canvas_objects.spider import Spider
     from MVP.refactored.frontend.components.custom_canvas import CustomCanvas
 
 
 class HypergraphManager:
-    hypergraphs: list[Hypergraph] = []
+    """
+    Registry of the valid hypergraphs of one project.
 
-    @staticmethod
-    def get_graph_by_node_id(node_id: int) -> Hypergraph | None:
-        for hypergraph in HypergraphManager.hypergraphs:
-            for node in hypergraph.nodes:
-                if node.id == node_id:
-                    return hypergraph
-        return None
+    Every MainDiagram owns its own manager, so lookups of one open project never see the hypergraphs of another.
 
-    @staticmethod
-    def get_graph_by_id(hypergraph_id: int) -> Hypergraph | None:
-        for graph in HypergraphManager.hypergraphs:
-            if graph.id == hypergraph_id:
-                return graph
-        return None
+    Boxes are nodes and spiders are resolved into wire joins (see SpiderResolver): all wires meeting in a group of
+    spiders are one wire of the hypergraph.
 
-    @staticmethod
-    def modify_canvas_hypergraph(canvas: CustomCanvas) -> None:
-        hypergraph = HypergraphManager.get_graph_by_id(canvas.id)
+    In incremental mode the manager keeps a live hypergraph for every canvas and the canvas objects report their edits
+    to it (box added/deleted/renamed, ports or wires of a box changed, wires of a spider changed). Each edit only
+    touches the nodes of the boxes it reaches. Validity is re-checked lazily, on the next lookup, by the
+    IncrementalValidator of the live hypergraph from the nodes and wires the edits touched.
+
+    The same events, in both modes, invalidate the structural hashes of the edited canvas and the canvasses
+    containing it.
+    """
+
+    def __init__(self, incremental: bool = False):
+        self.incremental = incremental
+        self.hypergraphs_by_id: dict[int, Hypergraph] = {}
+        self.graphs_by_node_id: dict[int, Hypergraph] = {}
+        self.live_hypergraphs: dict[int, Hypergraph] = {}
+        self.pending_canvases: set[int] = set()
+        self.structural_hashes = StructuralHashes()
+
+    @property
+    def hypergraphs(self) -> list[Hypergraph]:
+        self.validate_pending()
+        return list(self.hypergraphs_by_id.values())
+
+    def add_hypergraph(self, hypergraph: Hypergraph) -> None:
+        if hypergraph.id in self.hypergraphs_by_id:
+            self.remove_hypergraph(self.hypergraphs_by_id[hypergraph.id])
+        self.hypergraphs_by_id[hypergraph.id] = hypergraph
+        for node in hypergraph.nodes:
+            self.graphs_by_node_id[node.id] = hypergraph
+
+    def remove_hypergraph(self, hypergraph: Hypergraph) -> None:
+        if self.hypergraphs_by_id.get(hypergraph.id) is not hypergraph:
+            return
+        del self.hypergraphs_by_id[hypergraph.id]
+        for node in hypergraph.nodes:
+            if self.graphs_by_node_id.get(node.id) is hypergraph:
+                del self.graphs_by_node_id[node.id]
+
+    def get_graph_by_node_id(self, node_id: int) -> Hypergraph | None:
+        self.validate_pending()
+        hypergraph = self.graphs_by_node_id.get(node_id)
+        # The nodes of a live hypergraph stay mapped while it is invalid, so only a registered graph is returned.
+        if hypergraph is None or self.hypergraphs_by_id.get(hypergraph.id) is not hypergraph:
+            return None
+        return hypergraph
+
+    def get_graph_by_id(self, hypergraph_id: int) -> Hypergraph | None:
+        self.validate_pending()
+        return self.hypergraphs_by_id.get(hypergraph_id)
+
+    def modify_canvas_hypergraph(self, canvas: CustomCanvas) -> None:
+        self.structural_hashes.invalidate(canvas.id)
+        hypergraph = self.hypergraphs_by_id.get(canvas.id)
 
         if hypergraph:
-            HypergraphManager.hypergraphs.remove(hypergraph)
+            self.remove_hypergraph(hypergraph)
 
-        HypergraphManager.create_hypergraphs_from_canvas(canvas)
+        self.pending_canvases.discard(canvas.id)
+        live = self.live_hypergraphs.pop(canvas.id, None)
+        if live is not None and self.incremental:
+            for node_id in live.nodes_by_id:
+                if self.graphs_by_node_id.get(node_id) is live:
+                    del self.graphs_by_node_id[node_id]
+        self.create_hypergraphs_from_canvas(canvas)
 
-    @staticmethod
-    def create_hypergraphs_from_canvas(canvas: CustomCanvas) -> None:
-        hypergraph = Hypergraph(canvas.id)
-        for box in canvas.boxes:
-            node = Node(box.id)
-            for connection in box.connections:
-                if connection.side == "left" and connection.has_wire:
-                    node.add_input(connection.wire.id)
-                elif connection.has_wire:
-                    node.add_output(connection.wire.id)
-            hypergraph.add_node(node)
+    def create_hypergraphs_from_canvas(self, canvas: CustomCanvas) -> None:
+        hypergraph = self.build_hypergraph(canvas)
+        if self.incremental:
+            self.add_live_hypergraph(hypergraph)
+            if hypergraph.observer.is_valid():
+                self.hypergraphs_by_id[hypergraph.id] = hypergraph
+            return
 
         if hypergraph.is_valid():
-            HypergraphManager.hypergraphs.append(hypergraph)
+            self.add_hypergraph(hypergraph)
+
+    @staticmethod
+    def build_hypergraph(canvas: CustomCanvas) -> Hypergraph:
+        resolver = SpiderResolver()
+        return Hypergraph(canvas.id, nodes=[HypergraphManager.build_node(box, resolver) for box in canvas.boxes])
+
+    @staticmethod
+    def build_node(box: Box, resolver: SpiderResolver = None) -> Node:
+        """
+        Build the node of the box from the resolved wires of its connections.
+
+        Through a spider one value can reach several ports of the same box, so a wire may repeat in the inputs of the
+        node or be both its input and output (a cycle).
+        """
+        resolver = resolver if resolver is not None else SpiderResolver()
+        inputs, outputs = [], []
+        for connection in box.connections:
+            wire_id = resolver.wire_id(connection)
+            if wire_id is not None:
+                (inputs if connection.side == "left" else outputs).append(wire_id)
+        return Node(box.id, inputs, outputs)
+
+    def canvas_hash(self, canvas: CustomCanvas) -> str:
+        return self.structural_hashes.canvas_hash(canvas, canvas.main_diagram.canvasses)
+
+    def project_hash(self, canvas: CustomCanvas) -> str:
+        main_diagram = canvas.main_diagram
+        return self.structural_hashes.project_hash(canvas, main_diagram.canvasses, main_diagram.label_content)
+
+    # Edit events
+    def canvas_content_changed(self, canvas: CustomCanvas) -> None:
+        """Box labels, connection types or the canvas inputs and outputs changed."""
+        self.structural_hashes.invalidate(canvas.id)
+
+    def box_added(self, canvas: CustomCanvas, box: Box) -> None:
+        self.structural_hashes.invalidate(canvas.id)
+        if not self.incremental:
+            return
+        hypergraph = self.get_live_hypergraph(canvas)
+        if hypergraph.get_node(box.id) is None:
+            self.add_live_node(canvas, hypergraph, self.build_node(box))
+        else:
+            self.box_connections_changed(canvas, box)
+
+    def box_deleted(self, canvas: CustomCanvas, box: Box) -> None:
+        self.structural_hashes.invalidate(canvas.id)
+        self.remove_live_node(canvas, box.id)
+
+    def box_id_changed(self, canvas: CustomCanvas, old_id: int, box: Box) -> None:
+        self.structural_hashes.invalidate(canvas.id)
+        if not self.incremental:
+            return
+        self.remove_live_node(canvas, old_id)
+        self.box_added(canvas, box)
+
+    def box_connections_changed(self, canvas: CustomCanvas, box: Box) -> None:
+        """Re-synchronize the ports of the node of `box` with the wires currently attached to the box."""
+        self.structural_hashes.invalidate(canvas.id)
+        if not self.incremental:
+            return
+        node = self.get_live_hypergraph(canvas).get_node(box.id)
+        if node is None:
+            return
+        expected = self.build_node(box)
+        if expected.inputs == node.inputs and expected.outputs == node.outputs:
+            return
+        self.pending_canvases.add(canvas.id)
+        # The ports are replaced together, one by one they could repeat a wire the node does not accept on its own.
+        hypergraph = node.hypergraph
+        hypergraph.remove_node(node)
+        hypergraph.add_node(expected)
+
+    def spider_wires_changed(self, canvas: CustomCanvas, spider: Spider) -> None:
+        """Re-synchronize the nodes of the boxes wired to the group of spiders `spider` belongs to."""
+        self.structural_hashes.invalidate(canvas.id)
+        if not self.incremental:
+            return
+        boxes = {connection.box.id: connection.box for connection in SpiderResolver.attached_connections(spider)
+                 if connection.box is not None}
+        for box in boxes.values():
+            self.box_connections_changed(canvas, box)
+
+    def get_live_hypergraph(self, canvas: CustomCanvas) -> Hypergraph:
+        hypergraph = self.live_hypergraphs.get(canvas.id)
+        if hypergraph is None:
+            hypergraph = self.build_hypergraph(canvas)
+            self.add_live_hypergraph(hypergraph)
+            self.pending_canvases.add(canvas.id)
+        return hypergraph
+
+    def add_live_hypergraph(self, hypergraph: Hypergraph) -> None:
+        """Start tracking the live hypergraph of a canvas, its nodes stay mapped to it whether it is valid or not."""
+        IncrementalValidator(hypergraph)
+        self.live_hypergraphs[hypergraph.id] = hypergraph
+        self.graphs_by_node_id.update(dict.fromkeys(hypergraph.nodes_by_id, hypergraph))
+
+    def add_live_node(self, canvas: CustomCanvas, hypergraph: Hypergraph, node: Node) -> None:
+        hypergraph.add_node(node)
+        self.graphs_by_node_id[node.id] = hypergraph
+        self.pending_canvases.add(canvas.id)
+
+    def remove_live_node(self, canvas: CustomCanvas, node_id: int) -> None:
+        hypergraph = self.live_hypergraphs.get(canvas.id)
+        if not self.incremental or hypergraph is None or hypergraph.get_node(node_id) is None:
+            return
+        hypergraph.remove_node(hypergraph.get_node(node_id))
+        self.pending_canvases.add(canvas.id)
+        if self.graphs_by_node_id.get(node_id) is hypergraph:
+            del self.graphs_by_node_id[node_id]
+
+    def validate_pending(self) -> None:
+        while self.pending_canvases:
+            hypergraph = self.live_hypergraphs.get(self.pending_canvases.pop())
+            if hypergraph is None:
+                continue
+            # Live nodes are already mapped to their hypergraph, (un)registering it does not go through them.
+            if hypergraph.observer.is_valid():
+                self.hypergraphs_by_id[hypergraph.id] = hypergraph
+            elif self.hypergraphs_by_id.get(hypergraph.id) is hypergraph:
+                del self.hypergraphs_by_id[hypergraph.id]
+
+    def find_inconsistencies(self, canvas: CustomCanvas) -> list[str]:
+        """
+        Compare the hypergraph kept for the canvas, the live one in incremental mode and the registered one otherwise,
+        with a full rebuild.
+
+        Returns a description of every difference, an empty list means the two are identical.
+        """
+        expected = self.build_hypergraph(canvas)
+        kept = self.live_hypergraphs if self.incremental else self.hypergraphs_by_id
+        actual = kept.get(canvas.id, Hypergraph(canvas.id))
+        problems = []
+        if expected.nodes_by_id.keys() != actual.nodes_by_id.keys():
+            problems.append(f"nodes differ: expected {list(expected.nodes_by_id)}, got {list(actual.nodes_by_id)}")
+        for node_id, node in expected.nodes_by_id.items():
+            actual_node = actual.get_node(node_id)
+            if actual_node is None:
+                continue
+            if node.inputs != actual_node.inputs or node.outputs != actual_node.outputs:
+                problems.append(f"node {node_id} differs: expected {node.inputs} -> {node.outputs}, "
+                                f"got {actual_node.inputs} -> {actual_node.outputs}")
+        if set(expected.inputs) != set(actual.inputs):
+            problems.append(f"inputs differ: expected {expected.inputs}, got {actual.inputs}")
+        if set(expected.outputs) != set(actual.outputs):
+            problems.append(f"outputs differ: expected {expected.outputs}, got {actual.outputs}")
+        is_registered = self.get_graph_by_id(canvas.id) is not None
+        if expected.is_valid() != is_registered:
+            problems.append(f"validity differs: expected {expected.is_valid()}, registered {is_registered}")
+        return problems
+
+    def is_consistent(self, canvas: CustomCanvas) -> bool:
+        return not self.find_inconsistencies(canvas)
@@ -1,9 +1,8 @@
 from __future__ import annotations
 
-from importlib import import_module
-
 
 class Node:
+    __slots__ = ("id", "inputs", "outputs", "hypergraph")
 
     def __init__(self, node_id=None, inputs=None, outputs=None):
         if node_id is None:
@@ -15,36 +14,44 @@ class Node:
         self.id = node_id
         self.inputs = inputs
         self.outputs = outputs
+        self.hypergraph = None  # Hypergraph that currently contains this node, kept up to date by the hypergraph
 
     def get_children(self):
-        module = import_module("MVP.refactored.backend.hypergraph.hypergraph_manager")
-        HypergraphManager = getattr(module, "HypergraphManager")
-        hypergraph = HypergraphManager.get_graph_by_node_id(self.id)
-        return hypergraph.get_node_children_by_node(self)
+        return self.get_hypergraph().get_node_children_by_node(self)
 
     def get_parents(self):
-        module = import_module("MVP.refactored.backend.hypergraph.hypergraph_manager")
-        HypergraphManager = getattr(module, "HypergraphManager")
-        hypergraph = HypergraphManager.get_graph_by_node_id(self.id)
-        return hypergraph.get_node_parents_by_node(self)
+        return self.get_hypergraph().get_node_parents_by_node(self)
+
+    def get_hypergraph(self):
+        if self.hypergraph is None:
+            raise ValueError(f"Node {self.id} is not in a hypergraph")
+        return self.hypergraph
 
     def add_input(self, input_id: int) -> None:
         if input_id in self.inputs or input_id in self.outputs:
             raise ValueError("Input already exists")
 
         self.inputs.append(input_id)
+        if self.hypergraph is not None:
+            self.hypergraph.index_consumer(input_id, self)
 
     def remove_input(self, input_id: int) -> None:
         self.inputs.remove(input_id)
+        if self.hypergraph is not None:
+            self.hypergraph.unindex_consumer(input_id, self)
 
     def add_output(self, output_id: int) -> None:
         if output_id in self.inputs or output_id in self.outputs:
             raise ValueError("Output already exists")
 
         self.outputs.append(output_id)
+        if self.hypergraph is not None:
+            self.hypergraph.index_producer(output_id, self)
 
     def remove_output(self, output_id: int) -> None:
         self.outputs.remove(output_id)
+        if self.hypergraph is not None:
+            self.hypergraph.unindex_producer(output_id, self)
 
     def is_valid(self) -> bool:
         return len(self.inputs) > 0 and len(self.outputs) > 0
@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from MVP.refactored.frontend.canvas_objects.connection import Connection
+    from MVP.refactored.frontend.canvas_objects.spider import Spider
+
+
+class SpiderResolver:
+    """
+    Resolves the wires of a canvas to the values they carry.
+
+    A spider joins every wire attached to it into one value, spiders wired to each other form one group. All wires
+    meeting in a group resolve to the same id, the smallest spider id of the group, any other wire keeps its own id.
+
+    Groups are memoized, so one resolver should only be used while the canvas does not change.
+    """
+
+    def __init__(self):
+        self.groups: dict[int, int] = {}
+
+    def wire_id(self, connection: Connection) -> int | None:
+        """Id of the value on the wire of `connection`, None if the connection has no wire."""
+        if not connection.has_wire:
+            return None
+        wire = connection.wire
+        other = wire.end_connection if wire.start_connection is connection else wire.start_connection
+        if other is not None and other.is_spider():
+            return self.group_id(other)
+        return wire.id
+
+    def group_id(self, spider: Spider) -> int:
+        if spider.id not in self.groups:
+            group = self.find_group(spider)
+            self.groups.update(dict.fromkeys((member.id for member in group), min(member.id for member in group)))
+        return self.groups[spider.id]
+
+    @staticmethod
+    def find_group(spider: Spider) -> list[Spider]:
+        """Every spider connected to `spider` through wires between spiders, `spider` included."""
+        group = [spider]
+        seen = {spider.id}
+        for current in group:
+            for wire in current.wires:
+                for end in (wire.start_connection, wire.end_connection):
+                    if end is not None and end.is_spider() and end.id not in seen:
+                        seen.add(end.id)
+                        group.append(end)
+        return group
+
+    @classmethod
+    def attached_connections(cls, spider: Spider) -> list[Connection]:
+        """Connections other than spiders that are wired to the group of `spider`."""
+        connections = []
+        for member in cls.find_group(spider):
+            for wire in member.wires:
+                for end in (wire.start_connection, wire.end_connection):
+                    if end is not None and not end.is_spider():
+                        connections.append(end)
+        return connections
@@ -0,0 +1,146 @@
+from __future__ import annotations
+
+from hashlib import blake2b
+from typing import TYPE_CHECKING, Hashable
+
+from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
+from MVP.refactored.backend.hypergraph.node import Node
+from MVP.refactored.backend.hypergraph.spider_resolver import SpiderResolver
+from MVP.refactored.backend.hypergraph.validation import HypergraphValidator
+
+if TYPE_CHECKING:
+    from MVP.refactored.frontend.components.custom_canvas import CustomCanvas
+
+
+def digest(*parts) -> str:
+    """Stable digest of nested tuples of strings and numbers, the same in every Python process."""
+    return blake2b(repr(parts).encode(), digest_size=16).hexdigest()
+
+
+class StructuralHashes:
+    """
+    Canonical structural hashes of hypergraphs, canvasses and projects.
+
+    A hypergraph hash does not depend on node or wire ids, or on the order in which nodes were added. Two hypergraphs
+    get the same hash when their nodes have the same labels and port arities and are wired the same way, port by port.
+
+    Canvas hashes resolve spiders into wire joins, like the hypergraphs of the HypergraphManager. They label every box
+    with its text and connection types, a sub-diagram box is labelled with the hash of its sub-diagram, which makes the
+    hash of a canvas a Merkle hash over its sub-diagrams. Canvas hashes are cached and `invalidate` drops the hash of an
+    edited canvas and of every canvas containing it, so after an edit only the path from the edited canvas to the root
+    is hashed again.
+    """
+
+    def __init__(self):
+        self.hashes: dict[int, str] = {}
+        self.parents: dict[int, int] = {}
+
+    def invalidate(self, canvas_id: int) -> None:
+        while canvas_id in self.hashes:
+            del self.hashes[canvas_id]
+            canvas_id = self.parents.get(canvas_id)
+
+    def clear(self) -> None:
+        self.hashes.clear()
+        self.parents.clear()
+
+    def canvas_hash(self, canvas: CustomCanvas, canvasses: dict[str, CustomCanvas]) -> str:
+        canvas_hash = self.hashes.get(canvas.id)
+        if canvas_hash is not None:
+            return canvas_hash
+
+        labels: dict[int, Hashable] = {}
+        nodes = []
+        resolver = SpiderResolver()
+        for box in canvas.boxes:
+            sub_canvas = canvasses.get(str(box.id))
+            if sub_canvas is not None and sub_canvas is not canvas:
+                self.parents[sub_canvas.id] = canvas.id
+                label = ("sub_diagram", self.canvas_hash(sub_canvas, canvasses))
+            else:
+                label = ("box", box.label_text)
+            connections = sorted(box.connections, key=lambda c: (c.side, c.index))
+            labels[box.id] = (label, tuple((c.side, c.type.value) for c in connections))
+            inputs = [resolver.wire_id(c) for c in connections if c.side == "left" and c.has_wire]
+            outputs = [resolver.wire_id(c) for c in connections if c.side != "left" and c.has_wire]
+            nodes.append(Node(box.id, inputs, outputs))
+
+        inputs = [resolver.wire_id(c) for c in sorted(canvas.inputs, key=lambda c: c.index)]
+        outputs = [resolver.wire_id(c) for c in sorted(canvas.outputs, key=lambda c: c.index)]
+        interface = (tuple(c.type.value for c in sorted(canvas.inputs, key=lambda c: c.index)),
+                     tuple(c.type.value for c in sorted(canvas.outputs, key=lambda c: c.index)))
+        canvas_hash = digest(self.hypergraph_hash(Hypergraph(canvas.id, nodes=nodes), labels, inputs, outputs),
+                             interface)
+        self.hashes[canvas.id] = canvas_hash
+        return canvas_hash
+
+    def project_hash(self, canvas: CustomCanvas, canvasses: dict[str, CustomCanvas],
+                     label_content: dict[str, str] = None) -> str:
+        """Hash of the root canvas combined with the code of every box function used anywhere in the project."""
+        label_content = label_content if label_content is not None else {}
+        used_labels = {box.label_text for sub_canvas in canvasses.values() for box in sub_canvas.boxes
+                       if str(box.id) not in canvasses}
+        code = tuple((label, label_content.get(label)) for label in sorted(used_labels))
+        return digest(self.canvas_hash(canvas, canvasses), code)
+
+    @staticmethod
+    def hypergraph_hash(hypergraph: Hypergraph, labels: dict[int, Hashable] = None, inputs: list = None,
+                        outputs: list = None) -> str:
+        """
+        Weisfeiler-Lehman style hash of the hypergraph.
+
+        Instead of refining all colors for a fixed number of rounds, the colors are refined once along a topological
+        order (every node sees the final colors of all its ancestors) and once against it (descendants), which reaches
+        the stable coloring of an acyclic hypergraph in linear time. Nodes on or after a cycle are only refined by one
+        round.
+
+        :param hypergraph: Hypergraph to hash.
+        :param labels: (Optional) Node id to label, defaults to no labels.
+        :param inputs: (Optional) Ordered input wire ids, the hypergraph inputs by default.
+        :param outputs: (Optional) Ordered output wire ids, the hypergraph outputs by default.
+        :return: Hex digest.
+        """
+        labels = labels if labels is not None else {}
+        inputs = hypergraph.inputs if inputs is None else inputs
+        outputs = hypergraph.outputs if outputs is None else outputs
+        input_positions = {wire: i for i, wire in enumerate(inputs) if wire is not None}
+        output_positions = {wire: i for i, wire in enumerate(outputs) if wire is not None}
+        producers, consumers = hypergraph.wire_producers, hypergraph.wire_consumers
+
+        initial = {node.id: digest(labels.get(node.id), len(node.inputs), len(node.outputs))
+                   for node in hypergraph.nodes}
+        order, _ = HypergraphValidator.topological_sort(hypergraph)
+        ordered = set(order)
+        unordered = [node_id for node_id in initial if node_id not in ordered]
+
+        def upstream_color(node_id, colors):
+            node = hypergraph.get_node(node_id)
+            ports = tuple((input_positions.get(wire),
+                           tuple(sorted((colors[producer.id], producer.outputs.index(wire))
+                                        for producer in producers.get(wire, []))))
+                          for wire in node.inputs)
+            return digest(initial[node_id], ports)
+
+        def downstream_color(node_id, colors):
+            node = hypergraph.get_node(node_id)
+            ports = tuple((output_positions.get(wire),
+                           tuple(sorted((colors[consumer.id], consumer.inputs.index(wire))
+                                        for consumer in consumers.get(wire, []))))
+                          for wire in node.outputs)
+            return digest(upstream[node_id], ports)
+
+        # Ordered nodes see the final colors of their parents. Nodes on or after a cycle are refined together from a
+        # snapshot, so the result does not depend on the order they are visited in.
+        upstream = dict(initial)
+        for node_id in order:
+            upstream[node_id] = upstream_color(node_id, upstream)
+        upstream.update({node_id: upstream_color(node_id, upstream) for node_id in unordered})
+
+        downstream = dict(upstream)
+        downstream.update({node_id: downstream_color(node_id, upstream) for node_id in unordered})
+        for node_id in reversed(order):
+            downstream[node_id] = downstream_color(node_id, downstream)
+
+        passed_through = tuple(sorted((i, output_positions[wire]) for wire, i in input_positions.items()
+                                      if wire in output_positions))
+        return digest(tuple(sorted(downstream.values())), len(inputs), len(outputs), passed_through)
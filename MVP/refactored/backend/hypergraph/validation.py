@@ -0,0 +1,490 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
+    from MVP.refactored.backend.hypergraph.node import Node
+
+
+class ValidationReport:
+
+    def __init__(self, hypergraph_id=None):
+        self.hypergraph_id = hypergraph_id
+        self.is_empty = False
+        self.missing_inputs = False
+        self.missing_outputs = False
+        self.invalid_nodes: list[int] = []
+        self.dangling_wires: list[int] = []
+        self.components: list[list[int]] = []
+        self.cycle_members: list[int] = []
+        self.order: list[int] = []
+
+    @property
+    def is_connected(self) -> bool:
+        return len(self.components) <= 1
+
+    @property
+    def has_cycles(self) -> bool:
+        return len(self.cycle_members) > 0
+
+    @property
+    def is_valid(self) -> bool:
+        return not (self.is_empty or self.missing_inputs or self.missing_outputs or self.invalid_nodes
+                    or self.dangling_wires or not self.is_connected or self.has_cycles)
+
+    def to_dict(self) -> dict:
+        return {
+            "hypergraph_id": self.hypergraph_id,
+            "is_valid": self.is_valid,
+            "is_empty": self.is_empty,
+            "missing_inputs": self.missing_inputs,
+            "missing_outputs": self.missing_outputs,
+            "invalid_nodes": self.invalid_nodes,
+            "dangling_wires": self.dangling_wires,
+            "components": self.components,
+            "cycle_members": self.cycle_members,
+        }
+
+    def __bool__(self) -> bool:
+        return self.is_valid
+
+    def __str__(self) -> str:
+        if self.is_valid:
+            return f"Hypergraph {self.hypergraph_id} is valid"
+        problems = []
+        if self.is_empty:
+            problems.append("no nodes")
+        if self.missing_inputs:
+            problems.append("no inputs")
+        if self.missing_outputs:
+            problems.append("no outputs")
+        if self.invalid_nodes:
+            problems.append(f"nodes without inputs or outputs: {self.invalid_nodes}")
+        if self.dangling_wires:
+            problems.append(f"dangling wires: {self.dangling_wires}")
+        if not self.is_connected:
+            problems.append(f"{len(self.components)} disconnected components")
+        if self.has_cycles:
+            problems.append(f"cycle through nodes: {self.cycle_members}")
+        return f"Hypergraph {self.hypergraph_id} is invalid: " + ", ".join(problems)
+
+
+class HypergraphValidator:
+    """Iterative, linear time checks over the wire index of a Hypergraph."""
+
+    @classmethod
+    def validate(cls, hypergraph: Hypergraph, nodes: list[Node] = None) -> ValidationReport:
+        """
+        Validate the hypergraph, or only the given subset of its nodes.
+
+        Checking a subset is meant for a single connected component: the boundary checks are then made against the
+        wires that leave the subset instead of the boundary of the whole hypergraph.
+        """
+        if nodes is None:
+            nodes = hypergraph.nodes
+            inputs, outputs = hypergraph.boundary_inputs, hypergraph.boundary_outputs
+        else:
+            inputs, outputs = cls.find_boundary(nodes)
+        report = ValidationReport(hypergraph.id)
+        report.is_empty = not nodes
+        report.missing_inputs = not inputs
+        report.missing_outputs = not outputs
+        if report.is_empty:
+            return report
+
+        node_inputs = set()
+        node_outputs = set()
+        for node in nodes:
+            if not node.is_valid():
+                report.invalid_nodes.append(node.id)
+            node_inputs.update(node.inputs)
+            node_outputs.update(node.outputs)
+
+        dangling_inputs = node_inputs - inputs.keys() - node_outputs
+        dangling_outputs = node_outputs - outputs.keys() - node_inputs
+        report.dangling_wires = list(dangling_inputs | dangling_outputs)
+
+        report.components = cls.find_components(hypergraph, nodes)
+        report.order, report.cycle_members = cls.topological_sort(hypergraph, nodes)
+        return report
+
+    @staticmethod
+    def find_boundary(nodes: list[Node]) -> tuple[dict[int, None], dict[int, None]]:
+        consumed = {}
+        produced = {}
+        for node in nodes:
+            consumed.update(dict.fromkeys(node.inputs))
+            produced.update(dict.fromkeys(node.outputs))
+        inputs = {wire_id: None for wire_id in consumed if wire_id not in produced}
+        outputs = {wire_id: None for wire_id in produced if wire_id not in consumed}
+        return inputs, outputs
+
+    @staticmethod
+    def find_components(hypergraph: Hypergraph, nodes: list[Node] = None) -> list[list[int]]:
+        """Group node ids into connected components with union-find over the shared wires."""
+        if nodes is None:
+            nodes = hypergraph.nodes
+        parent = {node.id: node.id for node in nodes}
+
+        def find(node_id):
+            root = node_id
+            while parent[root] != root:
+                root = parent[root]
+            while parent[node_id] != root:
+                parent[node_id], node_id = root, parent[node_id]
+            return root
+
+        for node in nodes:
+            root = find(node.id)
+            for wire_id in node.inputs + node.outputs:
+                for index in (hypergraph.wire_producers, hypergraph.wire_consumers):
+                    for other in index.get(wire_id, []):
+                        if other.id in parent:
+                            other_root = find(other.id)
+                            if other_root != root:
+                                parent[other_root] = root
+
+        components: dict[int, list[int]] = {}
+        for node in nodes:
+            components.setdefault(find(node.id), []).append(node.id)
+        return list(components.values())
+
+    @staticmethod
+    def topological_sort(hypergraph: Hypergraph, nodes: list[Node] = None) -> tuple[list[int], list[int]]:
+        """
+        Order node ids with Kahn's algorithm.
+
+        Returns the topological order and the ids of nodes that lie on a cycle. Nodes that are only reachable from a
+        cycle are not reported as cycle members.
+        """
+        if nodes is None:
+            nodes = hypergraph.nodes
+        in_degree = {node.id: 0 for node in nodes}
+        for node in nodes:
+            for wire_id in node.outputs:
+                for child in hypergraph.wire_consumers.get(wire_id, []):
+                    if child.id in in_degree:
+                        in_degree[child.id] += 1
+
+        queue = deque(node for node in nodes if in_degree[node.id] == 0)
+        order = []
+        while queue:
+            node = queue.popleft()
+            order.append(node.id)
+            for wire_id in node.outputs:
+                for child in hypergraph.wire_consumers.get(wire_id, []):
+                    if child.id in in_degree:
+                        in_degree[child.id] -= 1
+                        if in_degree[child.id] == 0:
+                            queue.append(child)
+
+        if len(order) == len(nodes):
+            return order, []
+
+        # Peel off the nodes downstream of a cycle, which have no path back into it.
+        remaining = {node.id: node for node in nodes if in_degree[node.id] > 0}
+        out_degree = dict.fromkeys(remaining, 0)
+        for node in remaining.values():
+            for wire_id in node.outputs:
+                for child in hypergraph.wire_consumers.get(wire_id, []):
+                    if child.id in remaining:
+                        out_degree[node.id] += 1
+        queue = deque(node for node in remaining.values() if out_degree[node.id] == 0)
+        while queue:
+            node = queue.popleft()
+            del remaining[node.id]
+            for wire_id in node.inputs:
+                for parent in hypergraph.wire_producers.get(wire_id, []):
+                    if parent.id in remaining:
+                        out_degree[parent.id] -= 1
+                        if out_degree[parent.id] == 0:
+                            queue.append(parent)
+        return order, list(remaining)
+
+
+class IncrementalValidator:
+    """
+    Keeps the inputs of the validity check of a live hypergraph up to date while it is edited.
+
+    The hypergraph reports every node and wire incidence change to its observer. The invalid nodes and dangling wires
+    are re-checked for the touched nodes and wires only. Component membership is kept per node: a change merges the
+    components of the touched nodes, and a possible split is found with interleaved searches from the touched nodes
+    that stop as soon as a single search is left, so it costs the size of the smaller pieces. Acyclicity is kept as a
+    topological rank per node, a wire that goes against the ranks is repaired by reordering only the nodes between
+    its ends. Once a cycle is found the ranks are rebuilt with a full sort until the cycle is gone.
+
+    The cheap checks are made first, components and ranks are only brought up to date when they decide the result.
+    """
+
+    def __init__(self, hypergraph: Hypergraph):
+        self.hypergraph = hypergraph
+        self.invalid_nodes: set[int] = set()
+        self.dangling_wires: set[int] = set()
+        self.component_of: dict[int, int] = {}
+        self.components: dict[int, set[int]] = {}
+        self.rank: dict[int, int] = {}
+        self.has_cycle = False
+        self.next_component = 0
+        self.next_rank = 0
+        self.unchecked_nodes: set[int] = set()
+        self.unchecked_wires: set[int] = set()
+        self.touched_nodes: set[int] = set()
+        self.removed_nodes: set[int] = set()
+        self.needs_rebuild = True
+        hypergraph.observer = self
+
+    # Hypergraph events
+    def node_added(self, node: Node) -> None:
+        self.unchecked_nodes.add(node.id)
+        self.touched_nodes.add(node.id)
+
+    def node_removed(self, node: Node) -> None:
+        self.invalid_nodes.discard(node.id)
+        self.removed_nodes.add(node.id)
+
+    def wire_changed(self, wire_id: int, node: Node) -> None:
+        self.unchecked_wires.add(wire_id)
+        self.unchecked_nodes.add(node.id)
+        self.touched_nodes.add(node.id)
+        for index in (self.hypergraph.wire_producers, self.hypergraph.wire_consumers):
+            for other in index.get(wire_id, ()):
+                self.touched_nodes.add(other.id)
+
+    def boundary_changed(self) -> None:
+        self.needs_rebuild = True
+
+    def is_valid(self) -> bool:
+        hypergraph = self.hypergraph
+        if self.needs_rebuild:
+            self.rebuild()
+        self.check_local()
+        if (not hypergraph.nodes_by_id or not hypergraph.boundary_inputs or not hypergraph.boundary_outputs
+                or self.invalid_nodes or self.dangling_wires):
+            return False
+        self.update_structure()
+        return len(self.components) == 1 and not self.has_cycle
+
+    def rebuild(self) -> None:
+        """Recompute everything from the hypergraph, O(N)."""
+        hypergraph = self.hypergraph
+        report = HypergraphValidator.validate(hypergraph)
+        self.invalid_nodes = set(report.invalid_nodes)
+        self.dangling_wires = set(report.dangling_wires)
+        self.components = {label: set(members) for label, members in enumerate(report.components)}
+        self.component_of = {node_id: label for label, members in self.components.items() for node_id in members}
+        self.next_component = len(self.components)
+        self.has_cycle = report.has_cycles
+        self.rank = {node_id: rank for rank, node_id in enumerate(report.order)}
+        self.next_rank = len(hypergraph.nodes_by_id)
+        self.unchecked_nodes.clear()
+        self.unchecked_wires.clear()
+        self.touched_nodes.clear()
+        self.removed_nodes.clear()
+        self.needs_rebuild = False
+
+    def check_local(self) -> None:
+        nodes = self.hypergraph.nodes_by_id
+        for node_id in self.unchecked_nodes:
+            node = nodes.get(node_id)
+            if node is not None and not node.is_valid():
+                self.invalid_nodes.add(node_id)
+            else:
+                self.invalid_nodes.discard(node_id)
+        for wire_id in self.unchecked_wires:
+            if self.is_dangling(wire_id):
+                self.dangling_wires.add(wire_id)
+            else:
+                self.dangling_wires.discard(wire_id)
+        self.unchecked_nodes.clear()
+        self.unchecked_wires.clear()
+
+    def is_dangling(self, wire_id: int) -> bool:
+        hypergraph = self.hypergraph
+        consumed = wire_id in hypergraph.wire_consumers
+        produced = wire_id in hypergraph.wire_producers
+        return ((consumed and not produced and wire_id not in hypergraph.boundary_inputs)
+                or (produced and not consumed and wire_id not in hypergraph.boundary_outputs))
+
+    def update_structure(self) -> None:
+        if not self.touched_nodes and not self.removed_nodes:
+            return
+        nodes = self.hypergraph.nodes_by_id
+        if len(self.touched_nodes) > len(nodes) // 4 + 16:
+            self.rebuild()
+            return
+        labels = set()
+        for node_id in self.removed_nodes:
+            label = self.component_of.pop(node_id, None)
+            if label is not None:
+                self.components[label].discard(node_id)
+                labels.add(label)
+            self.rank.pop(node_id, None)
+        starts = [nodes[node_id] for node_id in self.touched_nodes if node_id in nodes]
+        for node in starts:
+            if node.id in self.component_of:
+                labels.add(self.component_of[node.id])
+            if node.id not in self.rank:
+                self.rank[node.id] = self.next_rank
+                self.next_rank += 1
+        self.touched_nodes.clear()
+        self.removed_nodes.clear()
+        self.update_components(starts, labels)
+        self.update_order(starts)
+
+    def neighbours(self, node: Node):
+        hypergraph = self.hypergraph
+        for wire_id in node.inputs + node.outputs:
+            yield from hypergraph.wire_producers.get(wire_id, ())
+            yield from hypergraph.wire_consumers.get(wire_id, ())
+
+    def update_components(self, starts: list[Node], labels: set[int]) -> None:
+        old = {label: self.components.pop(label) for label in labels}
+        finished, remaining = self.explore(starts)
+        for piece in finished:
+            self.add_component(piece)
+        # The piece of the search that was not run to the end holds everything else the old components and the new
+        # nodes are made of. It keeps the label of the largest old component, so only the smaller ones are relabeled.
+        base_label = max(old, key=lambda label: len(old[label]), default=None)
+        base = old.pop(base_label) if base_label is not None else set()
+        moved = set(remaining)
+        for members in old.values():
+            moved |= members
+        base |= moved
+        for piece in finished:
+            base -= piece
+        if not base:
+            return
+        if base_label is None:
+            self.add_component(base)
+            return
+        self.components[base_label] = base
+        for node_id in moved:
+            if node_id in base:
+                self.component_of[node_id] = base_label
+
+    def add_component(self, members: set[int]) -> None:
+        label = self.next_component
+        self.next_component += 1
+        self.components[label] = members
+        for node_id in members:
+            self.component_of[node_id] = label
+
+    def explore(self, starts: list[Node]) -> tuple[list[set[int]], set[int]]:
+        """
+        Search from every start node in turn, one node per search and round, merging searches that meet.
+
+        Returns the node ids of every search that ran out of nodes while others were still going, each one a whole
+        component, and the node ids seen by the last search left, if any.
+        """
+        owner: dict[int, int] = {}
+        merged: dict[int, int] = {}
+        groups: dict[int, tuple[deque, set[int]]] = {}
+        for node in starts:
+            if node.id not in owner:
+                owner[node.id] = node.id
+                groups[node.id] = (deque([node]), {node.id})
+
+        def find(root):
+            while root in merged:
+                root = merged[root]
+            return root
+
+        finished = []
+        while len(groups) > 1:
+            for root in list(groups):
+                if root not in groups or len(groups) < 2:
+                    continue
+                queue, seen = groups[root]
+                if not queue:
+                    finished.append(seen)
+                    del groups[root]
+                    continue
+                node = queue.popleft()
+                for other in self.neighbours(node):
+                    other_root = owner.get(other.id)
+                    if other_root is None:
+                        owner[other.id] = root
+                        seen.add(other.id)
+                        queue.append(other)
+                        continue
+                    other_root = find(other_root)
+                    if other_root == root:
+                        continue
+                    other_queue, other_seen = groups.pop(other_root)
+                    if len(other_seen) > len(seen):
+                        groups.pop(root)
+                        root, other_root = other_root, root
+                        queue, other_queue = other_queue, queue
+                        seen, other_seen = other_seen, seen
+                        groups[root] = (queue, seen)
+                    queue.extend(other_queue)
+                    seen |= other_seen
+                    merged[other_root] = root
+        remaining = next(iter(groups.values()))[1] if groups else set()
+        return finished, remaining
+
+    def update_order(self, starts: list[Node]) -> None:
+        hypergraph = self.hypergraph
+        if self.has_cycle:
+            order, cycle_members = HypergraphValidator.topological_sort(hypergraph)
+            self.has_cycle = bool(cycle_members)
+            if not self.has_cycle:
+                self.rank = {node_id: rank for rank, node_id in enumerate(order)}
+                self.next_rank = len(order)
+            return
+        pending = set()
+        for node in starts:
+            for parent in hypergraph.get_node_parents_by_node(node):
+                pending.add((parent.id, node.id))
+            for child in hypergraph.get_node_children_by_node(node):
+                pending.add((node.id, child.id))
+        pending = {(parent, child) for parent, child in pending if self.rank[parent] >= self.rank[child]}
+        while pending:
+            parent_id, child_id = pending.pop()
+            if self.rank[parent_id] < self.rank[child_id]:
+                continue
+            if not self.reorder(parent_id, child_id, pending):
+                self.has_cycle = True
+                return
+
+    def reorder(self, parent_id: int, child_id: int, pending: set[tuple[int, int]]) -> bool:
+        """
+        Restore the rank order for the wire from `parent_id` to `child_id`, returns False if it closes a cycle.
+
+        Only the nodes ranked between the two ends are visited: the descendants of the child and the ancestors of the
+        parent in that range swap their ranks so the ancestors come first. Wires in `pending` are not yet known to
+        follow the ranks and are skipped.
+        """
+        hypergraph = self.hypergraph
+        nodes = hypergraph.nodes_by_id
+        lower, upper = self.rank[child_id], self.rank[parent_id]
+
+        forward = {child_id}
+        stack = [child_id]
+        while stack:
+            node = nodes[stack.pop()]
+            for child in hypergraph.get_node_children_by_node(node):
+                if child.id == parent_id:
+                    return False
+                if (child.id not in forward and self.rank[child.id] <= upper
+                        and (node.id, child.id) not in pending):
+                    forward.add(child.id)
+                    stack.append(child.id)
+
+        backward = {parent_id}
+        stack = [parent_id]
+        while stack:
+            node = nodes[stack.pop()]
+            for parent in hypergraph.get_node_parents_by_node(node):
+                if (parent.id not in backward and self.rank[parent.id] >= lower
+                        and (parent.id, node.id) not in pending):
+                    backward.add(parent.id)
+                    stack.append(parent.id)
+
+        moved = sorted(backward, key=self.rank.get) + sorted(forward, key=self.rank.get)
+        ranks = sorted(self.rank[node_id] for node_id in moved)
+        for node_id, rank in zip(moved, ranks):
+            self.rank[node_id] = rank
+        return True
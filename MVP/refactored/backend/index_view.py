@@ -0,0 +1,44 @@
+from collections.abc import Sequence
+from itertools import islice
+
+
+class IndexView(Sequence):
+    """
+    Read-only live view of the keys, or the values, of an index by id in insertion order.
+
+    Length and membership are O(1), positional access walks the index. The view has no list methods, the contents are
+    changed through the methods of the object that owns the index and keeps it up to date.
+    """
+
+    __slots__ = ("index", "values")
+
+    def __init__(self, index: dict, values=False):
+        self.index = index
+        self.values = values
+
+    def __len__(self):
+        return len(self.index)
+
+    def __iter__(self):
+        return iter(self.index.values() if self.values else self.index)
+
+    def __contains__(self, item):
+        if self.values:
+            item_id = getattr(item, "id", None)
+            return item_id is not None and self.index.get(item_id) == item
+        return item in self.index
+
+    def __getitem__(self, position):
+        if isinstance(position, int) and 0 <= position < len(self.index):
+            return next(islice(iter(self), position, None))
+        return list(self)[position]
+
+    def __eq__(self, other):
+        if isinstance(other, (IndexView, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return repr(list(self))
@@ -0,0 +1,689 @@
+from contextlib import contextmanager
+
+
+class BoxState:
+    """Attributes of a box that the journal can restore."""
+
+    __slots__ = ("x", "y", "width", "height", "style", "label", "left", "right", "sub_diagram")
+
+    def __init__(self, x, y, width, height, style, label="", left=None, right=None, sub_diagram=None):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.style = style
+        self.label = label
+        self.left = left if left is not None else []
+        self.right = right if right is not None else []
+        self.sub_diagram = sub_diagram
+
+    def copy(self):
+        return BoxState(self.x, self.y, self.width, self.height, self.style, self.label, list(self.left),
+                        list(self.right), self.sub_diagram)
+
+    def side(self, side):
+        return self.left if side == "left" else self.right
+
+    def __eq__(self, other):
+        return isinstance(other, BoxState) and all(getattr(self, name) == getattr(other, name)
+                                                   for name in self.__slots__)
+
+
+class CanvasState:
+    """
+    Contents of one canvas as the journal sees them.
+
+    Boxes and spiders are keyed by id, connections are kept as ids in order, per box side and for the canvas inputs and
+    outputs, with their type names in `types`. Wires are (start connection id, end connection id) pairs, indexed by
+    connection in `links` so removing a connection does not go through every wire.
+    """
+
+    __slots__ = ("boxes", "spiders", "inputs", "outputs", "types", "wires", "links")
+
+    def __init__(self):
+        self.boxes: dict = {}
+        self.spiders: dict = {}
+        self.inputs: list = []
+        self.outputs: list = []
+        self.types: dict = {}
+        self.wires: set = set()
+        self.links: dict = {}
+
+    def copy(self):
+        state = CanvasState()
+        state.boxes = {box_id: box.copy() for box_id, box in self.boxes.items()}
+        state.spiders = {spider_id: list(location) for spider_id, location in self.spiders.items()}
+        state.inputs = list(self.inputs)
+        state.outputs = list(self.outputs)
+        state.types = dict(self.types)
+        for wire in self.wires:
+            state.add_wire(wire)
+        return state
+
+    def io(self, side):
+        return self.inputs if side == "input" else self.outputs
+
+    def add_wire(self, wire):
+        self.wires.add(wire)
+        for connection_id in wire:
+            self.links.setdefault(connection_id, set()).add(wire)
+
+    def remove_wire(self, wire):
+        self.wires.discard(wire)
+        for connection_id in wire:
+            links = self.links.get(connection_id)
+            if links is not None:
+                links.discard(wire)
+                if not links:
+                    del self.links[connection_id]
+
+    def remove_connection(self, connection_id):
+        self.types.pop(connection_id, None)
+        for wire in list(self.links.get(connection_id, ())):
+            self.remove_wire(wire)
+
+    def __eq__(self, other):
+        return isinstance(other, CanvasState) and all(getattr(self, name) == getattr(other, name)
+                                                      for name in self.__slots__ if name != "links")
+
+
+def copy_state(state: dict) -> dict:
+    return {canvas_id: canvas.copy() for canvas_id, canvas in state.items()}
+
+
+class Journal:
+    """
+    Undo and redo history of the changes made to the diagram.
+
+    Every change is recorded as a compact operation, a tuple of its kind, the canvas id and the ids and values it
+    sets, for example ("move_box", canvas_id, box_id, x, y). Operations only describe the new state, so every step also
+    keeps the objects its operations change as they were before it: boxes, spiders, connection types, wires, canvas
+    inputs and outputs, and whole canvases for sub-diagrams that are created, removed or moved. Undo puts those objects
+    back and redo applies the operations of the step again, both return the operations that turn the changed objects
+    into the wanted ones, so stepping through the history costs as much as the step and not as much as the diagram.
+
+    Operations recorded inside `group` are undone as one step, consecutive operations recorded with `merge` on the
+    same object, like the moves of a drag, are merged until `checkpoint`. At most about `max_operations` operations are
+    kept, the oldest steps are dropped first.
+
+    Panning and zooming a canvas moves everything on it, so positions are kept relative to the view the canvas had when
+    the history started, `view` tells the journal how the view of a canvas changed.
+    """
+
+    # index of the first coordinate and of the first size of the operations with positions or sizes
+    POSITIONS = {"add_box": (3, 5), "move_box": (3, None), "resize_box": (None, 3), "add_spider": (3, None),
+                 "move_spider": (3, None)}
+
+    def __init__(self, max_operations=100000):
+        if max_operations < 1:
+            raise ValueError("Journal size must be positive")
+        self.max_operations = max_operations
+        self.state: dict[object, CanvasState] = {}
+        self.steps: list[list[tuple]] = []
+        # objects changed by each step as they were before it, see `touched`
+        self.images: list[dict] = []
+        self.cursor = 0
+        self.operation_count = 0
+        self.group_depth = 0
+        self.pending: list[tuple] = []
+        self.pending_image: dict = {}
+        self.merge_key = None
+        self.suspend_depth = 0
+        self.frames: dict[object, tuple[float, float, float]] = {}
+
+    @property
+    def can_undo(self):
+        return self.cursor > 0
+
+    @property
+    def can_redo(self):
+        return self.cursor < len(self.steps)
+
+    def record(self, operation: tuple, merge=False, follow=False):
+        """
+        Record an operation that has been applied to the diagram.
+
+        :param operation: Kind of the operation, canvas id and its arguments.
+        :param merge: Replace the previous step if it was a merged operation of the same kind on the same object.
+        :param follow: Add the operation to the previous step, for changes that follow from it, like a box growing
+        when a connection is added.
+        :return: None
+        """
+        if self.suspend_depth:
+            return
+        operation = self.convert(operation, to_canvas=False)
+        if self.group_depth:
+            self.capture(operation, self.pending_image)
+            self.apply_operation(self.state, operation)
+            self.pending.append(operation)
+            return
+        key = operation[:3] if merge else None
+        at_end = self.steps and self.cursor == len(self.steps)
+        if at_end and (follow or key is not None and key == self.merge_key):
+            self.capture(operation, self.images[-1])
+            self.apply_operation(self.state, operation)
+            if follow:
+                self.steps[-1].append(operation)
+                self.operation_count += 1
+                self.merge_key = None
+                self.trim()
+            else:
+                self.steps[-1] = [operation]
+            return
+        image = {}
+        self.capture(operation, image)
+        self.apply_operation(self.state, operation)
+        self.add_step([operation], image)
+        self.merge_key = key
+
+    def checkpoint(self):
+        """End merging, the next operation starts a new step."""
+        self.merge_key = None
+
+    @contextmanager
+    def group(self):
+        """Record the operations of a bulk change as one step, nested groups end up in the outermost one."""
+        self.group_depth += 1
+        try:
+            yield self
+        finally:
+            self.group_depth -= 1
+            if self.group_depth == 0 and self.pending:
+                operations, self.pending = self.pending, []
+                image, self.pending_image = self.pending_image, {}
+                self.add_step(operations, image)
+                self.merge_key = None
+
+    @contextmanager
+    def suspended(self):
+        """Ignore the operations recorded meanwhile, used while undo and redo are applied to the diagram."""
+        self.suspend_depth += 1
+        try:
+            yield self
+        finally:
+            self.suspend_depth -= 1
+
+    def view(self, canvas_id, scale=1.0, dx=0.0, dy=0.0):
+        """
+        Update the view of a canvas after its coordinates were multiplied by `scale` and then shifted by (dx, dy).
+
+        :param canvas_id: Id of the canvas that was zoomed or panned.
+        :param scale: Zoom factor.
+        :param dx: Shift of x coordinates after scaling.
+        :param dy: Shift of y coordinates after scaling.
+        :return: None
+        """
+        frame_scale, x, y = self.frames.get(canvas_id, (1.0, 0.0, 0.0))
+        self.frames[canvas_id] = (frame_scale * scale, x * scale + dx, y * scale + dy)
+
+    def reset_view(self, canvas_id):
+        """Forget the view of a canvas, for a canvas that is created again."""
+        self.frames.pop(canvas_id, None)
+
+    def convert(self, operation: tuple, to_canvas=True) -> tuple:
+        """Convert the positions and sizes of an operation to the current view of its canvas or back."""
+        frame = self.frames.get(operation[1])
+        indexes = self.POSITIONS.get(operation[0])
+        if frame is None or indexes is None:
+            return operation
+        scale, x, y = frame
+        values = list(operation)
+        position, size = indexes
+        if position is not None:
+            if to_canvas:
+                values[position:position + 2] = values[position] * scale + x, values[position + 1] * scale + y
+            else:
+                values[position:position + 2] = (values[position] - x) / scale, (values[position + 1] - y) / scale
+        if size is not None:
+            factor = scale if to_canvas else 1 / scale
+            values[size:size + 2] = values[size] * factor, values[size + 1] * factor
+        return tuple(values)
+
+    def add_step(self, operations, image):
+        if self.cursor < len(self.steps):
+            self.operation_count -= sum(len(step) for step in self.steps[self.cursor:])
+            del self.steps[self.cursor:]
+            del self.images[self.cursor:]
+        self.steps.append(operations)
+        self.images.append(image)
+        self.cursor += 1
+        self.operation_count += len(operations)
+        self.trim()
+
+    def trim(self):
+        """Drop the oldest steps while more than `max_operations` operations are kept, the last step always stays."""
+        while self.operation_count > self.max_operations and self.cursor > 1:
+            self.operation_count -= len(self.steps[0])
+            del self.steps[0]
+            del self.images[0]
+            self.cursor -= 1
+
+    def clear(self, state: dict = None):
+        """
+        Forget the history, the current state, or the given one, becomes the state nothing can be undone from and the
+        current views of the canvases become their initial ones.
+
+        :param state: State of the diagram as canvas id to CanvasState, like a captured one.
+        :return: None
+        """
+        if state is not None:
+            self.state = state
+        self.steps = []
+        self.images = []
+        self.cursor = 0
+        self.operation_count = 0
+        self.merge_key = None
+        self.frames = {}
+
+    def state_at(self, step: int) -> dict:
+        """State after the first `step` steps, rebuilt from a copy of the current state."""
+        state = copy_state(self.state)
+        for image in reversed(self.images[step:self.cursor]):
+            self.restore(state, image)
+        for operations in self.steps[self.cursor:step]:
+            for operation in operations:
+                self.apply_operation(state, operation)
+        return state
+
+    def undo(self):
+        """
+        Step back in the history.
+
+        :return: Operations that turn the diagram into its previous state, None if there is nothing to undo.
+        """
+        if not self.can_undo or self.group_depth:
+            return None
+        image = self.images[self.cursor - 1]
+        current = self.extract(self.state, image)
+        self.restore(self.state, image)
+        operations = self.diff(current, self.extract(self.state, image))
+        self.cursor -= 1
+        self.merge_key = None
+        return [self.convert(operation) for operation in operations]
+
+    def redo(self):
+        """
+        Step forward in the history.
+
+        :return: Operations that apply the next step to the diagram again, None if there is nothing to redo.
+        """
+        if not self.can_redo or self.group_depth:
+            return None
+        image = self.images[self.cursor]
+        current = self.extract(self.state, image)
+        for operation in self.steps[self.cursor]:
+            self.apply_operation(self.state, operation)
+        operations = self.diff(current, self.extract(self.state, image))
+        self.cursor += 1
+        self.merge_key = None
+        return [self.convert(operation) for operation in operations]
+
+    def capture(self, operation: tuple, image: dict):
+        """Add the objects the operation changes to the image of its step, unless the step already changed them."""
+        for key in self.touched(self.state, operation):
+            if key not in image and (key[0], "canvas", None) not in image:
+                image[key] = self.copy_value(self.read(self.state, key))
+
+    def restore(self, state: dict, image: dict):
+        """Put the objects of an image back into the state, whole canvases before the objects in them."""
+        for key, value in image.items():
+            if key[1] == "canvas":
+                self.write(state, key, self.copy_value(value))
+        for key, value in image.items():
+            if key[1] != "canvas" and key[0] in state:
+                self.write(state, key, self.copy_value(value))
+
+    @staticmethod
+    def extract(state: dict, image: dict) -> dict:
+        """Copy of the part of the state holding the objects of an image, the only part `diff` has to compare."""
+        part = {}
+        for key in image:
+            if key[1] == "canvas" and key[0] in state:
+                part[key[0]] = state[key[0]].copy()
+        for key in image:
+            canvas_id = key[0]
+            if key[1] != "canvas" and canvas_id in state and (canvas_id, "canvas", None) not in image:
+                value = Journal.read(state, key)
+                part.setdefault(canvas_id, CanvasState())
+                if value is not None:
+                    Journal.write(part, key, Journal.copy_value(value))
+        return part
+
+    @staticmethod
+    def touched(state: dict, operation: tuple) -> list[tuple]:
+        """
+        Keys of the objects the operation changes, (canvas id, kind, id) with kind "canvas", "box", "spider", "io",
+        "type" or "wire".
+
+        A box or spider whose connections change comes with the types and wires of all its connections and an input or
+        output with those of its whole side, `diff_list` may re-create all of them. A box whose sub-diagram is removed
+        or moved comes with the canvases of the sub-diagram, `diff` re-creates a moved sub-diagram as well.
+        """
+        kind, canvas_id, *args = operation
+        canvas = state.get(canvas_id)
+        if canvas is None:
+            return [(canvas_id, "canvas", None)] if kind.startswith("add") else []
+
+        def connection_keys(connection_ids):
+            keys = []
+            for connection_id in connection_ids:
+                keys.append((canvas_id, "type", connection_id))
+                keys += [(canvas_id, "wire", wire) for wire in canvas.links.get(connection_id, ())]
+            return keys
+
+        def box_keys(box_id, sub_diagram=True):
+            box = canvas.boxes.get(box_id)
+            if box is None:
+                return [(canvas_id, "box", box_id)]
+            keys = [(canvas_id, "box", box_id)] + connection_keys(box.left + box.right)
+            return keys + Journal.sub_diagram_keys(state, box.sub_diagram) if sub_diagram else keys
+
+        if kind in ("label", "move_box", "resize_box"):
+            return [(canvas_id, "box", args[0])]
+        if kind in ("add_box", "remove_box", "remove_sub_diagram"):
+            return box_keys(args[0])
+        if kind == "add_connection":
+            return box_keys(args[0], sub_diagram=False) + [(canvas_id, "type", args[2])]
+        if kind == "remove_connection":
+            return box_keys(args[0], sub_diagram=False)
+        if kind == "box_id":
+            return box_keys(args[0]) + box_keys(args[1])
+        if kind == "sub_diagram":
+            return box_keys(args[0]) + Journal.sub_diagram_keys(state, args[1])
+        if kind in ("add_io", "remove_io"):
+            return [(canvas_id, "io", args[0])] + connection_keys(canvas.io(args[0]) + [args[1]])
+        if kind == "connection_type":
+            return [(canvas_id, "type", args[0])]
+        if kind in ("add_spider", "remove_spider", "move_spider"):
+            return [(canvas_id, "spider", args[0])] + connection_keys([args[0]])
+        if kind == "add_wire":
+            return [(canvas_id, "wire", tuple(args))]
+        if kind == "remove_wire":
+            return [(canvas_id, "wire", tuple(args)), (canvas_id, "wire", tuple(reversed(args)))]
+        return []
+
+    @staticmethod
+    def sub_diagram_keys(state: dict, sub_diagram) -> list[tuple]:
+        """Keys of the canvas of a sub-diagram and of every sub-diagram in it."""
+        if sub_diagram is None:
+            return []
+        keys = [(sub_diagram, "canvas", None)]
+        for box in state[sub_diagram].boxes.values() if sub_diagram in state else ():
+            keys += Journal.sub_diagram_keys(state, box.sub_diagram)
+        return keys
+
+    @staticmethod
+    def read(state: dict, key: tuple):
+        """Object of the state under the key, None if there is none."""
+        canvas_id, kind, item = key
+        canvas = state.get(canvas_id)
+        if kind == "canvas" or canvas is None:
+            return canvas
+        if kind == "box":
+            return canvas.boxes.get(item)
+        if kind == "spider":
+            return canvas.spiders.get(item)
+        if kind == "io":
+            return canvas.io(item)
+        if kind == "type":
+            return canvas.types.get(item)
+        return True if item in canvas.wires else None
+
+    @staticmethod
+    def write(state: dict, key: tuple, value):
+        """Set the object of the state under the key, None removes it."""
+        canvas_id, kind, item = key
+        if kind == "canvas":
+            if value is None:
+                state.pop(canvas_id, None)
+            else:
+                state[canvas_id] = value
+            return
+        canvas = state[canvas_id]
+        if kind == "io":
+            if item == "input":
+                canvas.inputs = value
+            else:
+                canvas.outputs = value
+        elif kind == "wire":
+            if value:
+                canvas.add_wire(item)
+            else:
+                canvas.remove_wire(item)
+        else:
+            objects = {"box": canvas.boxes, "spider": canvas.spiders, "type": canvas.types}[kind]
+            if value is None:
+                objects.pop(item, None)
+            else:
+                objects[item] = value
+
+    @staticmethod
+    def copy_value(value):
+        return value.copy() if isinstance(value, (BoxState, CanvasState, list)) else value
+
+    @staticmethod
+    def apply_operation(state: dict, operation: tuple):
+        """Apply an operation to a state, operations on unknown objects are ignored."""
+        kind, canvas_id, *args = operation
+        canvas = state.get(canvas_id)
+        if canvas is None:
+            if not kind.startswith("add"):
+                return
+            canvas = state[canvas_id] = CanvasState()
+        if kind == "add_box":
+            box_id, x, y, width, height, style = args
+            canvas.boxes[box_id] = BoxState(x, y, width, height, style)
+        elif kind == "remove_box":
+            # ("remove_box", canvas_id, box_id, keep_sub_diagram), the sub-diagram is kept when it is moved to a box
+            # in another canvas
+            box = canvas.boxes.pop(args[0], None)
+            if box is not None:
+                for connection_id in box.left + box.right:
+                    canvas.remove_connection(connection_id)
+                if len(args) < 2 or not args[1]:
+                    Journal.remove_sub_diagram(state, box)
+        elif kind == "box_id":
+            old_id, new_id = args
+            if old_id in canvas.boxes:
+                canvas.boxes[new_id] = canvas.boxes.pop(old_id)
+        elif kind in ("label", "move_box", "resize_box", "sub_diagram"):
+            box = canvas.boxes.get(args[0])
+            if box is None:
+                return
+            if kind == "label":
+                box.label = args[1]
+            elif kind == "move_box":
+                box.x, box.y = args[1:]
+            elif kind == "resize_box":
+                box.width, box.height = args[1:]
+            else:
+                box.sub_diagram = args[1]
+                state.setdefault(args[1], CanvasState())
+        elif kind == "remove_sub_diagram":
+            box = canvas.boxes.get(args[0])
+            if box is not None:
+                Journal.remove_sub_diagram(state, box)
+                box.sub_diagram = None
+        elif kind == "add_connection":
+            box_id, side, connection_id, type_name = args
+            box = canvas.boxes.get(box_id)
+            if box is not None:
+                box.side(side).append(connection_id)
+                canvas.types[connection_id] = type_name
+        elif kind == "remove_connection":
+            box_id, connection_id = args
+            box = canvas.boxes.get(box_id)
+            if box is not None:
+                for connections in (box.left, box.right):
+                    if connection_id in connections:
+                        connections.remove(connection_id)
+                canvas.remove_connection(connection_id)
+        elif kind == "add_io":
+            side, connection_id, type_name = args
+            canvas.io(side).append(connection_id)
+            canvas.types[connection_id] = type_name
+        elif kind == "remove_io":
+            side, connection_id = args
+            if connection_id in canvas.io(side):
+                canvas.io(side).remove(connection_id)
+                canvas.remove_connection(connection_id)
+        elif kind == "connection_type":
+            connection_id, type_name = args
+            if connection_id in canvas.types:
+                canvas.types[connection_id] = type_name
+        elif kind == "add_spider":
+            spider_id, x, y, type_name = args
+            canvas.spiders[spider_id] = [x, y]
+            canvas.types[spider_id] = type_name
+        elif kind == "remove_spider":
+            if canvas.spiders.pop(args[0], None) is not None:
+                canvas.remove_connection(args[0])
+        elif kind == "move_spider":
+            if args[0] in canvas.spiders:
+                canvas.spiders[args[0]] = [args[1], args[2]]
+        elif kind == "add_wire":
+            canvas.add_wire(tuple(args))
+        elif kind == "remove_wire":
+            canvas.remove_wire(tuple(args))
+            canvas.remove_wire(tuple(reversed(args)))
+        else:
+            raise ValueError(f"Unknown journal operation {kind}")
+
+    @staticmethod
+    def remove_sub_diagram(state: dict, box: BoxState):
+        """Remove the canvas of the sub-diagram of the box and of every sub-diagram in it."""
+        canvas = state.pop(box.sub_diagram, None) if box.sub_diagram is not None else None
+        if canvas is not None:
+            for sub_box in canvas.boxes.values():
+                Journal.remove_sub_diagram(state, sub_box)
+
+    @staticmethod
+    def diff(current: dict, target: dict) -> list[tuple]:
+        """
+        Operations that turn the current state into the target state.
+
+        Everything that goes away is removed first, wires before what they connect, then everything new is added,
+        boxes before their sub-diagrams and wires last. The contents of a sub-diagram that goes away with its box are
+        left to the removal of the box.
+        """
+        removals = []
+        additions = []
+        empty = CanvasState()
+        gone = set()
+        for canvas_id, canvas in current.items():
+            for box_id, box in canvas.boxes.items():
+                target_box = target.get(canvas_id, empty).boxes.get(box_id)
+                if box.sub_diagram is not None and (target_box is None or target_box.sub_diagram != box.sub_diagram):
+                    gone.add(box.sub_diagram)
+        # a canvas that goes away also takes the sub-diagrams in it
+        pending = list(gone)
+        while pending:
+            for box in current.get(pending.pop(), empty).boxes.values():
+                if box.sub_diagram is not None and box.sub_diagram not in gone:
+                    gone.add(box.sub_diagram)
+                    pending.append(box.sub_diagram)
+
+        new = set()
+        for canvas_id in Journal.canvas_order(target):
+            canvas = current.get(canvas_id, empty) if canvas_id not in new else empty
+            target_canvas = target[canvas_id]
+            for box_id, box in target_canvas.boxes.items():
+                current_box = canvas.boxes.get(box_id)
+                if box.sub_diagram is not None and (current_box is None or current_box.sub_diagram != box.sub_diagram
+                                                    or box.sub_diagram in gone):
+                    new.add(box.sub_diagram)
+            Journal.diff_canvas(canvas_id, canvas, target_canvas, removals, additions)
+        for canvas_id, canvas in current.items():
+            if canvas_id not in target and canvas_id not in gone:
+                Journal.diff_canvas(canvas_id, canvas, empty, removals, additions)
+        return removals + additions
+
+    @staticmethod
+    def canvas_order(state: dict) -> list:
+        """Canvas ids of the state, every sub-diagram after the canvas of its box."""
+        owned = {box.sub_diagram for canvas in state.values() for box in canvas.boxes.values()
+                 if box.sub_diagram is not None}
+        order = [canvas_id for canvas_id in state if canvas_id not in owned]
+        for canvas_id in order:
+            order.extend(box.sub_diagram for box in state[canvas_id].boxes.values()
+                         if box.sub_diagram is not None and box.sub_diagram in state)
+        return order
+
+    @staticmethod
+    def diff_canvas(canvas_id, current: CanvasState, target: CanvasState, removals: list, additions: list):
+        changed = set()
+        removed_boxes = [box_id for box_id in current.boxes if box_id not in target.boxes]
+        for box_id in removed_boxes:
+            changed.update(current.boxes[box_id].left + current.boxes[box_id].right)
+        changed.update(spider_id for spider_id in current.spiders if spider_id not in target.spiders)
+
+        connection_changes = []
+        for box_id, box in current.boxes.items():
+            target_box = target.boxes.get(box_id)
+            if target_box is None:
+                continue
+            for side in ("left", "right"):
+                removed, added = Journal.diff_list(box.side(side), target_box.side(side))
+                changed.update(removed + added)
+                connection_changes += [("remove_connection", canvas_id, box_id, connection_id)
+                                       for connection_id in reversed(removed)]
+                connection_changes += [("add_connection", canvas_id, box_id, side, connection_id,
+                                        target.types[connection_id]) for connection_id in added]
+        for side in ("input", "output"):
+            removed, added = Journal.diff_list(current.io(side), target.io(side))
+            changed.update(removed + added)
+            connection_changes += [("remove_io", canvas_id, side, connection_id) for connection_id in reversed(removed)]
+            connection_changes += [("add_io", canvas_id, side, connection_id, target.types[connection_id])
+                                   for connection_id in added]
+
+        removals += [("remove_wire", canvas_id, *wire) for wire in current.wires
+                     if wire not in target.wires or changed.intersection(wire)]
+        removals += [("remove_spider", canvas_id, spider_id) for spider_id in current.spiders
+                     if spider_id not in target.spiders]
+        removals += [("remove_box", canvas_id, box_id) for box_id in removed_boxes]
+        removals += [change for change in connection_changes if change[0].startswith("remove")]
+
+        for box_id, box in target.boxes.items():
+            current_box = current.boxes.get(box_id)
+            if current_box is None:
+                additions.append(("add_box", canvas_id, box_id, box.x, box.y, box.width, box.height, box.style))
+                if box.label:
+                    additions.append(("label", canvas_id, box_id, box.label))
+                for side in ("left", "right"):
+                    additions += [("add_connection", canvas_id, box_id, side, connection_id,
+                                   target.types[connection_id]) for connection_id in box.side(side)]
+                if box.sub_diagram is not None:
+                    additions.append(("sub_diagram", canvas_id, box_id, box.sub_diagram))
+                continue
+            if (box.x, box.y) != (current_box.x, current_box.y):
+                additions.append(("move_box", canvas_id, box_id, box.x, box.y))
+            if (box.width, box.height) != (current_box.width, current_box.height):
+                additions.append(("resize_box", canvas_id, box_id, box.width, box.height))
+            if box.label != current_box.label:
+                additions.append(("label", canvas_id, box_id, box.label))
+            if box.sub_diagram != current_box.sub_diagram:
+                if current_box.sub_diagram is not None:
+                    additions.append(("remove_sub_diagram", canvas_id, box_id))
+                if box.sub_diagram is not None:
+                    additions.append(("sub_diagram", canvas_id, box_id, box.sub_diagram))
+        additions += [change for change in connection_changes if change[0].startswith("add")]
+        for spider_id, (x, y) in target.spiders.items():
+            if spider_id not in current.spiders:
+                additions.append(("add_spider", canvas_id, spider_id, x, y, target.types[spider_id]))
+            elif current.spiders[spider_id] != [x, y]:
+                additions.append(("move_spider", canvas_id, spider_id, x, y))
+        additions += [("connection_type", canvas_id, connection_id, type_name)
+                      for connection_id, type_name in target.types.items()
+                      if connection_id not in changed and current.types.get(connection_id, type_name) != type_name]
+        additions += [("add_wire", canvas_id, *wire) for wire in target.wires
+                      if wire not in current.wires or changed.intersection(wire)]
+
+    @staticmethod
+    def diff_list(current: list, target: list) -> tuple[list, list]:
+        """Items to remove from the end of the current list and to append to it to get the target list."""
+        common = 0
+        for current_item, target_item in zip(current, target):
+            if current_item != target_item:
+                break
+            common += 1
+        return current[common:], target[common:]
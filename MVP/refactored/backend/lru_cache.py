@@ -0,0 +1,53 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    """
+    Cache bounded by `max_size` entries, the least recently used entry goes first. Lookups are counted in `hits` and
+    `misses`.
+
+    Only the standard library is used, the code generator emits the source into modules with memoized boxes.
+    """
+
+    def __init__(self, max_size=1024):
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def get(self, key, create):
+        """Cached value of the key, or else the result of `create()`, which is cached."""
+        found, value = self.lookup(key)
+        if not found:
+            value = create()
+            self.put(key, value)
+        return value
+
+    def lookup(self, key):
+        """(True, value) for a cached key, (False, None) otherwise."""
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return True, self.entries[key]
+        self.misses += 1
+        return False, None
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def pop(self, key):
+        self.entries.pop(key, None)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
@@ -0,0 +1,143 @@
+import json
+import threading
+from bisect import bisect_left
+
+
+class Histogram:
+    """Counts of observed values per bucket, with their sum, in the style of a Prometheus histogram."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds: tuple[float, ...]):
+        self.bounds = bounds
+        # one count per bound and a last one for values above every bound
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative_counts(self) -> list[int]:
+        """Number of values less than or equal to each bound, the last one counts every value."""
+        counts = []
+        total = 0
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket the q-quantile falls into, infinity if it is above every bound."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        for bound, total in zip(self.bounds, self.cumulative_counts()):
+            if total >= rank:
+                return bound
+        return float("inf")
+
+    def to_dict(self) -> dict:
+        return {"bounds": list(self.bounds), "counts": list(self.counts), "sum": self.sum, "count": self.count}
+
+
+class CallbackMetrics:
+    """
+    Number of calls, failures and a latency histogram per Receiver callback action, and counters of transactions.
+
+    The Receiver only times its callbacks when it is given an instance, without one the cost is a single `is None`
+    check per callback. Metrics are saved as JSON or in the Prometheus text format.
+    """
+
+    # seconds, from 10 microseconds to a second
+    BUCKETS = (1e-5, 2.5e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 2.5e-2, 5e-2, 0.1, 0.25, 0.5, 1.0)
+    WIRE_ACTIONS = {"wire_add", "wire_delete"}
+    SPIDER_ACTIONS = {"create_spider", "create_spider_parent", "delete_spider"}
+
+    def __init__(self, buckets: tuple[float, ...] = BUCKETS):
+        self.buckets = tuple(buckets)
+        self.histograms: dict[str, Histogram] = {}
+        self.errors: dict[str, int] = {}
+        self.counters: dict[str, int] = {}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def kind(cls, action) -> str:
+        """What the action changes, "wire", "spider" or "box"."""
+        if action in cls.WIRE_ACTIONS:
+            return "wire"
+        if action in cls.SPIDER_ACTIONS:
+            return "spider"
+        return "box"
+
+    def observe(self, action: str, seconds: float, failed=False):
+        """Record a callback of the action that took `seconds`."""
+        with self.lock:
+            histogram = self.histograms.get(action)
+            if histogram is None:
+                histogram = self.histograms[action] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            if failed:
+                self.errors[action] = self.errors.get(action, 0) + 1
+
+    def increment(self, name: str, amount=1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def calls(self, action) -> int:
+        histogram = self.histograms.get(action)
+        return histogram.count if histogram else 0
+
+    def reset(self):
+        with self.lock:
+            self.histograms.clear()
+            self.errors.clear()
+            self.counters.clear()
+
+    def to_dict(self) -> dict:
+        with self.lock:
+            return {
+                "actions": {action: {"kind": self.kind(action), "calls": histogram.count,
+                                     "errors": self.errors.get(action, 0), "seconds": histogram.to_dict()}
+                            for action, histogram in sorted(self.histograms.items())},
+                "counters": dict(sorted(self.counters.items())),
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), indent=2)
+
+    def to_prometheus(self, prefix="receiver") -> str:
+        """The metrics in the Prometheus text exposition format."""
+        with self.lock:
+            histograms = sorted(self.histograms.items())
+            lines = [f"# HELP {prefix}_callbacks_total Receiver callbacks applied.",
+                     f"# TYPE {prefix}_callbacks_total counter"]
+            lines += [f"{prefix}_callbacks_total{self.labels(action)} {histogram.count}"
+                      for action, histogram in histograms]
+            lines += [f"# HELP {prefix}_callback_errors_total Receiver callbacks that raised.",
+                      f"# TYPE {prefix}_callback_errors_total counter"]
+            lines += [f"{prefix}_callback_errors_total{self.labels(action)} {self.errors.get(action, 0)}"
+                      for action, _ in histograms]
+            lines += [f"# HELP {prefix}_callback_seconds Time to apply a Receiver callback.",
+                      f"# TYPE {prefix}_callback_seconds histogram"]
+            for action, histogram in histograms:
+                bounds = [repr(bound) for bound in histogram.bounds] + ["+Inf"]
+                for bound, count in zip(bounds, histogram.cumulative_counts()):
+                    lines.append(f'{prefix}_callback_seconds_bucket{self.labels(action, le=bound)} {count}')
+                lines.append(f"{prefix}_callback_seconds_sum{self.labels(action)} {histogram.sum!r}")
+                lines.append(f"{prefix}_callback_seconds_count{self.labels(action)} {histogram.count}")
+            for name, value in sorted(self.counters.items()):
+                lines += [f"# TYPE {prefix}_{name}_total counter", f"{prefix}_{name}_total {value}"]
+        return "\n".join(lines) + "\n"
+
+    def labels(self, action, **extra) -> str:
+        labels = {"action": action, "kind": self.kind(action), **extra}
+        return "{" + ",".join(f'{name}="{value}"' for name, value in labels.items()) + "}"
+
+    def save(self, path):
+        """Save the metrics in the Prometheus text format if the path ends with .prom or .txt, as JSON otherwise."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json()
+        with open(path, "w") as file:
+            file.write(text)
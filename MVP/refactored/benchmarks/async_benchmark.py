@@ -0,0 +1,74 @@
+"""
+Time a wide diagram of I/O-bound boxes generated for the sequential target and for the asyncio target.
+
+Every box waits 10 ms. The sequential `main` waits for the boxes one after another, the asyncio `main` overlaps the
+waits of every level, so it takes about as many waits as the diagram has levels.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.async_benchmark 16
+"""
+import asyncio
+import sys
+import time
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction
+from MVP.refactored.backend.code_generation.code_generator import CodeGenerator
+from MVP.refactored.tests.backend.synthetic import build_wide
+
+BLOCKING_ADD = """import time
+
+
+def invoke(a, b):
+    time.sleep(0.01)
+    return a + b
+
+
+meta = {"name": "Blocking add", "min_args": 2, "max_args": 2}
+"""
+
+ASYNC_ADD = """import asyncio
+
+
+async def invoke(a, b):
+    await asyncio.sleep(0.01)
+    return a + b
+
+
+meta = {"name": "Async add", "min_args": 2, "max_args": 2}
+"""
+
+
+def build_main(width: int, code: str, parallel: str = None):
+    canvas = build_wide(width, label="io_add")
+    canvas.main_diagram.label_content["io_add"] = code
+    canvas.main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+    box_function = BoxFunction("io_add", code=code)
+    main_function = CodeGenerator.construct_main_function(canvas, {box_function: "io_add"}, parallel)
+    namespace = {"asyncio": asyncio, "io_add": box_function}
+    exec(main_function, namespace)
+    return namespace["main"]
+
+
+def benchmark_async(width: int) -> tuple[float, float]:
+    inputs = range(2 * width)
+    sequential = build_main(width, BLOCKING_ADD)
+    start = time.perf_counter()
+    sequential(*inputs)
+    sequential_time = time.perf_counter() - start
+
+    asynchronous = build_main(width, ASYNC_ADD, parallel="asyncio")
+    start = time.perf_counter()
+    asyncio.run(asynchronous(*inputs))
+    return sequential_time, time.perf_counter() - start
+
+
+def main(width: int) -> None:
+    sequential_time, async_time = benchmark_async(width)
+    print(f"{width} independent boxes, {2 * width - 1} in total, 10 ms wait per box")
+    print(f"sequential {sequential_time:.3f} s, asyncio {async_time:.3f} s, "
+          f"speedup {sequential_time / async_time:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 16)
@@ -0,0 +1,72 @@
+"""
+Time a chain of add/subtract boxes over many rows: one `execute` per row against one `execute_batch` call, with the
+boxes mapped over the rows and with the boxes vectorized.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.batch_benchmark 100000
+"""
+import sys
+import time
+
+import numpy as np
+
+from MVP.refactored.backend.execution.executor import DiagramExecutor
+from MVP.refactored.tests.backend.synthetic import build_chain
+
+SCALAR_ADD = """def invoke(a, b):
+    return a + b
+
+
+meta = {"name": "Scalar add", "min_args": 2, "max_args": 2}
+"""
+
+SCALAR_SUBTRACT = """def invoke(a, b):
+    return a - b
+
+
+meta = {"name": "Scalar subtract", "min_args": 2, "max_args": 2}
+"""
+
+
+def build_diagram(size: int, scalar: bool):
+    canvas = build_chain(size)
+    for i, box in enumerate(canvas.boxes):
+        box.label_text = ("scalar_" if scalar else "") + ("add" if i % 2 == 0 else "subtract")
+    canvas.main_diagram.label_content.update({"scalar_add": SCALAR_ADD, "scalar_subtract": SCALAR_SUBTRACT})
+    return canvas
+
+
+def benchmark_batch(rows: int, size: int = 10) -> dict[str, float]:
+    columns = [np.arange(rows, dtype=np.int64) * (i + 1) for i in range(size + 1)]
+    executor = DiagramExecutor()
+    timings = {}
+
+    canvas = build_diagram(size, scalar=True)
+    row_values = list(zip(*(column.tolist() for column in columns)))
+    start = time.perf_counter()
+    expected = [executor.execute(canvas, *row)[0] for row in row_values]
+    timings["per-row loop"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    (mapped,) = executor.execute_batch(canvas, *columns)
+    timings["batch, mapped"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    (vectorized,) = executor.execute_batch(build_diagram(size, scalar=False), *columns)
+    timings["batch, vectorized"] = time.perf_counter() - start
+
+    assert np.array_equal(expected, mapped) and np.array_equal(expected, vectorized)
+    return timings
+
+
+def main(rows: int) -> None:
+    timings = benchmark_batch(rows)
+    print(f"{rows} rows, 10 boxes")
+    print(f"{'mode':>18} {'time (s)':>9} {'speedup':>8}")
+    for mode, elapsed in timings.items():
+        print(f"{mode:>18} {elapsed:>9.3f} {timings['per-row loop'] / elapsed:>8.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100000)
@@ -0,0 +1,38 @@
+"""
+Time constructing BoxFunctions for every box of a large diagram with the compiled-function cache and without it.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.box_function_benchmark 10000
+"""
+import sys
+import time
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction, compiled_functions
+
+
+def benchmark_box_functions(boxes: int) -> tuple[float, float]:
+    labels = ["add", "subtract", "copy"]
+    compiled_functions.clear()
+    start = time.perf_counter()
+    for i in range(boxes):
+        compiled_functions.clear()
+        BoxFunction(labels[i % len(labels)])
+    uncached = time.perf_counter() - start
+
+    compiled_functions.clear()
+    start = time.perf_counter()
+    for i in range(boxes):
+        BoxFunction(labels[i % len(labels)])
+    return uncached, time.perf_counter() - start
+
+
+def main(boxes: int) -> None:
+    uncached, cached = benchmark_box_functions(boxes)
+    print(f"{boxes} boxes, 3 distinct functions")
+    print(f"uncached {uncached:.3f} s, cached {cached:.3f} s ({compiled_functions.hits} hits, "
+          f"{compiled_functions.misses} misses), speedup {uncached / cached:.1f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 10000)
@@ -0,0 +1,38 @@
+"""
+Time hypergraph construction and `main` function generation on synthetic pipelines.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.codegen_benchmark 100 1000 10000
+"""
+import sys
+import time
+
+from MVP.refactored.backend.code_generation.code_generator import CodeGenerator
+from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
+from MVP.refactored.tests.backend.synthetic import build_chain
+
+DEFAULT_SIZES = [100, 1000, 10000]
+
+
+def benchmark_main_function(size: int) -> tuple[float, float]:
+    canvas = build_chain(size)
+    renamed_functions = {canvas.get_box_function(canvas.boxes[0].id): "invoke_0"}
+
+    start = time.perf_counter()
+    canvas.main_diagram.hypergraph_manager.add_hypergraph(HypergraphManager.build_hypergraph(canvas))
+    built = time.perf_counter()
+    CodeGenerator.construct_main_function(canvas, renamed_functions)
+    generated = time.perf_counter()
+    return built - start, generated - built
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'nodes':>8} {'hypergraph (s)':>15} {'main() (s)':>12}")
+    for size in sizes:
+        build_time, generation_time = benchmark_main_function(size)
+        print(f"{size:>8} {build_time:>15.4f} {generation_time:>12.4f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,66 @@
+"""
+Time code generation for the bundled example projects and for synthetic chains: with the previous string emitter (see
+`string_emitter`) as the baseline, rendered straight from the `ast` tree, and with the optional autopep8 pass.
+
+Projects the generator cannot generate are reported with the reason, the baseline column is empty for projects only
+the `ast` emitter supports (sub-diagram boxes). `generate_code` writes diagram.py, so the benchmark runs in a temporary
+directory.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.emitter_benchmark 100 1000
+"""
+import glob
+import os
+import sys
+import tempfile
+import time
+
+from MVP.refactored.backend.code_generation.code_generator import CodeGenerator
+from MVP.refactored.benchmarks.string_emitter import StringEmitter
+from MVP.refactored.tests.backend.synthetic import build_chain, load_project
+
+EXAMPLE_PROJECTS = os.path.join(os.path.dirname(__file__), "..", "..", "..", "example_projects")
+
+
+def time_generation(canvas, repeat: int, generator=CodeGenerator, **options) -> float:
+    main_diagram = canvas.main_diagram
+    main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        generator.fragments.clear()
+        generator.generate_code(canvas, main_diagram.canvasses, main_diagram, **options)
+    return (time.perf_counter() - start) / repeat
+
+
+def benchmark_emitter(name: str, canvas, repeat: int) -> None:
+    try:
+        unparsed = time_generation(canvas, repeat)
+        formatted = time_generation(canvas, repeat, formatted=True)
+    except ValueError as error:
+        print(f"{name:>24} {len(canvas.boxes):>6} unsupported: {error}")
+        return
+    try:
+        baseline = f"{time_generation(canvas, repeat, StringEmitter) * 1000:>12.2f}"
+    except ValueError:
+        baseline = f"{'-':>12}"
+    print(f"{name:>24} {len(canvas.boxes):>6} {baseline} {unparsed * 1000:>12.2f} {formatted * 1000:>14.2f}")
+
+
+def main(sizes: list[int]) -> None:
+    working_directory = os.getcwd()
+    projects = sorted(glob.glob(os.path.join(os.path.abspath(EXAMPLE_PROJECTS), "*.json")))
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            print(f"{'diagram':>24} {'boxes':>6} {'strings (ms)':>12} {'ast (ms)':>12} {'autopep8 (ms)':>14}")
+            for path in projects:
+                benchmark_emitter(os.path.basename(path), load_project(path), repeat=20)
+            for size in sizes:
+                benchmark_emitter(f"chain {size}", build_chain(size), repeat=1)
+        finally:
+            os.chdir(working_directory)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000])
@@ -0,0 +1,64 @@
+"""
+Compare running a diagram through generated code with running it in-process.
+
+The code generation column covers `CodeGenerator.generate_code` and executing the generated module. The executor
+columns are the first run (flattening and planning included) and a repeated run of the unchanged diagram.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.executor_benchmark 100 1000
+"""
+import os
+import sys
+import tempfile
+import time
+
+from MVP.refactored.backend.box_functions.box_function import functions
+from MVP.refactored.backend.code_generation.code_generator import CodeGenerator
+from MVP.refactored.backend.execution.executor import DiagramExecutor
+from MVP.refactored.tests.backend.synthetic import build_chain
+
+DEFAULT_SIZES = [100, 1000]
+
+
+def benchmark_code_generation(size: int) -> float:
+    canvas = build_chain(size)
+    main_diagram = canvas.main_diagram
+    main_diagram.label_content["add"] = functions["add"]
+    main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            start = time.perf_counter()
+            code = CodeGenerator.generate_code(canvas, main_diagram.canvasses, main_diagram)
+            namespace = {}
+            exec(code, namespace)
+            namespace["main"](*range(size + 1))
+            return time.perf_counter() - start
+        finally:
+            os.chdir(cwd)
+
+
+def benchmark_executor(size: int) -> tuple[float, float]:
+    canvas = build_chain(size)
+    executor = DiagramExecutor()
+
+    start = time.perf_counter()
+    executor.execute(canvas, *range(size + 1))
+    first = time.perf_counter()
+    executor.execute(canvas, *range(size + 1))
+    return first - start, time.perf_counter() - first
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'boxes':>8} {'codegen + exec (s)':>19} {'executor first (s)':>19} {'executor again (s)':>19}")
+    for size in sizes:
+        codegen_time = benchmark_code_generation(size)
+        first_time, again_time = benchmark_executor(size)
+        print(f"{size:>8} {codegen_time:>19.4f} {first_time:>19.4f} {again_time:>19.4f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
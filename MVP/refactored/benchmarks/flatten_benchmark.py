@@ -0,0 +1,40 @@
+"""
+Time flattening nested sub-diagrams into one hypergraph.
+
+Every sub-diagram of a level has the same content, so after the first occurrence the flattener only remaps cached
+templates. The second column flattens with an empty cache, the third flattens the same project again.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.flatten_benchmark
+"""
+import time
+
+from MVP.refactored.backend.hypergraph.flattener import Flattener
+from MVP.refactored.tests.backend.synthetic import build_nested
+
+DEFAULT_SHAPES = [(3, 10), (4, 10), (5, 8)]
+
+
+def benchmark_flatten(depth: int, width: int) -> tuple[int, int, float, float]:
+    canvas = build_nested(depth, width)
+    canvasses = canvas.main_diagram.canvasses
+    flattener = Flattener()
+
+    start = time.perf_counter()
+    flat = flattener.flatten(canvas, canvasses)
+    cold = time.perf_counter()
+    flattener.flatten(canvas, canvasses)
+    warm = time.perf_counter()
+    return len(canvasses), len(flat), cold - start, warm - cold
+
+
+def main() -> None:
+    print(f"{'canvasses':>10} {'leaf boxes':>11} {'cold (s)':>9} {'warm (s)':>9}")
+    for depth, width in DEFAULT_SHAPES:
+        canvasses, leaves, cold, warm = benchmark_flatten(depth, width)
+        print(f"{canvasses:>10} {leaves:>11} {cold:>9.4f} {warm:>9.4f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Time building and validating hypergraphs from synthetic pipelines, and the cost of a single edit when the manager
+rebuilds the canvas hypergraph versus when it updates it incrementally.
+
+The input edit replaces a diagram input wire of the middle box, the branch edit adds a box that taps the middle of the
+chain and deletes it again. Both leave the canvas valid after every lookup.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.hypergraph_benchmark 1000 5000 20000 50000
+"""
+import sys
+import time
+
+from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
+from MVP.refactored.tests.backend.synthetic import SyntheticWire, build_chain
+
+DEFAULT_SIZES = [1000, 5000, 20000, 50000]
+EDITS = 20
+
+
+def benchmark_build(size: int) -> tuple[float, float]:
+    canvas = build_chain(size)
+
+    start = time.perf_counter()
+    hypergraph = HypergraphManager.build_hypergraph(canvas)
+    built = time.perf_counter()
+    hypergraph.validate()
+    return built - start, time.perf_counter() - built
+
+
+def benchmark_edit(size: int, incremental: bool) -> float:
+    """Average time of reconnecting one wire and looking the canvas hypergraph up again."""
+    canvas = build_chain(size)
+    manager = HypergraphManager(incremental=incremental)
+    manager.modify_canvas_hypergraph(canvas)
+    box = canvas.boxes[size // 2]
+
+    start = time.perf_counter()
+    for _ in range(EDITS):
+        box.connections[1].wire = SyntheticWire()
+        canvas.add_input(box.connections[1].wire)
+        if incremental:
+            manager.box_connections_changed(canvas, box)
+        else:
+            manager.modify_canvas_hypergraph(canvas)
+        manager.get_graph_by_id(canvas.id)
+    return (time.perf_counter() - start) / EDITS
+
+
+def benchmark_branch(size: int, incremental: bool) -> float:
+    """Average time of adding or deleting a box on the middle wire of the chain and looking the canvas up again."""
+    canvas = build_chain(size)
+    manager = HypergraphManager(incremental=incremental)
+    manager.modify_canvas_hypergraph(canvas)
+    tapped = canvas.boxes[size // 2].connections[-1].wire
+
+    start = time.perf_counter()
+    for _ in range(EDITS):
+        box = canvas.add_box("add")
+        box.add_connection("left", tapped)
+        box.add_connection("right", SyntheticWire())
+        if incremental:
+            manager.box_added(canvas, box)
+        else:
+            manager.modify_canvas_hypergraph(canvas)
+        assert manager.get_graph_by_id(canvas.id) is not None
+        canvas.boxes.pop()
+        if incremental:
+            manager.box_deleted(canvas, box)
+        else:
+            manager.modify_canvas_hypergraph(canvas)
+        assert manager.get_graph_by_id(canvas.id) is not None
+    return (time.perf_counter() - start) / (2 * EDITS)
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'nodes':>8} {'build (s)':>10} {'validate (s)':>13} {'rebuild input (s)':>18} {'delta input (s)':>16} "
+          f"{'rebuild branch (s)':>19} {'delta branch (s)':>17}")
+    for size in sizes:
+        build_time, validation_time = benchmark_build(size)
+        rebuild_time = benchmark_edit(size, incremental=False)
+        delta_time = benchmark_edit(size, incremental=True)
+        rebuild_branch = benchmark_branch(size, incremental=False)
+        delta_branch = benchmark_branch(size, incremental=True)
+        print(f"{size:>8} {build_time:>10.4f} {validation_time:>13.4f} {rebuild_time:>18.4f} {delta_time:>16.4f} "
+              f"{rebuild_branch:>19.4f} {delta_branch:>17.6f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,46 @@
+"""
+Measure the memory per node of `Hypergraph` and of its compact, array-backed copy.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.memory_benchmark 10000 100000
+"""
+import gc
+import sys
+import tracemalloc
+
+from MVP.refactored.backend.hypergraph.compact_hypergraph import CompactHypergraph
+from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
+from MVP.refactored.tests.backend.synthetic import build_chain
+
+DEFAULT_SIZES = [10000, 100000]
+
+
+def measure(factory):
+    """Return the object built by `factory` and the bytes it keeps allocated."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = factory()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def benchmark_memory(size: int) -> tuple[float, float]:
+    canvas = build_chain(size)
+    hypergraph, hypergraph_bytes = measure(lambda: HypergraphManager.build_hypergraph(canvas))
+    _, compact_bytes = measure(lambda: CompactHypergraph.from_hypergraph(hypergraph))
+    return hypergraph_bytes / size, compact_bytes / size
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'nodes':>8} {'Hypergraph (B/node)':>20} {'CompactHypergraph (B/node)':>27}")
+    for size in sizes:
+        hypergraph_bytes, compact_bytes = benchmark_memory(size)
+        print(f"{size:>8} {hypergraph_bytes:>20.1f} {compact_bytes:>27.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
@@ -0,0 +1,55 @@
+"""
+Time level-scheduled execution of a wide diagram of CPU-heavy boxes against the number of workers.
+
+The boxes are pure Python loops, so the thread pool is limited by the GIL and only the process pool can scale with the
+number of cores.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.parallel_benchmark 64
+"""
+import os
+import sys
+import time
+
+from MVP.refactored.backend.execution.executor import DiagramExecutor
+from MVP.refactored.tests.backend.synthetic import build_wide
+
+BUSY = """def invoke(a, b):
+    total = 0
+    for i in range(200000):
+        total += i % 7
+    return a + b
+
+
+meta = {"name": "Busy", "min_args": 2, "max_args": 2}
+"""
+
+
+def benchmark_parallel(width: int, parallel: str = None, max_workers: int = None) -> float:
+    canvas = build_wide(width, label="busy")
+    canvas.main_diagram.label_content["busy"] = BUSY
+    inputs = range(2 * width)
+    with DiagramExecutor(parallel=parallel, max_workers=max_workers) as executor:
+        # the first run also starts the pool workers
+        executor.execute(canvas, *inputs)
+        start = time.perf_counter()
+        executor.execute(canvas, *inputs)
+        return time.perf_counter() - start
+
+
+def main(width: int) -> None:
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores} | {2 ** i for i in range(cores.bit_length()) if 2 ** i <= cores})
+    serial = benchmark_parallel(width)
+    print(f"{width} independent boxes, {2 * width - 1} in total, {cores} cores")
+    print(f"{'mode':>8} {'workers':>8} {'time (s)':>9} {'speedup':>8}")
+    print(f"{'serial':>8} {1:>8} {serial:>9.3f} {1:>8.2f}")
+    for parallel in ("thread", "process"):
+        for workers in worker_counts:
+            elapsed = benchmark_parallel(width, parallel, workers)
+            print(f"{parallel:>8} {workers:>8} {elapsed:>9.3f} {serial / elapsed:>8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 64)
@@ -0,0 +1,72 @@
+"""
+Time the Receiver callbacks of building a chain of boxes, then deleting every box, the time per callback should stay
+about the same as the chain grows. The chain is built once callback by callback, once in a transaction, like the
+importer does, and once with callback metrics recorded, whose time per action is printed for the largest chain.
+
+Logging is disabled, so only the backend bookkeeping is timed. Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.receiver_benchmark 500 1000 2000
+"""
+import logging
+import sys
+import time
+
+from MVP.refactored.backend.diagram_callback import Receiver
+from MVP.refactored.backend.metrics import CallbackMetrics
+
+
+def build_chain(receiver: Receiver, length: int) -> int:
+    """Add `length` boxes, each wired to the one before it, and return the number of callbacks made."""
+    callbacks = 0
+    for box_id in range(1, length + 1):
+        receiver.receiver_callback("box_add", generator_id=box_id)
+        receiver.receiver_callback("box_add_left", generator_id=box_id, connection_nr=0, connection_id=box_id * 10)
+        receiver.receiver_callback("box_add_right", generator_id=box_id, connection_nr=0,
+                                   connection_id=box_id * 10 + 1)
+        callbacks += 3
+        if box_id > 1:
+            wire_id = -box_id
+            receiver.receiver_callback("wire_add", wire_id=wire_id, start_connection=[0, box_id - 1, "right"],
+                                       connection_id=(box_id - 1) * 10 + 1)
+            receiver.receiver_callback("wire_add", wire_id=wire_id, start_connection=[0, box_id, "left"],
+                                       connection_id=box_id * 10)
+            callbacks += 2
+    return callbacks
+
+
+def benchmark_receiver(length: int, metrics: CallbackMetrics) -> tuple[int, float, float, float, float]:
+    start = time.perf_counter()
+    with Receiver().transaction() as receiver:
+        build_chain(receiver, length)
+    transaction = time.perf_counter() - start
+
+    start = time.perf_counter()
+    build_chain(Receiver(metrics=metrics), length)
+    measured = time.perf_counter() - start
+
+    receiver = Receiver()
+    start = time.perf_counter()
+    callbacks = build_chain(receiver, length)
+    built = time.perf_counter()
+    for box_id in range(length, 0, -1):
+        receiver.receiver_callback("box_delete", generator_id=box_id)
+    return callbacks + length, built - start, transaction, measured, time.perf_counter() - built
+
+
+def main(sizes: list[int]) -> None:
+    logging.disable(logging.CRITICAL)
+    print(f"{'boxes':>7} {'callbacks':>10} {'build (s)':>10} {'transaction (s)':>16} {'metrics (s)':>12} "
+          f"{'delete (s)':>11} {'us/callback':>12}")
+    for length in sizes:
+        metrics = CallbackMetrics()
+        callbacks, build, transaction, measured, delete = benchmark_receiver(length, metrics)
+        print(f"{length:>7} {callbacks:>10} {build:>10.4f} {transaction:>16.4f} {measured:>12.4f} "
+              f"{delete:>11.4f} {(build + delete) / callbacks * 1e6:>12.1f}")
+    print(f"\n{'action':>14} {'calls':>7} {'mean (us)':>10} {'p99 below (us)':>15}")
+    for action, histogram in sorted(metrics.histograms.items()):
+        print(f"{action:>14} {histogram.count:>7} {histogram.sum / histogram.count * 1e6:>10.1f} "
+              f"{histogram.quantile(0.99) * 1e6:>15.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [500, 1000, 2000])
@@ -0,0 +1,60 @@
+"""
+Time how long each Receiver callback blocks the caller, which is the latency the callbacks add to a Tk event handler,
+with the backend applied on the calling thread and on the Receiver worker thread. The chain of the receiver benchmark
+is built callback by callback, then `flush` waits for the worker to catch up.
+
+Logging stays on but is written to os.devnull, so its formatting is part of the time like in the editor. Run from the
+repository root:
+
+    python -m MVP.refactored.benchmarks.receiver_latency_benchmark 500 1000 2000
+"""
+import logging
+import os
+import statistics
+import sys
+import time
+
+from MVP.refactored.backend.diagram_callback import Receiver
+from MVP.refactored.benchmarks.receiver_benchmark import build_chain
+
+
+class TimedReceiver:
+    """Passes the callbacks on to the receiver and records how long each of them took to return."""
+
+    def __init__(self, receiver: Receiver):
+        self.receiver = receiver
+        self.latencies = []
+
+    def receiver_callback(self, action, **kwargs):
+        start = time.perf_counter()
+        self.receiver.receiver_callback(action, **kwargs)
+        self.latencies.append(time.perf_counter() - start)
+
+
+def benchmark_latency(length: int, threaded: bool) -> tuple[float, float, float, float]:
+    receiver = Receiver(threaded=threaded)
+    timed = TimedReceiver(receiver)
+    build_chain(timed, length)
+    start = time.perf_counter()
+    receiver.flush()
+    flush = time.perf_counter() - start
+    receiver.close()
+    latencies = sorted(timed.latencies)
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return statistics.mean(latencies), p99, latencies[-1], flush
+
+
+def main(sizes: list[int]) -> None:
+    with open(os.devnull, "w") as devnull:
+        logging.basicConfig(level=logging.INFO, stream=devnull,
+                            format='%(asctime)s - %(levelname)s - %(message)s')
+        print(f"{'boxes':>7} {'threaded':>9} {'mean (us)':>10} {'p99 (us)':>9} {'max (us)':>9} {'flush (s)':>10}")
+        for length in sizes:
+            for threaded in (False, True):
+                mean, p99, worst, flush = benchmark_latency(length, threaded)
+                print(f"{length:>7} {str(threaded):>9} {mean * 1e6:>10.1f} {p99 * 1e6:>9.1f} {worst * 1e6:>9.1f} "
+                      f"{flush:>10.4f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [500, 1000, 2000])
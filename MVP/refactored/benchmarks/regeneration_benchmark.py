@@ -0,0 +1,67 @@
+"""
+Time generating code for a large diagram, generating it again unchanged and generating it again after a one-box edit.
+
+`generate_code` writes diagram.py, so the benchmark runs in a temporary directory.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.regeneration_benchmark 100 1000
+"""
+import os
+import sys
+import tempfile
+import time
+
+from MVP.refactored.backend.code_generation.code_generator import CodeGenerator
+from MVP.refactored.tests.backend.synthetic import build_chain
+
+CUSTOM = """import math
+
+
+def scale(x):
+    return x * math.e
+
+
+def invoke(a, b):
+    return scale(a) + b
+
+
+meta = {"name": "Custom", "min_args": 2, "max_args": 2}
+"""
+
+
+def generate(canvas) -> float:
+    start = time.perf_counter()
+    canvas.main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+    CodeGenerator.generate_code(canvas, canvas.main_diagram.canvasses, canvas.main_diagram)
+    return time.perf_counter() - start
+
+
+def benchmark_regeneration(size: int) -> tuple[float, float, float]:
+    canvas = build_chain(size)
+    for i, box in enumerate(canvas.boxes):
+        box.label_text = ("add", "subtract", "custom")[i % 3]
+    canvas.main_diagram.label_content["custom"] = CUSTOM
+    CodeGenerator.fragments.clear()
+    cold = generate(canvas)
+    unchanged = generate(canvas)
+    canvas.boxes[size // 2].label_text = "add" if canvas.boxes[size // 2].label_text != "add" else "subtract"
+    edited = generate(canvas)
+    return cold, unchanged, edited
+
+
+def main(sizes: list[int]) -> None:
+    working_directory = os.getcwd()
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            print(f"{'boxes':>8} {'cold (s)':>9} {'unchanged (s)':>14} {'one edit (s)':>13}")
+            for size in sizes:
+                cold, unchanged, edited = benchmark_regeneration(size)
+                print(f"{size:>8} {cold:>9.3f} {unchanged:>14.3f} {edited:>13.3f}")
+        finally:
+            os.chdir(working_directory)
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [100, 1000])
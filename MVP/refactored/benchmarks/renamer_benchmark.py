@@ -0,0 +1,39 @@
+"""
+Time renaming custom box functions of growing size, the time per line should stay about the same.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.renamer_benchmark 50 100 200 400
+"""
+import sys
+import time
+
+from MVP.refactored.backend.code_generation.renamer import Renamer
+
+
+def build_code(helpers: int) -> str:
+    """Box function code with `helpers` helper functions and constants that all call each other in a chain."""
+    parts = [f"CONSTANT_{i} = {i}\n\n\ndef helper_{i}(x):\n    return helper_{i - 1}(x) + CONSTANT_{i}\n\n\n"
+             for i in range(1, helpers)]
+    code = "CONSTANT_0 = 0\n\n\ndef helper_0(x):\n    return x\n\n\n" + "".join(parts)
+    code += f"def invoke(a):\n    return helper_{helpers - 1}(a)\n\n\nmeta = {{\"name\": \"Big\"}}\n"
+    return code
+
+
+def benchmark_renamer(helpers: int) -> tuple[int, float]:
+    code = build_code(helpers)
+    Renamer.rename.cache_clear()
+    start = time.perf_counter()
+    Renamer.rename(code, "_0")
+    return code.count("\n"), time.perf_counter() - start
+
+
+def main(sizes: list[int]) -> None:
+    print(f"{'helpers':>8} {'lines':>7} {'time (s)':>9} {'us/line':>8}")
+    for helpers in sizes:
+        lines, elapsed = benchmark_renamer(helpers)
+        print(f"{helpers:>8} {lines:>7} {elapsed:>9.4f} {elapsed / lines * 1e6:>8.1f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [50, 100, 200, 400])
@@ -0,0 +1,40 @@
+"""
+Measure time and peak memory of streaming a diagram over generated inputs of growing length.
+
+The peak should stay the same however long the stream is, since every wire only buffers about one item.
+
+Run from the repository root:
+
+    python -m MVP.refactored.benchmarks.stream_benchmark 10000 100000 1000000
+"""
+import sys
+import time
+import tracemalloc
+
+from MVP.refactored.backend.execution.executor import DiagramExecutor
+from MVP.refactored.tests.backend.synthetic import build_chain
+
+
+def benchmark_stream(length: int, size: int = 10) -> tuple[float, int]:
+    canvas = build_chain(size)
+    executor = DiagramExecutor()
+    streams = [(i * j for i in range(length)) for j in range(size + 1)]
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in executor.stream(canvas, *streams):
+        pass
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def main(lengths: list[int]) -> None:
+    print(f"{'items':>10} {'time (s)':>9} {'peak (KiB)':>11}")
+    for length in lengths:
+        elapsed, peak = benchmark_stream(length)
+        print(f"{length:>10} {elapsed:>9.3f} {peak / 1024:>11.0f}")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or [10000, 100000, 1000000])
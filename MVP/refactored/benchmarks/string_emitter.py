@@ -0,0 +1,107 @@
+"""
+The string emitter `CodeGenerator` used before `main` was built as an `ast` tree, kept as the baseline of
+`emitter_benchmark`.
+
+`main` is concatenated from strings with tab characters, and the box functions are cleaned with regular expressions and
+passed through autopep8, like the previous `generate_code` did. The hypergraph, the order of the calls and the names of
+the inputs come from `CodeGenerator`, so both emitters render the same `main`, call for call. Only the sequential mode
+on canvasses without sub-diagram boxes is supported, the previous emitter did not support more.
+"""
+import re
+
+import autopep8
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction, CompiledFunctionCache
+from MVP.refactored.backend.code_generation.code_generator import CodeGenerator
+from MVP.refactored.backend.code_generation.fragment_cache import FragmentCache
+from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
+from MVP.refactored.backend.hypergraph.spider_resolver import SpiderResolver
+
+IMPORT_REGEX = r"(^import .+)|(^from .+)"
+META_REGEX = r"^meta\s=\s{[\s\S]+?}"
+
+
+class StringEmitter(CodeGenerator):
+    MAX_LINE_LENGTH = 79
+    fragments = FragmentCache()
+
+    @classmethod
+    def generate_code(cls, canvas, canvasses, main_diagram, **options) -> str:
+        if options:
+            raise ValueError(f"The string emitter does not support {sorted(options)}")
+        if any(str(box.id) in canvasses for box in canvas.boxes):
+            raise ValueError("The string emitter does not support sub-diagram boxes")
+        code_parts = cls.get_all_code_parts([canvas], canvasses, main_diagram)
+        file_content = cls.get_imports([box_function.code for box_function in code_parts]) + "\n\n\n"
+
+        function_list: list[str] = []
+        renamed_functions: dict[BoxFunction, str] = {}
+        for i, box_function in enumerate(code_parts.keys()):
+            function_fragment, renamed_functions[box_function] = cls.fragments.get(
+                ("function", CompiledFunctionCache.key(box_function.code), i),
+                lambda: cls.create_string_function_fragment(box_function, i))
+            function_list.append(function_fragment)
+        file_content += "\n\n".join(function_list)
+
+        main_key = ("main", cls.describe_canvas(canvas, renamed_functions))
+        file_content += "\n\n" + cls.fragments.get(
+            main_key, lambda: cls.construct_string_main_function(canvas, renamed_functions)).expandtabs(4) + "\n"
+
+        with open("diagram.py", "w") as file:
+            file.write(file_content)
+
+        return file_content
+
+    @classmethod
+    def create_string_function_fragment(cls, box_function: BoxFunction, index: int) -> tuple[str, str]:
+        """Rename, clean and format the code of the box function, return it with the new name of its `invoke`."""
+        (code_part,), renamed_functions = cls.rename([box_function], start=index)
+        code_part = re.sub(r"^\n+", "", re.sub(META_REGEX, "", code_part, flags=re.MULTILINE))
+        code_part = re.sub(r"^\n+", "", re.sub(IMPORT_REGEX, "", code_part, flags=re.MULTILINE))
+        return autopep8.fix_code(code_part).strip("\n") + "\n", renamed_functions[box_function]
+
+    @classmethod
+    def get_imports(cls, code_parts: list[str]) -> str:
+        imports = set()
+        for part in code_parts:
+            for code_import in re.finditer(IMPORT_REGEX, part, re.MULTILINE):
+                imports.add(code_import.group())
+        return "\n".join(sorted(imports))
+
+    @classmethod
+    def construct_string_main_function(cls, canvas, renamed_functions: dict[BoxFunction, str]) -> str:
+        hypergraph = cls.get_hypergraph(canvas)
+        input_names = cls.get_input_names(canvas, hypergraph)
+        parameters = [f"{name}=None" for name in dict.fromkeys(input_names.values())]
+        main_function = f"def main({', '.join(parameters)}):"
+        if len(main_function) > cls.MAX_LINE_LENGTH:
+            # one parameter per line, formatting a long definition line is the slowest part of autopep8
+            main_function = "def main(\n\t\t" + ",\n\t\t".join(parameters) + "):"
+        main_function += "\n\t"
+
+        function_result_variables: dict[int, str] = {}
+        nodes_queue = cls.get_nodes_queue(canvas, hypergraph)
+        while not nodes_queue.empty():
+            node = nodes_queue.get()
+            variable_name = f"res_{len(function_result_variables) + 1}"
+            arguments = ", ".join(cls.create_string_wire_value(wire, hypergraph, function_result_variables,
+                                                               input_names) for wire in node.inputs)
+            function_result_variables[node.id] = variable_name
+            main_function += (f"{variable_name} = "
+                              f"{renamed_functions[canvas.get_box_function(node.id)]}({arguments})\n\t")
+
+        resolver = SpiderResolver()
+        values = [cls.create_string_wire_value(resolver.wire_id(connection), hypergraph, function_result_variables,
+                                               input_names) if connection.has_wire else "None"
+                  for connection in sorted(canvas.outputs, key=lambda c: c.index)]
+        return main_function + f"return {', '.join(values)}"
+
+    @classmethod
+    def create_string_wire_value(cls, wire: int, hypergraph: Hypergraph, function_result_variables: dict[int, str],
+                                 input_names: dict[int, str]) -> str:
+        node = hypergraph.get_node_by_output(wire)
+        if node is None:
+            return input_names[wire]
+        if len(node.outputs) > 1:
+            return f"{function_result_variables[node.id]}[{node.outputs.index(wire)}]"
+        return function_result_variables[node.id]
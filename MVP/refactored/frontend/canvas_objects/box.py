@@ -105,7 +105,10 @@ class Box:
             if self.canvas.diagram_source_box:
                 self.receiver.receiver_callback("sub_box", generator_id=self.id,
                                                 connection_id=self.canvas.diagram_source_box.id)
+        old_id = self.id
         self.id = id_
+        self.canvas.record("box_id", old_id, id_)
+        self.canvas.main_diagram.hypergraph_manager.box_id_changed(self.canvas, old_id, self)
 
     def bind_events(self):
         """
@@ -267,22 +270,23 @@ class Box:
             if c.side == const.LEFT and inputs:
                 to_be_removed.append(c)
 
-        # remove selected connectionsS
-        for c in to_be_removed:
-            c.delete()
-            self.remove_connection(c)
-            self.update_connections()
-            self.update_wires()
-
-        # add new connections
-        if not self.canvas.is_search:
-            self.receiver.receiver_callback("box_remove_connection_all", generator_id=self.id)
-        if outputs:
-            for _ in range(int(outputs)):
-                self.add_right_connection()
-        if inputs:
-            for _ in range(int(inputs)):
-                self.add_left_connection()
+        with self.canvas.main_diagram.journal.group():
+            # remove selected connectionsS
+            for c in to_be_removed:
+                c.delete()
+                self.remove_connection(c)
+                self.update_connections()
+                self.update_wires()
+
+            # add new connections
+            if not self.canvas.is_search:
+                self.receiver.receiver_callback("box_remove_connection_all", generator_id=self.id)
+            if outputs:
+                for _ in range(int(outputs)):
+                    self.add_right_connection()
+            if inputs:
+                for _ in range(int(inputs)):
+                    self.add_left_connection()
 
     def edit_sub_diagram(self, save_to_canvasses=True, switch=True):
         """
@@ -302,6 +306,7 @@ class Box:
             self.sub_diagram = CustomCanvas(self.canvas.main_diagram, self.canvas.main_diagram,
                                             id_=self.id, highlightthickness=0,
                                             diagram_source_box=self, rotation=self.canvas.rotation)
+            self.canvas.record("sub_diagram", self.id, self.sub_diagram.journal_id)
             self.canvas.itemconfig(self.shape, fill="#dfecf2")
             if save_to_canvasses:
                 name = self.label_text
@@ -432,6 +437,8 @@ class Box:
         go_to_x, go_to_y = self.canvas.convert_coords(go_to_x, go_to_y, to_display=True)
         self.move(go_to_x, go_to_y, bypass_legality=from_configuration)
         self.move_label()
+        if not from_configuration:
+            self.canvas.record("move_box", self.id, self.x, self.y, merge=True)
 
     def update_self_collision_ids(self):
         """
@@ -520,6 +527,7 @@ class Box:
         self.size = old_size
         self.update_size(new_size_x, new_size_y)
         self.move_label()
+        self.canvas.record("resize_box", self.id, *self.get_logical_size(self.size), merge=True)
 
     def on_resize_drag(self, event):
         """
@@ -549,6 +557,7 @@ class Box:
         new_size_x, new_size_y = self.get_logical_size((new_size_x, new_size_y))
         self.update_size(new_size_x, new_size_y)
         self.move_label()
+        self.canvas.record("resize_box", self.id, *self.get_logical_size(self.size), merge=True)
 
     def resize_by_connections(self):
         """
@@ -564,10 +573,12 @@ class Box:
             if self.size[0] < height:
                 self.update_size(self.size[1], height)
                 self.move_label()
+                self.canvas.record("resize_box", self.id, *self.get_logical_size(self.size), follow=True)
         else:
             if self.size[1] < height:
                 self.update_size(self.size[0], height)
                 self.move_label()
+                self.canvas.record("resize_box", self.id, *self.get_logical_size(self.size), follow=True)
 
     def move_label(self):
         """
@@ -645,6 +656,8 @@ class Box:
         """
         if self.receiver.listener and not self.canvas.is_search:
             self.receiver.receiver_callback("box_add_operator", generator_id=self.id, operator=self.label_text)
+        self.canvas.record("label", self.id, self.label_text)
+        self.canvas.main_diagram.hypergraph_manager.canvas_content_changed(self.canvas)
         if not self.label:
             self.label = self.canvas.create_text((self.display_x + self.size[0] / 2, self.display_y + self.size[1] / 2),
                                                  text=self.label_text, fill=const.BLACK, font=('Helvetica', 14))
@@ -654,6 +667,7 @@ class Box:
         label_width = abs(self.canvas.bbox(self.label)[0] - self.canvas.bbox(self.label)[2])
         if label_width > self.size[0]:
             self.size = [label_width + 20, self.size[1]]
+            self.canvas.record("resize_box", self.id, *self.get_logical_size(self.size), follow=True)
         self.update_size(*self.get_logical_size(self.size))
         self.move_label()
 
@@ -747,6 +761,19 @@ class Box:
         [c.search_highlight_primary() for c in self.connections]
         self.canvas.search_result_highlights.append(self)
 
+    def profile_highlight(self, color):
+        """
+        Apply the profile highlight style.
+
+        Changes the outline of the Box to the color showing how much time it took. Will add the Box to CustomCanvas
+        list containing profile highlighted objects.
+
+        :param color: Outline color.
+        :return: None
+        """
+        self.canvas.itemconfig(self.shape, outline=color)
+        self.canvas.profile_highlights.append(self)
+
     def deselect(self):
         """
         Deselect the Box.
@@ -887,6 +914,7 @@ class Box:
         if self.receiver.listener and not self.canvas.is_search:
             self.receiver.receiver_callback("box_add_left", generator_id=self.id, connection_nr=i,
                                             connection_id=connection.id)
+        self.canvas.record("add_connection", self.id, "left", connection.id, connection.type.name)
 
         self.resize_by_connections()
         return connection
@@ -914,6 +942,7 @@ class Box:
         if self.receiver.listener and not self.canvas.is_search:
             self.receiver.receiver_callback("box_add_right", generator_id=self.id, connection_nr=i,
                                             connection_id=connection.id)
+        self.canvas.record("add_connection", self.id, "right", connection.id, connection.type.name)
         self.resize_by_connections()
         return connection
 
@@ -940,6 +969,8 @@ class Box:
         self.connections.remove(circle)
         self.collision_ids.remove(circle.circle)
         circle.delete()
+        self.canvas.record("remove_connection", self.id, circle.id)
+        self.canvas.main_diagram.hypergraph_manager.box_connections_changed(self.canvas, self)
         self.update_connections()
         self.update_wires()
         self.resize_by_connections()
@@ -962,6 +993,8 @@ class Box:
 
         if self in self.canvas.boxes:
             self.canvas.boxes.remove(self)
+            self.canvas.main_diagram.hypergraph_manager.box_deleted(self.canvas, self)
+            self.canvas.record("remove_box", self.id, keep_sub_diagram)
         self.canvas.delete(self.label)
         for tag in self.extra_shapes.values():
             self.canvas.delete(tag)
@@ -1055,21 +1088,13 @@ class Box:
         :param shape: Shape of new Box
         :return: None
         """
-        match shape:
-            case const.RECTANGLE:
-                new_box = self.canvas.add_box((self.x, self.y), self.get_logical_size(self.size), style=const.RECTANGLE)
-            case const.TRIANGLE:
-                new_box = self.canvas.add_box((self.x, self.y), self.get_logical_size(self.size), style=const.TRIANGLE)
-            case const.AND_GATE:
-                new_box = self.canvas.add_box((self.x, self.y), self.get_logical_size(self.size), style=const.AND_GATE)
-            case const.OR_GATE:
-                new_box = self.canvas.add_box((self.x, self.y), self.get_logical_size(self.size), style=const.OR_GATE)
-            case const.XOR_GATE:
-                new_box = self.canvas.add_box((self.x, self.y), self.get_logical_size(self.size), style=const.XOR_GATE)
-            case _:
-                return
-        self.canvas.copier.copy_box(self, new_box)
-        self.delete_box()
+        if shape not in (const.RECTANGLE, const.TRIANGLE, const.AND_GATE, const.OR_GATE, const.XOR_GATE):
+            return
+        with self.canvas.main_diagram.journal.group():
+            # the new Box takes over the Connection ids, so this one is deleted first
+            self.delete_box()
+            new_box = self.canvas.add_box((self.x, self.y), self.get_logical_size(self.size), style=shape)
+            self.canvas.copier.copy_box(self, new_box)
 
     @staticmethod
     def get_input_output_amount_off_code(code):
@@ -96,9 +96,14 @@ class Connection:
         if tied_con and tied_con != self:
             tied_con.type = ConnectionType(type_id)
             tied_con.update()
+            tied_con.canvas.record("connection_type", tied_con.id, tied_con.type.name)
         if not self.has_wire:
             self.type = ConnectionType(type_id)
             self.update()
+            self.canvas.record("connection_type", self.id, self.type.name)
+        self.canvas.main_diagram.hypergraph_manager.canvas_content_changed(self.canvas)
+        if tied_con and tied_con != self:
+            tied_con.canvas.main_diagram.hypergraph_manager.canvas_content_changed(tied_con.canvas)
 
     def get_tied_connection(self):
         """
@@ -289,6 +294,8 @@ class Connection:
         if not self.has_wire and self.wire is None:
             self.wire = wire
             self.has_wire = True
+            if not wire.is_temporary:
+                self.notify_wire_changed()
 
     def is_spider(self):
         """
@@ -311,8 +318,25 @@ class Connection:
         if self.box and self.wire and not self.wire.is_temporary:
             self.box.wires.remove(self.wire)
         if self.wire:
+            is_temporary = self.wire.is_temporary
             self.wire = None
             self.has_wire = False
+            if not is_temporary:
+                self.notify_wire_changed()
+
+    def notify_wire_changed(self):
+        """
+        Report a changed Wire to the hypergraph manager.
+
+        Connections of the canvas inputs and outputs are not part of any Box, for them only the canvas is reported.
+
+        :return: None
+        """
+        manager = self.canvas.main_diagram.hypergraph_manager
+        if self.box and self in self.box.connections:
+            manager.box_connections_changed(self.box.canvas, self.box)
+        else:
+            manager.canvas_content_changed(self.canvas)
 
     def select(self):
         """
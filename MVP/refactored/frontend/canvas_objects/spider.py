@@ -105,6 +105,7 @@ class Spider(Connection):
         [wire.delete(self) for wire in self.wires.copy()]
         self.canvas.spiders.remove(self)
         super().delete()
+        self.canvas.record("remove_spider", self.id)
         if self.receiver.listener and not self.canvas.is_search:
             if action != "sub_diagram":
                 self.receiver.receiver_callback('delete_spider', wire_id=self.id, connection_id=self.id)
@@ -130,6 +131,8 @@ class Spider(Connection):
         if wire not in self.wires:
             self.wires.append(wire)
             self.has_wire = True
+            if not wire.is_temporary:
+                self.notify_wire_changed()
 
     def on_resize_scroll(self, event):
         """
@@ -270,6 +273,8 @@ class Spider(Connection):
         self.rel_x = round(self.display_x / self.canvas.winfo_width(), 4)
         self.rel_y = round(self.display_y / self.canvas.winfo_height(), 4)
         [w.update() for w in self.wires]
+        if not from_configuration:
+            self.canvas.record("move_spider", self.id, self.x, self.y, merge=True)
 
     def align_wire_ends(self):
         """
@@ -363,6 +368,18 @@ class Spider(Connection):
         if wire and wire in self.wires:
             self.wires.remove(wire)
             self.has_wire = len(self.wires) > 0
+            if not wire.is_temporary:
+                self.notify_wire_changed()
+
+    def notify_wire_changed(self):
+        """
+        Report a changed Wire to the hypergraph manager.
+
+        A Spider joins its wires into one value, so every Box wired to its group of spiders is reported.
+
+        :return: None
+        """
+        self.canvas.main_diagram.hypergraph_manager.spider_wires_changed(self.canvas, self)
 
     def update_location(self, new_location):
         """
@@ -82,6 +82,8 @@ class Wire:
         self.is_temporary = is_temporary
         if not is_temporary and not self.canvas.is_search:
             self.handle_wire_addition_callback()
+        if not is_temporary:
+            self.canvas.record("add_wire", start_connection.id, end_connection.id)
         self.type = wire_type
         self.color = wire_type.value[0]
         self.dash_style = wire_type.value[1]
@@ -105,6 +107,7 @@ class Wire:
         self.delete_labels()
         if not self.is_temporary:
             self.canvas.wires.remove(self)
+            self.canvas.record("remove_wire", self.start_connection.id, self.end_connection.id)
         if not self.is_temporary and not self.canvas.is_search:
             self.handle_wire_deletion_callback(action)
 
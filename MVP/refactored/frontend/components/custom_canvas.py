@@ -7,7 +7,6 @@ from PIL import Image, ImageTk
 from ttkbootstrap.constants import *
 
 from MVP.refactored.backend.box_functions.box_function import BoxFunction
-from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
 from MVP.refactored.frontend.canvas_objects.box import Box
 from MVP.refactored.frontend.canvas_objects.connection import Connection
 from MVP.refactored.frontend.canvas_objects.corner import Corner
@@ -79,6 +78,8 @@ class CustomCanvas(tk.Canvas):
             self.id = id(self)
         else:
             self.id = id_
+        # the id can change when the canvas is added to the tree, the undo history keeps using this one
+        self.journal_id = self.id
 
         self.name_text = str(self.id)[-6:]
         self.select_box = None
@@ -100,6 +101,8 @@ class CustomCanvas(tk.Canvas):
         self.bind("<Control-v>", self.paste_copied_items)
         self.bind("<Control-x>", lambda event: self.cut_selected_items())
         self.bind("<Control-n>", lambda event: self.create_sub_diagram())
+        self.bind("<Control-z>", lambda event: self.main_diagram.undo())
+        self.bind("<Control-y>", lambda event: self.main_diagram.redo())
         self.selecting = False
         self.copier = Copier()
         self.hypergraph_exporter = HypergraphExporter(self)
@@ -142,6 +145,7 @@ class CustomCanvas(tk.Canvas):
 
         self.hover_item = None
         self.search_result_highlights = []
+        self.profile_highlights = []
 
         self.wire_label_tags = []
 
@@ -211,6 +215,16 @@ class CustomCanvas(tk.Canvas):
         self.search_result_highlights = []
         self.toggle_search_results_button()
 
+    def remove_profile_highlights(self):
+        """
+        Remove profile highlights from CustomCanvas.
+
+        :return: None
+        """
+        for item in self.profile_highlights:
+            item.deselect()
+        self.profile_highlights = []
+
     def select_all(self):
         """
         Selects all objects in the CustomCanvas.
@@ -274,6 +288,7 @@ class CustomCanvas(tk.Canvas):
             connection.update_location((x, y))
 
         self.move_boxes_spiders('display_x', multiplier)
+        self.update_journal_view(dx=multiplier * self.pan_speed)
         self.pan_speed = 20
 
     def pan_vertical(self, event):
@@ -306,6 +321,7 @@ class CustomCanvas(tk.Canvas):
             connection.update_location((x, y))
 
         self.move_boxes_spiders('display_y', multiplier)
+        self.update_journal_view(dy=multiplier * self.pan_speed)
         self.pan_speed = 20
 
     def move_boxes_spiders(self, attr, multiplier):
@@ -339,7 +355,8 @@ class CustomCanvas(tk.Canvas):
 
         :return: None
         """
-        HypergraphManager.modify_canvas_hypergraph(self)
+        if not self.main_diagram.hypergraph_manager.incremental:
+            self.main_diagram.hypergraph_manager.modify_canvas_hypergraph(self)
         super().delete(*args)
 
     def handle_right_click(self, event):
@@ -422,6 +439,7 @@ class CustomCanvas(tk.Canvas):
                 event.y += y_offset
 
         self.update_coordinates(denominator, event, scale)
+        self.update_journal_view(scale, event.x, event.y)
         self.update_inputs_outputs()
         if self.total_scale - 1 < 0.1:
             self.init_corners()
@@ -479,6 +497,28 @@ class CustomCanvas(tk.Canvas):
         if self.temp_wire:
             self.temp_wire.update()
 
+    def update_journal_view(self, scale=1.0, x=0.0, y=0.0, dx=0.0, dy=0.0):
+        """
+        Update the view of the CustomCanvas in the undo history after zooming or panning.
+
+        Zooming scales the coordinates of all objects around a display location, panning moves them by a display
+        distance.
+
+        :param scale: Zoom factor.
+        :param x: X coordinate of the zoom location on display.
+        :param y: Y coordinate of the zoom location on display.
+        :param dx: Distance panned along the x-axis on display.
+        :param dy: Distance panned along the y-axis on display.
+        :return: None
+        """
+        if scale != 1.0:
+            x, y = self.convert_coords(x, y, to_logical=True)
+            self.main_diagram.journal.view(self.journal_id, scale, x * (1 - scale), y * (1 - scale))
+        else:
+            start_x, start_y = self.convert_coords(0, 0, to_logical=True)
+            end_x, end_y = self.convert_coords(dx, dy, to_logical=True)
+            self.main_diagram.journal.view(self.journal_id, dx=end_x - start_x, dy=end_y - start_y)
+
     def check_max_zoom(self, x, y, denominator):
         """
         Check whether zooming is allowed.
@@ -638,6 +678,7 @@ class CustomCanvas(tk.Canvas):
         """
         self.selector.finalize_selection(self.boxes, self.spiders, self.wires)
         self.selector.select_action()
+        self.main_diagram.journal.checkpoint()
 
     def pull_wire(self, event):
         """
@@ -769,35 +810,38 @@ class CustomCanvas(tk.Canvas):
         if (self.current_wire_start
                 and self.is_wire_between_connections_legal(self.current_wire_start, connection)
                 or bypass_legality_check):
-            start_end: list[Connection] = sorted([self.current_wire_start, connection],
-                                                 key=lambda x: x.location[0])
+            # a type taken over from the other Connection is undone together with the Wire
+            with self.main_diagram.journal.group():
+                start_end: list[Connection] = sorted([self.current_wire_start, connection],
+                                                     key=lambda x: x.location[0])
 
-            if start_end[0].type == ConnectionType.GENERIC:
-                start_end[0].change_type(start_end[1].type.value)
-            if start_end[1].type == ConnectionType.GENERIC:
-                start_end[1].change_type(start_end[0].type.value)
+                if start_end[0].type == ConnectionType.GENERIC:
+                    start_end[0].change_type(start_end[1].type.value)
+                if start_end[1].type == ConnectionType.GENERIC:
+                    start_end[1].change_type(start_end[0].type.value)
 
-            if start_end[0].type != start_end[1].type:
-                return
+                if start_end[0].type != start_end[1].type:
+                    return
 
-            self.cancel_wire_pulling()
+                self.cancel_wire_pulling()
 
-            current_wire = Wire(self, start_end[0], start_end[1],
-                                wire_type=WireType[start_end[0].type.name])
-            self.wires.append(current_wire)
+                current_wire = Wire(self, start_end[0], start_end[1],
+                                    wire_type=WireType[start_end[0].type.name])
+                self.wires.append(current_wire)
 
-            if self.current_wire_start.box is not None:
-                self.current_wire_start.box.add_wire(current_wire)
-            if connection.box is not None:
-                connection.box.add_wire(current_wire)
+                if self.current_wire_start.box is not None:
+                    self.current_wire_start.box.add_wire(current_wire)
+                if connection.box is not None:
+                    connection.box.add_wire(current_wire)
 
-            self.current_wire_start.add_wire(current_wire)
-            connection.add_wire(current_wire)
+                self.current_wire_start.add_wire(current_wire)
+                connection.add_wire(current_wire)
 
-            current_wire.update()
-            self.nullify_wire_start()
+                current_wire.update()
+                self.nullify_wire_start()
 
-        HypergraphManager.modify_canvas_hypergraph(self)
+        if not self.main_diagram.hypergraph_manager.incremental:
+            self.main_diagram.hypergraph_manager.modify_canvas_hypergraph(self)
 
     def cancel_wire_pulling(self, event=None):
         """
@@ -833,6 +877,21 @@ class CustomCanvas(tk.Canvas):
             self.current_wire_start.deselect()
         self.current_wire_start = None
 
+    def record(self, kind, *args, merge=False, follow=False):
+        """
+        Record a change made on the CustomCanvas in the undo history.
+
+        Changes on search canvases are not recorded.
+
+        :param kind: Kind of the change, like "add_box".
+        :param args: Ids and values of the change.
+        :param merge: Merge with the previous change of the same kind on the same object, used while dragging.
+        :param follow: Undo together with the previous change.
+        :return: None
+        """
+        if not self.is_search:
+            self.main_diagram.journal.record((kind, self.journal_id, *args), merge=merge, follow=follow)
+
     def add_box(self, loc=(100, 100), size=(60, 60), id_=None, style=None):
         """
         Add a box to the CustomCanvas.
@@ -849,6 +908,8 @@ class CustomCanvas(tk.Canvas):
             style = self.box_shape
         box = Box(self, *loc, size=size, id_=id_, style=style)
         self.boxes.append(box)
+        self.record("add_box", box.id, box.x, box.y, *box.get_logical_size(box.size), box.style)
+        self.main_diagram.hypergraph_manager.box_added(self, box)
         return box
 
     def get_box_by_id(self, box_id: int) -> Box | None:
@@ -889,6 +950,7 @@ class CustomCanvas(tk.Canvas):
         """
         spider = Spider(loc, self, id_=id_, connection_type=connection_type)
         self.spiders.append(spider)
+        self.record("add_spider", spider.id, spider.x, spider.y, spider.type.name)
         return spider
 
     def add_spider_with_wires(self, start, end, x, y):
@@ -1227,6 +1289,8 @@ class CustomCanvas(tk.Canvas):
                                             connection_id=connection_output_new.id)
 
         self.outputs.append(connection_output_new)
+        self.record("add_io", "output", connection_output_new.id, connection_output_new.type.name)
+        self.main_diagram.hypergraph_manager.canvas_content_changed(self)
         self.update_inputs_outputs()
         return connection_output_new
 
@@ -1268,6 +1332,8 @@ class CustomCanvas(tk.Canvas):
             return
         to_be_removed = self.outputs.pop()
         to_be_removed.delete()
+        self.record("remove_io", "output", to_be_removed.id)
+        self.main_diagram.hypergraph_manager.canvas_content_changed(self)
         self.update_inputs_outputs()
         if self.diagram_source_box is None and self.receiver.listener:
             self.receiver.receiver_callback("remove_diagram_output")
@@ -1295,6 +1361,8 @@ class CustomCanvas(tk.Canvas):
             self.receiver.receiver_callback("add_diagram_input", generator_id=None,
                                             connection_id=new_input.id)
         self.inputs.append(new_input)
+        self.record("add_io", "input", new_input.id, new_input.type.name)
+        self.main_diagram.hypergraph_manager.canvas_content_changed(self)
         self.update_inputs_outputs()
         return new_input
 
@@ -1308,6 +1376,8 @@ class CustomCanvas(tk.Canvas):
             return
         to_be_removed = self.inputs.pop()
         to_be_removed.delete()
+        self.record("remove_io", "input", to_be_removed.id)
+        self.main_diagram.hypergraph_manager.canvas_content_changed(self)
         self.update_inputs_outputs()
         if self.diagram_source_box is None and self.receiver.listener:
             self.receiver.receiver_callback("remove_diagram_input")
@@ -1333,6 +1403,8 @@ class CustomCanvas(tk.Canvas):
 
         self.inputs.remove(con)
         con.delete()
+        self.record("remove_io", "input", con.id)
+        self.main_diagram.hypergraph_manager.canvas_content_changed(self)
         self.update_inputs_outputs()
 
     def remove_specific_diagram_output(self, con):
@@ -1357,6 +1429,8 @@ class CustomCanvas(tk.Canvas):
         self.outputs.remove(con)
 
         con.delete()
+        self.record("remove_io", "output", con.id)
+        self.main_diagram.hypergraph_manager.canvas_content_changed(self)
         self.update_inputs_outputs()
 
     def export_hypergraph(self):
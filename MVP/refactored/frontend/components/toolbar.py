@@ -43,6 +43,17 @@ class Toolbar(ttk.Frame):
         self.file_menu.add_command(label="Import as sub-diagram", command=self.import_sub_diagram)
         self.file_button.pack(side=ttk.LEFT)
 
+        # Edit button
+        self.edit_button = tk.Menubutton(self, text="Edit",
+                                         width=5, indicatoron=False)
+        self.edit_menu = tk.Menu(self.edit_button, tearoff=False)
+        self.edit_button.config(menu=self.edit_menu)
+
+        # Edit menu buttons
+        self.edit_menu.add_command(label="Undo", accelerator="Ctrl+Z", command=lambda: self.main_diagram.undo())
+        self.edit_menu.add_command(label="Redo", accelerator="Ctrl+Y", command=lambda: self.main_diagram.redo())
+        self.edit_button.pack(side=ttk.LEFT)
+
         # View button
         self.view_button = tk.Menubutton(self, text="View",
                                          width=5, indicatoron=False)
@@ -53,6 +64,11 @@ class Toolbar(ttk.Frame):
         self.view_menu.add_command(label="Visualize hypergraph",
                                    command=lambda:
                                    self.main_diagram.visualize_as_graph(self.main_diagram.custom_canvas))
+        self.view_menu.add_command(label="Load profile report", command=lambda: self.main_diagram.load_profile_report())
+        self.view_menu.add_command(label="Clear profile report",
+                                   command=lambda: self.main_diagram.clear_profile_report())
+        self.view_menu.add_command(label="Save callback metrics",
+                                   command=lambda: self.main_diagram.save_callback_metrics())
         self.view_button.pack(side=ttk.LEFT)
 
         # Search button
@@ -109,19 +125,20 @@ class Toolbar(ttk.Frame):
 
         :return: None
         """
-        box = self.main_diagram.custom_canvas.add_box(loc=(200, 100))
-        sub_diagram = box.edit_sub_diagram(switch=False)
-
-        main_canvas = self.main_diagram.importer.canvas
-        self.main_diagram.importer.canvas = sub_diagram
-        is_importing = self.main_diagram.importer.import_diagram()
-        for _ in range(len(sub_diagram.inputs)):
-            box.add_left_connection()
-        for _ in range(len(sub_diagram.outputs)):
-            box.add_right_connection()
-        self.main_diagram.importer.canvas = main_canvas
-        if not is_importing:
-            box.delete_box()
+        with self.main_diagram.journal.group():
+            box = self.main_diagram.custom_canvas.add_box(loc=(200, 100))
+            sub_diagram = box.edit_sub_diagram(switch=False)
+
+            main_canvas = self.main_diagram.importer.canvas
+            self.main_diagram.importer.canvas = sub_diagram
+            is_importing = self.main_diagram.importer.import_diagram()
+            for _ in range(len(sub_diagram.inputs)):
+                box.add_left_connection()
+            for _ in range(len(sub_diagram.outputs)):
+                box.add_right_connection()
+            self.main_diagram.importer.canvas = main_canvas
+            if not is_importing:
+                box.delete_box()
 
     def update_canvas_label(self):
         """
@@ -174,5 +191,6 @@ class Toolbar(ttk.Frame):
                 return
             self.main_diagram.switch_canvas(root_canvas)
             root_canvas.delete_everything()
+            self.main_diagram.journal.clear()
         if import_:
             self.main_diagram.load_from_file()
@@ -0,0 +1,202 @@
+import constants as const
+from MVP.refactored.frontend.canvas_objects.types.connection_type import ConnectionType
+
+
+class JournalPlayer:
+    """
+    Applies the operations that `Journal` undo and redo return to the canvases of the MainDiagram.
+
+    Canvases are found by their `journal_id`, boxes, connections and wires by their ids, indexed once per call to
+    `play`. Operations on objects that do not exist anymore are skipped. The player only uses the primitives of the
+    canvas objects, so removing an input of a sub-diagram does not remove the connection of its box as well, the
+    journal has an operation for each of them.
+    """
+
+    def __init__(self, main_diagram):
+        """
+        JournalPlayer constructor.
+
+        :param main_diagram: MainDiagram whose canvases the operations are applied to.
+        """
+        self.main_diagram = main_diagram
+        self.canvases = {}
+        self.boxes = {}
+        self.connections = {}
+        self.wires = {}
+
+    def play(self, operations):
+        """
+        Apply operations to the diagram.
+
+        :param operations: Operations returned by Journal undo or redo.
+        :return: None
+        """
+        self.index()
+        for kind, canvas_id, *args in operations:
+            canvas = self.canvases.get(canvas_id)
+            if canvas is not None:
+                getattr(self, kind)(canvas, *args)
+
+    def index(self):
+        """
+        Index the canvases and the objects on them by id.
+
+        :return: None
+        """
+        self.canvases = {canvas.journal_id: canvas for canvas in self.main_diagram.canvasses.values()}
+        self.boxes = {}
+        self.connections = {}
+        self.wires = {}
+        for canvas in self.canvases.values():
+            self.index_canvas(canvas)
+
+    def index_canvas(self, canvas):
+        for box in canvas.boxes:
+            self.boxes[canvas.journal_id, box.id] = box
+            for connection in box.connections:
+                self.connections[canvas.journal_id, connection.id] = connection
+        for connection in canvas.inputs + canvas.outputs + canvas.spiders:
+            self.connections[canvas.journal_id, connection.id] = connection
+        for wire in canvas.wires:
+            self.wires[canvas.journal_id, wire.start_connection.id, wire.end_connection.id] = wire
+
+    def add_box(self, canvas, box_id, x, y, width, height, style):
+        box = canvas.add_box((x, y), (width, height), id_=box_id, style=style)
+        self.boxes[canvas.journal_id, box_id] = box
+
+    def remove_box(self, canvas, box_id):
+        box = self.boxes.pop((canvas.journal_id, box_id), None)
+        if box is not None:
+            if box.sub_diagram:
+                self.forget_sub_diagrams(box.sub_diagram)
+            box.delete_box(action="sub_diagram" if box.sub_diagram else None)
+
+    def forget_sub_diagrams(self, canvas):
+        """
+        Remove the sub-diagrams of the boxes on a canvas that is deleted, their tree items go with the canvas.
+
+        :param canvas: CustomCanvas that will be deleted.
+        :return: None
+        """
+        self.canvases.pop(canvas.journal_id, None)
+        for box in canvas.boxes:
+            if box.sub_diagram:
+                self.forget_sub_diagrams(box.sub_diagram)
+                self.main_diagram.canvasses.pop(str(box.sub_diagram.id), None)
+
+    def label(self, canvas, box_id, label):
+        box = self.boxes.get((canvas.journal_id, box_id))
+        if box is not None:
+            box.edit_label(label)
+
+    def move_box(self, canvas, box_id, x, y):
+        box = self.boxes.get((canvas.journal_id, box_id))
+        if box is not None:
+            box.move(*canvas.convert_coords(x, y, to_display=True), bypass_legality=True)
+            box.move_label()
+
+    def resize_box(self, canvas, box_id, width, height):
+        box = self.boxes.get((canvas.journal_id, box_id))
+        if box is not None:
+            box.update_size(width, height)
+            box.move_label()
+
+    def sub_diagram(self, canvas, box_id, sub_diagram_id):
+        box = self.boxes.get((canvas.journal_id, box_id))
+        if box is None or box.sub_diagram:
+            return
+        sub_diagram = box.edit_sub_diagram(save_to_canvasses=False, switch=False)
+        sub_diagram.journal_id = sub_diagram_id
+        # a new canvas starts from the initial view
+        self.main_diagram.journal.reset_view(sub_diagram_id)
+        sub_diagram.set_name(box.label_text if box.label_text else str(sub_diagram.id)[-6:])
+        self.main_diagram.add_canvas(sub_diagram)
+        self.canvases[sub_diagram_id] = sub_diagram
+
+    def remove_sub_diagram(self, canvas, box_id):
+        box = self.boxes.get((canvas.journal_id, box_id))
+        if box is None or not box.sub_diagram:
+            return
+        self.forget_sub_diagrams(box.sub_diagram)
+        self.main_diagram.del_from_canvasses(box.sub_diagram)
+        box.sub_diagram = None
+        canvas.itemconfig(box.shape, fill=const.WHITE)
+
+    def add_connection(self, canvas, box_id, side, connection_id, type_name):
+        box = self.boxes.get((canvas.journal_id, box_id))
+        if box is None:
+            return
+        add = box.add_left_connection if side == "left" else box.add_right_connection
+        connection = add(id_=connection_id, connection_type=ConnectionType[type_name])
+        self.connections[canvas.journal_id, connection_id] = connection
+
+    def remove_connection(self, canvas, box_id, connection_id):
+        box = self.boxes.get((canvas.journal_id, box_id))
+        connection = self.connections.pop((canvas.journal_id, connection_id), None)
+        if box is not None and connection in box.connections:
+            box.remove_connection(connection)
+
+    def add_io(self, canvas, side, connection_id, type_name):
+        add = canvas.add_diagram_input if side == "input" else canvas.add_diagram_output
+        connection = add(id_=connection_id, connection_type=ConnectionType[type_name])
+        self.connections[canvas.journal_id, connection_id] = connection
+
+    def remove_io(self, canvas, side, connection_id):
+        connection = self.connections.pop((canvas.journal_id, connection_id), None)
+        connections = canvas.inputs if side == "input" else canvas.outputs
+        if connection not in connections:
+            return
+        if connection is connections[-1]:
+            if side == "input":
+                canvas.remove_diagram_input()
+            else:
+                canvas.remove_diagram_output()
+            return
+        for other in connections:
+            if other.index > connection.index:
+                other.lessen_index_by_one()
+        connections.remove(connection)
+        connection.delete()
+        self.main_diagram.hypergraph_manager.canvas_content_changed(canvas)
+        canvas.update_inputs_outputs()
+
+    def connection_type(self, canvas, connection_id, type_name):
+        connection = self.connections.get((canvas.journal_id, connection_id))
+        if connection is not None:
+            connection.type = ConnectionType[type_name]
+            connection.update()
+
+    def add_spider(self, canvas, spider_id, x, y, type_name):
+        spider = canvas.add_spider((x, y), id_=spider_id, connection_type=ConnectionType[type_name])
+        self.connections[canvas.journal_id, spider_id] = spider
+
+    def remove_spider(self, canvas, spider_id):
+        spider = self.connections.pop((canvas.journal_id, spider_id), None)
+        if spider in canvas.spiders:
+            spider.delete()
+
+    def move_spider(self, canvas, spider_id, x, y):
+        spider = self.connections.get((canvas.journal_id, spider_id))
+        if spider in canvas.spiders:
+            spider.update_location((x, y))
+            [wire.update() for wire in spider.wires]
+
+    def add_wire(self, canvas, start_id, end_id):
+        start = self.connections.get((canvas.journal_id, start_id))
+        end = self.connections.get((canvas.journal_id, end_id))
+        if start is None or end is None or any(c.has_wire and not c.is_spider() for c in (start, end)):
+            return
+        wire_count = len(canvas.wires)
+        canvas.start_wire_from_connection(start)
+        canvas.end_wire_to_connection(end, True)
+        if len(canvas.wires) > wire_count:
+            wire = canvas.wires[-1]
+            self.wires[canvas.journal_id, wire.start_connection.id, wire.end_connection.id] = wire
+        else:
+            canvas.nullify_wire_start()
+
+    def remove_wire(self, canvas, start_id, end_id):
+        wire = (self.wires.pop((canvas.journal_id, start_id, end_id), None)
+                or self.wires.pop((canvas.journal_id, end_id, start_id), None))
+        if wire is not None and wire in canvas.wires:
+            wire.delete()
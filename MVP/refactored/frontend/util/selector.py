@@ -88,31 +88,32 @@ class Selector:
         coordinates = self.find_corners_selected_items()
         if len(self.selected_boxes) == 0 and len(self.selected_spiders) == 0:
             return
-        x = (coordinates[0] + coordinates[2]) / 2
-        y = (coordinates[1] + coordinates[3]) / 2
-        box = self.canvas.add_box(loc=(x, y), style=const.RECTANGLE)
-        for wire in filter(lambda w: w in self.canvas.wires, self.selected_wires):
-            wire.delete("sub_diagram")
-        for box_ in filter(lambda b: b in self.canvas.boxes, self.selected_boxes):
-            box_.delete_box(keep_sub_diagram=True, action="sub_diagram")
-        for spider in filter(lambda s: s in self.canvas.spiders, self.selected_spiders):
-            spider.delete("sub_diagram")
-            if self.canvas.receiver.listener:
-                self.canvas.receiver.receiver_callback(
-                    'create_spider_parent', wire_id=spider.id, connection_id=spider.id, generator_id=box.id
-                )
-        sub_diagram = box.edit_sub_diagram(save_to_canvasses=False)
-        prev_status = self.canvas.receiver.listener
-        self.canvas.receiver.listener = False
-        self.canvas.copier.copy_canvas_contents(
-            sub_diagram, self.selected_wires, self.selected_boxes, self.selected_spiders, coordinates, box
-        )
-        box.lock_box()
-        self.canvas.receiver.listener = prev_status
-
-        sub_diagram.set_name(str(sub_diagram.id)[-6:])
-        box.set_label(str(sub_diagram.id)[-6:])
-        self.canvas.main_diagram.add_canvas(sub_diagram)
+        with self.canvas.receiver.transaction(), self.canvas.main_diagram.journal.group():
+            x = (coordinates[0] + coordinates[2]) / 2
+            y = (coordinates[1] + coordinates[3]) / 2
+            box = self.canvas.add_box(loc=(x, y), style=const.RECTANGLE)
+            for wire in filter(lambda w: w in self.canvas.wires, self.selected_wires):
+                wire.delete("sub_diagram")
+            for box_ in filter(lambda b: b in self.canvas.boxes, self.selected_boxes):
+                box_.delete_box(keep_sub_diagram=True, action="sub_diagram")
+            for spider in filter(lambda s: s in self.canvas.spiders, self.selected_spiders):
+                spider.delete("sub_diagram")
+                if self.canvas.receiver.listener:
+                    self.canvas.receiver.receiver_callback(
+                        'create_spider_parent', wire_id=spider.id, connection_id=spider.id, generator_id=box.id
+                    )
+            sub_diagram = box.edit_sub_diagram(save_to_canvasses=False)
+            prev_status = self.canvas.receiver.listener
+            self.canvas.receiver.listener = False
+            self.canvas.copier.copy_canvas_contents(
+                sub_diagram, self.selected_wires, self.selected_boxes, self.selected_spiders, coordinates, box
+            )
+            box.lock_box()
+            self.canvas.receiver.listener = prev_status
+
+            sub_diagram.set_name(str(sub_diagram.id)[-6:])
+            box.set_label(str(sub_diagram.id)[-6:])
+            self.canvas.main_diagram.add_canvas(sub_diagram)
 
     def is_within_selection(self, tag, selection_coords):
         x1, y1, x2, y2 = self.canvas.bbox(tag)
@@ -121,15 +122,16 @@ class Selector:
         return selection_coords[0] <= x <= selection_coords[2] and selection_coords[1] <= y <= selection_coords[3]
 
     def delete_selected_items(self):
-        for item in self.selected_items:
-            if isinstance(item, Box):
-                if item.sub_diagram:
-                    action_param = "sub_diagram"
-                else:
-                    action_param = None
-                item.delete_box(action=action_param)
-            if isinstance(item, Spider):
-                item.delete()
+        with self.canvas.main_diagram.journal.group():
+            for item in self.selected_items:
+                if isinstance(item, Box):
+                    if item.sub_diagram:
+                        action_param = "sub_diagram"
+                    else:
+                        action_param = None
+                    item.delete_box(action=action_param)
+                if isinstance(item, Spider):
+                    item.delete()
         self.selected_items.clear()
 
     def copy_selected_items(self, canvas=None):
@@ -151,38 +153,39 @@ class Selector:
 
     def paste_copied_items(self, event_x=50, event_y=50, replace=False, multi=1):
         if len(self.copied_items) > 0:
-            event_x, event_y = self.canvas.convert_coords(event_x, event_y, to_logical=True)
-            middle_point = self.find_middle_point(event_x, event_y)
-            wires = self.copied_left_wires + self.copied_right_wires
-            pasted_items = []
-
-            for item in self.copied_items:
-                x, y = item['location']
-                loc = (event_x + (x - middle_point[0]) * multi,
-                       event_y + (y - middle_point[1]) * multi)
-                if item['component'] == "Box":
-                    new_box = self.paste_box(item, loc, self.copied_wire_list, wires, self.canvas, multi=multi,
-                                             replace=replace, return_box=True)
-                    pasted_items.append(new_box)
-
-                if item['component'] == "Spider":
-                    new_spider = self.canvas.add_spider(loc, connection_type=item['type'])
-                    pasted_items.append(new_spider)
-                    for wire in self.copied_wire_list:
-                        if wire['original_start_connection'] == item['id']:
-                            wire['start_connection'] = new_spider
-                        if wire['original_end_connection'] == item['id']:
-                            wire['end_connection'] = new_spider
-                    if replace:
-                        for wire in wires:
+            with self.canvas.receiver.transaction(), self.canvas.main_diagram.journal.group():
+                event_x, event_y = self.canvas.convert_coords(event_x, event_y, to_logical=True)
+                middle_point = self.find_middle_point(event_x, event_y)
+                wires = self.copied_left_wires + self.copied_right_wires
+                pasted_items = []
+
+                for item in self.copied_items:
+                    x, y = item['location']
+                    loc = (event_x + (x - middle_point[0]) * multi,
+                           event_y + (y - middle_point[1]) * multi)
+                    if item['component'] == "Box":
+                        new_box = self.paste_box(item, loc, self.copied_wire_list, wires, self.canvas, multi=multi,
+                                                 replace=replace, return_box=True)
+                        pasted_items.append(new_box)
+
+                    if item['component'] == "Spider":
+                        new_spider = self.canvas.add_spider(loc, connection_type=item['type'])
+                        pasted_items.append(new_spider)
+                        for wire in self.copied_wire_list:
                             if wire['original_start_connection'] == item['id']:
                                 wire['start_connection'] = new_spider
-
-            for wire in self.copied_wire_list:
-                self.canvas.start_wire_from_connection(wire['start_connection'])
-                self.canvas.end_wire_to_connection(wire['end_connection'])
-            if replace:
-                self.add_edge_wires(pasted_items)
+                            if wire['original_end_connection'] == item['id']:
+                                wire['end_connection'] = new_spider
+                        if replace:
+                            for wire in wires:
+                                if wire['original_start_connection'] == item['id']:
+                                    wire['start_connection'] = new_spider
+
+                for wire in self.copied_wire_list:
+                    self.canvas.start_wire_from_connection(wire['start_connection'])
+                    self.canvas.end_wire_to_connection(wire['end_connection'])
+                if replace:
+                    self.add_edge_wires(pasted_items)
 
     def paste_canvas(self, canvas, canvas_id):
         for diagram in self.copied_sub_diagrams:
@@ -6,6 +6,7 @@ from tkinter import messagebox
 import pygments.lexers
 from chlorophyll import CodeView
 
+from MVP.refactored.backend.box_functions.box_function import compiled_functions
 from MVP.refactored.util.exporter.code_exporter import CodeExporter
 import constants as const
 
@@ -182,4 +183,6 @@ class CodeEditor:
             for box in canvas.boxes:
                 if box.label_text == self.label:
                     box.update_io()
+        if self.label in self.main_diagram.label_content:
+            compiled_functions.invalidate(self.main_diagram.label_content[self.label])
         self.main_diagram.label_content[self.label] = self.code_view.get('1.0', tk.END)
@@ -2,6 +2,7 @@ import hashlib
 import json
 import os
 import tkinter as tk
+from tkinter import filedialog
 from tkinter import messagebox
 from tkinter import simpledialog
 
@@ -15,12 +16,15 @@ from ttkbootstrap.constants import *
 
 import tikzplotlib
 from MVP.refactored.backend.code_generation.code_generator import CodeGenerator
+from MVP.refactored.backend.execution.profiler import Profiler
 from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
+from MVP.refactored.backend.journal import Journal
 from MVP.refactored.frontend.canvas_objects.box import Box
 from MVP.refactored.frontend.canvas_objects.types.wire_types import WireType
 from MVP.refactored.frontend.components.custom_canvas import CustomCanvas
 from MVP.refactored.frontend.components.toolbar import Toolbar
 from MVP.refactored.frontend.components.rotation_button import RotationButton
+from MVP.refactored.frontend.util.journal_player import JournalPlayer
 from MVP.refactored.frontend.util.selector import Selector
 from MVP.refactored.frontend.windows.code_editor import CodeEditor
 from MVP.refactored.frontend.windows.manage_boxes import ManageBoxes
@@ -38,16 +42,20 @@ class MainDiagram(tk.Tk):
     that you see when using the application.
     """
 
-    def __init__(self, receiver, load=False):
+    def __init__(self, receiver, load=False, journal_size=100000):
         """
         MainDiagram constructor.
 
         :param receiver: Receiver object for sending information to backend.
         :param load: Boolean if a diagram should be loaded upon opening.
+        :param journal_size: (Optional) Maximum number of changes kept for undo.
         """
         super().__init__()
         self.title("Dynamic String Diagram Canvas")
         self.receiver = receiver
+        self.journal = Journal(max_operations=journal_size)
+        self.journal_player = JournalPlayer(self)
+        self.hypergraph_manager = HypergraphManager(incremental=True)
 
         self.toolbar = Toolbar(self)
         self.toolbar.pack(side='top', fill='both')
@@ -177,6 +185,8 @@ class MainDiagram(tk.Tk):
 
         if load:
             self.load_from_file()
+        # a loaded diagram is where the history starts
+        self.journal.clear()
         self.json_file_hash = self.calculate_boxes_json_file_hash()
         self.label_content = {}
         self.load_functions()
@@ -223,6 +233,103 @@ class MainDiagram(tk.Tk):
         code = CodeGenerator.generate_code(self.custom_canvas, self.canvasses, self)
         CodeEditor(self, code=code, is_generated=True)
 
+    def load_profile_report(self):
+        """
+        Show the hot boxes of a profile report.
+
+        Asks for a report saved by `Profiler.save_report` and colors the outline of every profiled Box in every
+        CustomCanvas by its share of the time of the slowest Box. The slowest boxes are also listed in a dialog.
+
+        :return: None
+        """
+        file_path = filedialog.askopenfilename(filetypes=[("JSON files", "*.json")], title="Load profile report")
+        if not file_path:
+            return
+        try:
+            report = Profiler.load_report(file_path)
+        except (OSError, ValueError, KeyError) as error:
+            self.show_error_dialog(f"Could not load profile report: {error}")
+            return
+        self.clear_profile_report()
+        slowest = max((box["wall_time"] for box in report.values()), default=0) or 1
+        for canvas in self.canvasses.values():
+            for box in canvas.boxes:
+                if box.id in report:
+                    share = report[box.id]["wall_time"] / slowest
+                    box.profile_highlight(const.PROFILE_COLORS[min(int(share * len(const.PROFILE_COLORS)),
+                                                                   len(const.PROFILE_COLORS) - 1)])
+        hot_boxes = sorted(report.values(), key=lambda box: box["wall_time"], reverse=True)[:5]
+        messagebox.showinfo("Hot boxes", "\n".join(
+            f"{box['label']} ({box['box_id']}): {box['wall_time'] * 1000:.1f} ms in {box['calls']} calls"
+            for box in hot_boxes))
+
+    def clear_profile_report(self):
+        """
+        Remove the profile highlights from every CustomCanvas.
+
+        :return: None
+        """
+        for canvas in self.canvasses.values():
+            canvas.remove_profile_highlights()
+
+    def save_callback_metrics(self):
+        """
+        Save the callback metrics of the Receiver as JSON or in the Prometheus text format.
+
+        The editor records them when started with `--metrics`.
+
+        :return: None
+        """
+        if self.receiver.metrics is None:
+            messagebox.showinfo("Callback metrics", "Start the editor with --metrics to record callback metrics.")
+            return
+        file_path = filedialog.asksaveasfilename(defaultextension=".json", title="Save callback metrics",
+                                                 filetypes=[("JSON files", "*.json"),
+                                                            ("Prometheus text files", "*.prom")])
+        if not file_path:
+            return
+        self.receiver.flush()
+        try:
+            self.receiver.metrics.save(file_path)
+        except OSError as error:
+            self.show_error_dialog(f"Could not save callback metrics: {error}")
+
+    def undo(self):
+        """
+        Undo the last change of the diagram.
+
+        :return: None
+        """
+        self.apply_journal_operations(self.journal.undo())
+
+    def redo(self):
+        """
+        Redo the last undone change of the diagram.
+
+        :return: None
+        """
+        self.apply_journal_operations(self.journal.redo())
+
+    def apply_journal_operations(self, operations):
+        """
+        Apply operations from undo or redo to the diagram without recording them.
+
+        Callbacks to the backend are sent in one Receiver transaction. If the open canvas was removed, the root canvas
+        is opened.
+
+        :param operations: Operations returned by the journal, None if there was nothing to undo or redo.
+        :return: None
+        """
+        if not operations:
+            return
+        self.custom_canvas.selector.finish_selection()
+        self.custom_canvas.nullify_wire_start()
+        self.custom_canvas.cancel_wire_pulling()
+        with self.receiver.transaction(), self.journal.suspended():
+            self.journal_player.play(operations)
+        if self.custom_canvas not in self.canvasses.values():
+            self.switch_canvas(self.canvasses[self.tree_root_id])
+
     def open_manage_methods_window(self):
         """
         Open ManageMethods window.
@@ -393,7 +500,7 @@ class MainDiagram(tk.Tk):
         :param canvas: CustomCanvas that will be visualized.
         :return: None
         """
-        hypergraph = HypergraphManager.get_graph_by_id(canvas.id)
+        hypergraph = self.hypergraph_manager.get_graph_by_id(canvas.id)
         if hypergraph is None:
             messagebox.showerror("Error", f"No hypergraph found with ID: {canvas.id}")
             return
@@ -602,9 +709,10 @@ class MainDiagram(tk.Tk):
         :return: Box connection and diagram input tags.
         """
         box_c = None
-        if self.custom_canvas.diagram_source_box:
-            box_c = self.custom_canvas.diagram_source_box.add_left_connection()
-        canvas_i = self.custom_canvas.add_diagram_input(id_=id_)
+        with self.journal.group():
+            if self.custom_canvas.diagram_source_box:
+                box_c = self.custom_canvas.diagram_source_box.add_left_connection()
+            canvas_i = self.custom_canvas.add_diagram_input(id_=id_)
         return box_c, canvas_i
 
     def add_diagram_output(self, id_=None):
@@ -615,9 +723,10 @@ class MainDiagram(tk.Tk):
         :return: Box connection and diagram output tags.
         """
         box_c = None
-        if self.custom_canvas.diagram_source_box:
-            box_c = self.custom_canvas.diagram_source_box.add_right_connection()
-        canvas_o = self.custom_canvas.add_diagram_output(id_=id_)
+        with self.journal.group():
+            if self.custom_canvas.diagram_source_box:
+                box_c = self.custom_canvas.diagram_source_box.add_right_connection()
+            canvas_o = self.custom_canvas.add_diagram_output(id_=id_)
         return box_c, canvas_o
 
     def remove_diagram_input(self):
@@ -627,10 +736,11 @@ class MainDiagram(tk.Tk):
         :return: None
         """
         if self.custom_canvas.diagram_source_box:
-            c = self.find_connection_to_remove(const.LEFT)
-            if c:
-                self.custom_canvas.diagram_source_box.remove_connection(c)
-            self.custom_canvas.remove_diagram_input()
+            with self.journal.group():
+                c = self.find_connection_to_remove(const.LEFT)
+                if c:
+                    self.custom_canvas.diagram_source_box.remove_connection(c)
+                self.custom_canvas.remove_diagram_input()
             if self.receiver.listener:
                 self.receiver.receiver_callback("remove_inner_left",
                                                 generator_id=self.custom_canvas.diagram_source_box.id)
@@ -644,11 +754,11 @@ class MainDiagram(tk.Tk):
         :return: None
         """
         if self.custom_canvas.diagram_source_box:
-
-            c = self.find_connection_to_remove(const.RIGHT)
-            if c:
-                self.custom_canvas.diagram_source_box.remove_connection(c)
-            self.custom_canvas.remove_diagram_output()
+            with self.journal.group():
+                c = self.find_connection_to_remove(const.RIGHT)
+                if c:
+                    self.custom_canvas.diagram_source_box.remove_connection(c)
+                self.custom_canvas.remove_diagram_output()
             if self.receiver.listener:
                 self.receiver.receiver_callback("remove_inner_right",
                                                 generator_id=self.custom_canvas.diagram_source_box.id)
@@ -5,6 +5,7 @@ from tkinter import simpledialog, messagebox, filedialog
 import ttkbootstrap as ttk
 
 import constants as const
+from MVP.refactored.backend.box_functions.box_function import compiled_functions
 from MVP.refactored.frontend.windows.code_editor import CodeEditor
 
 
@@ -145,7 +146,7 @@ class ManageMethods(tk.Toplevel):
         """
         label = self.table.item(self.table.focus())["text"]
         item = self.table.selection()[0]
-        del self.main_diagram.label_content[label]
+        compiled_functions.invalidate(self.main_diagram.label_content.pop(label))
         self.table.delete(item)
         self.write_to_json(self.main_diagram.label_content)
         for canvas in self.main_diagram.canvasses.values():
@@ -1,3 +1,5 @@
+import logging
+import sys
 import tkinter as tk
 from tkinter import font  # Import the font module
 from tkinter import messagebox
@@ -5,16 +7,18 @@ from tkinter import messagebox
 import hupper
 
 from MVP.refactored.backend.diagram_callback import Receiver
+from MVP.refactored.backend.metrics import CallbackMetrics
 from MVP.refactored.frontend.windows.main_diagram import MainDiagram
 
 
 class Launcher:
-    def __init__(self):
+    def __init__(self, threaded_receiver=False, metrics=False, journal_size=100000):
         # Create the main window
         self.root = tk.Tk()
         self.root.title("String Diagrams")
         self.root.resizable(False, False)
-        self.receiver = Receiver()
+        self.receiver = Receiver(threaded=threaded_receiver, metrics=CallbackMetrics() if metrics else None)
+        self.journal_size = journal_size
 
         # Get the screen dimensions
         screen_width = self.root.winfo_screenwidth()
@@ -54,18 +58,23 @@ class Launcher:
 
     def create_new_diagram(self):
         self.root.destroy()
-        MainDiagram(self.receiver)
+        MainDiagram(self.receiver, journal_size=self.journal_size)
 
     def import_from_file(self):
         self.root.destroy()
-        MainDiagram(self.receiver, True)
+        MainDiagram(self.receiver, True, journal_size=self.journal_size)
 
     def exit_program(self):
         self.root.destroy()
 
 
 def start_program():
-    Launcher()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    options = {}
+    for arg in sys.argv:
+        if arg.startswith("--journal-size="):
+            options["journal_size"] = int(arg.split("=", 1)[1])
+    Launcher(threaded_receiver="--threaded-receiver" in sys.argv, metrics="--metrics" in sys.argv, **options)
 
 
 if __name__ == '__main__':
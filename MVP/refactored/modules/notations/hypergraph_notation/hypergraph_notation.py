@@ -3,6 +3,9 @@ from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManag
 
 class HypergraphNotation:
 
+    def __init__(self, hypergraph_manager: HypergraphManager):
+        self.hypergraph_manager = hypergraph_manager
+
     def get_all_hypergraph_notations(self) -> str:
-        hypergraphs = HypergraphManager.hypergraphs
+        hypergraphs = self.hypergraph_manager.hypergraphs
         return "\n\n".join([str(hypergraph) for hypergraph in hypergraphs])
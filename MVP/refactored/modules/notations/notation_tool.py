@@ -19,8 +19,9 @@ def is_canvas_complete(canvas):
 
 def get_notations(canvas):
     pseudo = PseudoNotation()
+    canvas.receiver.flush()
     diagram_notation = DiagramNotation(canvas.receiver.diagram)
-    hypergraph_notation = HypergraphNotation()
+    hypergraph_notation = HypergraphNotation(canvas.main_diagram.hypergraph_manager)
 
     # TODO add all different notations here
     ...
@@ -0,0 +1,49 @@
+import unittest
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction, CompiledFunctionCache, compiled_functions
+
+INCREMENT = """def invoke(x):
+    return x + 1
+
+
+meta = {"name": "Increment", "min_args": 1, "max_args": 1}
+"""
+
+
+class CompiledFunctionCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = CompiledFunctionCache(max_size=2)
+
+    def test__get__compiles_each_code_once(self):
+        function, meta = self.cache.get(INCREMENT)
+        self.assertIs(function, self.cache.get(INCREMENT)[0])
+        self.assertEqual("Increment", meta["name"])
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    def test__get__evicts_least_recently_used(self):
+        first, second, third = (INCREMENT.replace("x + 1", f"x + {i}") for i in range(3))
+        self.cache.get(first)
+        self.cache.get(second)
+        self.cache.get(first)
+        self.cache.get(third)
+        self.assertEqual(2, len(self.cache))
+        self.assertIn(self.cache.key(first), self.cache.entries)
+        self.assertNotIn(self.cache.key(second), self.cache.entries)
+
+    def test__invalidate__drops_replaced_code(self):
+        self.cache.get(INCREMENT)
+        self.cache.invalidate(INCREMENT)
+        self.cache.get(INCREMENT)
+        self.assertEqual(2, self.cache.misses)
+
+    def test__box_function__shares_compiled_function(self):
+        self.assertIs(BoxFunction("increment", code=INCREMENT).function,
+                      BoxFunction("other name", code=INCREMENT).function)
+        self.assertIs(BoxFunction("add").function, BoxFunction("add").function)
+        self.assertIn(CompiledFunctionCache.key(BoxFunction("add").code), compiled_functions.entries)
+
+    def test__box_function__edited_code_is_compiled_again(self):
+        before = BoxFunction("increment", code=INCREMENT)
+        after = BoxFunction("increment", code=INCREMENT.replace("x + 1", "x + 2"))
+        self.assertEqual((2, 3), (before(1), after(1)))
@@ -0,0 +1,87 @@
+import pickle
+import unittest
+
+import numpy as np
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction
+from MVP.refactored.backend.box_functions.memo import Memo
+
+PURE_SQUARE = """def invoke(x):
+    return x * x
+
+
+meta = {"name": "Square", "min_args": 1, "max_args": 1, "pure": True, "cache_size": 2}
+"""
+
+
+class MemoTests(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+        def square(x):
+            self.calls.append(x)
+            return x * x
+
+        self.memo = Memo(square, max_size=2, max_array_bytes=64)
+
+    def test__call__caches_results(self):
+        self.assertEqual(9, self.memo(3))
+        self.assertEqual(9, self.memo(3))
+        self.assertEqual([3], self.calls)
+        self.assertEqual((1, 1), (self.memo.hits, self.memo.misses))
+
+    def test__call__keys_on_type(self):
+        self.memo(1)
+        self.memo(True)
+        self.memo(1.0)
+        self.assertEqual(3, len(self.calls))
+
+    def test__call__evicts_least_recently_used(self):
+        self.memo(1)
+        self.memo(2)
+        self.memo(1)
+        self.memo(3)
+        self.memo(1)
+        self.assertEqual([1, 2, 3], self.calls)
+        self.assertEqual(2, len(self.memo))
+
+    def test__call__keys_arrays_by_content(self):
+        result = self.memo(np.arange(4))
+        self.assertIs(result, self.memo(np.arange(4)))
+        self.memo(np.arange(4, dtype=np.int8))
+        self.memo(np.arange(4).reshape(2, 2))
+        self.assertEqual(3, len(self.calls))
+
+    def test__call__passes_large_and_unhashable_arguments_through(self):
+        memo = Memo(len, max_array_bytes=64)
+        self.assertEqual(100, memo(np.arange(100)))
+        memo(np.arange(100))
+        memo({1: 2})
+        memo(np.array([None]))
+        self.assertEqual((0, 0, 4), (memo.hits, memo.misses, memo.uncached))
+
+    def test__call__keys_nested_sequences(self):
+        memo = Memo(len)
+        memo([1, (2, np.zeros(2))])
+        memo([1, (2, np.zeros(2))])
+        memo((1, (2, np.zeros(2))))
+        self.assertEqual((1, 2), (memo.hits, memo.misses))
+
+    def test__pickle__starts_empty(self):
+        memo = Memo(BoxFunction("square", code=PURE_SQUARE), 2)
+        memo(3)
+        copy = pickle.loads(pickle.dumps(memo))
+        self.assertEqual(0, len(copy))
+        self.assertEqual(16, copy(4))
+
+
+class MemoSizeTests(unittest.TestCase):
+
+    def test__memo_size__of_pure_function(self):
+        self.assertEqual(2, BoxFunction("square", code=PURE_SQUARE).memo_size)
+        self.assertEqual(128, BoxFunction("square", code=PURE_SQUARE.replace(', "cache_size": 2', "")).memo_size)
+
+    def test__memo_size__of_impure_and_coroutine_functions(self):
+        self.assertIsNone(BoxFunction("add").memo_size)
+        self.assertIsNone(BoxFunction("square", code=PURE_SQUARE.replace("def invoke", "async def invoke")).memo_size)
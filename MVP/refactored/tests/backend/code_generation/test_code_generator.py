@@ -0,0 +1,244 @@
+import asyncio
+import os
+import tempfile
+import unittest
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction
+from MVP.refactored.backend.code_generation.code_generator import CodeGenerator
+from MVP.refactored.backend.execution.executor import DiagramExecutor
+from MVP.refactored.tests.backend.synthetic import SyntheticCanvas, build_chain, build_nested, build_wide
+
+INCREMENT = """def invoke(x):
+    return x + 1
+
+
+meta = {"name": "Increment", "min_args": 1, "max_args": 1}
+"""
+
+SLOW_ADD = """import asyncio
+
+
+async def invoke(a, b):
+    await asyncio.sleep(0.05)
+    return a + b
+
+
+meta = {"name": "Slow add", "min_args": 2, "max_args": 2}
+"""
+
+
+class ParallelMainFunctionTests(unittest.TestCase):
+
+    def construct_main_function(self, canvas, parallel=None):
+        canvas.main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+        add = BoxFunction("add")
+        main_function = CodeGenerator.construct_main_function(canvas, {add: "add"}, parallel, max_workers=2)
+        namespace = {"add": add}
+        exec("from concurrent.futures import ThreadPoolExecutor\n" + main_function, namespace)
+        return main_function, namespace["main"]
+
+    def test__construct_main_function__submits_every_level_to_pool(self):
+        main_function, main = self.construct_main_function(build_wide(4), parallel="thread")
+        self.assertIn("with ThreadPoolExecutor(max_workers=2) as pool:", main_function)
+        self.assertEqual(2, main_function.count("futures = ["))
+        self.assertEqual(sum(range(8)), main(*range(8)))
+
+    def test__construct_main_function__parallel_matches_sequential(self):
+        _, sequential = self.construct_main_function(build_chain(4))
+        _, parallel = self.construct_main_function(build_chain(4), parallel="thread")
+        self.assertEqual(sequential(*range(5)), parallel(*range(5)))
+
+    def test__get_levels__chain(self):
+        canvas = build_chain(3)
+        canvas.main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+        hypergraph = canvas.main_diagram.hypergraph_manager.get_graph_by_id(canvas.id)
+        levels = CodeGenerator.get_levels([hypergraph.get_node(box.id) for box in canvas.boxes], hypergraph)
+        self.assertEqual([[box.id] for box in canvas.boxes], [[node.id for node in level] for level in levels])
+
+
+class AsyncMainFunctionTests(unittest.TestCase):
+
+    def construct_main_function(self, canvas):
+        canvas.main_diagram.label_content["slow_add"] = SLOW_ADD
+        canvas.main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+        add, slow_add = BoxFunction("add"), BoxFunction("slow_add", code=SLOW_ADD)
+        main_function = CodeGenerator.construct_main_function(canvas, {add: "add", slow_add: "slow_add"},
+                                                              parallel="asyncio")
+        namespace = {"asyncio": asyncio, "add": add, "slow_add": slow_add}
+        exec(main_function, namespace)
+        return main_function, namespace["main"]
+
+    def test__construct_main_function__gathers_every_level(self):
+        main_function, main = self.construct_main_function(build_wide(4, label="slow_add"))
+        self.assertTrue(main_function.startswith("async def main("))
+        self.assertEqual(2, main_function.count("await asyncio.gather("))
+        self.assertEqual(sum(range(8)), asyncio.run(main(*range(8))))
+
+    def test__construct_main_function__runs_sync_boxes_in_threads(self):
+        canvas = build_wide(2, label="slow_add")
+        canvas.boxes[0].label_text = "add"
+        main_function, main = self.construct_main_function(canvas)
+        self.assertIn("asyncio.to_thread(add, ", main_function)
+        self.assertEqual(sum(range(4)), asyncio.run(main(*range(4))))
+
+    def test__construct_main_function__awaits_single_coroutine(self):
+        main_function, main = self.construct_main_function(build_chain(2, label="slow_add"))
+        self.assertEqual(2, main_function.count("= await slow_add("))
+        self.assertEqual(6, asyncio.run(main(1, 2, 3)))
+
+
+class GenerateCodeTests(unittest.TestCase):
+
+    def setUp(self):
+        # generate_code writes diagram.py into the working directory
+        self.working_directory = os.getcwd()
+        self.temporary_directory = tempfile.TemporaryDirectory()
+        os.chdir(self.temporary_directory.name)
+        CodeGenerator.fragments.clear()
+
+    def tearDown(self):
+        os.chdir(self.working_directory)
+        self.temporary_directory.cleanup()
+
+    def generate_code(self, canvas):
+        canvas.main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+        return CodeGenerator.generate_code(canvas, canvas.main_diagram.canvasses, canvas.main_diagram)
+
+    def run_code(self, code, *inputs):
+        namespace = {}
+        exec(code, namespace)
+        return namespace["main"](*inputs)
+
+    def test__generate_code__renders_runnable_module(self):
+        canvas = build_chain(30)
+        code = self.generate_code(canvas)
+        self.assertIn("def main(input_1=None, input_2=None, ", code)
+        self.assertNotIn("\t", code)
+        self.assertNotIn("meta", code)
+        self.assertEqual(sum(range(31)), self.run_code(code, *range(31)))
+        with open("diagram.py") as file:
+            self.assertEqual(code, file.read())
+
+    def test__generate_code__formatted(self):
+        canvas = build_chain(2)
+        canvas.main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+        code = CodeGenerator.generate_code(canvas, {}, canvas.main_diagram, formatted=True)
+        self.assertEqual(3, self.run_code(code, 0, 1, 2))
+        self.assertEqual(code, CodeGenerator.generate_code(canvas, {}, canvas.main_diagram))
+
+    def test__generate_code__reuses_unchanged_fragments(self):
+        canvas = build_chain(5)
+        code = self.generate_code(canvas)
+        self.assertEqual(code, self.generate_code(canvas))
+        self.assertEqual((2, 2), (CodeGenerator.fragments.hits, CodeGenerator.fragments.misses))
+
+        canvas.boxes[2].label_text = "subtract"
+        code = self.generate_code(canvas)
+        # the add function is reused, the subtract function and main are generated
+        self.assertEqual((3, 4), (CodeGenerator.fragments.hits, CodeGenerator.fragments.misses))
+        self.assertEqual(0 + 1 + 2 - 3 + 4 + 5, self.run_code(code, *range(6)))
+
+    def test__generate_code__edited_code_regenerates_function(self):
+        canvas = build_chain(2, label="slow_add")
+        canvas.main_diagram.label_content["slow_add"] = SLOW_ADD
+        self.generate_code(canvas)
+        canvas.main_diagram.label_content["slow_add"] = SLOW_ADD.replace("0.05", "0")
+        code = self.generate_code(canvas)
+        self.assertIn("asyncio.sleep(0)", code)
+
+    def test__generate_code__one_function_per_distinct_sub_diagram(self):
+        canvas = build_nested(3, 2, label="increment")
+        canvas.main_diagram.label_content["increment"] = INCREMENT
+        code = self.generate_code(canvas)
+        self.assertEqual(2, code.count("def sub_diagram_"))
+        self.assertEqual(1, code.count("def invoke"))
+        self.assertEqual(DiagramExecutor().execute(canvas, 0)[0], self.run_code(code, 0))
+
+    def test__generate_code__module_grows_with_distinct_sub_diagrams(self):
+        small = self.generate_code(build_nested(3, 2))
+        large = self.generate_code(build_nested(3, 4))
+        self.assertEqual(small.count("def "), large.count("def "))
+        self.assertEqual(3, self.generate_code(build_nested(4, 3)).count("def sub_diagram_"))
+
+    def test__generate_code__spider_fed_outputs(self):
+        canvas = SyntheticCanvas()
+        box = canvas.add_box("add")
+        canvas.connect(canvas.add_input(), box.add_connection("left"))
+        canvas.connect(canvas.add_input(), box.add_connection("left"))
+        first, second = canvas.add_spider(), canvas.add_spider()
+        canvas.connect(box.add_connection("right"), first)
+        canvas.connect(first, second)
+        canvas.connect(second, canvas.add_output())
+        canvas.connect(canvas.add_output(), first)
+        code = self.generate_code(canvas)
+        self.assertEqual((5, 5), self.run_code(code, 2, 3))
+
+    def test__generate_code__spider_feeds_several_inputs_of_one_box(self):
+        canvas = SyntheticCanvas()
+        spider = canvas.add_spider()
+        canvas.connect(canvas.add_input(), spider)
+        box = canvas.add_box("add")
+        canvas.connect(spider, box.add_connection("left"))
+        canvas.connect(spider, box.add_connection("left"))
+        canvas.connect(box.add_connection("right"), canvas.add_output())
+        self.assertEqual(8, self.run_code(self.generate_code(canvas), 4))
+
+    def test__generate_code__undriven_spider_output_raises(self):
+        canvas = build_chain(2)
+        canvas.connect(canvas.add_spider(), canvas.add_output())
+        with self.assertRaisesRegex(ValueError, "not driven"):
+            self.generate_code(canvas)
+
+    def test__generate_code__does_not_register_sub_diagrams(self):
+        canvas = build_nested(2, 2, label="increment")
+        canvas.main_diagram.label_content["increment"] = INCREMENT
+        code = CodeGenerator.generate_code(canvas, canvas.main_diagram.canvasses, canvas.main_diagram)
+        self.assertEqual(4, self.run_code(code, 0))
+        self.assertEqual([], canvas.main_diagram.hypergraph_manager.hypergraphs)
+
+    def test__generate_code__invalid_sub_diagram_raises(self):
+        canvas = build_nested(2, 2)
+        canvas.main_diagram.canvasses[str(canvas.boxes[0].id)].add_box("add")
+        with self.assertRaisesRegex(ValueError, "Cannot generate code for canvas"):
+            self.generate_code(canvas)
+
+    def test__generate_code__awaits_sub_diagrams(self):
+        canvas = build_nested(2, 2, label="increment")
+        canvas.main_diagram.label_content["increment"] = INCREMENT.replace("def invoke", "async def invoke")
+        canvas.main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+        code = CodeGenerator.generate_code(canvas, canvas.main_diagram.canvasses, canvas.main_diagram,
+                                           parallel=CodeGenerator.ASYNCIO)
+        self.assertIn("async def sub_diagram_0", code)
+        self.assertEqual(4, asyncio.run(self.run_code(code, 0)))
+
+    def test__generate_code__profiled_module_records_every_box(self):
+        canvas = build_nested(2, 2, label="increment")
+        canvas.main_diagram.label_content["increment"] = INCREMENT
+        canvas.main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+        code = CodeGenerator.generate_code(canvas, canvas.main_diagram.canvasses, canvas.main_diagram,
+                                           parallel="thread", profile=True)
+        namespace = {}
+        exec(code, namespace)
+        self.assertEqual(4, namespace["main"](0))
+        profiles = namespace["profiler"].profiles
+        canvasses = canvas.main_diagram.canvasses
+        self.assertEqual(4, sum(profile.calls for box_id, profile in profiles.items() if str(box_id) not in canvasses))
+        self.assertEqual(2, sum(profile.calls for box_id, profile in profiles.items() if str(box_id) in canvasses))
+
+    def test__generate_code__profile_with_process_pool(self):
+        canvas = build_chain(2)
+        with self.assertRaises(ValueError):
+            CodeGenerator.generate_code(canvas, canvas.main_diagram.canvasses, canvas.main_diagram,
+                                        parallel="process", profile=True)
+
+    def test__generate_code__memoizes_pure_boxes(self):
+        canvas = build_nested(2, 2, label="increment")
+        canvas.main_diagram.label_content["increment"] = INCREMENT.replace('"max_args": 1', '"max_args": 1, "pure": True')
+        code = self.generate_code(canvas)
+        self.assertIn("invoke_0_memo = Memo(invoke_0, 128)", code)
+        namespace = {}
+        exec(code, namespace)
+        self.assertEqual(4, namespace["main"](0))
+        self.assertEqual(4, namespace["main"](0))
+        memo = namespace["invoke_0_memo"]
+        self.assertEqual((4, 4), (memo.hits, memo.misses))
@@ -0,0 +1,61 @@
+import unittest
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction
+from MVP.refactored.backend.code_generation.code_generator import CodeGenerator
+from MVP.refactored.backend.code_generation.renamer import Renamer
+
+CODE = """OFFSET = 10
+counter = 0
+
+
+def helper(x):
+    return x + OFFSET
+
+
+def invoke(a, b):
+    global counter
+    counter += 1
+    OFFSET = a
+    return helper(OFFSET) + b + counter
+
+
+meta = {"name": "Custom", "min_args": 2, "max_args": 2}
+"""
+
+
+class RenamerTests(unittest.TestCase):
+
+    def rename_and_run(self, code, suffix="_0"):
+        renamed, mapping = Renamer.rename(code, suffix)
+        namespace = {}
+        exec(renamed, namespace)
+        return renamed, mapping, namespace
+
+    def test__rename__module_level_names_except_meta(self):
+        _, mapping, namespace = self.rename_and_run(CODE)
+        self.assertEqual({"OFFSET": "OFFSET_0", "counter": "counter_0", "helper": "helper_0", "invoke": "invoke_0"},
+                         mapping)
+        self.assertIn("meta", namespace)
+        self.assertNotIn("invoke", namespace)
+
+    def test__rename__keeps_locals_and_renames_declared_globals(self):
+        renamed, _, namespace = self.rename_and_run(CODE)
+        self.assertIn("global counter_0", renamed)
+        self.assertIn("OFFSET = a", renamed)
+        self.assertEqual(1 + 10 + 2 + 1, namespace["invoke_0"](1, 2))
+        self.assertEqual(1, namespace["counter_0"])
+
+    def test__rename__globals_read_in_function_with_parameters(self):
+        _, _, namespace = self.rename_and_run(CODE)
+        self.assertEqual(15, namespace["helper_0"](5))
+
+    def test__rename__is_cached_per_code_and_suffix(self):
+        first = Renamer.rename(CODE, "_7")
+        self.assertIs(first, Renamer.rename(CODE, "_7"))
+        self.assertIsNot(first, Renamer.rename(CODE, "_8"))
+
+    def test__code_generator_rename__suffixes_every_function(self):
+        add, custom = BoxFunction("add"), BoxFunction("custom", code=CODE)
+        function_list, renamed_functions = CodeGenerator.rename([add, custom])
+        self.assertEqual({add: "invoke_0", custom: "invoke_1"}, renamed_functions)
+        self.assertIn("def helper_1(x):", function_list[1])
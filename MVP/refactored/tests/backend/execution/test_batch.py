@@ -0,0 +1,118 @@
+import unittest
+
+import numpy as np
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction
+from MVP.refactored.backend.code_generation.code_generator import CodeGenerator
+from MVP.refactored.backend.execution.batch import map_rows
+from MVP.refactored.backend.execution.executor import DiagramExecutor
+from MVP.refactored.tests.backend.synthetic import SyntheticCanvas, SyntheticWire, build_chain, build_nested
+
+INCREMENT = """def invoke(x):
+    return x + 1
+
+
+meta = {"name": "Increment", "min_args": 1, "max_args": 1}
+"""
+
+DIVMOD = """def invoke(a, b):
+    return a // b, a % b
+
+
+meta = {"name": "Divmod", "min_args": 2, "max_args": 2}
+"""
+
+ADD_ONE = """def invoke(a, b):
+    return a + b + 1
+
+
+meta = {"name": "Add one", "min_args": 2, "max_args": 2}
+"""
+
+
+class MapRowsTests(unittest.TestCase):
+
+    def test__map_rows__single_output_over_several_chunks(self):
+        result = map_rows(lambda a, b: a * b, 1, 10, np.arange(10), np.arange(10), chunk_size=3)
+        np.testing.assert_array_equal(np.arange(10) ** 2, result)
+
+    def test__map_rows__multiple_outputs(self):
+        quotient, remainder = map_rows(divmod, 2, 3, [7, 8, 9], [2, 3, 4], chunk_size=2)
+        np.testing.assert_array_equal([3, 2, 2], quotient)
+        np.testing.assert_array_equal([1, 2, 1], remainder)
+
+    def test__map_rows__empty_columns(self):
+        self.assertEqual(0, len(map_rows(divmod, 1, 0, [], [])))
+
+    def test__map_rows__sink_is_called_on_every_row(self):
+        seen = []
+        self.assertEqual((), map_rows(seen.append, 0, 5, np.arange(5), chunk_size=2))
+        self.assertEqual([0, 1, 2, 3, 4], seen)
+
+    def test__map_rows__without_inputs_uses_row_count(self):
+        np.testing.assert_array_equal([7, 7, 7], map_rows(lambda: 7, 1, 3, chunk_size=2))
+
+
+class ExecuteBatchTests(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = DiagramExecutor()
+
+    def test__box_function__is_vectorizable(self):
+        self.assertTrue(BoxFunction("add").is_vectorizable)
+        self.assertFalse(BoxFunction("increment", code=INCREMENT).is_vectorizable)
+
+    def test__execute_batch__vectorized_chain_matches_rows(self):
+        canvas = build_chain(3)
+        columns = [np.arange(100) * i for i in range(4)]
+        (result,) = self.executor.execute_batch(canvas, *columns)
+        expected = [self.executor.execute(canvas, *row)[0] for row in zip(*(c.tolist() for c in columns))]
+        np.testing.assert_array_equal(expected, result)
+
+    def test__execute_batch__scalar_box_is_mapped_over_rows(self):
+        canvas = build_nested(2, 2, label="increment")
+        canvas.main_diagram.label_content["increment"] = INCREMENT
+        (result,) = self.executor.execute_batch(canvas, np.arange(5), chunk_size=2)
+        np.testing.assert_array_equal(np.arange(5) + 4, result)
+
+    def test__execute_batch__multi_output_scalar_box(self):
+        canvas = SyntheticCanvas()
+        canvas.main_diagram.label_content["divmod"] = DIVMOD
+        a, b, quotient, remainder = (SyntheticWire() for _ in range(4))
+        canvas.add_input(a)
+        canvas.add_input(b)
+        box = canvas.add_box("divmod")
+        box.add_connection("left", a)
+        box.add_connection("left", b)
+        box.add_connection("right", quotient)
+        box.add_connection("right", remainder)
+        canvas.add_output(remainder)
+        canvas.add_output(quotient)
+        remainders, quotients = self.executor.execute_batch(canvas, [17, 9], [5, 4])
+        np.testing.assert_array_equal([2, 1], remainders)
+        np.testing.assert_array_equal([3, 2], quotients)
+
+    def test__execute_batch__inputs_of_different_lengths(self):
+        with self.assertRaises(ValueError):
+            self.executor.execute_batch(build_chain(1), [1, 2], [1])
+
+
+class BatchCodeGenerationTests(unittest.TestCase):
+
+    def test__construct_main_function__maps_scalar_boxes_only(self):
+        canvas = build_chain(2)
+        canvas.boxes[1].label_text = "add_one"
+        canvas.main_diagram.label_content["add_one"] = ADD_ONE
+        canvas.main_diagram.hypergraph_manager.modify_canvas_hypergraph(canvas)
+        add = BoxFunction("add")
+        increment = BoxFunction("add_one", code=ADD_ONE)
+        main_function = CodeGenerator.construct_main_function(canvas, {add: "add", increment: "increment"},
+                                                              batch=True)
+        self.assertIn("map_rows(increment, 1, len(input_1), ", main_function)
+        self.assertNotIn("map_rows(add", main_function)
+
+        namespace = {"add": add, "increment": increment}
+        source = "import numpy as np\n" + CodeGenerator.create_batch_helpers() + main_function
+        exec(source, namespace)
+        result = namespace["main"](*(np.arange(4) for _ in range(3)))
+        np.testing.assert_array_equal(np.arange(4) * 3 + 1, result)
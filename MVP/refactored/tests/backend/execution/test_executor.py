@@ -0,0 +1,168 @@
+import pickle
+import unittest
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction
+from MVP.refactored.backend.execution.executor import DiagramExecutor
+from MVP.refactored.tests.backend.synthetic import SyntheticCanvas, SyntheticWire, build_chain, build_nested, build_wide
+
+INCREMENT = """def invoke(x):
+    return x + 1
+
+
+meta = {"name": "Increment", "min_args": 1, "max_args": 1}
+"""
+
+PURE_INCREMENT = INCREMENT.replace('"max_args": 1', '"max_args": 1, "pure": True')
+
+PURE_ADD = """def invoke(a, b):
+    return a + b
+
+
+meta = {"name": "Pure add", "min_args": 2, "max_args": 2, "pure": True}
+"""
+
+DIVMOD = """def invoke(a, b):
+    return a // b, a % b
+
+
+meta = {"name": "Divmod", "min_args": 2, "max_args": 2}
+"""
+
+
+class DiagramExecutorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = DiagramExecutor()
+
+    def test__execute__chain(self):
+        canvas = build_chain(4)
+        self.assertEqual((1 + 2 + 3 + 4 + 5,), self.executor.execute(canvas, 1, 2, 3, 4, 5))
+
+    def test__execute__nested_sub_diagrams(self):
+        canvas = build_nested(3, 3, label="increment")
+        canvas.main_diagram.label_content["increment"] = INCREMENT
+        self.assertEqual((27,), self.executor.execute(canvas, 0))
+
+    def test__execute__multi_output_box_returns_outputs_in_diagram_order(self):
+        canvas = SyntheticCanvas()
+        canvas.main_diagram.label_content["divmod"] = DIVMOD
+        a, b, quotient, remainder = (SyntheticWire() for _ in range(4))
+        canvas.add_input(a)
+        canvas.add_input(b)
+        box = canvas.add_box("divmod")
+        box.add_connection("left", a)
+        box.add_connection("left", b)
+        box.add_connection("right", quotient)
+        box.add_connection("right", remainder)
+        canvas.add_output(remainder)
+        canvas.add_output(quotient)
+        self.assertEqual((2, 3), self.executor.execute(canvas, 17, 5))
+
+    def test__execute__fan_out_of_one_wire(self):
+        canvas = SyntheticCanvas()
+        a, total = SyntheticWire(), SyntheticWire()
+        canvas.add_input(a)
+        box = canvas.add_box("add")
+        box.add_connection("left", a)
+        box.add_connection("left", a)
+        box.add_connection("right", total)
+        canvas.add_output(total)
+        canvas.add_output(a)
+        self.assertEqual((6, 3), self.executor.execute(canvas, 3))
+
+    def test__execute__reuses_plan_of_unchanged_canvas(self):
+        canvas = build_chain(3)
+        self.executor.execute(canvas, 1, 1, 1, 1)
+        plan = self.executor.get_plan(canvas)
+        self.assertIs(plan, self.executor.get_plan(canvas))
+        canvas.boxes[0].label_text = "subtract"
+        self.assertIsNot(plan, self.executor.get_plan(canvas))
+        self.assertEqual((1 - 1 + 1 + 1,), self.executor.execute(canvas, 1, 1, 1, 1))
+
+    def test__execute__wrong_number_of_inputs(self):
+        with self.assertRaises(ValueError):
+            self.executor.execute(build_chain(2), 1)
+
+    def test__execute__unconnected_box_input(self):
+        canvas = build_chain(2)
+        canvas.boxes[1].connections[1].wire = SyntheticWire()
+        with self.assertRaises(ValueError):
+            self.executor.execute(canvas, 1, 2, 3)
+
+    def test__execute__cycle(self):
+        canvas = SyntheticCanvas()
+        a, b, c = SyntheticWire(), SyntheticWire(), SyntheticWire()
+        canvas.add_input(a)
+        first = canvas.add_box("add")
+        first.add_connection("left", a)
+        first.add_connection("left", c)
+        first.add_connection("right", b)
+        second = canvas.add_box("copy")
+        second.add_connection("left", b)
+        second.add_connection("right", c)
+        second.add_connection("right", SyntheticWire())
+        with self.assertRaises(ValueError):
+            self.executor.execute(canvas, 1)
+
+
+class ParallelExecutionTests(unittest.TestCase):
+
+    def test__plan__groups_independent_boxes_into_levels(self):
+        canvas = build_wide(4)
+        plan = DiagramExecutor().get_plan(canvas)
+        self.assertEqual([4, 2, 1], [len(level) for level in plan.levels])
+
+    def test__plan__chain_has_one_box_per_level(self):
+        plan = DiagramExecutor().get_plan(build_chain(3))
+        self.assertEqual([1, 1, 1], [len(level) for level in plan.levels])
+
+    def test__execute__thread_pool(self):
+        canvas = build_wide(5)
+        with DiagramExecutor(parallel="thread", max_workers=2) as executor:
+            self.assertEqual((sum(range(10)),), executor.execute(canvas, *range(10)))
+
+    def test__execute__process_pool(self):
+        canvas = build_wide(3)
+        with DiagramExecutor(parallel="process", max_workers=2) as executor:
+            self.assertEqual((sum(range(6)),), executor.execute(canvas, *range(6)))
+
+    def test__executor__unknown_parallel_mode(self):
+        with self.assertRaises(ValueError):
+            DiagramExecutor(parallel="gpu")
+
+    def test__box_function__is_picklable(self):
+        box_function = BoxFunction("increment", code=INCREMENT)
+        copy = pickle.loads(pickle.dumps(box_function))
+        self.assertEqual(box_function, copy)
+        self.assertEqual(2, copy(1))
+
+
+class MemoizedExecutionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.canvas = build_nested(2, 2, label="increment")
+        self.canvas.main_diagram.label_content["increment"] = PURE_INCREMENT
+        self.executor = DiagramExecutor()
+
+    def test__execute__reuses_results_of_pure_boxes(self):
+        self.assertEqual((4,), self.executor.execute(self.canvas, 0))
+        self.assertEqual((4,), self.executor.execute(self.canvas, 0))
+        memo = self.executor.memos[PURE_INCREMENT]
+        # the four boxes are called with 0, 1, 2 and 3 in the first run only
+        self.assertEqual((4, 4), (memo.hits, memo.misses))
+
+    def test__execute_batch__keys_arrays_by_content(self):
+        code = PURE_INCREMENT.replace('"pure": True', '"pure": True, "vectorizable": True')
+        self.canvas.main_diagram.label_content["increment"] = code
+        self.executor.execute_batch(self.canvas, [0, 1])
+        self.assertEqual([4, 5], list(self.executor.execute_batch(self.canvas, [0, 1])[0]))
+        memo = self.executor.memos[code]
+        self.assertEqual((4, 4), (memo.hits, memo.misses))
+
+    def test__execute__process_pool_runs_without_memo(self):
+        canvas = build_wide(2, label="pure_add")
+        canvas.main_diagram.label_content["pure_add"] = PURE_ADD
+        with DiagramExecutor(parallel="process", max_workers=2) as executor:
+            self.assertEqual((sum(range(4)),), executor.execute(canvas, *range(4)))
+        # the two boxes of the first level run in the workers, only the last box runs here
+        self.assertEqual(1, len(executor.memos[PURE_ADD]))
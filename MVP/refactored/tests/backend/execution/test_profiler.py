@@ -0,0 +1,93 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from MVP.refactored.backend.execution.executor import DiagramExecutor
+from MVP.refactored.backend.execution.profiler import Profiler
+from MVP.refactored.tests.backend.synthetic import build_chain, build_nested
+
+INCREMENT = """def invoke(x):
+    return x + 1
+
+
+meta = {"name": "Increment", "min_args": 1, "max_args": 1}
+"""
+
+
+class ProfilerTests(unittest.TestCase):
+
+    def test__call__records_calls_and_sizes_per_output(self):
+        profiler = Profiler({1: ("split", 2)})
+        values = np.zeros(10)
+        for _ in range(3):
+            self.assertEqual(2, len(profiler.call(1, lambda array: (array, array[:5]), values)))
+        profile = profiler.profiles[1]
+        self.assertEqual(3, profile.calls)
+        self.assertEqual(3 * 80, profile.input_bytes)
+        self.assertEqual([3 * 80, 3 * 40], profile.output_bytes)
+        self.assertGreaterEqual(profile.wall_time, 0)
+        self.assertEqual(3, len(profiler.events))
+
+    def test__call__awaits_coroutines(self):
+        async def slow(x):
+            await asyncio.sleep(0.02)
+            return x
+
+        profiler = Profiler({1: ("slow", 1)})
+        self.assertEqual(5, asyncio.run(profiler.call(1, slow, 5)))
+        self.assertEqual(1, profiler.profiles[1].calls)
+        self.assertGreaterEqual(profiler.profiles[1].wall_time, 0.02)
+
+    def test__events__bounded(self):
+        profiler = Profiler({1: ("copy", 1)}, max_events=2)
+        for i in range(5):
+            profiler.call(1, abs, i)
+        self.assertEqual(5, profiler.profiles[1].calls)
+        self.assertEqual(2, len(profiler.events))
+
+    def test__hot_boxes__slowest_first(self):
+        profiler = Profiler({1: ("fast", 1), 2: ("slow", 1)})
+        profiler.profiles[1].wall_time = 0.1
+        profiler.profiles[2].wall_time = 0.5
+        self.assertEqual([2, 1], [profile.box_id for profile in profiler.hot_boxes()])
+        self.assertEqual([2], [profile.box_id for profile in profiler.hot_boxes(1)])
+
+    def test__save__report_and_chrome_trace(self):
+        profiler = Profiler({7: ("copy", 1)})
+        profiler.call(7, abs, -1)
+        with tempfile.TemporaryDirectory() as directory:
+            report_path = os.path.join(directory, "report.json")
+            trace_path = os.path.join(directory, "trace.json")
+            profiler.save_report(report_path)
+            profiler.save_chrome_trace(trace_path)
+            report = Profiler.load_report(report_path)
+            with open(trace_path) as file:
+                trace = json.load(file)
+        self.assertEqual(1, report[7]["calls"])
+        self.assertEqual("copy", report[7]["label"])
+        event, = trace["traceEvents"]
+        self.assertEqual(("copy", "X", 7), (event["name"], event["ph"], event["args"]["box_id"]))
+
+
+class ProfiledExecutionTests(unittest.TestCase):
+
+    def test__execute__records_every_box(self):
+        canvas = build_chain(3)
+        profiler = Profiler()
+        for _ in range(2):
+            self.assertEqual((10,), DiagramExecutor().execute(canvas, 1, 2, 3, 4, profiler=profiler))
+        self.assertEqual({box.id for box in canvas.boxes}, set(profiler.profiles))
+        self.assertTrue(all(profile.calls == 2 for profile in profiler.profiles.values()))
+
+    def test__execute__records_boxes_inside_sub_diagrams(self):
+        canvas = build_nested(2, 2, label="increment")
+        canvas.main_diagram.label_content["increment"] = INCREMENT
+        profiler = Profiler()
+        self.assertEqual((4,), DiagramExecutor().execute(canvas, 0, profiler=profiler))
+        leaf_ids = {box.id for sub_canvas in canvas.main_diagram.canvasses.values() for box in sub_canvas.boxes
+                    if str(box.id) not in canvas.main_diagram.canvasses}
+        self.assertEqual(leaf_ids, set(profiler.profiles))
@@ -0,0 +1,113 @@
+import itertools
+import unittest
+
+from MVP.refactored.backend.execution.executor import DiagramExecutor
+from MVP.refactored.tests.backend.synthetic import SyntheticCanvas, build_chain, build_nested
+
+INCREMENT = """def invoke(x):
+    return x + 1
+
+
+meta = {"name": "Increment", "min_args": 1, "max_args": 1}
+"""
+
+DIVMOD = """def invoke(a, b):
+    return a // b, a % b
+
+
+meta = {"name": "Divmod", "min_args": 2, "max_args": 2}
+"""
+
+
+CHECK = """def invoke(x):
+    if x > 1:
+        raise ValueError(x)
+
+
+meta = {"name": "Check", "min_args": 1, "max_args": 1}
+"""
+
+
+class CountingIterator:
+
+    def __init__(self, iterable):
+        self.iterator = iter(iterable)
+        self.taken = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        value = next(self.iterator)
+        self.taken += 1
+        return value
+
+
+class StreamTests(unittest.TestCase):
+
+    def setUp(self):
+        self.executor = DiagramExecutor()
+
+    def test__stream__matches_execute(self):
+        canvas = build_chain(3)
+        streams = [range(i, i + 50) for i in range(4)]
+        expected = [self.executor.execute(canvas, *row) for row in zip(*streams)]
+        self.assertEqual(expected, list(self.executor.stream(canvas, *streams)))
+
+    def test__stream__consumes_infinite_input_lazily(self):
+        canvas = build_nested(2, 2, label="increment")
+        canvas.main_diagram.label_content["increment"] = INCREMENT
+        source = CountingIterator(itertools.count())
+        outputs = self.executor.stream(canvas, source)
+        self.assertEqual([(4,), (5,), (6,)], list(itertools.islice(outputs, 3)))
+        self.assertEqual(3, source.taken)
+
+    def test__stream__yields_each_item_before_taking_the_next(self):
+        canvas = build_chain(2)
+        sources = [CountingIterator(range(100)) for _ in range(3)]
+        outputs = self.executor.stream(canvas, *sources)
+        self.assertEqual((0,), next(outputs))
+        self.assertEqual([1, 1, 1], [source.taken for source in sources])
+        self.assertEqual((3,), next(outputs))
+        self.assertEqual([2, 2, 2], [source.taken for source in sources])
+
+    def test__stream__runs_boxes_whose_results_are_not_read(self):
+        canvas = SyntheticCanvas()
+        canvas.main_diagram.label_content["increment"] = INCREMENT
+        canvas.main_diagram.label_content["check"] = CHECK
+        a, a_spider = canvas.add_input(), canvas.add_spider()
+        increment, check = canvas.add_box("increment"), canvas.add_box("check")
+        canvas.connect(a, a_spider)
+        canvas.connect(a_spider, increment.add_connection("left"))
+        canvas.connect(a_spider, check.add_connection("left"))
+        canvas.connect(increment.add_connection("right"), canvas.add_output())
+        outputs = self.executor.stream(canvas, [0, 1, 2])
+        self.assertEqual([(1,), (2,)], list(itertools.islice(outputs, 2)))
+        with self.assertRaises(ValueError):
+            next(outputs)
+
+    def test__stream__spider_fan_out_and_multiple_outputs(self):
+        canvas = SyntheticCanvas()
+        canvas.main_diagram.label_content["divmod"] = DIVMOD
+        a, b = canvas.add_input(), canvas.add_input()
+        divmod_box = canvas.add_box("divmod")
+        add_box = canvas.add_box("add")
+        a_spider, quotient_spider = canvas.add_spider(), canvas.add_spider()
+        canvas.connect(a, a_spider)
+        canvas.connect(a_spider, divmod_box.add_connection("left"))
+        canvas.connect(b, divmod_box.add_connection("left"))
+        canvas.connect(divmod_box.add_connection("right"), quotient_spider)
+        canvas.connect(divmod_box.add_connection("right"), canvas.add_output())
+        canvas.connect(a_spider, add_box.add_connection("left"))
+        canvas.connect(quotient_spider, add_box.add_connection("left"))
+        canvas.connect(add_box.add_connection("right"), canvas.add_output())
+        canvas.connect(quotient_spider, canvas.add_output())
+        self.assertEqual([(2, 20, 3), (1, 11, 2)],
+                         list(self.executor.stream(canvas, [17, 9], [5, 4])))
+
+    def test__stream__ends_with_shortest_input(self):
+        self.assertEqual([(3,)], list(self.executor.stream(build_chain(1), [1, 2], [2])))
+
+    def test__stream__wrong_number_of_inputs(self):
+        with self.assertRaises(ValueError):
+            next(self.executor.stream(build_chain(1), [1]))
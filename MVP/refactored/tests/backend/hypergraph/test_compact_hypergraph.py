@@ -0,0 +1,72 @@
+import unittest
+
+import numpy as np
+
+from MVP.refactored.backend.hypergraph.compact_hypergraph import CompactHypergraph
+from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
+from MVP.refactored.backend.hypergraph.node import Node
+
+
+class CompactHypergraphTests(unittest.TestCase):
+
+    def setUp(self):
+        # 10 and 11 share the diagram input 100, 12 joins their results
+        self.hypergraph = Hypergraph(1, nodes=[
+            Node(10, [100, 101], [200]),
+            Node(11, [100], [201]),
+            Node(12, [201, 200], [300]),
+        ])
+        self.compact = CompactHypergraph.from_hypergraph(self.hypergraph)
+
+    def test__from_hypergraph__interns_wire_ids(self):
+        self.assertEqual([100, 101, 200, 201, 300], self.compact.wire_ids.tolist())
+        self.assertEqual([0, 2, 3, 5], self.compact.input_indptr.tolist())
+        self.assertEqual([0, 1, 2, 3], self.compact.output_indptr.tolist())
+
+    def test__to_hypergraph__round_trips(self):
+        hypergraph = self.compact.to_hypergraph()
+        self.assertEqual(self.hypergraph.to_dict(), hypergraph.to_dict())
+        self.assertTrue(hypergraph.is_valid())
+
+    def test__nodes__keep_port_order(self):
+        node = self.compact.get_node(12)
+        self.assertEqual([201, 200], node.inputs)
+        self.assertEqual([300], node.outputs)
+        self.assertTrue(node.is_valid())
+        self.assertIsNone(self.compact.get_node(13))
+
+    def test__get_children__and__get_parents(self):
+        node = self.compact.get_node(12)
+        self.assertEqual([10, 11], [parent.id for parent in node.get_parents()])
+        self.assertEqual([12], [child.id for child in self.compact.get_node(10).get_children()])
+        self.assertEqual([], node.get_children())
+
+    def test__incidence_matrix__is_oriented(self):
+        incidence = self.compact.incidence_matrix().toarray()
+        self.assertEqual((3, 5), incidence.shape)
+        np.testing.assert_array_equal([-1, -1, 1, 0, 0], incidence[0])
+        np.testing.assert_array_equal([0, 0, -1, -1, 1], incidence[2])
+
+    def test__adjacency_matrix__counts_wires_between_nodes(self):
+        adjacency = self.compact.adjacency_matrix().toarray()
+        np.testing.assert_array_equal([[0, 0, 1], [0, 0, 1], [0, 0, 0]], adjacency)
+
+    def test__boundary__matches_hypergraph(self):
+        self.assertEqual(self.hypergraph.inputs, self.compact.inputs)
+        self.assertEqual(self.hypergraph.outputs, self.compact.outputs)
+
+    def test__from_hypergraph__empty_hypergraph(self):
+        compact = CompactHypergraph.from_hypergraph(Hypergraph(2))
+        self.assertEqual(0, len(compact))
+        self.assertEqual((0, 0), compact.adjacency_matrix().shape)
+        self.assertEqual([], compact.to_hypergraph().nodes)
+
+    def test__get_node__finds_every_node_of_unsorted_ids(self):
+        ids = np.random.default_rng(3).permutation(2000) * 7
+        hypergraph = Hypergraph(3, nodes=[Node(int(node_id), [int(node_id) * 2], [int(node_id) * 2 + 1])
+                                          for node_id in ids])
+        compact = CompactHypergraph.from_hypergraph(hypergraph)
+        for node_id in ids[:200]:
+            self.assertEqual(node_id, compact.get_node(int(node_id)).id)
+        self.assertIsNone(compact.get_node(1))
+        self.assertEqual([], compact.get_node(int(ids[0])).get_parents())
@@ -0,0 +1,102 @@
+import unittest
+
+from MVP.refactored.backend.hypergraph.flattener import Flattener
+from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
+from MVP.refactored.tests.backend.synthetic import SyntheticCanvas, SyntheticWire, build_chain, build_nested
+
+
+class FlattenerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.flattener = Flattener()
+
+    def test__flatten__canvas_without_sub_diagrams_matches_hypergraph(self):
+        canvas = build_chain(5)
+        flat = self.flattener.flatten(canvas, canvas.main_diagram.canvasses)
+        hypergraph = flat.to_hypergraph()
+        self.assertEqual(5, len(flat))
+        self.assertTrue(hypergraph.is_valid())
+        self.assertEqual(len(HypergraphManager.build_hypergraph(canvas).inputs), len(hypergraph.inputs))
+        self.assertEqual(canvas.boxes[3], flat.get_box(3))
+
+    def test__flatten__inlines_nested_sub_diagrams(self):
+        canvas = build_nested(3, 4)
+        flat = self.flattener.flatten(canvas, canvas.main_diagram.canvasses)
+        hypergraph = flat.to_hypergraph()
+        self.assertEqual(64, len(flat))
+        self.assertTrue(hypergraph.is_valid())
+        self.assertEqual(flat.inputs, hypergraph.inputs)
+        self.assertEqual(flat.outputs, hypergraph.outputs)
+        for node_id in range(63):
+            self.assertEqual([node_id + 1], [child.id for child in hypergraph.get_node(node_id).get_children()])
+
+    def test__flatten__expands_identical_sub_diagrams_once(self):
+        canvas = build_nested(3, 4)
+        self.flattener.flatten(canvas, canvas.main_diagram.canvasses)
+        # one template per level
+        self.assertEqual(3, self.flattener.misses)
+        self.assertEqual(4 + 16 - 2, self.flattener.hits)
+
+    def test__flatten__reuses_templates_between_calls(self):
+        canvas = build_nested(3, 4)
+        self.flattener.flatten(canvas, canvas.main_diagram.canvasses)
+        misses = self.flattener.misses
+        other = build_nested(3, 4)
+        flat = self.flattener.flatten(other, other.main_diagram.canvasses)
+        self.assertEqual(misses, self.flattener.misses)
+        canvasses = other.main_diagram.canvasses
+        leaf_canvas = canvasses[str(canvasses[str(other.boxes[0].id)].boxes[0].id)]
+        self.assertEqual(leaf_canvas.boxes[0], flat.get_box(0))
+
+    def test__get_box__resolves_nested_box(self):
+        canvas = build_nested(2, 3)
+        flat = self.flattener.flatten(canvas, canvas.main_diagram.canvasses)
+        sub_canvas = canvas.main_diagram.canvasses[str(canvas.boxes[1].id)]
+        self.assertEqual(sub_canvas.boxes[2], flat.get_box(5))
+
+    def test__flatten__pass_through_sub_diagram_joins_outer_wires(self):
+        canvas = SyntheticCanvas()
+        wire = SyntheticWire()
+        canvas.add_input(wire)
+        first = canvas.add_box("add")
+        first.add_connection("left", wire)
+        first.add_connection("right", wire := SyntheticWire())
+        compound = canvas.add_box("compound")
+        compound.add_connection("left", wire)
+        compound.add_connection("right", wire := SyntheticWire())
+        last = canvas.add_box("add")
+        last.add_connection("left", wire)
+        last.add_connection("right", wire := SyntheticWire())
+        canvas.add_output(wire)
+
+        sub_canvas = SyntheticCanvas(canvas.main_diagram, compound.id)
+        inner = SyntheticWire()
+        sub_canvas.add_input(inner)
+        sub_canvas.add_output(inner)
+
+        hypergraph = self.flattener.flatten(canvas, canvas.main_diagram.canvasses).to_hypergraph()
+        self.assertEqual(2, len(hypergraph.nodes))
+        self.assertEqual([1], [node.id for node in hypergraph.get_node(0).get_children()])
+        self.assertTrue(hypergraph.is_valid())
+
+    def test__flatten__changed_sub_diagram_is_expanded_again(self):
+        canvas = build_nested(2, 2)
+        self.flattener.flatten(canvas, canvas.main_diagram.canvasses)
+        sub_canvas = canvas.main_diagram.canvasses[str(canvas.boxes[0].id)]
+        sub_canvas.boxes[0].label_text = "subtract"
+        flat = self.flattener.flatten(canvas, canvas.main_diagram.canvasses)
+        self.assertEqual(["subtract", "add", "add", "add"], flat.labels)
+
+    def test__flatten__chained_spiders_join_their_wires(self):
+        canvas = SyntheticCanvas()
+        box = canvas.add_box("add")
+        canvas.connect(canvas.add_input(), box.add_connection("left"))
+        first, second = canvas.add_spider(), canvas.add_spider()
+        canvas.connect(box.add_connection("right"), first)
+        canvas.connect(first, second)
+        canvas.connect(second, canvas.add_output())
+        canvas.connect(canvas.add_output(), first)
+
+        flat = self.flattener.flatten(canvas, canvas.main_diagram.canvasses)
+        self.assertEqual(list(flat.template.outputs[0]) * 2, flat.outputs)
+        self.assertNotEqual(flat.inputs, flat.outputs[:1])
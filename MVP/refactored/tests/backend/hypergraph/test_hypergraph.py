@@ -0,0 +1,178 @@
+import json
+import unittest
+from types import SimpleNamespace
+
+from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
+from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
+from MVP.refactored.backend.hypergraph.node import Node
+from MVP.refactored.util.exporter.hypergraph_exporter import HypergraphExporter
+
+
+class TestHypergraph(unittest.TestCase):
+
+    def setUp(self):
+        self.first = Node(1, [10, 11], [12])
+        self.second = Node(2, [12, 13], [14])
+        self.third = Node(3, [12], [15])
+        self.hypergraph = Hypergraph(100)
+        self.hypergraph.add_nodes([self.first, self.second, self.third])
+
+
+class HypergraphIndexTests(TestHypergraph):
+
+    def test__get_node_by_input__returns_consumer(self):
+        self.assertEqual(self.first, self.hypergraph.get_node_by_input(10))
+        self.assertEqual(self.second, self.hypergraph.get_node_by_input(13))
+        self.assertIsNone(self.hypergraph.get_node_by_input(14))
+
+    def test__get_node_by_output__returns_producer(self):
+        self.assertEqual(self.first, self.hypergraph.get_node_by_output(12))
+        self.assertEqual(self.third, self.hypergraph.get_node_by_output(15))
+        self.assertIsNone(self.hypergraph.get_node_by_output(10))
+
+    def test__get_nodes_by_input__returns_all_consumers(self):
+        self.assertEqual([self.second, self.third], self.hypergraph.get_nodes_by_input(12))
+
+    def test__get_node_children_by_node__returns_children(self):
+        self.assertEqual([self.second, self.third], self.hypergraph.get_node_children_by_node(self.first))
+        self.assertEqual([], self.hypergraph.get_node_children_by_node(self.second))
+
+    def test__get_node_parents_by_node__returns_parents(self):
+        self.assertEqual([self.first], self.hypergraph.get_node_parents_by_node(self.second))
+        self.assertEqual([], self.hypergraph.get_node_parents_by_node(self.first))
+
+    def test__node_get_children__uses_containing_hypergraph(self):
+        self.assertEqual(self.hypergraph, self.first.hypergraph)
+        self.assertEqual([self.second, self.third], self.first.get_children())
+        self.assertEqual([self.first], self.third.get_parents())
+
+    def test__node_get_children__outside_hypergraph_raises(self):
+        self.hypergraph.remove_node(self.second)
+        with self.assertRaises(ValueError):
+            self.second.get_children()
+        with self.assertRaises(ValueError):
+            Node(4, [1], [2]).get_parents()
+
+    def test__get_node__returns_node_by_id(self):
+        self.assertEqual(self.second, self.hypergraph.get_node(2))
+        self.assertIsNone(self.hypergraph.get_node(4))
+
+    def test__add_node__duplicate_id_raises(self):
+        with self.assertRaises(ValueError):
+            self.hypergraph.add_node(Node(1, [20], [21]))
+
+    def test__node_add_input__updates_index(self):
+        self.third.add_input(14)
+        self.assertEqual([self.third], self.hypergraph.get_node_children_by_node(self.second))
+
+    def test__node_add_output__updates_index(self):
+        self.second.add_output(16)
+        self.assertEqual(self.second, self.hypergraph.get_node_by_output(16))
+
+    def test__node_remove_input__updates_index(self):
+        self.third.remove_input(12)
+        self.assertEqual([self.second], self.hypergraph.get_node_children_by_node(self.first))
+
+    def test__node_remove_output__updates_index(self):
+        self.first.remove_output(12)
+        self.assertIsNone(self.hypergraph.get_node_by_output(12))
+        self.assertEqual([], self.hypergraph.get_node_parents_by_node(self.second))
+
+    def test__remove_node__removes_from_index(self):
+        self.hypergraph.remove_node(self.second)
+        self.assertIsNone(self.hypergraph.get_node(2))
+        self.assertIsNone(self.hypergraph.get_node_by_input(13))
+        self.assertEqual([self.third], self.hypergraph.get_node_children_by_node(self.first))
+        self.assertIsNone(self.second.hypergraph)
+
+    def test__init__indexes_given_nodes(self):
+        node = Node(5, [1], [2])
+        hypergraph = Hypergraph(101, nodes=[node])
+        self.assertEqual(node, hypergraph.get_node_by_input(1))
+        self.assertEqual(hypergraph, node.hypergraph)
+
+
+class HypergraphIOTests(TestHypergraph):
+
+    def test__add_nodes__sets_boundary_wires(self):
+        self.assertEqual([10, 11, 13], self.hypergraph.inputs)
+        self.assertEqual([14, 15], self.hypergraph.outputs)
+
+    def test__add_node__updates_boundary_wires(self):
+        self.hypergraph.add_node(Node(4, [14, 15], [16]))
+        self.assertEqual([10, 11, 13], self.hypergraph.inputs)
+        self.assertEqual([16], self.hypergraph.outputs)
+
+    def test__add_node__consumer_before_producer(self):
+        hypergraph = Hypergraph(101)
+        hypergraph.add_node(Node(1, [2], [3]))
+        hypergraph.add_node(Node(2, [1], [2]))
+        self.assertEqual([1], hypergraph.inputs)
+        self.assertEqual([3], hypergraph.outputs)
+
+    def test__remove_node__updates_boundary_wires(self):
+        self.hypergraph.remove_node(self.first)
+        self.assertEqual([13, 12], self.hypergraph.inputs)
+        self.assertEqual([14, 15], self.hypergraph.outputs)
+
+    def test__remove_node__wire_still_consumed_stays_internal(self):
+        self.hypergraph.remove_node(self.third)
+        self.assertEqual([10, 11, 13], self.hypergraph.inputs)
+        self.assertEqual([14], self.hypergraph.outputs)
+
+    def test__node_add_input__updates_boundary_wires(self):
+        self.third.add_input(14)
+        self.assertNotIn(14, self.hypergraph.outputs)
+        self.third.add_input(20)
+        self.assertIn(20, self.hypergraph.inputs)
+
+    def test__node_remove_output__updates_boundary_wires(self):
+        self.first.remove_output(12)
+        self.assertIn(12, self.hypergraph.inputs)
+
+    def test__set_hypergraph_io__matches_incremental_result(self):
+        self.hypergraph.add_node(Node(4, [15], [17]))
+        self.second.remove_input(13)
+        inputs, outputs = set(self.hypergraph.inputs), set(self.hypergraph.outputs)
+        self.hypergraph.set_hypergraph_io()
+        self.assertEqual(inputs, set(self.hypergraph.inputs))
+        self.assertEqual(outputs, set(self.hypergraph.outputs))
+
+    def test__io_views__are_live_and_read_only(self):
+        inputs, nodes = self.hypergraph.inputs, self.hypergraph.nodes
+        self.hypergraph.add_node(Node(4, [20], [21]))
+        self.assertEqual([10, 11, 13, 20], inputs)
+        self.assertEqual(4, len(nodes))
+        self.assertIn(self.first, nodes)
+        self.assertEqual(self.second, nodes[1])
+        with self.assertRaises(AttributeError):
+            inputs.append(30)
+        with self.assertRaises(AttributeError):
+            nodes.append(Node(5, [30], [31]))
+
+    def test__hypergraph_add_input__updates_containing_hypergraph(self):
+        inner = Hypergraph(5, nodes=[Node(6, [30], [31])])
+        self.hypergraph.add_node(inner)
+        inner.add_input(32)
+        self.assertEqual([30, 32], inner.inputs)
+        self.assertEqual(inner, self.hypergraph.get_node_by_input(32))
+        inner.remove_output(31)
+        self.assertEqual([], inner.outputs)
+        self.assertIsNone(self.hypergraph.get_node_by_output(31))
+        with self.assertRaises(ValueError):
+            inner.add_output(30)
+
+
+class HypergraphExportTests(TestHypergraph):
+
+    def test__export__round_trips_through_json(self):
+        manager = HypergraphManager()
+        manager.add_hypergraph(self.hypergraph)
+        canvas = SimpleNamespace(id=100, main_diagram=SimpleNamespace(hypergraph_manager=manager))
+        data = json.loads(json.dumps(HypergraphExporter(canvas).create_file_content("hypergraph.json")))
+        self.assertEqual([10, 11, 13], data["inputs"])
+        self.assertEqual([14, 15], data["outputs"])
+
+        imported = Hypergraph(data["id"], nodes=[Node(node["id"], node["inputs"], node["outputs"])
+                                                 for node in data["nodes"]])
+        self.assertEqual(self.hypergraph.to_dict(), imported.to_dict())
@@ -0,0 +1,55 @@
+import unittest
+
+from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
+from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
+from MVP.refactored.backend.hypergraph.node import Node
+from MVP.refactored.tests.backend.synthetic import build_chain
+
+
+class HypergraphManagerTests(unittest.TestCase):
+
+    def setUp(self):
+        self.manager = HypergraphManager()
+        self.hypergraph = Hypergraph(1, nodes=[Node(10, [1], [2]), Node(11, [2], [3])])
+        self.manager.add_hypergraph(self.hypergraph)
+
+    def test__get_graph_by_id__returns_registered_graph(self):
+        self.assertEqual(self.hypergraph, self.manager.get_graph_by_id(1))
+        self.assertIsNone(self.manager.get_graph_by_id(2))
+
+    def test__get_graph_by_node_id__returns_graph_of_node(self):
+        self.assertEqual(self.hypergraph, self.manager.get_graph_by_node_id(11))
+        self.assertIsNone(self.manager.get_graph_by_node_id(12))
+
+    def test__remove_hypergraph__removes_node_index(self):
+        self.manager.remove_hypergraph(self.hypergraph)
+        self.assertIsNone(self.manager.get_graph_by_id(1))
+        self.assertIsNone(self.manager.get_graph_by_node_id(10))
+        self.assertEqual([], self.manager.hypergraphs)
+
+    def test__add_hypergraph__replaces_graph_with_same_id(self):
+        replacement = Hypergraph(1, nodes=[Node(12, [1], [2])])
+        self.manager.add_hypergraph(replacement)
+        self.assertEqual([replacement], self.manager.hypergraphs)
+        self.assertIsNone(self.manager.get_graph_by_node_id(10))
+        self.assertEqual(replacement, self.manager.get_graph_by_node_id(12))
+
+    def test__managers__do_not_share_hypergraphs(self):
+        self.assertEqual([], HypergraphManager().hypergraphs)
+
+    def test__modify_canvas_hypergraph__registers_valid_canvas(self):
+        canvas = build_chain(3)
+        manager = canvas.main_diagram.hypergraph_manager
+        manager.modify_canvas_hypergraph(canvas)
+        hypergraph = manager.get_graph_by_id(canvas.id)
+        self.assertEqual(3, len(hypergraph.nodes))
+        self.assertEqual(hypergraph, manager.get_graph_by_node_id(canvas.boxes[1].id))
+
+    def test__modify_canvas_hypergraph__drops_invalid_canvas(self):
+        canvas = build_chain(3)
+        manager = canvas.main_diagram.hypergraph_manager
+        manager.modify_canvas_hypergraph(canvas)
+        canvas.boxes[1].connections[-1].wire = None
+        manager.modify_canvas_hypergraph(canvas)
+        self.assertIsNone(manager.get_graph_by_id(canvas.id))
+        self.assertIsNone(manager.get_graph_by_node_id(canvas.boxes[0].id))
@@ -0,0 +1,117 @@
+import unittest
+
+from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
+from MVP.refactored.tests.backend.synthetic import SyntheticCanvas, SyntheticMainDiagram, SyntheticWire, build_chain
+
+
+class IncrementalHypergraphTests(unittest.TestCase):
+
+    def setUp(self):
+        self.main_diagram = SyntheticMainDiagram()
+        self.main_diagram.hypergraph_manager = HypergraphManager(incremental=True)
+        self.manager = self.main_diagram.hypergraph_manager
+
+    def build_chain(self, size):
+        canvas = build_chain(size, canvas=SyntheticCanvas(self.main_diagram))
+        for box in canvas.boxes:
+            self.manager.box_added(canvas, box)
+        return canvas
+
+    def test__box_added__registers_valid_canvas(self):
+        canvas = self.build_chain(4)
+        self.assertTrue(self.manager.is_consistent(canvas))
+        self.assertEqual(4, len(self.manager.get_graph_by_id(canvas.id).nodes))
+
+    def test__box_connections_changed__disconnected_wire_invalidates_canvas(self):
+        canvas = self.build_chain(4)
+        self.manager.get_graph_by_id(canvas.id)
+        box = canvas.boxes[1]
+        box.connections[-1].wire = None
+        self.manager.box_connections_changed(canvas, box)
+        self.assertTrue(self.manager.is_consistent(canvas))
+        self.assertIsNone(self.manager.get_graph_by_id(canvas.id))
+        self.assertIsNone(self.manager.get_graph_by_node_id(box.id))
+
+    def test__box_connections_changed__reconnected_wire_revalidates_canvas(self):
+        canvas = self.build_chain(4)
+        box = canvas.boxes[1]
+        wire = box.connections[-1].wire
+        box.connections[-1].wire = None
+        self.manager.box_connections_changed(canvas, box)
+        self.assertIsNone(self.manager.get_graph_by_id(canvas.id))
+
+        box.connections[-1].wire = wire
+        self.manager.box_connections_changed(canvas, box)
+        self.assertTrue(self.manager.is_consistent(canvas))
+        self.assertIsNotNone(self.manager.get_graph_by_id(canvas.id))
+
+    def test__box_deleted__keeps_hypergraph_consistent(self):
+        canvas = self.build_chain(4)
+        box = canvas.boxes.pop()
+        self.manager.box_deleted(canvas, box)
+        self.assertTrue(self.manager.is_consistent(canvas))
+        self.assertEqual(3, len(self.manager.get_graph_by_id(canvas.id).nodes))
+
+        middle = canvas.boxes.pop(1)
+        self.manager.box_deleted(canvas, middle)
+        self.assertTrue(self.manager.is_consistent(canvas))
+        self.assertIsNone(self.manager.get_graph_by_id(canvas.id))
+
+    def test__box_id_changed__moves_node(self):
+        canvas = self.build_chain(3)
+        box = canvas.boxes[1]
+        old_id = box.id
+        box.id = 10 ** 9
+        self.manager.box_id_changed(canvas, old_id, box)
+        self.assertTrue(self.manager.is_consistent(canvas))
+        self.assertIsNone(self.manager.get_graph_by_node_id(old_id))
+        self.assertEqual(self.manager.get_graph_by_id(canvas.id), self.manager.get_graph_by_node_id(box.id))
+
+    def test__box_added__unconnected_box_invalidates_canvas(self):
+        canvas = self.build_chain(3)
+        box = canvas.add_box("add")
+        self.manager.box_added(canvas, box)
+        self.assertTrue(self.manager.is_consistent(canvas))
+        self.assertIsNone(self.manager.get_graph_by_id(canvas.id))
+
+        box.add_connection("left", canvas.outputs[0].wire)
+        wire = SyntheticWire()
+        box.add_connection("right", wire)
+        canvas.outputs[0].wire = wire
+        self.manager.box_connections_changed(canvas, box)
+        self.assertTrue(self.manager.is_consistent(canvas))
+        self.assertIsNotNone(self.manager.get_graph_by_id(canvas.id))
+
+    def test__spider_wires_changed__joined_spiders_connect_boxes(self):
+        canvas = SyntheticCanvas(self.main_diagram)
+        first, second = canvas.add_box("increment"), canvas.add_box("increment")
+        producer, consumer = canvas.add_spider(), canvas.add_spider()
+        canvas.connect(canvas.add_input(), first.add_connection("left"))
+        canvas.connect(first.add_connection("right"), producer)
+        canvas.connect(consumer, second.add_connection("left"))
+        canvas.connect(second.add_connection("right"), canvas.add_output())
+        for box in canvas.boxes:
+            self.manager.box_added(canvas, box)
+        self.assertIsNone(self.manager.get_graph_by_id(canvas.id))
+
+        canvas.connect(producer, consumer)
+        self.manager.spider_wires_changed(canvas, producer)
+        self.assertTrue(self.manager.is_consistent(canvas))
+        self.assertEqual([second.id], [child.id for child in self.manager.get_graph_by_id(canvas.id)
+                                       .get_node(first.id).get_children()])
+
+    def test__edits__match_full_rebuild_on_long_chain(self):
+        canvas = self.build_chain(2000)
+        for box in canvas.boxes[::100]:
+            box.connections[0].wire = SyntheticWire()
+            self.manager.box_connections_changed(canvas, box)
+        self.assertTrue(self.manager.is_consistent(canvas))
+
+    def test__full_rebuild_mode__ignores_edit_events(self):
+        canvas = build_chain(3)
+        manager = canvas.main_diagram.hypergraph_manager
+        manager.box_added(canvas, canvas.boxes[0])
+        self.assertIsNone(manager.get_graph_by_id(canvas.id))
+        manager.modify_canvas_hypergraph(canvas)
+        self.assertTrue(manager.is_consistent(canvas))
+        self.assertEqual({}, manager.live_hypergraphs)
@@ -0,0 +1,86 @@
+import unittest
+
+from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
+from MVP.refactored.backend.hypergraph.node import Node
+from MVP.refactored.backend.hypergraph.structural_hash import StructuralHashes
+from MVP.refactored.frontend.canvas_objects.types.connection_type import ConnectionType
+from MVP.refactored.tests.backend.synthetic import build_chain, build_nested
+
+
+class HypergraphHashTests(unittest.TestCase):
+
+    def test__hypergraph_hash__ignores_ids_and_node_order(self):
+        first = Hypergraph(1, nodes=[Node(1, [1, 2], [3]), Node(2, [3], [4])])
+        second = Hypergraph(2, nodes=[Node(20, [30], [40]), Node(10, [10, 20], [30])])
+        self.assertEqual(StructuralHashes.hypergraph_hash(first), StructuralHashes.hypergraph_hash(second))
+
+    def test__hypergraph_hash__depends_on_labels(self):
+        hypergraph = Hypergraph(1, nodes=[Node(1, [1], [2]), Node(2, [2], [3])])
+        self.assertNotEqual(StructuralHashes.hypergraph_hash(hypergraph, {1: "add", 2: "sub"}),
+                            StructuralHashes.hypergraph_hash(hypergraph, {1: "sub", 2: "add"}))
+
+    def test__hypergraph_hash__depends_on_port_order(self):
+        # the second node takes the result of the first node as its first or as its second argument
+        first = Hypergraph(1, nodes=[Node(1, [1], [2]), Node(2, [2, 3], [4])])
+        second = Hypergraph(1, nodes=[Node(1, [1], [2]), Node(2, [3, 2], [4])])
+        self.assertNotEqual(StructuralHashes.hypergraph_hash(first), StructuralHashes.hypergraph_hash(second))
+
+    def test__hypergraph_hash__distinguishes_shared_wire_from_copies(self):
+        shared = Hypergraph(1, nodes=[Node(1, [1], [2]), Node(2, [2], [3]), Node(3, [2], [4])])
+        copies = Hypergraph(1, nodes=[Node(1, [1], [2]), Node(2, [2], [3]), Node(3, [5], [4])])
+        self.assertNotEqual(StructuralHashes.hypergraph_hash(shared), StructuralHashes.hypergraph_hash(copies))
+
+    def test__hypergraph_hash__cycle_does_not_depend_on_node_order(self):
+        nodes = [Node(1, [1, 3], [2]), Node(2, [2], [3, 4]), Node(3, [4], [5])]
+        reordered = [Node(3, [4], [5]), Node(2, [2], [3, 4]), Node(1, [1, 3], [2])]
+        self.assertEqual(StructuralHashes.hypergraph_hash(Hypergraph(1, nodes=nodes)),
+                         StructuralHashes.hypergraph_hash(Hypergraph(1, nodes=reordered)))
+
+
+class CanvasHashTests(unittest.TestCase):
+
+    def setUp(self):
+        self.hashes = StructuralHashes()
+
+    def test__canvas_hash__identical_canvasses_have_equal_hashes(self):
+        first, second = build_chain(10), build_chain(10)
+        self.assertEqual(self.hashes.canvas_hash(first, first.main_diagram.canvasses),
+                         self.hashes.canvas_hash(second, second.main_diagram.canvasses))
+        self.assertNotEqual(self.hashes.canvas_hash(first, first.main_diagram.canvasses),
+                            self.hashes.canvas_hash(build_chain(11), {}))
+
+    def test__canvas_hash__depends_on_connection_types(self):
+        first, second = build_chain(3), build_chain(3)
+        second.boxes[1].connections[0].type = ConnectionType.FIRST
+        self.assertNotEqual(self.hashes.canvas_hash(first, {}), self.hashes.canvas_hash(second, {}))
+
+    def test__canvas_hash__combines_sub_diagram_hashes(self):
+        canvas = build_nested(3, 3)
+        canvasses = canvas.main_diagram.canvasses
+        before = self.hashes.canvas_hash(canvas, canvasses)
+        middle = canvasses[str(canvas.boxes[2].id)]
+        leaf = canvasses[str(middle.boxes[0].id)]
+        sibling = canvasses[str(middle.boxes[1].id)]
+        self.assertEqual(self.hashes.canvas_hash(leaf, canvasses), self.hashes.canvas_hash(sibling, canvasses))
+
+        leaf.boxes[0].label_text = "subtract"
+        self.hashes.invalidate(leaf.id)
+        self.assertNotIn(middle.id, self.hashes.hashes)
+        self.assertIn(sibling.id, self.hashes.hashes)
+        self.assertNotEqual(before, self.hashes.canvas_hash(canvas, canvasses))
+
+    def test__project_hash__depends_on_box_code(self):
+        canvas = build_chain(2)
+        canvasses = canvas.main_diagram.canvasses
+        first = self.hashes.project_hash(canvas, canvasses, {"add": "def invoke(a, b): return a + b"})
+        second = self.hashes.project_hash(canvas, canvasses, {"add": "def invoke(a, b): return b + a"})
+        self.assertNotEqual(first, second)
+
+    def test__manager_events__invalidate_canvas_hash(self):
+        canvas = build_chain(3)
+        manager = canvas.main_diagram.hypergraph_manager
+        before = manager.canvas_hash(canvas)
+        canvas.boxes[0].label_text = "subtract"
+        self.assertEqual(before, manager.canvas_hash(canvas))
+        manager.canvas_content_changed(canvas)
+        self.assertNotEqual(before, manager.canvas_hash(canvas))
@@ -0,0 +1,147 @@
+import random
+import unittest
+
+from MVP.refactored.backend.hypergraph.hypergraph import Hypergraph
+from MVP.refactored.backend.hypergraph.node import Node
+from MVP.refactored.backend.hypergraph.validation import HypergraphValidator, IncrementalValidator
+
+
+def chain(length: int) -> Hypergraph:
+    return Hypergraph(1, nodes=[Node(i, [i], [i + 1]) for i in range(length)])
+
+
+class ValidationTests(unittest.TestCase):
+
+    def test__validate__valid_chain(self):
+        report = chain(3).validate()
+        self.assertTrue(report.is_valid)
+        self.assertEqual([0, 1, 2], report.order)
+        self.assertEqual([], report.cycle_members)
+        self.assertEqual(1, len(report.components))
+
+    def test__validate__long_chain_does_not_hit_recursion_limit(self):
+        hypergraph = chain(50000)
+        self.assertTrue(hypergraph.is_valid())
+        self.assertTrue(hypergraph.is_connected())
+        self.assertTrue(hypergraph.has_no_cycles())
+
+    def test__validate__empty_hypergraph(self):
+        report = Hypergraph(1).validate()
+        self.assertFalse(report.is_valid)
+        self.assertTrue(report.is_empty)
+
+    def test__validate__reports_disconnected_components(self):
+        hypergraph = Hypergraph(1, nodes=[Node(1, [1], [2]), Node(2, [2], [3]), Node(3, [4], [5])])
+        report = hypergraph.validate()
+        self.assertFalse(report.is_valid)
+        self.assertFalse(hypergraph.is_connected())
+        self.assertEqual([[1, 2], [3]], report.components)
+
+    def test__validate__reports_cycle_members_only(self):
+        hypergraph = Hypergraph(1, nodes=[
+            Node(1, [1, 4], [2]),
+            Node(2, [2], [3, 5]),
+            Node(3, [3], [4]),
+            Node(4, [5], [6]),
+        ])
+        report = hypergraph.validate()
+        self.assertFalse(report.is_valid)
+        self.assertFalse(hypergraph.has_no_cycles())
+        self.assertEqual({1, 2, 3}, set(report.cycle_members))
+
+    def test__validate__reports_invalid_nodes(self):
+        hypergraph = Hypergraph(1, nodes=[Node(1, [1], [2]), Node(2, [2], [])])
+        report = hypergraph.validate()
+        self.assertFalse(report.is_valid)
+        self.assertEqual([2], report.invalid_nodes)
+
+    def test__validate__reports_dangling_wires(self):
+        hypergraph = chain(2)
+        hypergraph.inputs = []
+        report = hypergraph.validate()
+        self.assertFalse(report.is_valid)
+        self.assertTrue(report.missing_inputs)
+        self.assertEqual([0], report.dangling_wires)
+
+    def test__validate__subset_uses_subset_boundary(self):
+        hypergraph = Hypergraph(1, nodes=[Node(1, [1], [2]), Node(2, [2], [3]), Node(3, [4], [5])])
+        report = HypergraphValidator.validate(hypergraph, [hypergraph.get_node(1), hypergraph.get_node(2)])
+        self.assertTrue(report.is_valid)
+
+    def test__to_dict__contains_problems(self):
+        hypergraph = Hypergraph(7, nodes=[Node(1, [1], [2]), Node(2, [3], [4])])
+        report = hypergraph.validate().to_dict()
+        self.assertEqual(7, report["hypergraph_id"])
+        self.assertFalse(report["is_valid"])
+        self.assertEqual(2, len(report["components"]))
+
+
+class IncrementalValidatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.hypergraph = chain(200)
+        self.validator = IncrementalValidator(self.hypergraph)
+        self.assertTrue(self.validator.is_valid())
+
+    def assertMatchesFullValidation(self):
+        report = HypergraphValidator.validate(self.hypergraph)
+        self.assertEqual(report.is_valid, self.validator.is_valid())
+        self.validator.update_structure()
+        self.assertEqual(sorted(map(sorted, report.components)),
+                         sorted(sorted(members) for members in self.validator.components.values()))
+        self.assertEqual(report.has_cycles, self.validator.has_cycle)
+        if not report.has_cycles:
+            for node in self.hypergraph.nodes:
+                for child in node.get_children():
+                    self.assertLess(self.validator.rank[node.id], self.validator.rank[child.id])
+
+    def test__split_and_join__tracks_components(self):
+        node = self.hypergraph.get_node(100)
+        node.remove_input(100)
+        node.add_input(1000)
+        self.assertFalse(self.validator.is_valid())
+        self.assertEqual(2, len(self.validator.components))
+        node.remove_input(1000)
+        node.add_input(100)
+        self.assertTrue(self.validator.is_valid())
+        self.assertEqual(1, len(self.validator.components))
+
+    def test__back_wire__detects_cycle(self):
+        self.hypergraph.get_node(0).add_input(150)
+        self.assertFalse(self.validator.is_valid())
+        self.assertTrue(self.validator.has_cycle)
+        self.hypergraph.get_node(0).remove_input(150)
+        self.assertTrue(self.validator.is_valid())
+
+    def test__forward_wire__reorders_ranks(self):
+        node = Node(500, [300], [301])
+        self.hypergraph.add_node(node)
+        self.hypergraph.get_node(120).add_input(301)
+        self.hypergraph.get_node(10).add_output(300)
+        self.assertMatchesFullValidation()
+
+    def test__random_edits__match_full_validation(self):
+        generator = random.Random(5)
+        next_id = 1000
+        for step in range(400):
+            nodes = list(self.hypergraph.nodes)
+            action = generator.random()
+            node = generator.choice(nodes) if nodes else None
+            if action < 0.15 or node is None:
+                wires = list(self.hypergraph.wire_producers) + list(self.hypergraph.wire_consumers) or [next_id]
+                self.hypergraph.add_node(Node(next_id, [generator.choice(wires)], [next_id + 1]))
+                next_id += 2
+            elif action < 0.3:
+                self.hypergraph.remove_node(node)
+            elif action < 0.5 and node.inputs:
+                node.remove_input(generator.choice(node.inputs))
+            elif action < 0.7 and node.outputs:
+                node.remove_output(generator.choice(node.outputs))
+            else:
+                wire_id = generator.choice(list(self.hypergraph.wire_producers) or [next_id])
+                if wire_id not in node.inputs and wire_id not in node.outputs:
+                    node.add_input(wire_id)
+            if step % 3 == 0:
+                self.assertMatchesFullValidation()
+        self.assertMatchesFullValidation()
+
@@ -0,0 +1,261 @@
+"""
+Synthetic, Tk-free diagrams shared by the backend tests and the benchmarks.
+
+The objects here only mimic the attributes of `CustomCanvas`, `Box`, `Connection` and `Wire` that the backend reads,
+so the backend can be measured on diagrams far bigger than anyone would draw by hand.
+"""
+import json
+from itertools import count
+
+from MVP.refactored.backend.box_functions.box_function import BoxFunction, functions
+from MVP.refactored.backend.hypergraph.hypergraph_manager import HypergraphManager
+from MVP.refactored.frontend.canvas_objects.types.connection_type import ConnectionType
+
+_ids = count(1)
+
+
+class SyntheticWire:
+    def __init__(self, wire_id=None, start_connection=None, end_connection=None):
+        self.id = wire_id if wire_id is not None else next(_ids)
+        self.start_connection = start_connection
+        self.end_connection = end_connection
+
+
+class SyntheticConnection:
+    def __init__(self, side, index, wire=None, box=None, connection_type=ConnectionType.GENERIC):
+        self.id = next(_ids)
+        self.side = side
+        self.index = index
+        self.wire = wire
+        self.box = box
+        self.type = connection_type
+
+    @property
+    def has_wire(self):
+        return self.wire is not None
+
+    def add_wire(self, wire):
+        self.wire = wire
+
+    def is_spider(self):
+        return False
+
+
+class SyntheticSpider:
+    def __init__(self, connection_type=ConnectionType.GENERIC):
+        self.id = next(_ids)
+        self.wires: list[SyntheticWire] = []
+        self.type = connection_type
+
+    @property
+    def has_wire(self):
+        return len(self.wires) > 0
+
+    def add_wire(self, wire):
+        self.wires.append(wire)
+
+    def is_spider(self):
+        return True
+
+
+class SyntheticBox:
+    def __init__(self, label, y, sub_diagram=None):
+        self.id = next(_ids)
+        self.label_text = label
+        self.y = y
+        self.connections: list[SyntheticConnection] = []
+        self.sub_diagram = sub_diagram
+
+    def add_connection(self, side, wire=None):
+        index = len([c for c in self.connections if c.side == side])
+        connection = SyntheticConnection(side, index, wire, self)
+        self.connections.append(connection)
+        return connection
+
+
+class SyntheticMainDiagram:
+    def __init__(self, label_content=None):
+        self.label_content = label_content if label_content is not None else {}
+        self.canvasses = {}
+        self.hypergraph_manager = HypergraphManager()
+
+
+class SyntheticCanvas:
+    def __init__(self, main_diagram=None, canvas_id=None):
+        self.id = canvas_id if canvas_id is not None else next(_ids)
+        self.main_diagram = main_diagram if main_diagram is not None else SyntheticMainDiagram()
+        self.main_diagram.canvasses[str(self.id)] = self
+        self.boxes: list[SyntheticBox] = []
+        self.inputs: list[SyntheticConnection] = []
+        self.outputs: list[SyntheticConnection] = []
+        self.spiders: list[SyntheticSpider] = []
+        self._boxes_by_id = {}
+
+    def add_box(self, label, sub_diagram=None):
+        box = SyntheticBox(label, len(self.boxes), sub_diagram)
+        self.boxes.append(box)
+        self._boxes_by_id[box.id] = box
+        return box
+
+    def add_input(self, wire=None):
+        connection = SyntheticConnection("right", len(self.inputs), wire)
+        self.inputs.append(connection)
+        return connection
+
+    def add_output(self, wire=None):
+        connection = SyntheticConnection("left", len(self.outputs), wire)
+        self.outputs.append(connection)
+        return connection
+
+    def add_spider(self):
+        spider = SyntheticSpider()
+        self.spiders.append(spider)
+        return spider
+
+    def connect(self, start, end):
+        """Wire two connections or spiders together, like drawing a wire between them in the editor."""
+        wire = SyntheticWire(start_connection=start, end_connection=end)
+        start.add_wire(wire)
+        end.add_wire(wire)
+        return wire
+
+    def get_box_by_id(self, box_id):
+        return self._boxes_by_id.get(box_id)
+
+    def get_box_function(self, box_id):
+        box = self.get_box_by_id(box_id)
+        if box:
+            return BoxFunction(box.label_text, code=self.main_diagram.label_content.get(box.label_text))
+        return None
+
+
+def build_chain(size: int, label: str = "add", canvas: SyntheticCanvas = None) -> SyntheticCanvas:
+    """
+    Build a pipeline of `size` two-input boxes where every box consumes the previous result and one diagram input.
+
+    :param size: number of boxes in the chain.
+    :param label: label (function name) of every box.
+    :param canvas: (Optional) canvas to build the chain on.
+    :return: SyntheticCanvas
+    """
+    canvas = canvas if canvas is not None else SyntheticCanvas()
+    previous = SyntheticWire()
+    canvas.add_input(previous)
+    for _ in range(size):
+        box = canvas.add_box(label)
+        box.add_connection("left", previous)
+        side_input = SyntheticWire()
+        canvas.add_input(side_input)
+        box.add_connection("left", side_input)
+        previous = SyntheticWire()
+        box.add_connection("right", previous)
+    canvas.add_output(previous)
+    return canvas
+
+
+def build_wide(width: int, label: str = "add", canvas: SyntheticCanvas = None) -> SyntheticCanvas:
+    """
+    Build a diagram with `width` independent two-input boxes reduced pairwise by a balanced tree of boxes.
+
+    Every level of the result only depends on the level before it, which makes it a good shape for level scheduling.
+
+    :param width: number of boxes in the first level.
+    :param label: label (function name) of every box.
+    :param canvas: (Optional) canvas to build the diagram on.
+    :return: SyntheticCanvas
+    """
+    canvas = canvas if canvas is not None else SyntheticCanvas()
+    level = []
+    for _ in range(width):
+        box = canvas.add_box(label)
+        for _ in range(2):
+            wire = SyntheticWire()
+            canvas.add_input(wire)
+            box.add_connection("left", wire)
+        wire = SyntheticWire()
+        box.add_connection("right", wire)
+        level.append(wire)
+    while len(level) > 1:
+        next_level = []
+        for i in range(0, len(level) - 1, 2):
+            box = canvas.add_box(label)
+            box.add_connection("left", level[i])
+            box.add_connection("left", level[i + 1])
+            wire = SyntheticWire()
+            box.add_connection("right", wire)
+            next_level.append(wire)
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    canvas.add_output(level[0])
+    return canvas
+
+
+def build_nested(depth: int, width: int, label: str = "add", canvas: SyntheticCanvas = None) -> SyntheticCanvas:
+    """
+    Build a pipeline of `width` one-input boxes where, above the last level, every box is a sub-diagram of the same shape.
+
+    All sub-diagrams on one level have identical content, the diagram has `width ** depth` leaf boxes.
+
+    :param depth: number of levels, 1 means no sub-diagrams.
+    :param width: number of boxes on every canvas.
+    :param label: label (function name) of every leaf box.
+    :param canvas: (Optional) canvas to build the pipeline on.
+    :return: SyntheticCanvas
+    """
+    canvas = canvas if canvas is not None else SyntheticCanvas()
+    wire = SyntheticWire()
+    canvas.add_input(wire)
+    for _ in range(width):
+        box = canvas.add_box(label)
+        box.add_connection("left", wire)
+        wire = SyntheticWire()
+        box.add_connection("right", wire)
+        if depth > 1:
+            box.sub_diagram = build_nested(depth - 1, width, label, SyntheticCanvas(canvas.main_diagram, box.id))
+    canvas.add_output(wire)
+    return canvas
+
+
+def load_project(path: str) -> SyntheticCanvas:
+    """
+    Load a project saved by the editor (like the ones in `example_projects`) into synthetic canvasses.
+
+    Saved projects do not contain the code of their functions, every label that is not a predefined function gets a
+    placeholder function that sums its arguments.
+
+    :param path: path of the project JSON file.
+    :return: SyntheticCanvas of the main canvas.
+    """
+    with open(path) as file:
+        project = json.load(file)
+    canvas = SyntheticCanvas()
+    _load_canvas(project["main_canvas"], canvas)
+    return canvas
+
+
+def _load_canvas(data: dict, canvas: SyntheticCanvas) -> None:
+    # Connections and spiders by their saved id, the saved wires refer to their ends by these ids.
+    ends = {}
+    for spider_data in data["spiders"]:
+        ends[spider_data["id"]] = canvas.add_spider()
+    for box_data in data["boxes"]:
+        box = canvas.add_box(box_data["label"] or "")
+        box.y = box_data["y"]
+        for connection in sorted(box_data["connections"], key=lambda c: (c["side"], c["index"])):
+            ends[connection["id"]] = box.add_connection(connection["side"])
+            ends[connection["id"]].type = ConnectionType[connection.get("type", "GENERIC")]
+        if box_data["sub_diagram"]:
+            box.sub_diagram = SyntheticCanvas(canvas.main_diagram, box.id)
+            _load_canvas(box_data["sub_diagram"], box.sub_diagram)
+        elif box.label_text not in functions and box.label_text not in canvas.main_diagram.label_content:
+            outputs = len([c for c in box.connections if c.side == "right"])
+            result = "sum(args)" if outputs == 1 else f"({', '.join(['sum(args)'] * outputs)},)"
+            canvas.main_diagram.label_content[box.label_text] = (
+                f"def invoke(*args):\n    return {result}\n\n\nmeta = {{\"name\": \"{box.label_text}\"}}\n")
+    for connection in sorted(data["io"]["inputs"], key=lambda c: c["index"]):
+        ends[connection["id"]] = canvas.add_input()
+    for connection in sorted(data["io"]["outputs"], key=lambda c: c["index"]):
+        ends[connection["id"]] = canvas.add_output()
+    for wire_data in data["wires"]:
+        canvas.connect(ends[wire_data["start_c"]["id"]], ends[wire_data["end_c"]["id"]])
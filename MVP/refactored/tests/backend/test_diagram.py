@@ -0,0 +1,203 @@
+import unittest
+
+from MVP.refactored.backend.diagram import Diagram
+from MVP.refactored.backend.diagram_callback import Receiver
+from MVP.refactored.backend.generator import Generator
+from MVP.refactored.backend.resource import Resource
+
+
+def build(receiver):
+    """Two boxes with a wire from the right of box 1 to the left of box 2."""
+    for box_id in (1, 2):
+        receiver.receiver_callback("box_add", generator_id=box_id)
+    receiver.receiver_callback("box_add_right", generator_id=1, connection_nr=0, connection_id=11)
+    receiver.receiver_callback("box_add_left", generator_id=2, connection_nr=0, connection_id=21)
+    receiver.receiver_callback("wire_add", wire_id=10, start_connection=[0, 1, "right"], connection_id=11)
+    receiver.receiver_callback("wire_add", wire_id=10, start_connection=[0, 2, "left"], connection_id=21)
+
+
+class DiagramTests(unittest.TestCase):
+
+    def setUp(self):
+        self.diagram = Diagram()
+
+    def test__add_box__indexed_by_id_in_insertion_order(self):
+        boxes = [Generator(box_id) for box_id in (3, 1, 2)]
+        for box in boxes:
+            self.diagram.add_box(box)
+        self.assertIs(boxes[1], self.diagram.get_box(1))
+        self.assertIsNone(self.diagram.get_box(4))
+        self.assertEqual(boxes, self.diagram.boxes)
+
+    def test__views__are_live_and_read_only(self):
+        boxes, resources, spiders = self.diagram.boxes, self.diagram.resources, self.diagram.spiders
+        box, resource, spider = Generator(1), Resource(2), Resource(3)
+        self.diagram.add_box(box)
+        self.diagram.add_resource(resource)
+        self.diagram.add_spider(spider)
+        self.assertEqual(([box], [resource], [spider]), (boxes, resources, spiders))
+        self.assertIn(box, boxes)
+        self.assertNotIn(Generator(1), boxes)
+        for view in (boxes, resources, spiders):
+            self.assertFalse(hasattr(view, "append"))
+
+    def test__remove_box__missing_box(self):
+        self.diagram.add_box(Generator(1))
+        with self.assertRaises(ValueError):
+            self.diagram.remove_box(Generator(1))
+
+    def test__remove_resource__only_the_given_resource(self):
+        resource = Resource(1)
+        self.diagram.add_resource(resource)
+        self.diagram.remove_resource(Resource(1))
+        self.assertIs(resource, self.diagram.get_resource(1))
+        self.diagram.remove_resource(resource)
+        self.assertEqual([], self.diagram.resources)
+
+    def test__change_box_id__reindexes_box(self):
+        box = Generator(1)
+        self.diagram.add_box(box)
+        self.diagram.add_box(Generator(2))
+        self.diagram.change_box_id(box, 5)
+        self.assertIsNone(self.diagram.get_box(1))
+        self.assertIs(box, self.diagram.get_box(5))
+        self.assertEqual([2, 5], [box.id for box in self.diagram.boxes])
+
+    def test__from_dict__rebuilds_indexes(self):
+        self.diagram.add_box(Generator(1))
+        resource = Resource(7)
+        resource.add_connection([0, 1, "right", 8])
+        self.diagram.add_resource(resource)
+        copy = Diagram()
+        copy._from_dict(self.diagram._to_dict())
+        self.assertEqual(1, copy.get_box(1).id)
+        self.assertEqual([[0, 1, "right", 8]], copy.get_resource(7).connections)
+
+
+class ReceiverTests(unittest.TestCase):
+
+    def setUp(self):
+        self.receiver = Receiver()
+        build(self.receiver)
+
+    def test__wire_add__connects_boxes(self):
+        resource = self.receiver.wire_get_resource_by_id(10)
+        self.assertEqual([[0, 1, "right", 11], [0, 2, "left", 21]], resource.connections)
+        self.assertEqual([0, 1, 11, 10], self.receiver.generator_get_box_by_id(1).right[0])
+
+    def test__box_delete__removes_box_and_its_wires(self):
+        self.receiver.receiver_callback("box_delete", generator_id=1)
+        self.assertIsNone(self.receiver.generator_get_box_by_id(1))
+        self.assertIsNone(self.receiver.wire_get_resource_by_id(10))
+        self.assertEqual([0, 2], self.receiver.generator_get_box_by_id(2).left[0][:2])
+
+    def test__box_swap_id__box_found_by_new_id(self):
+        self.receiver.receiver_callback("box_swap_id", generator_id=2, connection_id=20)
+        self.assertIsNone(self.receiver.generator_get_box_by_id(2))
+        self.assertEqual(20, self.receiver.generator_get_box_by_id(20).id)
+
+    def test__delete_spider__removes_spider(self):
+        self.receiver.receiver_callback("create_spider", wire_id=30, connection_id=31, generator_id=1)
+        self.assertIs(self.receiver.spider_get_resource_by_connection_id(30), self.receiver.diagram.spiders[0])
+        self.receiver.receiver_callback("delete_spider", wire_id=30)
+        self.assertIsNone(self.receiver.spider_get_resource_by_connection_id(30))
+        self.assertEqual([], self.receiver.generator_get_box_by_id(1).spiders)
+
+
+class TransactionTests(unittest.TestCase):
+
+    def setUp(self):
+        self.receiver = Receiver()
+
+    def test__transaction__applies_callbacks_on_commit(self):
+        with self.receiver.transaction():
+            build(self.receiver)
+            self.assertIsNone(self.receiver.generator_get_box_by_id(1))
+        expected = Receiver()
+        build(expected)
+        self.assertEqual(expected.diagram._to_dict(), self.receiver.diagram._to_dict())
+
+    def test__transaction__nested_applies_at_outermost_end(self):
+        with self.receiver.transaction():
+            with self.receiver.transaction():
+                self.receiver.receiver_callback("box_add", generator_id=1)
+            self.assertIsNone(self.receiver.generator_get_box_by_id(1))
+        self.assertIsNotNone(self.receiver.generator_get_box_by_id(1))
+
+    def test__transaction__applies_callbacks_when_operation_fails(self):
+        with self.assertRaises(RuntimeError):
+            with self.receiver.transaction():
+                self.receiver.receiver_callback("box_add", generator_id=1)
+                raise RuntimeError
+        self.assertIsNotNone(self.receiver.generator_get_box_by_id(1))
+
+    def test__coalesce__drops_wire_added_and_deleted(self):
+        with self.receiver.transaction():
+            build(self.receiver)
+            self.receiver.receiver_callback("wire_delete", wire_id=10)
+        self.assertIsNone(self.receiver.wire_get_resource_by_id(10))
+        self.assertEqual([[0, 1, 11]], self.receiver.generator_get_box_by_id(1).right)
+        self.assertEqual([[0, 2, 21]], self.receiver.generator_get_box_by_id(2).left)
+
+    def test__coalesce__keeps_deletion_of_existing_wire(self):
+        build(self.receiver)
+        with self.receiver.transaction():
+            self.receiver.receiver_callback("wire_add", wire_id=10, start_connection=[0, 1, "right"], connection_id=11)
+            self.receiver.receiver_callback("wire_delete", wire_id=10)
+        self.assertIsNone(self.receiver.wire_get_resource_by_id(10))
+
+    def test__coalesce__drops_box_once_its_wires_are_dropped(self):
+        callbacks = [("box_add", {"generator_id": 3}),
+                     ("wire_add", {"wire_id": 30, "start_connection": [0, 3, "right"], "connection_id": 31}),
+                     ("wire_delete", {"wire_id": 30}),
+                     ("box_delete", {"generator_id": 3}),
+                     ("box_add", {"generator_id": 4})]
+        self.assertEqual([("box_add", {"generator_id": 4})], self.receiver.coalesce(callbacks))
+
+    def test__coalesce__keeps_spider_with_wires(self):
+        callbacks = [("create_spider", {"wire_id": 5, "connection_id": 5}),
+                     ("wire_add", {"wire_id": 6, "start_connection": [0, 1, "right"], "connection_id": 5,
+                                   "end_connection": [0, None, "spider"]}),
+                     ("delete_spider", {"wire_id": 5})]
+        self.assertEqual(callbacks, self.receiver.coalesce(callbacks))
+
+
+class ThreadedReceiverTests(unittest.TestCase):
+
+    def setUp(self):
+        self.receiver = Receiver(threaded=True)
+
+    def tearDown(self):
+        self.receiver.close()
+
+    def test__flush__applies_callbacks_in_order(self):
+        build(self.receiver)
+        self.receiver.receiver_callback("box_swap_id", generator_id=2, connection_id=20)
+        self.assertTrue(self.receiver.flush(timeout=5))
+        expected = Receiver()
+        build(expected)
+        expected.receiver_callback("box_swap_id", generator_id=2, connection_id=20)
+        self.assertEqual(expected.diagram._to_dict(), self.receiver.diagram._to_dict())
+
+    def test__transaction__coalesced_on_worker(self):
+        with self.receiver.transaction():
+            build(self.receiver)
+            self.receiver.receiver_callback("wire_delete", wire_id=10)
+        self.receiver.flush()
+        self.assertIsNone(self.receiver.wire_get_resource_by_id(10))
+        self.assertEqual([[0, 1, 11]], self.receiver.generator_get_box_by_id(1).right)
+
+    def test__worker__survives_failing_callback(self):
+        with self.assertLogs("MVP.refactored.backend.diagram_callback", level="ERROR"):
+            self.receiver.receiver_callback("wire_add", wire_id=3, connection_id=1)
+            self.receiver.flush()
+        self.receiver.receiver_callback("box_add", generator_id=1)
+        self.receiver.flush()
+        self.assertIsNotNone(self.receiver.generator_get_box_by_id(1))
+
+    def test__close__applies_queued_callbacks(self):
+        self.receiver.receiver_callback("box_add", generator_id=1)
+        self.receiver.close()
+        self.assertFalse(self.receiver.threaded)
+        self.assertIsNotNone(self.receiver.generator_get_box_by_id(1))
+        self.assertTrue(self.receiver.flush())
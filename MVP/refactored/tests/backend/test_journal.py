@@ -0,0 +1,279 @@
+import unittest
+
+from MVP.refactored.backend.journal import BoxState, CanvasState, Journal, copy_state
+
+
+def add_box(journal, canvas_id, box_id, x=0, y=0, inputs=(), outputs=()):
+    journal.record(("add_box", canvas_id, box_id, x, y, 60, 60, "rectangle"))
+    for connection_id in inputs:
+        journal.record(("add_connection", canvas_id, box_id, "left", connection_id, "GENERIC"))
+    for connection_id in outputs:
+        journal.record(("add_connection", canvas_id, box_id, "right", connection_id, "GENERIC"))
+
+
+def without_empty(state):
+    return {canvas_id: canvas for canvas_id, canvas in state.items() if canvas != CanvasState()}
+
+
+class JournalTests(unittest.TestCase):
+
+    def setUp(self):
+        self.journal = Journal()
+        self.journal.clear({"root": CanvasState()})
+
+    def assertDiffReaches(self, current, target):
+        state = copy_state(current)
+        for operation in Journal.diff(current, target):
+            Journal.apply_operation(state, operation)
+        self.assertEqual(without_empty(target), without_empty(state))
+
+    def test__record__applies_operations_to_state(self):
+        add_box(self.journal, "root", 1, inputs=[10], outputs=[11])
+        self.journal.record(("add_spider", "root", 5, 100, 100, "GENERIC"))
+        self.journal.record(("add_wire", "root", 11, 5))
+        self.journal.record(("label", "root", 1, "f"))
+        canvas = self.journal.state["root"]
+        self.assertEqual(BoxState(0, 0, 60, 60, "rectangle", "f", [10], [11]), canvas.boxes[1])
+        self.assertEqual({(11, 5)}, canvas.wires)
+        self.journal.record(("remove_connection", "root", 1, 11))
+        self.assertEqual(set(), canvas.wires)
+        self.assertNotIn(11, canvas.types)
+
+    def test__undo_redo__restore_states(self):
+        add_box(self.journal, "root", 1, outputs=[11])
+        before = copy_state(self.journal.state)
+        self.journal.record(("move_box", "root", 1, 50, 60))
+        after = copy_state(self.journal.state)
+        self.assertEqual([("move_box", "root", 1, 0, 0)], self.journal.undo())
+        self.assertEqual(before, self.journal.state)
+        self.assertEqual([("move_box", "root", 1, 50, 60)], self.journal.redo())
+        self.assertEqual(after, self.journal.state)
+        self.assertIsNone(self.journal.redo())
+
+    def test__undo__to_empty_diagram_removes_box(self):
+        self.journal.record(("add_box", "root", 1, 0, 0, 60, 60, "rectangle"))
+        self.assertEqual([("remove_box", "root", 1)], self.journal.undo())
+        self.assertIsNone(self.journal.undo())
+
+    def test__record__after_undo_drops_redo(self):
+        add_box(self.journal, "root", 1)
+        self.journal.record(("label", "root", 1, "a"))
+        self.journal.undo()
+        self.journal.record(("label", "root", 1, "b"))
+        self.assertFalse(self.journal.can_redo)
+        self.assertEqual(2, len(self.journal.steps))
+        self.assertEqual(2, self.journal.operation_count)
+
+    def test__group__is_one_step(self):
+        with self.journal.group():
+            for box_id in range(1000):
+                add_box(self.journal, "root", box_id, inputs=[box_id + 1000])
+            with self.journal.group():
+                self.journal.record(("add_wire", "root", 1000, 1001))
+        self.assertEqual(1, len(self.journal.steps))
+        operations = self.journal.undo()
+        self.assertEqual(1000, len([operation for operation in operations if operation[0] == "remove_box"]))
+        self.assertEqual({"root": CanvasState()}, self.journal.state)
+        self.assertEqual(2001, len(self.journal.redo()))
+
+    def test__group__commits_on_exception(self):
+        with self.assertRaises(RuntimeError):
+            with self.journal.group():
+                add_box(self.journal, "root", 1)
+                raise RuntimeError
+        self.assertEqual(1, len(self.journal.steps))
+
+    def test__merge__until_checkpoint(self):
+        add_box(self.journal, "root", 1)
+        for x in range(1, 20):
+            self.journal.record(("move_box", "root", 1, x, 0), merge=True)
+        self.assertEqual(2, len(self.journal.steps))
+        self.journal.checkpoint()
+        self.journal.record(("move_box", "root", 1, 40, 0), merge=True)
+        self.assertEqual(3, len(self.journal.steps))
+        self.journal.undo()
+        self.assertEqual(19, self.journal.state["root"].boxes[1].x)
+
+    def test__follow__joins_previous_step(self):
+        add_box(self.journal, "root", 1)
+        self.journal.record(("add_connection", "root", 1, "left", 10, "GENERIC"))
+        self.journal.record(("resize_box", "root", 1, 60, 100), follow=True)
+        self.assertEqual(2, len(self.journal.steps))
+        self.assertEqual([("remove_connection", "root", 1, 10), ("resize_box", "root", 1, 60, 60)],
+                         self.journal.undo())
+
+    def test__remove_box__keeps_moved_sub_diagram(self):
+        add_box(self.journal, "root", 1)
+        self.journal.record(("sub_diagram", "root", 1, "sub"))
+        add_box(self.journal, "sub", 2)
+        with self.journal.group():
+            add_box(self.journal, "root", 3)
+            self.journal.record(("sub_diagram", "root", 3, "new"))
+            self.journal.record(("remove_box", "root", 1, True))
+            add_box(self.journal, "new", 1)
+            self.journal.record(("sub_diagram", "new", 1, "sub"))
+        self.assertIn(2, self.journal.state["sub"].boxes)
+        before = copy_state(self.journal.state)
+        self.journal.undo()
+        self.assertNotIn("new", self.journal.state)
+        self.assertEqual("sub", self.journal.state["root"].boxes[1].sub_diagram)
+        self.journal.redo()
+        self.assertEqual(before, self.journal.state)
+
+    def test__suspended__ignores_operations(self):
+        with self.journal.suspended():
+            add_box(self.journal, "root", 1)
+        self.assertEqual({"root": CanvasState()}, self.journal.state)
+        self.assertFalse(self.journal.can_undo)
+
+    def test__state_at__rebuilds_earlier_states(self):
+        journal = Journal()
+        states = [copy_state(journal.state)]
+        add_box(journal, "root", 1)
+        states.append(copy_state(journal.state))
+        for x in range(50):
+            journal.record(("move_box", "root", 1, x, x))
+            states.append(copy_state(journal.state))
+        for step, state in enumerate(states):
+            self.assertEqual(state, journal.state_at(step))
+        for state in reversed(states[:-1]):
+            journal.undo()
+            self.assertEqual(state, journal.state)
+        self.assertEqual(states[-1], journal.state_at(len(states) - 1))
+
+    def test__merge__undoes_to_state_before_first_merged_operation(self):
+        add_box(self.journal, "root", 1)
+        self.journal.record(("move_box", "root", 1, 1, 1), merge=True)
+        self.journal.record(("move_box", "root", 1, 2, 2), merge=True)
+        self.assertEqual([("move_box", "root", 1, 0, 0)], self.journal.undo())
+        self.assertEqual([("move_box", "root", 1, 2, 2)], self.journal.redo())
+
+    def test__undo__keeps_only_touched_objects(self):
+        with self.journal.group():
+            for box_id in range(1000):
+                add_box(self.journal, "root", box_id, inputs=[box_id + 1000])
+        self.journal.record(("move_box", "root", 5, 10, 10))
+        self.assertEqual([("root", "box", 5)], list(self.journal.images[-1]))
+        self.assertEqual([("move_box", "root", 5, 0, 0)], self.journal.undo())
+
+    def test__trim__keeps_max_operations(self):
+        journal = Journal(max_operations=30)
+        add_box(journal, "root", 1)
+        for x in range(100):
+            journal.record(("move_box", "root", 1, x, 0))
+        self.assertEqual(30, journal.operation_count)
+        self.assertEqual(journal.operation_count, len(journal.steps))
+        self.assertEqual(len(journal.steps), len(journal.images))
+        while journal.can_undo:
+            journal.undo()
+        self.assertEqual(100 - len(journal.steps) - 1, journal.state["root"].boxes[1].x)
+
+    def test__follow__trims(self):
+        journal = Journal(max_operations=3)
+        add_box(journal, "root", 1)
+        add_box(journal, "root", 2)
+        for height in range(5):
+            journal.record(("resize_box", "root", 2, 60, height), follow=True)
+        self.assertEqual(1, len(journal.steps))
+        journal.undo()
+        self.assertEqual({1}, set(journal.state["root"].boxes))
+
+    def test__undo_redo__round_trip_every_operation(self):
+        add_box(self.journal, "root", 1, inputs=[10, 11], outputs=[12])
+        add_box(self.journal, "root", 2, inputs=[20], outputs=[21, 22])
+        self.journal.record(("add_io", "root", "input", 30, "GENERIC"))
+        self.journal.record(("add_io", "root", "input", 31, "GENERIC"))
+        self.journal.record(("add_io", "root", "output", 32, "GENERIC"))
+        self.journal.record(("add_spider", "root", 40, 5, 5, "GENERIC"))
+        for wire in [(30, 10), (31, 11), (12, 40), (40, 20), (21, 32)]:
+            self.journal.record(("add_wire", "root", *wire))
+        self.journal.record(("sub_diagram", "root", 2, "sub"))
+        self.journal.record(("add_io", "sub", "input", 50, "GENERIC"))
+        add_box(self.journal, "sub", 3, inputs=[60])
+        self.journal.record(("sub_diagram", "sub", 3, "inner"))
+        add_box(self.journal, "inner", 4)
+        self.journal.record(("add_wire", "sub", 50, 60))
+        steps = [
+            [("remove_io", "root", "input", 30)],
+            [("remove_connection", "root", 1, 10), ("add_connection", "root", 1, "left", 13, "FIRST")],
+            [("connection_type", "root", 21, "SECOND"), ("move_spider", "root", 40, 8, 8)],
+            [("remove_spider", "root", 40)],
+            [("box_id", "root", 2, 7), ("label", "root", 7, "g")],
+            [("add_box", "root", 8, 0, 0, 60, 60, "rectangle"), ("sub_diagram", "root", 8, "moved"),
+             ("remove_box", "root", 7, True), ("add_box", "moved", 9, 0, 0, 60, 60, "rectangle"),
+             ("sub_diagram", "moved", 9, "sub"), ("move_box", "sub", 3, 30, 30)],
+            [("remove_sub_diagram", "root", 8), ("remove_wire", "root", 31, 11)],
+            [("remove_box", "root", 1), ("add_io", "root", "output", 33, "GENERIC")],
+        ]
+        states = [copy_state(self.journal.state)]
+        for operations in steps:
+            with self.journal.group():
+                for operation in operations:
+                    self.journal.record(operation)
+            states.append(copy_state(self.journal.state))
+
+        mirror = copy_state(self.journal.state)
+        for state in reversed(states[:-1]):
+            for operation in self.journal.undo():
+                Journal.apply_operation(mirror, operation)
+            self.assertEqual(state, self.journal.state)
+            self.assertEqual(without_empty(state), without_empty(mirror))
+        for state in states[1:]:
+            for operation in self.journal.redo():
+                Journal.apply_operation(mirror, operation)
+            self.assertEqual(state, self.journal.state)
+            self.assertEqual(without_empty(state), without_empty(mirror))
+
+    def test__view__converts_positions(self):
+        add_box(self.journal, "root", 1, x=10, y=20)
+        self.journal.view("root", scale=2, dx=5, dy=0)
+        self.journal.record(("move_box", "root", 1, 45, 40))
+        self.assertEqual((20, 20), (self.journal.state["root"].boxes[1].x, self.journal.state["root"].boxes[1].y))
+        self.journal.record(("resize_box", "root", 1, 100, 100))
+        self.assertEqual([("resize_box", "root", 1, 120, 120)], self.journal.undo())
+        self.assertEqual([("move_box", "root", 1, 25, 40)], self.journal.undo())
+        self.journal.undo()
+        self.assertEqual([("add_box", "root", 1, 25, 40, 120, 120, "rectangle")], self.journal.redo())
+
+    def test__invalid_size__raises(self):
+        with self.assertRaises(ValueError):
+            Journal(max_operations=0)
+
+    def test__diff__rewires_changed_connections(self):
+        add_box(self.journal, "root", 1, outputs=[11, 12])
+        add_box(self.journal, "root", 2, inputs=[20])
+        self.journal.record(("add_io", "root", "output", 30, "GENERIC"))
+        self.journal.record(("add_wire", "root", 12, 20))
+        self.journal.record(("add_wire", "root", 11, 30))
+        current = copy_state(self.journal.state)
+        self.journal.record(("remove_connection", "root", 1, 11))
+        self.journal.record(("add_connection", "root", 1, "right", 13, "GENERIC"))
+        self.journal.record(("connection_type", "root", 20, "FIRST"))
+        target = copy_state(self.journal.state)
+        self.assertDiffReaches(current, target)
+        self.assertDiffReaches(target, current)
+
+    def test__diff__sub_diagrams(self):
+        add_box(self.journal, "root", 1, inputs=[10])
+        current = copy_state(self.journal.state)
+        self.journal.record(("sub_diagram", "root", 1, "sub"))
+        self.journal.record(("add_io", "sub", "input", 10, "GENERIC"))
+        add_box(self.journal, "sub", 2, inputs=[20])
+        self.journal.record(("sub_diagram", "sub", 2, "inner"))
+        add_box(self.journal, "inner", 3)
+        self.journal.record(("add_wire", "sub", 10, 20))
+        target = copy_state(self.journal.state)
+        operations = Journal.diff(current, target)
+        kinds = [operation[0] for operation in operations]
+        self.assertLess(kinds.index("sub_diagram"), operations.index(("add_box", "sub", 2, 0, 0, 60, 60, "rectangle")))
+        self.assertDiffReaches(current, target)
+        self.journal.record(("remove_box", "root", 1))
+        self.assertEqual(["root"], list(self.journal.state))
+        self.assertEqual([("add_box", "root", 1, 0, 0, 60, 60, "rectangle")], Journal.diff(self.journal.state,
+                                                                                            target)[:1])
+        self.assertDiffReaches(self.journal.state, target)
+        self.assertEqual([("remove_box", "root", 1)], Journal.diff(target, self.journal.state))
+
+
+if __name__ == '__main__':
+    unittest.main()
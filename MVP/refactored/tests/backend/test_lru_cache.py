@@ -0,0 +1,31 @@
+import unittest
+
+from MVP.refactored.backend.lru_cache import LRUCache
+
+
+class LRUCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.cache = LRUCache(max_size=2)
+
+    def test__get__creates_missing_values_once(self):
+        self.assertEqual(1, self.cache.get("a", lambda: 1))
+        self.assertEqual(1, self.cache.get("a", lambda: 2))
+        self.assertEqual((1, 1), (self.cache.hits, self.cache.misses))
+
+    def test__get__caches_none(self):
+        self.cache.get("a", lambda: None)
+        self.assertEqual((True, None), self.cache.lookup("a"))
+
+    def test__put__evicts_least_recently_used(self):
+        self.cache.put("a", 1)
+        self.cache.put("b", 2)
+        self.cache.lookup("a")
+        self.cache.put("c", 3)
+        self.assertEqual(["a", "c"], list(self.cache.entries))
+        self.assertEqual((False, None), self.cache.lookup("b"))
+
+    def test__clear__resets_counters(self):
+        self.cache.get("a", lambda: 1)
+        self.cache.clear()
+        self.assertEqual((0, 0, 0), (len(self.cache), self.cache.hits, self.cache.misses))
@@ -0,0 +1,85 @@
+import json
+import os
+import tempfile
+import unittest
+
+from MVP.refactored.backend.diagram_callback import Receiver
+from MVP.refactored.backend.metrics import CallbackMetrics, Histogram
+
+
+class HistogramTests(unittest.TestCase):
+
+    def test__observe__counts_per_bucket(self):
+        histogram = Histogram((1, 2, 4))
+        for value in (0.5, 1, 3, 3, 10):
+            histogram.observe(value)
+        self.assertEqual([2, 0, 2, 1], histogram.counts)
+        self.assertEqual([2, 2, 4, 5], histogram.cumulative_counts())
+        self.assertEqual((5, 17.5), (histogram.count, histogram.sum))
+
+    def test__quantile__upper_bound_of_bucket(self):
+        histogram = Histogram((1, 2, 4))
+        self.assertEqual(0.0, histogram.quantile(0.5))
+        for value in (0.5, 1.5, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(2, histogram.quantile(0.5))
+        self.assertEqual(float("inf"), histogram.quantile(0.99))
+
+
+class CallbackMetricsTests(unittest.TestCase):
+
+    def setUp(self):
+        self.metrics = CallbackMetrics()
+        self.receiver = Receiver(metrics=self.metrics)
+
+    def test__receiver__records_every_applied_callback(self):
+        for box_id in (1, 2):
+            self.receiver.receiver_callback("box_add", generator_id=box_id)
+        self.receiver.receiver_callback("box_add_right", generator_id=1, connection_nr=0, connection_id=11)
+        self.receiver.receiver_callback("wire_add", wire_id=10, start_connection=[0, 1, "right"], connection_id=11)
+        self.assertEqual(2, self.metrics.calls("box_add"))
+        self.assertEqual(1, self.metrics.calls("wire_add"))
+        self.assertEqual(0, self.metrics.calls("box_delete"))
+        self.assertEqual({"box_add": "box", "box_add_right": "box", "wire_add": "wire"},
+                         {action: entry["kind"] for action, entry in self.metrics.to_dict()["actions"].items()})
+
+    def test__receiver__records_failed_callback(self):
+        with self.assertRaises(TypeError):
+            self.receiver.receiver_callback("wire_add", wire_id=3, connection_id=1)
+        self.assertEqual({"calls": 1, "errors": 1},
+                         {key: self.metrics.to_dict()["actions"]["wire_add"][key] for key in ("calls", "errors")})
+
+    def test__receiver__counts_coalesced_transaction_callbacks(self):
+        with self.receiver.transaction():
+            self.receiver.receiver_callback("create_spider", wire_id=5, connection_id=5)
+            self.receiver.receiver_callback("delete_spider", wire_id=5)
+            self.receiver.receiver_callback("box_add", generator_id=1)
+        self.assertEqual({"transactions": 1, "coalesced_callbacks": 2}, self.metrics.counters)
+        self.assertEqual(0, self.metrics.calls("create_spider"))
+
+    def test__to_prometheus__histogram_per_action(self):
+        self.metrics.observe("create_spider", 2e-5)
+        self.metrics.observe("create_spider", 2.0)
+        self.metrics.increment("transactions")
+        lines = self.metrics.to_prometheus().splitlines()
+        labels = 'action="create_spider",kind="spider"'
+        self.assertIn(f"receiver_callbacks_total{{{labels}}} 2", lines)
+        self.assertIn(f'receiver_callback_seconds_bucket{{{labels},le="1e-05"}} 0', lines)
+        self.assertIn(f'receiver_callback_seconds_bucket{{{labels},le="2.5e-05"}} 1', lines)
+        self.assertIn(f'receiver_callback_seconds_bucket{{{labels},le="+Inf"}} 2', lines)
+        self.assertIn(f"receiver_callback_seconds_count{{{labels}}} 2", lines)
+        self.assertIn("receiver_transactions_total 1", lines)
+
+    def test__save__format_by_extension(self):
+        self.metrics.observe("box_add", 1e-4)
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "metrics.json")
+            prometheus_path = os.path.join(directory, "metrics.prom")
+            self.metrics.save(json_path)
+            self.metrics.save(prometheus_path)
+            with open(json_path) as file:
+                saved = json.load(file)
+            with open(prometheus_path) as file:
+                text = file.read()
+        self.assertEqual(1, saved["actions"]["box_add"]["calls"])
+        self.assertTrue(text.startswith("# HELP receiver_callbacks_total"))
@@ -8,8 +8,7 @@ class Copier:
     @staticmethod
     def copy_over_spiders(spiders, canvas):
         for spider in spiders:
-            new_spider = canvas.add_spider(spider.location, connection_type=spider.type)
-            new_spider.id = spider.id
+            canvas.add_spider(spider.location, id_=spider.id, connection_type=spider.type)
 
     @staticmethod
     def copy_over_boxes(boxes, canvas):
@@ -22,6 +21,7 @@ class Copier:
             sub_diagram_box.sub_diagram = old_box.sub_diagram
             if sub_diagram_box.sub_diagram:
                 canvas.itemconfig(sub_diagram_box.shape, fill="#dfecf2")
+                canvas.record("sub_diagram", sub_diagram_box.id, sub_diagram_box.sub_diagram.journal_id)
 
             sub_diagram_box.locked = old_box.locked
 
@@ -153,14 +153,11 @@ class Copier:
     @staticmethod
     def copy_box(old_box, new_box, remember_connections=True):
         for connection in old_box.connections:
+            id_ = connection.id if remember_connections else None
             if connection.side == "right":
-                new_connection = new_box.add_right_connection(connection_type=connection.type)
-                if remember_connections:
-                    new_connection.id = connection.id
+                new_box.add_right_connection(id_=id_, connection_type=connection.type)
             if connection.side == "left":
-                new_connection = new_box.add_left_connection(connection_type=connection.type)
-                if remember_connections:
-                    new_connection.id = connection.id
+                new_box.add_left_connection(id_=id_, connection_type=connection.type)
         new_box.set_label(old_box.label_text)
 
     @staticmethod
@@ -37,7 +37,8 @@ class Importer:
     def start_import(self, d):
         self.load_static_variables(d)
         d = d["main_canvas"]
-        self.load_everything_to_canvas(d, self.canvas)
+        with self.canvas.receiver.transaction(), self.canvas.main_diagram.journal.group():
+            self.load_everything_to_canvas(d, self.canvas)
 
     def load_everything_to_canvas(self, d, canvas):
         canvas.rotation = d.get("rotation", 0)
@@ -26,6 +26,7 @@ RIGHT = "right"
 SELECT_COLOR = "green"
 PRIMARY_SEARCH_COLOR = "cyan"
 SECONDARY_SEARCH_COLOR = "orange"
+PROFILE_COLORS = ["gold", "dark orange", "red"]  # from the least to the most time
 BLACK = "black"
 WHITE = "white"
 